@@ -1,10 +1,91 @@
+from collections import deque
+
 import discord
 from discord.ext import commands
 
+from ...utils.outbound import Priority
+from ...core.events import (
+    AchievementUnlockedEvent,
+    GameEvent,
+    JutsuUnlockedEvent,
+    LevelUpEvent,
+    RankChangedEvent,
+)
+
 
 class AnnouncementCommands(commands.Cog):
+    MILESTONE_HISTORY = 50
+
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        self.recent_milestones: deque = deque(maxlen=self.MILESTONE_HISTORY)
+        self._subscription = None
+
+    async def cog_load(self) -> None:
+        event_bus = getattr(getattr(self.bot, "services", None), "event_bus", None)
+        if event_bus is None:
+            return
+        self._subscription = event_bus.subscribe(
+            self.on_progression_event,
+            LevelUpEvent,
+            RankChangedEvent,
+            JutsuUnlockedEvent,
+            AchievementUnlockedEvent,
+            maxsize=100,
+            name="announcements",
+        )
+
+    async def cog_unload(self) -> None:
+        event_bus = getattr(getattr(self.bot, "services", None), "event_bus", None)
+        if event_bus is not None and self._subscription is not None:
+            await event_bus.unsubscribe(self._subscription)
+        self._subscription = None
+
+    async def _broadcast(self, destination, **kwargs) -> None:
+        """Bulk sends queue behind battle updates when the outbound scheduler is available."""
+        outbound = getattr(getattr(self.bot, "services", None), "outbound", None)
+        if outbound is None:
+            await destination.send(**kwargs)
+            return
+        await outbound.send(destination, Priority.BULK, **kwargs)
+
+    @staticmethod
+    def describe_milestone(event: GameEvent) -> str:
+        if isinstance(event, LevelUpEvent):
+            return f"<@{event.user_id}> reached level **{event.new_level}**!"
+        if isinstance(event, RankChangedEvent):
+            return f"<@{event.user_id}> has been promoted to **{event.new_rank}**!"
+        if isinstance(event, JutsuUnlockedEvent):
+            return f"<@{event.user_id}> unlocked **{event.jutsu_name}**!"
+        if isinstance(event, AchievementUnlockedEvent):
+            return f"<@{event.user_id}> earned the achievement **{event.achievement}**!"
+        return f"<@{event.user_id}>: {event.event_type}"
+
+    async def on_progression_event(self, event: GameEvent) -> None:
+        """Record a milestone and post it to the announcement channel, if one is configured."""
+        text = self.describe_milestone(event)
+        self.recent_milestones.append(text)
+        config = getattr(getattr(self.bot, "services", None), "config", None)
+        channel_id = getattr(config, "online_channel_id", 0)
+        if not channel_id:
+            return
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            return
+        embed = discord.Embed(title="🎉 Shinobi Milestone", description=text, color=discord.Color.gold())
+        await self._broadcast(channel, embed=embed)
+
+    @commands.command(name="milestones", help="Show recent level-ups, promotions and unlocks")
+    async def milestones(self, ctx: commands.Context) -> None:
+        if not self.recent_milestones:
+            await ctx.send("No milestones yet. Get training!")
+            return
+        embed = discord.Embed(
+            title="🎉 Recent Milestones",
+            description="\n".join(reversed(list(self.recent_milestones)[-10:])),
+            color=discord.Color.gold()
+        )
+        await ctx.send(embed=embed)
 
     @commands.command(name="announce", help="Make a general announcement")
     @commands.has_permissions(administrator=True)
@@ -90,7 +171,7 @@ class AnnouncementCommands(commands.Cog):
         if not trigger:
             await ctx.send("**Usage:** `!broadcast_lore <trigger>`\n**Example:** `!broadcast_lore ancient_scroll`")
             return
-        await ctx.send(f"📡 Lore broadcast triggered: `{trigger}`")
+        await self._broadcast(ctx, content=f"📡 Lore broadcast triggered: `{trigger}`")
 
     @commands.command(name="alert_clan", help="Send clan alert")
     @commands.has_permissions(administrator=True)
@@ -105,7 +186,7 @@ class AnnouncementCommands(commands.Cog):
             color=discord.Color.purple()
         )
         embed.set_footer(text=f"Alert for {clan_name} Clan")
-        await ctx.send(embed=embed)
+        await self._broadcast(ctx, embed=embed)
 
     @commands.command(name="view_lore", help="View lore information")
     @commands.has_permissions(administrator=True)
@@ -10,14 +10,21 @@ Features:
 - Jutsu selection: Players choose from their available jutsu
 - Real-time battle updates: Battle embeds update with each action
 - Battle management: View active battles, resume battles, forfeit options
+- Tournaments: Seeded single/double-elimination brackets whose AFK matches are simulated
 - Testing support: Admin test command for testing the PvP system
 
 Commands:
 - /challenge @user - Challenge another player to PvP battle
+- /queue - Join rated matchmaking and get paired with a similarly rated player
+- /leave_queue - Leave rated matchmaking
 - /pvp_battles - View all active PvP battles
 - /resume_pvp [battle_id] - Resume an active PvP battle
 - /battle_status [battle_id] - View battle status (supports both PvP and other battles)
+- /spectate @user [stop] - Mirror a player's battle into this channel or thread
+- /tournament action [name] [format] - Create, join, leave, start, view or fast-forward a server tournament
+- /replay battle_id - Re-simulate a finished PvP battle from its seed and inputs
 - !test_pvp - Admin command to test PvP system against a bot
+- !balance [mode] [days] - Admin balance dashboard built from the battle history
 
 The system integrates with the existing character system and provides
 a seamless interactive experience through Discord's UI components.
@@ -28,19 +35,42 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional, Dict, Any, List
 import random
+import time
 import asyncio
+import logging
 
 from ...utils.embeds import create_error_embed
 from ...utils.battle_ui import render_battle_view
-from ...core.battle.state import BattleState, BattleParticipant
+from ...utils.message_updates import partial_message
+from ...core.battle import queries
+from ...core.battle.analytics import analytics_for
+from ...core.battle.engine import Attack, TurnEngine, TurnState
+from ...core.battle.log import BattleLog, jutsu_damage
+from ...core.battle.registry import BattleConflictError, new_battle_id, registry_for
+from ...core.battle.replay import (
+    ATTACK, BOT_TURN, FORFEIT, TIMEOUT, PVP_JUTSU_MULTIPLIERS, PVP_BOT_DAMAGE, PVP_PLAYER_DAMAGE,
+    BattleReplay, new_seed, simulate, starting_fighters,
+)
+from ...core.battle.state import BattleState
+from ...core.battle.tournament import FORMATS, SINGLE, Tournament, TournamentEngine, TournamentError, tournaments_for
 from ...core.character import Character
+from ...core.events import BattleEndedEvent
+from ...core.matchmaking import MatchmakingQueue, Ticket
+from ...core.stats import stat_bonus
+
+logger = logging.getLogger(__name__)
+
+# Seconds a player has to act before the PvP battle ends by timeout.
+PVP_TURN_TIMEOUT = 600
 
 
 class PvPBattleView(discord.ui.View):
     """Interactive view for PvP battles with buttons."""
     
-    def __init__(self, cog, battle_data: Dict[str, Any]):
-        super().__init__(timeout=600)  # 10 minute timeout for PvP
+    def __init__(self, cog, battle_data: Dict[str, Any], timeout: Optional[float] = PVP_TURN_TIMEOUT):
+        # Views restored after a restart pass None to stay persistent; the turn
+        # deadline itself is enforced by the shared scheduler.
+        super().__init__(timeout=timeout)
         self.cog = cog
         self.battle_data = battle_data
         self.current_turn_user_id = battle_data["current_turn_user_id"]
@@ -61,7 +91,7 @@ class PvPBattleView(discord.ui.View):
             return False
         return True
     
-    @discord.ui.button(label="⚔️ Attack", style=discord.ButtonStyle.red, emoji="⚔️")
+    @discord.ui.button(label="⚔️ Attack", style=discord.ButtonStyle.red, emoji="⚔️", custom_id="pvp:attack")
     async def attack_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
@@ -84,7 +114,7 @@ class PvPBattleView(discord.ui.View):
         
         await interaction.followup.send(embed=embed, view=jutsu_view, ephemeral=True)
     
-    @discord.ui.button(label="📊 Status", style=discord.ButtonStyle.gray, emoji="📊")
+    @discord.ui.button(label="📊 Status", style=discord.ButtonStyle.gray, emoji="📊", custom_id="pvp:status")
     async def status_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
@@ -133,7 +163,7 @@ class PvPBattleView(discord.ui.View):
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
-    @discord.ui.button(label="🏃 Forfeit", style=discord.ButtonStyle.gray, emoji="🏃")
+    @discord.ui.button(label="🏃 Forfeit", style=discord.ButtonStyle.gray, emoji="🏃", custom_id="pvp:forfeit")
     async def forfeit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
@@ -148,7 +178,7 @@ class PvPBattleView(discord.ui.View):
         
         await interaction.followup.send(embed=embed, view=confirm_view, ephemeral=True)
     
-    @discord.ui.button(label="ℹ️ Info", style=discord.ButtonStyle.gray, emoji="ℹ️")
+    @discord.ui.button(label="ℹ️ Info", style=discord.ButtonStyle.gray, emoji="ℹ️", custom_id="pvp:info")
     async def info_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
@@ -243,6 +273,44 @@ class BattleSystemCommands(commands.Cog):
         self.bot = bot
         self.services = services
         self.active_pvp_battles: Dict[str, Dict[str, Any]] = {}  # Store active PvP battles
+        self._battle_rngs: Dict[str, random.Random] = {}  # Per-battle seeded RNG streams
+        self.battle_registry = registry_for(services or getattr(bot, "services", None))
+        self.tournaments = tournaments_for(services or getattr(bot, "services", None))
+        self.turn_engine = TurnEngine()
+
+    async def cog_load(self) -> None:
+        """Restore tournaments and PvP battles that were in flight before a restart and reattach their views."""
+        matchmaking = self._matchmaking()
+        if matchmaking is not None:
+            matchmaking.on_match = self.start_matched_pvp_battle
+        if self.tournaments is not None:
+            self.tournaments.on_match = self.start_tournament_match
+            self.tournaments.on_finish = self.announce_tournament_champion
+            try:
+                await self.tournaments.restore()
+            except Exception as e:
+                logger.error(f"Failed to restore tournaments: {e}")
+        persistence = self._battle_persistence()
+        if persistence is None:
+            return
+        try:
+            battles = await persistence.load_active_battles()
+        except Exception as e:
+            logger.error(f"Failed to restore active battles: {e}")
+            return
+        for battle_id, battle_data in battles.items():
+            if not isinstance(battle_data, dict) or battle_id in self.active_pvp_battles:
+                continue
+            try:
+                self._register_pvp_battle(battle_data)
+            except (BattleConflictError, ValueError) as e:
+                logger.warning(f"Skipping restored PvP battle {battle_id}: {e}")
+                continue
+            self.active_pvp_battles[battle_id] = battle_data
+            self._schedule_pvp_timeout(battle_data)
+            message_id = battle_data.get("message_id")
+            if message_id:
+                self.bot.add_view(PvPBattleView(self, battle_data, timeout=None), message_id=message_id)
 
     @app_commands.command(name="challenge", description="Challenge another player to battle")
     async def challenge(self, interaction: discord.Interaction, opponent: discord.User) -> None:
@@ -288,21 +356,15 @@ class BattleSystemCommands(commands.Cog):
                 )
                 return
 
-            # Create battle participants
-            challenger_participant = BattleParticipant.from_character(challenger_char)
-            opponent_participant = BattleParticipant.from_character(opponent_char)
-
-            # Create battle state
-            battle_state = BattleState(
-                attacker=challenger_participant,
-                defender=opponent_participant,
-                current_turn_player_id=str(interaction.user.id)
-            )
-
-            # Store battle in persistence (if available)
-            if hasattr(self.bot.services, 'battle_persistence'):
-                await self.bot.services.battle_persistence.store_active_battle(battle_state.id, battle_state)
+            for user in (interaction.user, opponent):
+                if self.battle_registry.in_battle(user.id, "pvp"):
+                    await interaction.response.send_message(
+                        embed=create_error_embed(f"{user.display_name} is already in a PvP battle!"),
+                        ephemeral=True
+                    )
+                    return
 
+            # Nothing is persisted until the challenge is accepted and becomes a PvP battle.
             embed = discord.Embed(
                 title="⚔️ Battle Challenge!",
                 description=f"{interaction.user.mention} challenges {opponent.mention} to battle!",
@@ -318,15 +380,14 @@ class BattleSystemCommands(commands.Cog):
                 value=f"{opponent_char.name} (Level {opponent_char.level})\nHP: {opponent_char.hp}",
                 inline=True
             )
+            # Create PvP battle data for interactive system
+            battle_id = new_battle_id("pvp")
             embed.add_field(
                 name="Battle ID",
-                value=battle_state.id[:8],
+                value=battle_id,
                 inline=False
             )
 
-            # Create PvP battle data for interactive system
-            battle_id = f"pvp_{interaction.user.id}_{opponent.id}_{len(self.active_pvp_battles)}"
-            
             view = BattleAcceptView(self, battle_id, challenger_char, opponent_char, opponent.id)
             await interaction.response.send_message(embed=embed, view=view)
 
@@ -336,6 +397,48 @@ class BattleSystemCommands(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="queue", description="Join rated matchmaking for a PvP battle")
+    async def queue(self, interaction: discord.Interaction) -> None:
+        """Queue for a PvP battle against a similarly rated player."""
+        matchmaking = self._matchmaking()
+        if matchmaking is None:
+            await interaction.response.send_message(
+                embed=create_error_embed("Matchmaking is not available."), ephemeral=True
+            )
+            return
+        character = await self._get_character(interaction.user.id)
+        if not character:
+            await interaction.response.send_message(
+                embed=create_error_embed("You need to create a character first!"), ephemeral=True
+            )
+            return
+        if self.battle_registry.in_battle(interaction.user.id, "pvp"):
+            await interaction.response.send_message(
+                embed=create_error_embed("You are already in a PvP battle!"), ephemeral=True
+            )
+            return
+
+        matchmaking.enqueue(interaction.user.id, character.rating, interaction.channel_id)
+        embed = discord.Embed(
+            title="🔎 Searching for an Opponent",
+            description=f"Rating **{character.rating}**. The search widens the longer you wait; "
+                        f"the battle starts in this channel once a match is found.",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"{len(matchmaking)} player(s) in queue • /leave_queue to cancel")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="leave_queue", description="Leave rated PvP matchmaking")
+    async def leave_queue(self, interaction: discord.Interaction) -> None:
+        """Stop searching for a rated PvP battle."""
+        matchmaking = self._matchmaking()
+        if matchmaking is None or matchmaking.dequeue(interaction.user.id) is None:
+            await interaction.response.send_message(
+                embed=create_error_embed("You are not in the matchmaking queue."), ephemeral=True
+            )
+            return
+        await interaction.response.send_message("✅ You left the matchmaking queue.", ephemeral=True)
+
     @app_commands.command(name="battle_status", description="View current battle status")
     async def battle_status(self, interaction: discord.Interaction, battle_id: Optional[str] = None) -> None:
         """View the status of a battle."""
@@ -346,12 +449,8 @@ class BattleSystemCommands(commands.Cog):
             
             if not battle_id:
                 # Find user's active PvP battle
-                for bid, battle_data in self.active_pvp_battles.items():
-                    if (interaction.user.id == battle_data["challenger_id"] or 
-                        interaction.user.id == battle_data["opponent_id"]):
-                        user_pvp_battle = battle_data
-                        pvp_battle_id = bid
-                        break
+                pvp_battle_id = self.battle_registry.battle_for(interaction.user.id, "pvp")
+                user_pvp_battle = self.active_pvp_battles.get(pvp_battle_id) if pvp_battle_id else None
             else:
                 user_pvp_battle = self.active_pvp_battles.get(battle_id)
                 pvp_battle_id = battle_id
@@ -375,9 +474,11 @@ class BattleSystemCommands(commands.Cog):
             if not battle_id:
                 active_battles = self.bot.services.battle_persistence.active_battles
                 user_battle = None
+                user_id = str(interaction.user.id)
                 for bid, battle in active_battles.items():
-                    if (battle.attacker.character.id == interaction.user.id or 
-                        battle.defender.character.id == interaction.user.id):
+                    if not isinstance(battle, BattleState):
+                        continue  # PvP battle dicts were handled above
+                    if user_id in (str(battle.attacker.character.id), str(battle.defender.character.id)):
                         user_battle = battle
                         battle_id = bid
                         break
@@ -390,7 +491,7 @@ class BattleSystemCommands(commands.Cog):
                     return
             else:
                 user_battle = self.bot.services.battle_persistence.active_battles.get(battle_id)
-                if not user_battle:
+                if not isinstance(user_battle, BattleState):
                     await interaction.response.send_message(
                         embed=create_error_embed("Battle not found."),
                         ephemeral=True
@@ -461,16 +562,19 @@ class BattleSystemCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
+            updates = self._message_updates()
             for battle_id, battle_data in self.active_pvp_battles.items():
                 challenger = battle_data["challenger"]
                 opponent = battle_data["opponent"]
                 current_turn = challenger["name"] if battle_data["current_turn_user_id"] == challenger["id"] else opponent["name"]
+                watching = len(updates.spectators(("pvp", battle_id))) if updates is not None else 0
                 
                 embed.add_field(
-                    name=f"Battle {battle_id[:8]}",
+                    name=f"Battle {battle_id}",
                     value=f"**{challenger['name']}** vs **{opponent['name']}**\n"
                           f"Turn: {battle_data['turn']} | Current: {current_turn}\n"
-                          f"HP: {challenger['hp']}/{challenger['max_hp']} | {opponent['hp']}/{opponent['max_hp']}",
+                          f"HP: {challenger['hp']}/{challenger['max_hp']} | {opponent['hp']}/{opponent['max_hp']}"
+                          + (f"\n👀 {watching} watching" if watching else ""),
                     inline=False
                 )
 
@@ -482,6 +586,46 @@ class BattleSystemCommands(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="spectate", description="Watch a player's battle from this channel or thread")
+    @app_commands.describe(player="The player whose battle to watch", stop="Stop watching their battle here")
+    async def spectate(self, interaction: discord.Interaction, player: discord.User, stop: bool = False) -> None:
+        """Mirror a player's PvP, Solomon, raid or mission battle into this channel."""
+        updates = self._message_updates()
+        battles = self.battle_registry.battles_for(player.id)
+        if updates is None or not battles:
+            await interaction.response.send_message(
+                embed=create_error_embed(f"**{player.display_name}** is not in a battle right now."), ephemeral=True
+            )
+            return
+        key = self._spectate_key(battles)
+        if stop:
+            if updates.unwatch(key, interaction.channel_id):
+                await interaction.response.send_message("✅ Stopped spectating.", ephemeral=True)
+            else:
+                await interaction.response.send_message(
+                    embed=create_error_embed("This channel is not spectating that battle."), ephemeral=True
+                )
+            return
+        channel = interaction.channel
+        if channel is None or not hasattr(channel, "send") or not updates.watch(key, interaction.channel_id, channel.send):
+            await interaction.response.send_message(
+                embed=create_error_embed("That battle cannot take more spectators here."), ephemeral=True
+            )
+            return
+        await interaction.response.send_message(
+            f"👀 Spectating **{player.display_name}**'s battle here for the next "
+            f"{int(updates.SPECTATE_TTL // 60)} minutes. Delete the battle message to stop early.",
+            ephemeral=True
+        )
+
+    @staticmethod
+    def _spectate_key(battles: Dict[str, str]):
+        """The message-update key of a user's battle, preferring PvP, then bosses, then missions."""
+        mode = next((m for m in ("pvp", "boss", "mission") if m in battles), next(iter(battles)))
+        battle_id = battles[mode]
+        # Raids share the "boss" claim with solo Solomon fights but post under their own key
+        return ("raid" if battle_id.startswith("raid_") else mode, battle_id)
+
     @app_commands.command(name="resume_pvp", description="Resume an active PvP battle")
     @app_commands.describe(battle_id="The battle ID to resume (optional - finds your active battle if not provided)")
     async def resume_pvp(self, interaction: discord.Interaction, battle_id: Optional[str] = None) -> None:
@@ -496,12 +640,8 @@ class BattleSystemCommands(commands.Cog):
                 found_battle_id = battle_id
             else:
                 # Find user's active battle
-                for bid, battle_data in self.active_pvp_battles.items():
-                    if (interaction.user.id == battle_data["challenger_id"] or 
-                        interaction.user.id == battle_data["opponent_id"]):
-                        user_battle = battle_data
-                        found_battle_id = bid
-                        break
+                found_battle_id = self.battle_registry.battle_for(interaction.user.id, "pvp")
+                user_battle = self.active_pvp_battles.get(found_battle_id) if found_battle_id else None
 
             if not user_battle:
                 await interaction.response.send_message(
@@ -522,6 +662,113 @@ class BattleSystemCommands(commands.Cog):
                 ephemeral=True
             )
 
+    @app_commands.command(name="replay", description="Re-run a finished PvP battle from its replay file")
+    @app_commands.describe(battle_id="The battle ID shown when the battle ended")
+    async def replay(self, interaction: discord.Interaction, battle_id: str) -> None:
+        """Re-simulate a finished PvP battle from its seed and recorded inputs."""
+        store = self._replay_store()
+        battle_replay = store.load(battle_id) if store is not None else None
+        if battle_replay is None:
+            await interaction.response.send_message(
+                embed=create_error_embed("No replay found for that battle."),
+                ephemeral=True
+            )
+            return
+
+        outcome = simulate(battle_replay)
+        challenger, opponent = battle_replay.fighters
+        embed = discord.Embed(
+            title="🎬 **PVP REPLAY** 🎬",
+            description=f"**{challenger['name']} vs {opponent['name']}** | {outcome.turns} turns",
+            color=discord.Color.purple()
+        )
+        if outcome.winner is not None:
+            winner = battle_replay.fighters[outcome.winner]
+            embed.add_field(name="🏆 Winner", value=f"**{winner['name']}** ({outcome.end_reason})", inline=True)
+        embed.add_field(
+            name="❤️ Final HP",
+            value=f"{challenger['name']}: {outcome.hp[0]}/{challenger['max_hp']}\n"
+                  f"{opponent['name']}: {outcome.hp[1]}/{opponent['max_hp']}",
+            inline=True
+        )
+
+        # Keep the newest lines that fit in one embed field.
+        lines, size = [], 0
+        for line in reversed(outcome.log.render()):
+            size += len(line) + 1
+            if size > 1024:
+                break
+            lines.append(line)
+        if lines:
+            embed.add_field(name="📜 Battle Log", value="\n".join(reversed(lines)), inline=False)
+        embed.set_footer(text=f"Seed {battle_replay.seed} | {len(battle_replay.inputs)} recorded inputs")
+
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name="tournament", description="Run a bracket tournament in this server")
+    @app_commands.describe(action="What to do", name="Tournament name (create only)",
+                           format="Single or double elimination (create only)")
+    @app_commands.choices(
+        action=[app_commands.Choice(name=a.title(), value=a)
+                for a in ("create", "join", "leave", "start", "bracket", "simulate")],
+        format=[app_commands.Choice(name=f"{f.title()} elimination", value=f) for f in FORMATS],
+    )
+    async def tournament(self, interaction: discord.Interaction, action: str, name: Optional[str] = None,
+                         format: str = SINGLE) -> None:
+        """Register for, start and follow a seeded elimination tournament."""
+        engine = self.tournaments
+        if engine is None:
+            await interaction.response.send_message(
+                embed=create_error_embed("Tournaments are not available."), ephemeral=True
+            )
+            return
+        key = interaction.guild_id or interaction.channel_id
+        try:
+            if action == "create":
+                tournament = engine.create(key, name or "Shinobi Tournament", format,
+                                           channel_id=interaction.channel_id, organizer_id=interaction.user.id)
+                await interaction.response.send_message(embed=self.create_tournament_embed(tournament))
+            elif action == "join":
+                character = await self._get_character(interaction.user.id)
+                if not character:
+                    raise TournamentError("You need to create a character first!")
+                tournament = engine.register(key, character)
+                await interaction.response.send_message(
+                    f"✅ You are registered for **{tournament.name}** ({len(tournament.entrants)} players).",
+                    ephemeral=True
+                )
+            elif action == "leave":
+                tournament = engine.withdraw(key, interaction.user.id)
+                await interaction.response.send_message(f"✅ You withdrew from **{tournament.name}**.", ephemeral=True)
+            elif action == "bracket":
+                tournament = engine.tournament(key)
+                if tournament is None:
+                    raise TournamentError("There is no tournament here.")
+                await interaction.response.send_message(embed=self.create_tournament_embed(tournament), ephemeral=True)
+            else:
+                tournament = engine.tournament(key)
+                if tournament is None:
+                    raise TournamentError("There is no tournament here.")
+                if not self._runs_tournament(interaction, tournament):
+                    raise TournamentError("Only the organiser or a server manager can do that.")
+                # Opening or simulating a whole round can outlast the interaction window
+                await interaction.response.defer()
+                if action == "start":
+                    await engine.start(key)
+                else:
+                    await engine.simulate_open(key)
+                await interaction.followup.send(embed=self.create_tournament_embed(tournament))
+        except TournamentError as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=create_error_embed(str(e)), ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=create_error_embed(str(e)), ephemeral=True)
+
+    @staticmethod
+    def _runs_tournament(interaction: discord.Interaction, tournament: Tournament) -> bool:
+        permissions = getattr(interaction.user, "guild_permissions", None)
+        return str(interaction.user.id) == tournament.organizer_id or getattr(permissions, "manage_guild", False)
+
     async def _get_character(self, user_id: int) -> Optional[Character]:
         """Helper method to get a character."""
         try:
@@ -564,13 +811,15 @@ class BattleSystemCommands(commands.Cog):
             )
 
             # Create PvP battle data
-            battle_id = f"test_pvp_{ctx.author.id}_{len(self.active_pvp_battles)}"
+            battle_id = new_battle_id("test_pvp")
             battle_data = {
                 "battle_id": battle_id,
                 "challenger_id": int(character.id),
                 "opponent_id": "test_bot",
                 "current_turn_user_id": int(character.id),  # Player goes first
                 "turn": 1,
+                "seed": new_seed(),
+                "inputs": [],
                 "challenger": {
                     "id": character.id,
                     "name": character.name,
@@ -595,14 +844,20 @@ class BattleSystemCommands(commands.Cog):
                     "jutsu": test_opponent.jutsu,
                     "level": test_opponent.level
                 },
-                "battle_log": [
+                "battle_log": BattleLog.from_lines([
                     f"🧪 **TEST BATTLE INITIATED**",
                     f"⚔️ {character.name} vs {test_opponent.name}",
                     f"🎯 {character.name}'s turn to act!"
-                ]
+                ], actors=[character.name, test_opponent.name])
             }
 
             # Store active battle
+            battle_data["initial_fighters"] = starting_fighters(battle_data["challenger"], battle_data["opponent"])
+            try:
+                self._register_pvp_battle(battle_data)
+            except BattleConflictError:
+                await ctx.send("❌ You are already in a PvP battle! Use `/resume_pvp` to continue it.")
+                return
             self.active_pvp_battles[battle_id] = battle_data
 
             # Create battle embed and view
@@ -613,52 +868,106 @@ class BattleSystemCommands(commands.Cog):
             
             view = PvPBattleView(self, battle_data)
 
-            await ctx.send(embed=embed, view=view)
+            message = await ctx.send(embed=embed, view=view)
+            await self._record_pvp_turn(battle_data, message)
 
         except Exception as e:
             await ctx.send(f"❌ Error creating test PvP battle: {str(e)}")
 
+    @commands.command(name="balance", help="Balance dashboard from the battle history")
+    @commands.has_permissions(administrator=True)
+    async def balance(self, ctx: commands.Context, mode: str = "pvp", days: int = 7) -> None:
+        """Jutsu win contribution, battle length by level and per-mode outcomes (admin only)."""
+        store = analytics_for(self.services or getattr(self.bot, "services", None))
+        if store is None or not len(store):
+            await ctx.send(embed=create_error_embed("No battle history has been recorded yet."))
+            return
+        since = time.time() - days * 86400 if days > 0 else None
+        mode_filter = None if mode == "all" else mode
+        try:
+            jutsu = queries.jutsu_contribution(store, mode_filter, since, min_battles=3)[:8]
+            lengths = queries.length_by_level(store, mode_filter, since=since)
+            modes = queries.mode_summary(store, since)
+        except RuntimeError as e:
+            await ctx.send(embed=create_error_embed(str(e)))
+            return
+
+        embed = discord.Embed(
+            title=f"📊 Balance Dashboard — {mode}",
+            description=f"Last {days} day(s)" if since else "All recorded battles",
+            color=discord.Color.blue()
+        )
+        if jutsu:
+            embed.add_field(name="🥇 Jutsu Win Contribution", value="\n".join(
+                f"**{j.name}**: {j.contribution:.0%} of {j.damage:,} damage in {j.battles} battles" for j in jutsu
+            ), inline=False)
+        if lengths:
+            embed.add_field(name="⏱️ Length by Level", value="\n".join(
+                f"Lv {b.low}-{b.high}: {b.mean_turns:.1f} turns avg, {b.max_turns} max ({b.battles} battles)"
+                for b in lengths[:10]
+            ), inline=False)
+        if modes:
+            embed.add_field(name="⚔️ Modes", value="\n".join(
+                f"**{m.mode}**: {m.battles} battles, {m.mean_turns:.1f} turns, "
+                + ", ".join(f"{reason} {count}" for reason, count in sorted(m.reasons.items(), key=lambda r: -r[1]))
+                for m in modes
+            ), inline=False)
+        embed.set_footer(text=f"{len(store):,} battles recorded in {store.segments} sealed segment(s)")
+        await ctx.send(embed=embed)
+
+    def _new_pvp_battle_data(self, battle_id: str, challenger_char, opponent_char) -> Dict[str, Any]:
+        """Fresh battle state for two characters; the challenger moves first."""
+        battle_data = {
+            "battle_id": battle_id,
+            "challenger_id": challenger_char.id,
+            "opponent_id": opponent_char.id,
+            "current_turn_user_id": challenger_char.id,  # Challenger goes first
+            "turn": 1,
+            "seed": new_seed(),
+            "inputs": [],
+            "challenger": {
+                "id": challenger_char.id,
+                "name": challenger_char.name,
+                "hp": challenger_char.hp,
+                "max_hp": challenger_char.max_hp,
+                "chakra": challenger_char.chakra,
+                "max_chakra": challenger_char.max_chakra,
+                "stamina": challenger_char.stamina,
+                "max_stamina": challenger_char.max_stamina,
+                "jutsu": challenger_char.jutsu,
+                "level": challenger_char.level
+            },
+            "opponent": {
+                "id": opponent_char.id,
+                "name": opponent_char.name,
+                "hp": opponent_char.hp,
+                "max_hp": opponent_char.max_hp,
+                "chakra": opponent_char.chakra,
+                "max_chakra": opponent_char.max_chakra,
+                "stamina": opponent_char.stamina,
+                "max_stamina": opponent_char.max_stamina,
+                "jutsu": opponent_char.jutsu,
+                "level": opponent_char.level
+            },
+            "battle_log": BattleLog.from_lines([
+                f"⚔️ {challenger_char.name} challenges {opponent_char.name} to battle!",
+                f"🎯 {challenger_char.name}'s turn to act!"
+            ], actors=[challenger_char.name, opponent_char.name])
+        }
+        battle_data["initial_fighters"] = starting_fighters(battle_data["challenger"], battle_data["opponent"])
+        return battle_data
+
     async def start_interactive_pvp_battle(self, interaction: discord.Interaction, battle_id: str, challenger_char, opponent_char):
         """Start an interactive PvP battle."""
         try:
-            # Create battle data
-            battle_data = {
-                "battle_id": battle_id,
-                "challenger_id": challenger_char.id,
-                "opponent_id": opponent_char.id,
-                "current_turn_user_id": challenger_char.id,  # Challenger goes first
-                "turn": 1,
-                "challenger": {
-                    "id": challenger_char.id,
-                    "name": challenger_char.name,
-                    "hp": challenger_char.hp,
-                    "max_hp": challenger_char.max_hp,
-                    "chakra": challenger_char.chakra,
-                    "max_chakra": challenger_char.max_chakra,
-                    "stamina": challenger_char.stamina,
-                    "max_stamina": challenger_char.max_stamina,
-                    "jutsu": challenger_char.jutsu,
-                    "level": challenger_char.level
-                },
-                "opponent": {
-                    "id": opponent_char.id,
-                    "name": opponent_char.name,
-                    "hp": opponent_char.hp,
-                    "max_hp": opponent_char.max_hp,
-                    "chakra": opponent_char.chakra,
-                    "max_chakra": opponent_char.max_chakra,
-                    "stamina": opponent_char.stamina,
-                    "max_stamina": opponent_char.max_stamina,
-                    "jutsu": opponent_char.jutsu,
-                    "level": opponent_char.level
-                },
-                "battle_log": [
-                    f"⚔️ {challenger_char.name} challenges {opponent_char.name} to battle!",
-                    f"🎯 {challenger_char.name}'s turn to act!"
-                ]
-            }
+            battle_data = self._new_pvp_battle_data(battle_id, challenger_char, opponent_char)
 
             # Store active battle
+            try:
+                self._register_pvp_battle(battle_data)
+            except BattleConflictError:
+                await interaction.followup.send("❌ One of you is already in another PvP battle!", ephemeral=True)
+                return
             self.active_pvp_battles[battle_id] = battle_data
 
             # Create battle embed and view
@@ -666,11 +975,102 @@ class BattleSystemCommands(commands.Cog):
             view = PvPBattleView(self, battle_data)
 
             # Send the interactive battle interface
-            await interaction.followup.send(embed=embed, view=view)
+            message = await interaction.followup.send(embed=embed, view=view)
+            await self._record_pvp_turn(battle_data, message)
 
         except Exception as e:
             await interaction.followup.send(f"❌ Error starting battle: {str(e)}", ephemeral=True)
 
+    async def start_matched_pvp_battle(self, first: Ticket, second: Ticket) -> None:
+        """Start a battle for two players paired by matchmaking, in the first player's channel."""
+        challenger_char = await self._get_character(first.user_id)
+        opponent_char = await self._get_character(second.user_id)
+        channel = self.bot.get_channel(first.channel_id or second.channel_id)
+        if not challenger_char or not opponent_char or channel is None:
+            logger.warning(f"Dropping matchmaking pair {first.user_id} vs {second.user_id}")
+            return
+        try:
+            await self._open_pvp_battle(
+                challenger_char, opponent_char, channel,
+                f"🎯 Match found: <@{first.user_id}> ({first.rating}) vs <@{second.user_id}> ({second.rating})",
+            )
+        except BattleConflictError as e:
+            logger.info(f"Matched player {e.user_id} started another PvP battle first")
+            matchmaking = self._matchmaking()
+            for ticket in (first, second):
+                if matchmaking is not None and ticket.user_id != e.user_id:
+                    matchmaking.enqueue(ticket.user_id, ticket.rating, ticket.channel_id)
+
+    async def start_tournament_match(self, tournament: Tournament, match: int, state: BattleState) -> None:
+        """Post a tournament match as a PvP battle in the tournament's channel.
+
+        If it cannot be posted, or a player is busy elsewhere, the match is
+        simulated once its window runs out.
+        """
+        first_id, second_id = tournament.match_players(match)
+        challenger_char = await self._get_character(first_id)
+        opponent_char = await self._get_character(second_id)
+        channel = self.bot.get_channel(tournament.channel_id) if tournament.channel_id else None
+        if not challenger_char or not opponent_char or channel is None:
+            logger.warning(f"Could not post {tournament.tournament_id} match {match + 1}; it will be simulated")
+            return
+        minutes = int(TournamentEngine.MATCH_WINDOW // 60)
+        try:
+            await self._open_pvp_battle(
+                challenger_char, opponent_char, channel,
+                f"🏆 **{tournament.name}** — {tournament.bracket.label(match)}: <@{first_id}> vs <@{second_id}>. "
+                f"Finish within {minutes} minutes or the match is simulated.",
+            )
+        except BattleConflictError as e:
+            logger.info(f"Tournament player {e.user_id} is busy; {state.id} will be simulated")
+
+    async def announce_tournament_champion(self, tournament: Tournament) -> None:
+        channel = self.bot.get_channel(tournament.channel_id) if tournament.channel_id else None
+        if channel is None:
+            return
+        try:
+            await channel.send(embed=self.create_tournament_embed(tournament))
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to announce the winner of {tournament.tournament_id}: {e}")
+
+    async def _open_pvp_battle(self, challenger_char, opponent_char, channel, content: str) -> Dict[str, Any]:
+        """Register a PvP battle and post it to ``channel``; raises BattleConflictError if either player is busy."""
+        battle_data = self._new_pvp_battle_data(new_battle_id("pvp"), challenger_char, opponent_char)
+        self._register_pvp_battle(battle_data)
+        self.active_pvp_battles[battle_data["battle_id"]] = battle_data
+
+        embed = self.create_pvp_battle_embed(battle_data)
+        message = await channel.send(content=content, embed=embed, view=PvPBattleView(self, battle_data))
+        await self._record_pvp_turn(battle_data, message)
+        return battle_data
+
+    def create_tournament_embed(self, tournament: Tournament) -> discord.Embed:
+        """Status, the matches being played right now, and the champion once there is one."""
+        champion = tournament.champion
+        embed = discord.Embed(
+            title=f"🏆 {tournament.name}",
+            description=f"{'Single' if tournament.fmt == SINGLE else 'Double'} elimination • "
+                        f"{len(tournament.entrants)} player(s) • {tournament.status.title()}",
+            color=discord.Color.gold() if champion else discord.Color.blue()
+        )
+        if champion:
+            embed.add_field(name="👑 Champion", value=tournament.entrants[champion].name, inline=False)
+        elif tournament.status == "registration":
+            embed.add_field(name="Registration", value="`/tournament join` to enter; the organiser runs "
+                                                       "`/tournament start` when everyone is in.", inline=False)
+        live = sorted(tournament.live)
+        lines = []
+        for match in live[:10]:
+            first, second = (tournament.entrants[uid].name for uid in tournament.match_players(match))
+            lines.append(f"**{tournament.bracket.label(match)}**: {first} vs {second}")
+        if len(live) > 10:
+            lines.append(f"...and {len(live) - 10} more")
+        if lines:
+            embed.add_field(name="⚔️ Matches in Progress", value="\n".join(lines), inline=False)
+        if tournament.simulated:
+            embed.set_footer(text=f"{tournament.simulated} match(es) simulated after the {int(TournamentEngine.MATCH_WINDOW // 60)}-minute window")
+        return embed
+
     def create_pvp_battle_embed(self, battle_data: Dict[str, Any]) -> discord.Embed:
         """Create a PvP battle embed."""
         challenger = battle_data["challenger"]
@@ -724,46 +1124,24 @@ class BattleSystemCommands(commands.Cog):
     async def execute_pvp_attack(self, interaction: discord.Interaction, battle_data: Dict[str, Any], jutsu_name: str, attacker_id: int):
         """Execute a PvP attack."""
         try:
-            # Determine attacker and defender
-            if attacker_id == battle_data["challenger_id"]:
-                attacker = battle_data["challenger"]
-                defender = battle_data["opponent"]
-                attacker_name = "challenger"
-                defender_name = "opponent"
-            else:
-                attacker = battle_data["opponent"]
-                defender = battle_data["challenger"]
-                attacker_name = "opponent"
-                defender_name = "challenger"
-            
-            # Calculate damage
-            base_damage = random.randint(20, 80)
-            level_bonus = attacker["level"] * 2
-            jutsu_multiplier = self.get_pvp_jutsu_multiplier(jutsu_name)
-            
-            total_damage = int((base_damage + level_bonus) * jutsu_multiplier)
-            
-            # Apply damage
-            defender["hp"] = max(0, defender["hp"] - total_damage)
+            actor_index = 0 if attacker_id == battle_data["challenger_id"] else 1
+            attacker = battle_data["challenger"] if actor_index == 0 else battle_data["opponent"]
             
-            # Update battle log
-            battle_data["battle_log"].append(f"💥 {attacker['name']} used {jutsu_name} for {total_damage} damage!")
+            # Resolve the attack on the battle's own RNG stream and record the input for replays
+            gear_bonus = self._get_gear_bonus(attacker)
+            mastery = self._get_mastery_multiplier(attacker, jutsu_name)
+            state = self._pvp_turn_state(battle_data, actor_index)
+            self.turn_engine.attack(state, actor_index, Attack(jutsu_name, power=mastery, bonus=gear_bonus),
+                                    PVP_PLAYER_DAMAGE)
+            battle_data.setdefault("inputs", []).append([ATTACK, actor_index, jutsu_name, gear_bonus, mastery])
             
             # Check for victory
-            if defender["hp"] <= 0:
+            if state.winner is not None:
                 await self.handle_pvp_victory(interaction, battle_data, attacker_id)
                 return
             
             # Switch turns
-            if battle_data["current_turn_user_id"] == battle_data["challenger_id"]:
-                battle_data["current_turn_user_id"] = battle_data["opponent_id"]
-                next_player = battle_data["opponent"]["name"]
-            else:
-                battle_data["current_turn_user_id"] = battle_data["challenger_id"]
-                next_player = battle_data["challenger"]["name"]
-            
-            battle_data["turn"] += 1
-            battle_data["battle_log"].append(f"🎯 {next_player}'s turn!")
+            self._advance_pvp_turn(battle_data, state)
             
             # Check if next turn is a bot (for testing)
             if battle_data["current_turn_user_id"] == "test_bot":
@@ -773,28 +1151,15 @@ class BattleSystemCommands(commands.Cog):
                 return
             
             # Update battle display
-            embed = self.create_pvp_battle_embed(battle_data)
-            view = PvPBattleView(self, battle_data)
-            
-            await interaction.followup.send(embed=embed, view=view)
+            message = await self._show_pvp_battle(interaction, battle_data)
+            await self._record_pvp_turn(battle_data, message)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error during attack: {str(e)}", ephemeral=True)
 
     def get_pvp_jutsu_multiplier(self, jutsu_name: str) -> float:
         """Get damage multiplier for PvP jutsu."""
-        jutsu_multipliers = {
-            "Rasengan": 1.4,
-            "Chidori": 1.3,
-            "Great Fireball Jutsu": 1.2,
-            "Dragon Flame Jutsu": 1.15,
-            "Shadow Clone Jutsu": 1.1,
-            "Fireball Jutsu": 1.0,
-            "Basic Attack": 0.8,
-            "Punch": 0.7,
-            "Kick": 0.7
-        }
-        return jutsu_multipliers.get(jutsu_name, 1.0)
+        return PVP_JUTSU_MULTIPLIERS.get(jutsu_name, 1.0)
 
     async def handle_pvp_victory(self, interaction: discord.Interaction, battle_data: Dict[str, Any], winner_id: int):
         """Handle PvP battle victory."""
@@ -839,19 +1204,207 @@ class BattleSystemCommands(commands.Cog):
             
             embed.add_field(
                 name="📊 Battle Stats",
-                value=f"**Duration:** {battle_data['turn']} turns\n**Battle ID:** {battle_data['battle_id'][:8]}",
+                value=f"**Duration:** {battle_data['turn']} turns\n**Replay:** `/replay {battle_data['battle_id']}`",
                 inline=False
             )
             
-            # Remove from active battles
+            loser_id = battle_data["opponent_id"] if winner_id == battle_data["challenger_id"] else battle_data["challenger_id"]
+            self._publish_battle_end(battle_data, winner_id, loser_id, "victory")
+            
+            # Remove from active battles; the battle message becomes the result
             if battle_data["battle_id"] in self.active_pvp_battles:
                 del self.active_pvp_battles[battle_data["battle_id"]]
-            
-            await interaction.followup.send(embed=embed)
+            await self._show_pvp_battle(interaction, battle_data, lambda: {"embed": embed, "view": None})
+            await self._close_pvp_battle(battle_data)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error handling victory: {str(e)}", ephemeral=True)
 
+    def _get_gear_bonus(self, fighter: Dict[str, Any]) -> int:
+        """Offensive bonus from equipment, buffs and debuffs, read from the cached stat block."""
+        services = self.services or getattr(self.bot, "services", None)
+        return (stat_bonus(services, fighter.get("id"), "ninjutsu")
+                + stat_bonus(services, fighter.get("id"), "taijutsu")) // 2
+
+    def _get_mastery_multiplier(self, fighter: Dict[str, Any], jutsu_name: str) -> float:
+        """Record a jutsu use and return the mastery damage multiplier for it."""
+        services = self.services or getattr(self.bot, "services", None)
+        mastery = getattr(services, "jutsu_mastery", None)
+        if mastery is None:
+            return 1.0
+        damage_multiplier = mastery.get_damage_multiplier(fighter.get("id"), jutsu_name)
+        mastery.record_use(fighter.get("id"), jutsu_name)
+        return damage_multiplier
+
+    def _battle_persistence(self):
+        services = self.services or getattr(self.bot, "services", None)
+        return getattr(services, "battle_persistence", None)
+
+    def _battle_rng(self, battle_data: Dict[str, Any]) -> random.Random:
+        """The battle's RNG stream; after a restart it is rebuilt by replaying the recorded inputs."""
+        battle_id = battle_data["battle_id"]
+        rng = self._battle_rngs.get(battle_id)
+        if rng is None:
+            if "seed" not in battle_data:
+                battle_data["seed"] = new_seed()
+                battle_data["inputs"] = []
+                battle_data["initial_fighters"] = starting_fighters(battle_data["challenger"], battle_data["opponent"])
+            if battle_data.get("inputs"):
+                rng = simulate(BattleReplay.from_battle_data(battle_data), log_capacity=0).rng
+            else:
+                rng = random.Random(battle_data["seed"])
+            self._battle_rngs[battle_id] = rng
+        return rng
+
+    def _pvp_turn_state(self, battle_data: Dict[str, Any], active: int) -> TurnState:
+        """Engine view over a PvP battle dict; fighter 0 is the challenger."""
+        return TurnState.of(battle_data["challenger"], battle_data["opponent"], log=battle_data["battle_log"],
+                            rng=self._battle_rng(battle_data), turn=battle_data["turn"], active=active)
+
+    def _advance_pvp_turn(self, battle_data: Dict[str, Any], state: TurnState) -> None:
+        next_index = self.turn_engine.advance(state, announce=True)
+        battle_data["turn"] = state.turn
+        battle_data["current_turn_user_id"] = battle_data["opponent_id" if next_index else "challenger_id"]
+
+    def _replay_store(self):
+        services = self.services or getattr(self.bot, "services", None)
+        return getattr(services, "replay_store", None)
+
+    def _save_replay(self, battle_data: Dict[str, Any]):
+        store = self._replay_store()
+        if store is None or "seed" not in battle_data or "initial_fighters" not in battle_data:
+            return
+        store.save(BattleReplay.from_battle_data(battle_data))
+
+    def _scheduler(self):
+        services = self.services or getattr(self.bot, "services", None)
+        return getattr(services, "scheduler", None)
+
+    def _schedule_pvp_timeout(self, battle_data: Dict[str, Any]):
+        """(Re)start the turn deadline; touching an existing deadline is O(log n)."""
+        scheduler = self._scheduler()
+        if scheduler is not None:
+            scheduler.schedule_in(("pvp", battle_data["battle_id"]), PVP_TURN_TIMEOUT, self._expire_pvp_battle)
+
+    async def _expire_pvp_battle(self, key):
+        """The player on turn let the deadline pass: their opponent wins by timeout."""
+        _, battle_id = key
+        battle_data = self.active_pvp_battles.pop(battle_id, None)
+        if battle_data is None:
+            return
+        idle_id = battle_data["current_turn_user_id"]
+        if idle_id == battle_data["challenger_id"]:
+            winner_id, idle, winner = battle_data["opponent_id"], battle_data["challenger"], battle_data["opponent"]
+        else:
+            winner_id, idle, winner = battle_data["challenger_id"], battle_data["opponent"], battle_data["challenger"]
+        battle_data.setdefault("inputs", []).append([TIMEOUT, 0 if idle_id == battle_data["challenger_id"] else 1])
+        battle_data["battle_log"].append(f"⏰ {idle['name']} ran out of time!")
+        self._publish_battle_end(battle_data, winner_id, idle_id, "timeout")
+        await self._close_pvp_battle(battle_data)
+
+        channel_id = battle_data.get("channel_id")
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if channel is None:
+            return
+        embed = discord.Embed(
+            title="⏰ **BATTLE TIMED OUT** ⏰",
+            description=f"**{idle['name']}** did not act in time. **{winner['name']}** wins!",
+            color=discord.Color.orange()
+        )
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to announce PvP timeout for {battle_id}: {e}")
+
+    async def _record_pvp_turn(self, battle_data: Dict[str, Any], message=None):
+        """Write-ahead the latest turn (and the message carrying its view) so it survives a restart."""
+        if message is not None and getattr(message, "id", None) is not None:
+            battle_data["message_id"] = message.id
+            battle_data["channel_id"] = getattr(getattr(message, "channel", None), "id", None)
+            updates = self._message_updates()
+            if updates is not None:
+                handle = partial_message(self.bot, battle_data["channel_id"], message.id)
+                updates.track(("pvp", battle_data["battle_id"]), handle or message)
+        self._schedule_pvp_timeout(battle_data)
+        persistence = self._battle_persistence()
+        if persistence is None:
+            return
+        try:
+            await persistence.record_turn(battle_data["battle_id"], battle_data)
+        except Exception as e:
+            logger.warning(f"Failed to persist PvP battle {battle_data['battle_id']}: {e}")
+
+    def _matchmaking(self) -> Optional[MatchmakingQueue]:
+        services = self.services or getattr(self.bot, "services", None)
+        matchmaking = getattr(services, "matchmaking", None)
+        return matchmaking if isinstance(matchmaking, MatchmakingQueue) else None
+
+    def _message_updates(self):
+        services = self.services or getattr(self.bot, "services", None)
+        return getattr(services, "message_updates", None)
+
+    async def _show_pvp_battle(self, interaction: discord.Interaction, battle_data: Dict[str, Any], render=None):
+        """Edit the battle's one message in place; a burst of turns collapses into the latest state."""
+        if render is None:
+            render = lambda: {"embed": self.create_pvp_battle_embed(battle_data), "view": PvPBattleView(self, battle_data)}
+        updates = self._message_updates()
+        if updates is None:
+            return await interaction.followup.send(**render())
+        key = ("pvp", battle_data["battle_id"])
+        if updates.message(key) is None:
+            updates.track(key, partial_message(self.bot, battle_data.get("channel_id"), battle_data.get("message_id")))
+        channel_id = battle_data.get("channel_id") or interaction.channel_id
+        return await updates.submit(key, channel_id, render, interaction.followup.send)
+
+    def _register_pvp_battle(self, battle_data: Dict[str, Any]) -> None:
+        """Claim both players (bots excluded) so each fights one PvP battle at a time."""
+        players = [battle_data["challenger_id"], battle_data["opponent_id"]]
+        self.battle_registry.register("pvp", [p for p in players if p != "test_bot"],
+                                      data=battle_data, battle_id=battle_data["battle_id"])
+
+    async def _close_pvp_battle(self, battle_data: Dict[str, Any]):
+        """Move a finished PvP battle from the active set into history."""
+        self._battle_rngs.pop(battle_data["battle_id"], None)
+        self.battle_registry.release(battle_data["battle_id"])
+        updates = self._message_updates()
+        if updates is not None:
+            updates.forget(("pvp", battle_data["battle_id"]))
+        self._save_replay(battle_data)
+        scheduler = self._scheduler()
+        if scheduler is not None:
+            scheduler.cancel(("pvp", battle_data["battle_id"]))
+        persistence = self._battle_persistence()
+        if persistence is None:
+            return
+        try:
+            await persistence.add_battle_to_history(battle_data["battle_id"], battle_data)
+            await persistence.remove_active_battle(battle_data["battle_id"])
+        except Exception as e:
+            logger.warning(f"Failed to close PvP battle {battle_data['battle_id']}: {e}")
+
+    def _publish_battle_end(self, battle_data: Dict[str, Any], winner_id: int, loser_id: int, reason: str):
+        """Publish a BattleEndedEvent if the bot exposes an event bus."""
+        services = self.services or getattr(self.bot, "services", None)
+        event_bus = getattr(services, "event_bus", None)
+        if event_bus is None:
+            return
+        winner, loser = battle_data["challenger"], battle_data["opponent"]
+        if str(winner_id) != str(battle_data["challenger_id"]):
+            winner, loser = loser, winner
+        log = battle_data.get("battle_log", [])
+        event_bus.publish(BattleEndedEvent(
+            user_id=str(winner_id),
+            battle_id=battle_data["battle_id"],
+            loser_id=str(loser_id),
+            mode="pvp",
+            end_reason=reason,
+            turns=battle_data.get("turn", 0),
+            level=winner.get("level", 0),
+            loser_level=loser.get("level", 0),
+            damage=jutsu_damage(log, winner["name"]),
+            loser_damage=jutsu_damage(log, loser["name"]),
+        ))
+
     async def execute_pvp_forfeit(self, interaction: discord.Interaction, battle_data: Dict[str, Any], forfeiting_user_id: int):
         """Handle PvP battle forfeit."""
         try:
@@ -884,15 +1437,21 @@ class BattleSystemCommands(commands.Cog):
             
             embed.add_field(
                 name="📊 Battle Stats",
-                value=f"**Duration:** {battle_data['turn']} turns\n**Battle ID:** {battle_data['battle_id'][:8]}",
+                value=f"**Duration:** {battle_data['turn']} turns\n**Replay:** `/replay {battle_data['battle_id']}`",
                 inline=False
             )
             
-            # Remove from active battles
+            winner_id = battle_data["opponent_id"] if forfeiting_user_id == battle_data["challenger_id"] else battle_data["challenger_id"]
+            forfeiter_index = 0 if forfeiting_user_id == battle_data["challenger_id"] else 1
+            battle_data.setdefault("inputs", []).append([FORFEIT, forfeiter_index])
+            battle_data["battle_log"].append(f"🏃 {forfeiter['name']} forfeited!")
+            self._publish_battle_end(battle_data, winner_id, forfeiting_user_id, "forfeit")
+            
+            # Remove from active battles; the battle message becomes the result
             if battle_data["battle_id"] in self.active_pvp_battles:
                 del self.active_pvp_battles[battle_data["battle_id"]]
-            
-            await interaction.followup.send(embed=embed)
+            await self._show_pvp_battle(interaction, battle_data, lambda: {"embed": embed, "view": None})
+            await self._close_pvp_battle(battle_data)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error handling forfeit: {str(e)}", ephemeral=True)
@@ -900,41 +1459,23 @@ class BattleSystemCommands(commands.Cog):
     async def _execute_bot_turn(self, interaction: discord.Interaction, battle_data: Dict[str, Any]):
         """Execute an automatic bot turn for testing."""
         try:
-            # Bot is the opponent
-            bot_character = battle_data["opponent"]
-            player_character = battle_data["challenger"]
-            
-            # Choose a random jutsu for the bot
-            bot_jutsu = random.choice(bot_character["jutsu"])
-            
-            # Calculate bot damage
-            base_damage = random.randint(15, 60)  # Slightly weaker than player
-            level_bonus = bot_character["level"] * 1.5
-            jutsu_multiplier = self.get_pvp_jutsu_multiplier(bot_jutsu)
-            
-            total_damage = int((base_damage + level_bonus) * jutsu_multiplier)
-            
-            # Apply damage to player
-            player_character["hp"] = max(0, player_character["hp"] - total_damage)
-            
-            # Update battle log
-            battle_data["battle_log"].append(f"🤖 {bot_character['name']} used {bot_jutsu} for {total_damage} damage!")
+            # Bot is the opponent; its jutsu and damage come from the battle's RNG stream
+            state = self._pvp_turn_state(battle_data, 1)
+            bot_jutsu = self.turn_engine.choose_jutsu(state, battle_data["opponent"]["jutsu"])
+            self.turn_engine.attack(state, 1, Attack(bot_jutsu), PVP_BOT_DAMAGE)
+            battle_data.setdefault("inputs", []).append([BOT_TURN])
             
             # Check if player is defeated
-            if player_character["hp"] <= 0:
+            if state.winner is not None:
                 await self.handle_pvp_victory(interaction, battle_data, "test_bot")
                 return
             
             # Switch back to player
-            battle_data["current_turn_user_id"] = battle_data["challenger_id"]
-            battle_data["turn"] += 1
-            battle_data["battle_log"].append(f"🎯 {player_character['name']}'s turn!")
+            self._advance_pvp_turn(battle_data, state)
             
             # Update battle display
-            embed = self.create_pvp_battle_embed(battle_data)
-            view = PvPBattleView(self, battle_data)
-            
-            await interaction.followup.send(embed=embed, view=view)
+            message = await self._show_pvp_battle(interaction, battle_data)
+            await self._record_pvp_turn(battle_data, message)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error during bot turn: {str(e)}", ephemeral=True)
@@ -11,6 +11,35 @@ from datetime import datetime, timedelta
 import random
 import os
 
+from ...core.battle.ai import BossModel, EnemyPolicy, ExpectimaxPolicy
+from ...core.battle.engine import Attack, RangeDamage, TurnEngine, TurnState, VarianceDamage
+from ...core.battle.raid import Raid, RaidEngine, RaidError, RaidTick
+from ...core.battle.registry import BattleConflictError, registry_for
+from ...core.boss_battle_system import (
+    SOLOMON_STRIKE, solomon_phase_attack, solomon_strike, solomon_table,
+)
+from ...core.boss_tables import BossTable
+from ...core.cooldowns import cooldowns_for, format_remaining
+from ...core.events import BattleEndedEvent
+from ...core.npc_registry import npc_registry_for
+from ...core.stats import effective_stats
+from ...utils.message_updates import partial_message, publish_frame
+
+INTERACTIVE_JUTSU_MULTIPLIERS: Dict[str, float] = {
+    "Rasengan": 1.5,
+    "Chidori": 1.4,
+    "Great Fireball Jutsu": 1.3,
+    "Dragon Flame Jutsu": 1.2,
+    "Shadow Clone Jutsu": 1.1,
+    "Fireball Jutsu": 1.0,
+    "Basic Attack": 0.8
+}
+
+INTERACTIVE_STRIKE = RangeDamage(50, 150, multipliers=INTERACTIVE_JUTSU_MULTIPLIERS,
+                                 text="💥 {actor} used {jutsu} for {damage} damage!")
+INTERACTIVE_COUNTER = RangeDamage(80, 180, text="🔥 Solomon used {jutsu} for {damage} damage!")
+NPC_STRIKE = VarianceDamage(text="⚔️ **You** use **{jutsu}** - **{damage} damage!**")
+
 class SolomonBattleView(discord.ui.View):
     """Interactive view for Solomon battles with buttons."""
     
@@ -175,13 +204,41 @@ class BossCommands(commands.Cog):
         self.bot = bot
         self.boss_data_path = "data/characters/solomon.json"
         self.jutsu_data_path = "data/jutsu/solomon_jutsu.json"
-        self.active_boss_battles: Dict[str, Dict[str, Any]] = {} # Store active battles
+        registry = registry_for(getattr(bot, "services", None))
+        self.active_boss_battles = registry.user_battles("boss")
+        self.npcs = npc_registry_for(getattr(bot, "services", None))
+        self.boss_cooldowns = cooldowns_for(getattr(bot, "services", None)).scope("boss")
+        self.raids = RaidEngine(registry, on_tick=self.render_raid_tick)
+        self.turn_engine = TurnEngine()
+        self.enemy_policy: EnemyPolicy = ExpectimaxPolicy(max_depth=2)
+
+    async def cog_load(self) -> None:
+        self.raids.start()
+
+    async def cog_unload(self) -> None:
+        await self.raids.stop()
+
+    def solomon_cooldown_embed(self, user_id) -> Optional[discord.Embed]:
+        """Embed telling ``user_id`` how long Solomon is still recovering, or None when they may challenge."""
+        remaining = self.boss_cooldowns.remaining(user_id)
+        if not remaining:
+            return None
+        return discord.Embed(
+            title="⏳ **SOLOMON IS RECOVERING** ⏳",
+            description=f"**Solomon:** *'Return when the flames have settled.'*\n\n"
+                       f"You can challenge Solomon again in **{format_remaining(remaining)}**.",
+            color=0xFF6600
+        )
+
+    def start_solomon_cooldown(self, user_id) -> None:
+        """Start the post-battle cooldown, shared with :class:`BossBattleSystem`."""
+        cooldown_hours = self.load_boss_data().get("boss_requirements", {}).get("cooldown_hours", 168)
+        self.boss_cooldowns.start(user_id, timedelta(hours=cooldown_hours))
         
     def load_boss_data(self) -> Dict[str, Any]:
-        """Load Solomon's boss data."""
+        """Load Solomon's boss data (cached until the file changes)."""
         try:
-            with open(self.boss_data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.npcs.read(self.boss_data_path)
         except FileNotFoundError:
             # EDIT START: Return default boss data for tests when file not found
             return {
@@ -240,10 +297,9 @@ class BossCommands(commands.Cog):
             # EDIT END
             
     def load_jutsu_data(self) -> Dict[str, Any]:
-        """Load Solomon's jutsu data."""
+        """Load Solomon's jutsu data (cached until the file changes)."""
         try:
-            with open(self.jutsu_data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.npcs.read(self.jutsu_data_path)
         except FileNotFoundError:
             return {}
             
@@ -403,6 +459,11 @@ class BossCommands(commands.Cog):
                 )
                 await interaction.followup.send(embed=embed)
                 return
+        # Cooldown check
+        embed = self.solomon_cooldown_embed(interaction.user.id)
+        if embed is not None:
+            await interaction.followup.send(embed=embed)
+            return
         # Initialize battle with boss stats
         boss_stats = {
             "id": boss_data.get("id", "solomon"),
@@ -498,14 +559,11 @@ class BossCommands(commands.Cog):
         if jutsu_name not in character_data.get("jutsu", []):
             await interaction.followup.send(f"❌ You don't know the jutsu **{jutsu_name}**!")
             return
-        # Calculate player damage (simplified)
-        base_damage = 50 + (character_data.get("ninjutsu", 0) // 10)
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-        # Apply damage to boss
-        battle_data["boss"]["hp"] = max(0, battle_data["boss"]["hp"] - damage)
-        battle_data["battle_log"].append(f"⚔️ **{character_data['name']}** uses **{jutsu_name}** - **{damage} damage!**")
+        # Apply the player's attack to the boss
+        state = TurnState.of(character_data, battle_data["boss"], log=battle_data["battle_log"])
+        self.turn_engine.attack(state, 0, solomon_strike(character_data, jutsu_name), SOLOMON_STRIKE)
         # Check if boss is defeated
-        if battle_data["boss"]["hp"] <= 0:
+        if state.winner is not None:
             await self.end_battle(interaction, battle_data, "victory")
             return
         # Process boss turn
@@ -532,14 +590,15 @@ class BossCommands(commands.Cog):
         
         # Get current phase
         hp_percentage = boss["hp"] / boss["max_hp"]
-        current_phase = self.get_current_phase(hp_percentage)
+        table = self.boss_table()
+        current_phase = table.phase(hp_percentage, default={"name": "Unknown Phase"})
         
         # Get boss jutsu
+        state = TurnState.of(character, boss, log=battle_data["battle_log"], active=1)
         jutsu_pool = current_phase.get("jutsu_pool", ["Katon: Gōka Messhitsu"])
-        jutsu_name = random.choice(jutsu_pool)
-        
-        # Calculate boss damage
-        damage = self.calculate_boss_damage(jutsu_name, current_phase)
+        model = BossModel(table, boss["max_hp"], character.get("max_hp", character["hp"]),
+                          solomon_strike(character, "").base, default_pool=jutsu_pool)
+        jutsu_name = self.enemy_policy.decide(model, model.snapshot(character["hp"], boss["hp"])).action
         
         # Special phase abilities
         if "Kamui Phase" in jutsu_name:
@@ -547,11 +606,10 @@ class BossCommands(commands.Cog):
             return battle_data
             
         # Apply damage
-        character["hp"] = max(0, character["hp"] - damage)
-        battle_data["battle_log"].append(f"🔥 **Solomon** uses **{jutsu_name}** - **{damage} damage!**")
+        self.turn_engine.attack(state, 1, solomon_phase_attack(jutsu_name, current_phase), table)
         
         # Phase transition check
-        new_phase = self.get_current_phase(boss["hp"] / boss["max_hp"])
+        new_phase = table.phase(boss["hp"] / boss["max_hp"], default={"name": "Unknown Phase"})
         if new_phase != current_phase:
             battle_data["battle_log"].append(f"🔥 **PHASE TRANSITION:** {new_phase.get('name', 'Unknown')}")
             battle_data["battle_log"].append(f"🔥 **{new_phase.get('description', '')}**")
@@ -565,52 +623,18 @@ class BossCommands(commands.Cog):
                 
         return battle_data
         
+    def boss_table(self) -> BossTable:
+        """Solomon's compiled phase and damage table; rebuilt only when the boss file changes."""
+        return self.npcs.compiled(self.load_boss_data(), "solomon", solomon_table)
+        
     def get_current_phase(self, hp_percentage: float) -> Dict[str, Any]:
         """Get the current boss phase based on HP percentage."""
-        boss_data = self.load_boss_data()
-        phases = boss_data.get("boss_phases", [])
-        # FIX: Phase 1 should last until HP < 0.7
-        for phase in phases:
-            if hp_percentage >= phase.get("hp_threshold", 1.0):
-                return phase
-        # EDIT START: Always return a dict with a 'name' key to avoid KeyError in tests
-        if phases:
-            return phases[-1]
-        return {"name": "Unknown Phase"}
-        # EDIT END
+        # Always a dict with a 'name' key, even when the boss has no phases
+        return self.boss_table().phase(hp_percentage, default={"name": "Unknown Phase"})
         
     def calculate_boss_damage(self, jutsu_name: str, phase: Dict[str, Any]) -> int:
         """Calculate boss damage based on jutsu and current phase."""
-        base_damage = {
-            "Katon: Gōka Messhitsu": 80,
-            "Katon: Gōryūka no Jutsu": 100,
-            "Sharingan Genjutsu": 60,
-            "Adamantine Chakra-Forged Chains": 90,
-            "Amaterasu": 150,
-            "Kamui Phase": 0,  # Dodge
-            "Yōton: Maguma Hōkai": 120,
-            "Yōton: Ryūsei no Jutsu": 140,
-            "Susanoo: Ōkami no Yōsei": 200,
-            "Yōton: Enkō no Ōkami": 180,
-            "Kōkō no Kusari": 160,
-            "Eclipse Fang Severance": 250,
-            "Ōkami no Yōsei Susanoo: Final Incarnation": 300,
-            "Yōton: Enkō no Ōkami: Pack Release": 220,
-            "Summoning: Wolves of Kiba no Tōdai": 280
-        }
-        
-        damage = base_damage.get(jutsu_name, 100)
-        
-        # Phase multipliers
-        phase_multipliers = {
-            "Phase 1: The Crimson Shadow": 1.0,
-            "Phase 2: The Burning Revenant": 1.3,
-            "Phase 3: The Exiled Flame": 1.6,
-            "Phase 4: The Ultimate Being": 2.0
-        }
-        
-        multiplier = phase_multipliers.get(phase.get("name", ""), 1.0)
-        return int(damage * multiplier)
+        return self.boss_table().damage(jutsu_name, phase)
         
     async def end_battle(self, interaction: discord.Interaction, battle_data: Dict[str, Any], result: str):
         """End the boss battle and handle rewards."""
@@ -624,8 +648,10 @@ class BossCommands(commands.Cog):
             os.remove(battle_file)
         except FileNotFoundError:
             pass
+        self.start_solomon_cooldown(user_id)
             
         if result == "victory":
+            self._publish_boss_defeat(user_id, battle_data)
             # Grant rewards
             boss_data = self.load_boss_data()
             rewards = boss_data.get("boss_rewards", {})
@@ -741,6 +767,14 @@ class BossCommands(commands.Cog):
             view = SolomonBattleView(self, battle_data)
             await ctx.send(embed=embed, view=view)
             return
+        if self.active_boss_battles.busy(user_id):
+            embed = discord.Embed(
+                title="❌ ALREADY IN BATTLE",
+                description="You are already in a boss battle elsewhere! Finish it before challenging Solomon.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
         
         # Check requirements
         boss_data = self.load_boss_data()
@@ -774,6 +808,12 @@ class BossCommands(commands.Cog):
                 await ctx.send(embed=embed)
                 return
         
+        # Cooldown check
+        embed = self.solomon_cooldown_embed(user_id)
+        if embed is not None:
+            await ctx.send(embed=embed)
+            return
+        
         # Initialize battle
         boss_stats = {
             "id": boss_data.get("id", "solomon"),
@@ -801,6 +841,12 @@ class BossCommands(commands.Cog):
         view = SolomonBattleView(self, battle_data)
         
         await ctx.send(embed=embed, view=view)
+        self._broadcast(battle_data, embed)
+
+    def _broadcast(self, battle_data: Dict[str, Any], embed: discord.Embed, final: bool = False):
+        """Mirror the fight to /spectate watchers; the player's own messages are sent as before."""
+        if "battle_id" in battle_data:
+            publish_frame(getattr(self.bot, "services", None), ("boss", battle_data["battle_id"]), embed, final)
     
     def create_interactive_battle_embed(self, battle_data: Dict[str, Any]) -> discord.Embed:
         """Create an interactive battle embed."""
@@ -877,25 +923,24 @@ class BossCommands(commands.Cog):
             character = battle_data["character"]
             boss = battle_data["boss"]
             
-            # Calculate player damage
-            base_damage = random.randint(50, 150)
-            ninjutsu_bonus = character.get("ninjutsu", 5) * 2
-            level_bonus = character.get("level", 1) * 3
-            
-            total_damage = base_damage + ninjutsu_bonus + level_bonus
-            
-            # Apply jutsu multiplier
-            jutsu_multiplier = self.get_jutsu_multiplier(jutsu_name)
-            total_damage = int(total_damage * jutsu_multiplier)
+            # Ninjutsu and level bonuses, scaled by the jutsu multiplier and mastery
+            services = getattr(self.bot, "services", None)
+            stats = effective_stats(services, character.get("id"))
+            ninjutsu = stats.ninjutsu if stats is not None else character.get("ninjutsu", 5)
+            bonus = ninjutsu * 2 + character.get("level", 1) * 3
+            power = 1.0
+            mastery = getattr(services, "jutsu_mastery", None)
+            if mastery is not None:
+                user_id = str(interaction.user.id)
+                power = mastery.get_damage_multiplier(user_id, jutsu_name)
+                mastery.record_use(user_id, jutsu_name)
             
             # Apply damage to boss
-            boss["hp"] = max(0, boss["hp"] - total_damage)
-            
-            # Update battle log
-            battle_data["battle_log"].append(f"💥 {character['name']} used {jutsu_name} for {total_damage} damage!")
+            state = TurnState.of(character, boss, log=battle_data["battle_log"])
+            self.turn_engine.attack(state, 0, Attack(jutsu_name, power=power, bonus=bonus), INTERACTIVE_STRIKE)
             
             # Check if boss is defeated
-            if boss["hp"] <= 0:
+            if state.winner is not None:
                 await self.handle_interactive_victory(interaction, battle_data)
                 return
             
@@ -918,22 +963,14 @@ class BossCommands(commands.Cog):
             view = SolomonBattleView(self, battle_data)
             
             await interaction.followup.send(embed=embed, view=view)
+            self._broadcast(battle_data, embed)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error during attack: {str(e)}")
     
     def get_jutsu_multiplier(self, jutsu_name: str) -> float:
         """Get damage multiplier for different jutsu."""
-        jutsu_multipliers = {
-            "Rasengan": 1.5,
-            "Chidori": 1.4,
-            "Great Fireball Jutsu": 1.3,
-            "Dragon Flame Jutsu": 1.2,
-            "Shadow Clone Jutsu": 1.1,
-            "Fireball Jutsu": 1.0,
-            "Basic Attack": 0.8
-        }
-        return jutsu_multipliers.get(jutsu_name, 1.0)
+        return INTERACTIVE_JUTSU_MULTIPLIERS.get(jutsu_name, 1.0)
     
     async def process_boss_counter_attack(self, battle_data: Dict[str, Any]):
         """Process Solomon's counter-attack."""
@@ -948,19 +985,12 @@ class BossCommands(commands.Cog):
             ["Tailed Beast Bomb", "Jinchūriki Rage", "Ultimate Incineration"]
         ]
         
-        selected_jutsu = random.choice(phase_jutsu[current_phase])
-        
-        # Calculate boss damage
-        base_damage = random.randint(80, 180)
-        phase_multiplier = 1.0 + (current_phase * 0.3)  # Damage increases with phase
-        
-        total_damage = int(base_damage * phase_multiplier)
-        
-        # Apply damage to character
-        character["hp"] = max(0, character["hp"] - total_damage)
+        state = TurnState.of(character, boss, log=battle_data["battle_log"], active=1)
+        selected_jutsu = self.turn_engine.choose_jutsu(state, phase_jutsu[current_phase])
         
-        # Update battle log
-        battle_data["battle_log"].append(f"🔥 Solomon used {selected_jutsu} for {total_damage} damage!")
+        # Damage increases with phase
+        phase_multiplier = 1.0 + (current_phase * 0.3)
+        self.turn_engine.attack(state, 1, Attack(selected_jutsu, power=phase_multiplier), INTERACTIVE_COUNTER)
     
     def update_battle_phase(self, battle_data: Dict[str, Any]):
         """Update battle phase based on boss HP."""
@@ -974,6 +1004,22 @@ class BossCommands(commands.Cog):
             battle_data["current_phase"] = 1
             battle_data["battle_log"].append("🔥 Solomon's power intensifies! Phase 2 begins!")
     
+    def _publish_boss_defeat(self, user_id, battle_data: Dict[str, Any]):
+        """Publish a boss victory so achievements and announcements can react."""
+        event_bus = getattr(getattr(self.bot, "services", None), "event_bus", None)
+        if event_bus is None:
+            return
+        event_bus.publish(BattleEndedEvent(
+            user_id=str(user_id),
+            battle_id=f"solomon_{user_id}",
+            mode="boss",
+            opponent="Solomon",
+            end_reason="victory",
+            turns=battle_data.get("turn", 0),
+            level=battle_data.get("character", {}).get("level", 0),
+            loser_level=battle_data.get("boss", {}).get("level", 0),
+        ))
+
     async def handle_interactive_victory(self, interaction: discord.Interaction, battle_data: Dict[str, Any]):
         """Handle player victory in interactive battle."""
         user_id = str(interaction.user.id)
@@ -981,6 +1027,8 @@ class BossCommands(commands.Cog):
         # Remove from active battles
         if user_id in self.active_boss_battles:
             del self.active_boss_battles[user_id]
+        self.start_solomon_cooldown(user_id)
+        self._publish_boss_defeat(user_id, battle_data)
         
         character = battle_data["character"]
         
@@ -1029,6 +1077,7 @@ class BossCommands(commands.Cog):
         embed.set_footer(text="You are now among the greatest warriors in the shinobi world!")
         
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
     
     async def handle_interactive_defeat(self, interaction: discord.Interaction, battle_data: Dict[str, Any]):
         """Handle player defeat in interactive battle."""
@@ -1037,6 +1086,7 @@ class BossCommands(commands.Cog):
         # Remove from active battles
         if user_id in self.active_boss_battles:
             del self.active_boss_battles[user_id]
+        self.start_solomon_cooldown(user_id)
         
         character = battle_data["character"]
         
@@ -1059,6 +1109,7 @@ class BossCommands(commands.Cog):
         embed.set_footer(text="Defeat is just another step towards victory!")
         
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
     
     async def execute_flee(self, interaction: discord.Interaction, battle_data: Dict[str, Any]):
         """Execute flee action in interactive battle."""
@@ -1097,6 +1148,7 @@ class BossCommands(commands.Cog):
         embed.set_footer(text="Come back when you're ready to face the ultimate challenge!")
         
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
 
     @app_commands.command(name="battle_npc", description="Battle against an NPC boss with special mechanics")
     @app_commands.describe(
@@ -1121,7 +1173,7 @@ class BossCommands(commands.Cog):
             
             # Check if already in battle
             user_id = str(interaction.user.id)
-            if user_id in self.active_boss_battles:
+            if self.active_boss_battles.busy(user_id):
                 embed = discord.Embed(
                     title="❌ ALREADY IN BATTLE",
                     description="You are already in a boss battle! Use `/battle_attack` or `/battle_flee`",
@@ -1189,6 +1241,7 @@ class BossCommands(commands.Cog):
             view = SolomonBattleView(self, battle_data)
             
             await interaction.followup.send(embed=embed, view=view)
+            self._broadcast(battle_data, embed)
         except Exception as e:
             if interaction.response.is_done():
                 await interaction.followup.send(f"Error during NPC battle: {str(e)}", ephemeral=True)
@@ -1245,8 +1298,10 @@ class BossCommands(commands.Cog):
         ]
         
         for npc in npc_list:
+            definition = self.npcs.npc(npc["name"])  # the NPC's file has the current level
+            level = definition.level if definition is not None else npc["level"]
             embed.add_field(
-                name=f"**{npc['name']}** (Level {npc['level']})",
+                name=f"**{npc['name']}** (Level {level})",
                 value=f"**Special:** {npc['special']}\n**Mechanic:** {npc['description']}\n**Min Level:** {npc['min_level']}",
                 inline=False
             )
@@ -1323,15 +1378,12 @@ class BossCommands(commands.Cog):
             await interaction.followup.send(embed=embed)
             return
             
-        # Calculate damage
-        damage = self.calculate_damage(jutsu, character)
-        
         # Apply damage to boss
-        boss["hp"] = max(0, boss["hp"] - damage)
-        battle_data["battle_log"].append(f"⚔️ **You** use **{jutsu}** - **{damage} damage!**")
+        state = TurnState.of(character, boss, log=battle_data["battle_log"])
+        self.turn_engine.attack(state, 0, solomon_strike(character, jutsu), NPC_STRIKE)
         
         # Check if boss is defeated
-        if boss["hp"] <= 0:
+        if state.winner is not None:
             await self.handle_npc_victory(interaction, battle_data)
             return
             
@@ -1448,6 +1500,147 @@ class BossCommands(commands.Cog):
         
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(name="raid", description="Fight Solomon together with your whole server")
+    @app_commands.describe(
+        action="What you want to do",
+        jutsu="Jutsu to use in the raid"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="open", value="open"),
+        app_commands.Choice(name="join", value="join"),
+        app_commands.Choice(name="attack", value="attack"),
+        app_commands.Choice(name="status", value="status")
+    ])
+    async def raid_command(self, interaction: discord.Interaction, action: str, jutsu: str = None):
+        """Guild-wide Solomon raid: one shared boss, actions resolved every few seconds."""
+        key = interaction.guild_id or interaction.channel_id
+        raid = self.raids.raid(key)
+
+        if action == "status":
+            if raid is None:
+                await interaction.response.send_message("❌ There is no active raid here.", ephemeral=True)
+                return
+            await interaction.response.send_message(embed=self.create_raid_embed(raid), ephemeral=True)
+            return
+
+        try:
+            if action == "attack":
+                if not jutsu:
+                    await interaction.response.send_message("❌ Please specify a jutsu to use!", ephemeral=True)
+                    return
+                self.raids.submit(key, interaction.user.id, jutsu)
+                await interaction.response.send_message(
+                    f"⚔️ **{jutsu}** is readied and lands on the next raid turn.", ephemeral=True
+                )
+                return
+
+            character_data = self.load_character_data(interaction.user.id)
+            if not character_data:
+                await interaction.response.send_message("❌ You don't have a character! Use `/create` first.",
+                                                        ephemeral=True)
+                return
+
+            if action == "open":
+                raid = self.raids.open(key, self.load_boss_data(), channel_id=interaction.channel_id)
+            self.raids.join(key, interaction.user.id, character_data)
+        except RaidError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        except BattleConflictError:
+            if action == "open":
+                self.raids.close(key)
+            await interaction.response.send_message("❌ You are already in a battle with Solomon!", ephemeral=True)
+            return
+
+        if action == "open":
+            await interaction.response.send_message(embed=self.create_raid_embed(raid))
+            message = await interaction.original_response()
+            raid.message_id = message.id
+        else:
+            await interaction.response.send_message(
+                f"🛡️ You joined the raid! Solomon grows stronger: **{raid.boss['hp']:,} HP**.", ephemeral=True
+            )
+
+    def create_raid_embed(self, raid: Raid) -> discord.Embed:
+        """Shared raid state: boss HP, phase, top damage dealers and the recent log."""
+        boss = raid.boss
+        phase = raid.phase
+        boss_hp_percent = (boss["hp"] / boss["max_hp"]) * 100 if boss["max_hp"] else 100.0
+        embed = discord.Embed(
+            title="🔥 **RAID: SOLOMON - THE BURNING REVENANT** 🔥",
+            description=f"**Turn {raid.ticks}** | **{len(raid.standing())}/{len(raid.players)} raiders standing**",
+            color=0xFF0000 if raid.active else 0xFFD700
+        )
+        embed.add_field(
+            name="🔥 **SOLOMON** 🔥",
+            value=f"**HP:** {boss['hp']:,}/{boss['max_hp']:,} ({boss_hp_percent:.1f}%)\n"
+                  f"**Phase:** {phase.get('name', 'Unknown')}",
+            inline=False
+        )
+        top = [f"**{raid.players[uid]['name']}** — {dealt:,}" for uid, dealt in raid.top() if dealt]
+        if top:
+            embed.add_field(name="🏅 **Top Damage**", value="\n".join(top), inline=True)
+        if raid.log:
+            embed.add_field(name="📜 **Raid Log**", value="\n".join(list(raid.log)[-5:]), inline=False)
+        embed.set_footer(text="/raid join to fight • /raid attack <jutsu> acts on the next raid turn")
+        return embed
+
+    async def render_raid_tick(self, raid: Raid, tick: RaidTick):
+        """Edit the raid message in place after each tick; hand out rewards once it ends."""
+        channel = self.bot.get_channel(raid.channel_id)
+        render = lambda: {"embed": self.create_raid_embed(raid)}
+        updates = getattr(getattr(self.bot, "services", None), "message_updates", None)
+        if updates is not None and channel is not None:
+            key = ("raid", raid.raid_id)
+            if updates.message(key) is None:
+                updates.track(key, partial_message(self.bot, raid.channel_id, raid.message_id))
+            await updates.submit(key, raid.channel_id, render, channel.send)
+            if not raid.active:
+                updates.forget(key)
+        else:
+            message = partial_message(self.bot, raid.channel_id, raid.message_id)
+            if message is not None:
+                await message.edit(**render())
+        if not raid.active:
+            await self.finish_raid(raid, channel)
+
+    async def finish_raid(self, raid: Raid, channel):
+        """Split the rewards by damage dealt and announce the outcome."""
+        if raid.status != "victory":
+            if channel is not None:
+                await channel.send(embed=discord.Embed(
+                    title="💀 **THE RAID HAS FAILED** 💀",
+                    description="**Solomon:** *'Numbers alone will not bring me down.'*",
+                    color=0xFF0000
+                ))
+            return
+
+        rewards = self.load_boss_data().get("boss_rewards", {})
+        exp = raid.split(rewards.get("exp", 10000))
+        ryo = raid.split(rewards.get("ryo", 50000))
+        for user_id in exp:
+            character = self.load_character_data(user_id)
+            if character is None:
+                continue
+            character["exp"] = character.get("exp", 0) + exp[user_id]
+            character["ryo"] = character.get("ryo", 0) + ryo.get(user_id, 0)
+            achievements = character.setdefault("achievements", [])
+            for achievement in rewards.get("achievements", []):
+                if achievement not in achievements:
+                    achievements.append(achievement)
+            self.save_character_data(user_id, character)
+            self._publish_boss_defeat(user_id, {"turn": raid.ticks})
+
+        if channel is not None:
+            lines = [f"**{raid.players[uid]['name']}** — {dealt:,} dmg • {exp.get(uid, 0):,} EXP • {ryo.get(uid, 0):,} Ryo"
+                     for uid, dealt in raid.top(10) if dealt]
+            await channel.send(embed=discord.Embed(
+                title="🏆 **SOLOMON HAS BEEN DEFEATED!** 🏆",
+                description=f"**{len(exp)} shinobi** brought down the Burning Revenant in {raid.ticks} turns!\n\n"
+                            + "\n".join(lines),
+                color=0xFFD700
+            ))
+
 async def setup(bot):
     """Setup the boss battle commands."""
     await bot.add_cog(BossCommands(bot)) 
\ No newline at end of file
@@ -4,12 +4,19 @@ from discord.ext import commands
 from typing import Optional
 import logging
 
+from ...core.cooldowns import DAILY, CooldownScope, CooldownStore, format_remaining
 from ...utils.embeds import create_error_embed
 
 
 class CurrencyCommands(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        self._local_cooldowns = CooldownStore()
+
+    def _daily_cooldowns(self) -> CooldownScope:
+        """``/daily`` claims in the shared (persisted) store, or a cog-local one without services."""
+        store = getattr(getattr(self.bot, "services", None), "cooldowns", None)
+        return (store if isinstance(store, CooldownStore) else self._local_cooldowns).scope("daily")
 
     async def _safe_response(self, interaction: discord.Interaction, content=None, embed=None, ephemeral=False):
         """Safely respond to an interaction, handling expired interactions gracefully."""
@@ -173,9 +180,21 @@ class CurrencyCommands(commands.Cog):
                 )
                 return
                 
+            cooldowns = self._daily_cooldowns()
+            remaining = cooldowns.remaining(interaction.user.id)
+            if remaining:
+                logging.info(f"   ⏳ Daily reward already claimed, {format_remaining(remaining)} left")
+                await self._safe_response(
+                    interaction,
+                    embed=create_error_embed(f"You already claimed your daily reward. Come back in {format_remaining(remaining)}."),
+                    ephemeral=True
+                )
+                return
+                
             daily_amount = 100
             currency_system = self.bot.services.currency_system
             currency_system.add_balance_and_save(interaction.user.id, daily_amount)
+            cooldowns.start(interaction.user.id, DAILY)
             new_balance = await currency_system.get_player_balance(interaction.user.id)
             logging.info(f"   ✅ Daily reward claimed: +{daily_amount} ryo, new balance: {new_balance:,}")
             
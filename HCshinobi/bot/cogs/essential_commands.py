@@ -80,39 +80,45 @@ class EssentialCommands(commands.Cog):
     @app_commands.command(name="achievements", description="View your achievements and progress")
     async def achievements_command(self, interaction: discord.Interaction) -> None:
         """Display user achievements and progress."""
+        engine = getattr(getattr(self.bot, "services", None), "achievement_engine", None)
+        if engine is None:
+            await interaction.response.send_message(
+                embed=create_error_embed("Achievement system is not available."), ephemeral=True
+            )
+            return
+        try:
+            categories = await engine.get_player_achievements(str(interaction.user.id))
+        except Exception as e:
+            await interaction.response.send_message(
+                embed=create_error_embed(f"Error loading achievements: {str(e)}"), ephemeral=True
+            )
+            return
+
         embed = discord.Embed(
             title="🏆 Achievements",
             description="Your ninja accomplishments and progress",
             color=0xffd700
         )
-        
-        # Combat Achievements
-        embed.add_field(
-            name="⚔️ Combat Achievements",
-            value="🔓 **First Battle** - Win your first fight\n🔓 **Boss Slayer** - Defeat your first boss\n🔒 **Solomon's Equal** - Defeat Solomon\n🔒 **Perfect Victory** - Win without taking damage",
-            inline=False
-        )
-        
-        # Training Achievements
-        embed.add_field(
-            name="🏃‍♂️ Training Achievements", 
-            value="🔓 **Dedicated Student** - Complete 10 training sessions\n🔒 **Master Trainer** - Complete 100 training sessions\n🔒 **Attribute Master** - Max out any attribute",
-            inline=False
-        )
-        
-        # Economic Achievements
-        embed.add_field(
-            name="💰 Economic Achievements",
-            value="🔓 **First Transaction** - Make your first purchase\n🔒 **Wealthy Ninja** - Accumulate 100,000 ryo\n🔒 **Generous Soul** - Transfer 50,000 ryo to others",
-            inline=False
-        )
-        
-        embed.add_field(
-            name="📊 Progress Tracking",
-            value="Check your progress with:\n• Battle statistics in combat\n• Training progress with `/training_status`\n• Economic status with `/balance`",
-            inline=False
-        )
-        
+        icons = {"Combat": "⚔️", "Training": "🏃‍♂️", "Economic": "💰", "Progression": "📈"}
+        unlocked_total = 0
+        for category, entries in categories.items():
+            lines = []
+            for entry in entries:
+                if entry["unlocked"]:
+                    unlocked_total += 1
+                    lines.append(f"🔓 **{entry['name']}** - {entry['description']}")
+                else:
+                    lines.append(
+                        f"🔒 **{entry['name']}** - {entry['description']} ({entry['current']:,}/{entry['goal']:,})"
+                    )
+            embed.add_field(
+                name=f"{icons.get(category, '🎖️')} {category} Achievements",
+                value="\n".join(lines),
+                inline=False
+            )
+
+        total = sum(len(entries) for entries in categories.values())
+        embed.set_footer(text=f"{unlocked_total}/{total} achievements unlocked")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="jutsu_shop", description="Browse and purchase new jutsu techniques")  
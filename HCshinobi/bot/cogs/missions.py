@@ -19,7 +19,6 @@ Commands:
 
 import asyncio
 import json
-import random
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
@@ -27,21 +26,18 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from ...core.battle.engine import Attack, D20Damage, TurnEngine, TurnState, roll_d20
+from ...core.battle.registry import new_battle_id, registry_for
 from ...core.missions.shinobios_engine import ShinobiOSEngine
 from ...core.missions.shinobios_mission import ShinobiOSMission, BattleMissionType
 from ...core.missions.mission import MissionDifficulty
+from ...core.missions.simulation_pool import scenario_sweep_specs
+from ...core.stats import effective_stats
 from ...utils.embeds import create_error_embed, create_success_embed, create_info_embed
+from ...utils.message_updates import partial_message
 
-def roll_d20(modifier=0):
-    """Roll a d20 with modifier and return detailed results."""
-    roll = random.randint(1, 20)
-    total = roll + modifier
-    crit = None
-    if roll == 20:
-        crit = 'success'
-    elif roll == 1:
-        crit = 'failure'
-    return {'roll': roll, 'modifier': modifier, 'total': total, 'crit': crit}
+MISSION_D20_DAMAGE = D20Damage()
+ENEMY_D20_DAMAGE = D20Damage(icon="👹")
 
 
 class MissionBattleView(discord.ui.View):
@@ -234,10 +230,45 @@ class MissionCommands(commands.Cog):
     
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.engine = ShinobiOSEngine()
+        self.engine = ShinobiOSEngine(getattr(bot, "services", None))
         self.active_missions: Dict[str, ShinobiOSMission] = {}
         self.player_missions: Dict[str, str] = {}  # user_id -> mission_id
-        
+        self.sweep_job = None
+        self.turn_engine = TurnEngine()
+        self.battle_registry = registry_for(getattr(bot, "services", None))
+        
+    def _mission_turn_state(self, mission: ShinobiOSMission, attacker, target) -> TurnState:
+        """Engine view for one attack: ``attacker`` and ``target`` are a character dict or ShinobiOS stats."""
+        return TurnState.of(attacker, target, log=mission.battle_state.battle_log,
+                            turn=mission.battle_state.current_turn)
+        
+    def _track_mission(self, user_id: str, mission: ShinobiOSMission) -> None:
+        """Index the mission by id and claim the player, who runs one mission at a time."""
+        self.battle_registry.register("mission", [user_id], data=mission, battle_id=mission.id)
+        self.active_missions[mission.id] = mission
+        self.player_missions[user_id] = mission.id
+
+    def _message_updates(self):
+        return getattr(getattr(self.bot, "services", None), "message_updates", None)
+
+    def _track_mission_message(self, mission: ShinobiOSMission, message) -> None:
+        """Edit this mission's battle message from now on instead of posting a new one each turn."""
+        updates = self._message_updates()
+        if updates is None or getattr(message, "id", None) is None:
+            return
+        handle = partial_message(self.bot, getattr(getattr(message, "channel", None), "id", None), message.id)
+        updates.track(("mission", mission.id), handle or message)
+
+    async def _show_mission_battle(self, interaction: discord.Interaction, mission: ShinobiOSMission, user_id: int):
+        render = lambda: {"embed": self._create_interactive_mission_embed(mission),
+                          "view": MissionBattleView(self, mission, user_id)}
+        updates = self._message_updates()
+        if updates is None:
+            return await interaction.followup.send(**render())
+        message = await updates.submit(("mission", mission.id), interaction.channel_id, render, interaction.followup.send)
+        self._track_mission_message(mission, message)
+        return message
+
     def _load_character_data(self, user_id: str) -> Optional[Dict]:
         """Load character data for a user"""
         try:
@@ -284,11 +315,7 @@ class MissionCommands(commands.Cog):
         
         # Add recent actions
         if mission.battle_state.battle_log:
-            recent_actions = mission.battle_state.battle_log[-3:]
-            action_text = "\n".join([
-                f"**{action['actor']}** used {action['jutsu']} on {action['target']} - {action['damage']} damage"
-                for action in recent_actions
-            ])
+            action_text = "\n".join(mission.battle_state.battle_log.render(last=3))
             embed.add_field(name="⚡ Recent Actions", value=action_text, inline=False)
         
         embed.set_footer(text=f"Turn: {mission.battle_state.current_turn} | Battle ID: {mission.battle_id}")
@@ -365,7 +392,7 @@ class MissionCommands(commands.Cog):
                 return
             
             # Check if already in mission
-            if str(interaction.user.id) in self.active_missions:
+            if self.battle_registry.in_battle(interaction.user.id, "mission"):
                 embed = discord.Embed(
                     title="❌ ALREADY IN MISSION",
                     description="You are already in a mission! Use `/mission_status` to check progress.",
@@ -390,7 +417,7 @@ class MissionCommands(commands.Cog):
             mission.initialize_battle([character_data], environment)
             
             # Store mission
-            self.active_missions[str(interaction.user.id)] = mission
+            self._track_mission(str(interaction.user.id), mission)
             
             # Generate opening narration
             opening_narration = self._generate_opening_narration(mission, character_data)
@@ -437,7 +464,8 @@ class MissionCommands(commands.Cog):
             # Create interactive battle view
             view = MissionBattleView(self, mission, interaction.user.id)
             
-            await interaction.followup.send(embed=embed, view=view)
+            message = await interaction.followup.send(embed=embed, view=view)
+            self._track_mission_message(mission, message)
             
         except Exception as e:
             await interaction.followup.send(
@@ -469,7 +497,8 @@ class MissionCommands(commands.Cog):
             embed = self._create_interactive_mission_embed(mission)
             view = MissionBattleView(self, mission, interaction.user.id)
             
-            await interaction.followup.send(embed=embed, view=view)
+            message = await interaction.followup.send(embed=embed, view=view)
+            self._track_mission_message(mission, message)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error starting interactive mission: {str(e)}", ephemeral=True)
@@ -528,11 +557,7 @@ class MissionCommands(commands.Cog):
         
         # Add recent actions
         if mission.battle_state.battle_log:
-            recent_actions = mission.battle_state.battle_log[-2:]
-            action_text = "\n".join([
-                f"**{action['actor']}** used {action['jutsu']} → {action['damage']} damage"
-                for action in recent_actions
-            ])
+            action_text = "\n".join(mission.battle_state.battle_log.render(last=2))
             embed.add_field(name="⚡ Recent Actions", value=action_text, inline=False)
         
         embed.set_footer(text="Use the buttons below to take action in battle!")
@@ -568,37 +593,23 @@ class MissionCommands(commands.Cog):
                 await interaction.followup.send(f"❌ You don't know the jutsu **{jutsu_name}**!", ephemeral=True)
                 return
             
-            # Calculate attack roll with d20 mechanics
-            dex_mod = (character_data.get("dexterity", 10) - 10) // 2  # DEX modifier
-            target_ac = target.stats.defense + 10  # Convert defense to AC
-            attack_result = roll_d20(dex_mod)
-            
-            # Create attack log
-            log = f"⚔️ **{character_data['name']}** uses **{jutsu_name}**! (Roll: {attack_result['roll']} + {attack_result['modifier']} = {attack_result['total']} vs AC {target_ac})"
-            
-            # Crit/fail logic
-            if attack_result['crit'] == 'success':
-                log += " — **CRITICAL HIT!**"
-            elif attack_result['crit'] == 'failure':
-                log += " — **CRITICAL FAILURE!**"
-            
-            # Hit/miss logic
-            if attack_result['crit'] == 'failure' or attack_result['total'] < target_ac:
-                log += " — **Misses!**"
-                mission.battle_state.add_battle_log(log)
-            else:
-                # Calculate damage with d20 mechanics
-                base_damage = 20 + (character_data.get("ninjutsu", 0) // 5)
-                damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-                
-                # Critical hit doubles damage
-                if attack_result['crit'] == 'success':
-                    damage *= 2
-                
-                # Apply damage
-                actual_damage = target.stats.take_damage(damage)
-                log += f" — **Hits for {actual_damage} damage!**"
-                mission.battle_state.add_battle_log(log)
+            # Attack roll with d20 mechanics: DEX modifier against defense converted to AC
+            services = getattr(self.bot, "services", None)
+            mastery = getattr(services, "jutsu_mastery", None)
+            stats = effective_stats(services, user_id)
+            ninjutsu = stats.ninjutsu if stats is not None else character_data.get("ninjutsu", 0)
+            attack = Attack(
+                jutsu_name,
+                power=mastery.get_damage_multiplier(user_id, jutsu_name) if mastery is not None else 1.0,
+                base=20 + (ninjutsu // 5),
+                modifier=(character_data.get("dexterity", 10) - 10) // 2,
+                armor_class=target.stats.defense + 10,
+            )
+            state = self._mission_turn_state(mission, character_data, target.stats)
+            hit = self.turn_engine.attack(state, 0, attack, MISSION_D20_DAMAGE)
+            if not hit.missed:
+                if mastery is not None:
+                    mastery.record_use(user_id, jutsu_name)
                 
                 # Check if target is defeated
                 if target.stats.health <= 0:
@@ -618,10 +629,7 @@ class MissionCommands(commands.Cog):
                 return
             
             # Update mission display
-            embed = self._create_interactive_mission_embed(mission)
-            view = MissionBattleView(self, mission, user_id)
-            
-            await interaction.followup.send(embed=embed, view=view)
+            await self._show_mission_battle(interaction, mission, user_id)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error during attack: {str(e)}", ephemeral=True)
@@ -645,48 +653,27 @@ class MissionCommands(commands.Cog):
                 if enemy.stats.health <= 0:
                     continue
                 
-                # Enemy attack roll with d20 mechanics
-                enemy_dex_mod = (enemy.stats.speed - 10) // 2  # Use speed as DEX equivalent
-                player_ac = character_data.get("defense", 10) + 10  # Convert defense to AC
-                attack_result = roll_d20(enemy_dex_mod)
-                
                 # Get enemy jutsu
+                state = self._mission_turn_state(mission, enemy.stats, player.stats)
                 available_jutsu = mission.engine.get_available_jutsu(enemy.stats)
-                jutsu = random.choice(available_jutsu) if available_jutsu else None
+                jutsu = self.turn_engine.choose_jutsu(state, available_jutsu) if available_jutsu else None
                 
                 if jutsu:
-                    log = f"👹 **{enemy.stats.name}** uses **{jutsu.name}**! (Roll: {attack_result['roll']} + {attack_result['modifier']} = {attack_result['total']} vs AC {player_ac})"
-                    
-                    # Crit/fail logic
-                    if attack_result['crit'] == 'success':
-                        log += " — **CRITICAL HIT!**"
-                    elif attack_result['crit'] == 'failure':
-                        log += " — **CRITICAL FAILURE!**"
-                    
-                    # Hit/miss logic
-                    if attack_result['crit'] == 'failure' or attack_result['total'] < player_ac:
-                        log += " — **Misses!**"
-                        mission.battle_state.add_battle_log(log)
-                    else:
-                        # Calculate damage with d20 mechanics
-                        base_damage = jutsu.damage
-                        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-                        
-                        # Critical hit doubles damage
-                        if attack_result['crit'] == 'success':
-                            damage *= 2
-                        
-                        # Apply damage
-                        actual_damage = player.stats.take_damage(damage)
-                        log += f" — **Hits for {actual_damage} damage!**"
-                        mission.battle_state.add_battle_log(log)
-                        
+                    # Enemy attack roll with d20 mechanics: speed as DEX, player defense converted to AC
+                    attack = Attack(
+                        jutsu.name,
+                        base=jutsu.damage,
+                        modifier=(enemy.stats.speed - 10) // 2,
+                        armor_class=character_data.get("defense", 10) + 10,
+                    )
+                    hit = self.turn_engine.attack(state, 0, attack, ENEMY_D20_DAMAGE)
+                    if not hit.missed:
                         actions.append({
                             "actor": enemy.stats.name,
                             "target": player.stats.name,
                             "jutsu": jutsu.name,
-                            "damage": actual_damage,
-                            "narration": log
+                            "damage": hit.damage,
+                            "narration": ENEMY_D20_DAMAGE.describe(state.fighters[0], state.fighters[1], attack, hit)
                         })
                         
                         # Check if player is defeated
@@ -929,16 +916,14 @@ class MissionCommands(commands.Cog):
 
     def _cleanup_mission(self, mission_id: str):
         """Clean up completed mission"""
-        if mission_id in self.active_missions:
-            mission = self.active_missions[mission_id]
-            
-            # Remove from player missions
-            for user_id, mid in list(self.player_missions.items()):
-                if mid == mission_id:
-                    del self.player_missions[user_id]
-            
-            # Remove from active missions
-            del self.active_missions[mission_id]
+        updates = self._message_updates()
+        if updates is not None:
+            updates.forget(("mission", mission_id))
+        entry = self.battle_registry.release(mission_id)
+        for user_id in entry.participants if entry else ():
+            if self.player_missions.get(user_id) == mission_id:
+                del self.player_missions[user_id]
+        self.active_missions.pop(mission_id, None)
 
     @app_commands.command(name="mission_status", description="Check current mission status and resume interactive battle")
     async def mission_status(self, interaction: discord.Interaction):
@@ -1047,7 +1032,7 @@ class MissionCommands(commands.Cog):
             user_id = str(ctx.author.id)
             
             # Check if user already has an active mission
-            if user_id in self.player_missions:
+            if self.battle_registry.in_battle(user_id, "mission"):
                 await ctx.send("❌ You already have an active mission! Use `/mission_status` to resume it.")
                 return
             
@@ -1060,7 +1045,7 @@ class MissionCommands(commands.Cog):
             # Create test mission
             mission = ShinobiOSMission(
                 engine=self.engine,
-                id=str(random.randint(10000, 99999)),
+                id=new_battle_id("mission"),
                 title="🧪 TEST MISSION: Forest Combat Training",
                 description="An interactive test mission in the forest environment",
                 difficulty="C",
@@ -1080,8 +1065,7 @@ class MissionCommands(commands.Cog):
             mission.initialize_battle(players, "forest")
             
             # Store mission
-            self.active_missions[mission.id] = mission
-            self.player_missions[user_id] = mission.id
+            self._track_mission(user_id, mission)
             
             # Create opening embed
             embed = discord.Embed(
@@ -1121,5 +1105,64 @@ class MissionCommands(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error creating test mission: {str(e)}")
 
+    @commands.command(name="balance_sweep")
+    @commands.has_permissions(administrator=True)
+    async def balance_sweep(self, ctx: commands.Context, level: int = 10, battles: int = 10000):
+        """Simulate a level against every mission difficulty in worker processes (admin only)."""
+        service = getattr(getattr(self.bot, "services", None), "simulation_service", None)
+        if service is None:
+            await ctx.send("❌ Simulation service is not available.")
+            return
+        if self.sweep_job is not None and not self.sweep_job.done:
+            await ctx.send("❌ A sweep is already running. Use `!cancel_sweep` to stop it.")
+            return
+        battles = max(1, min(battles, 1_000_000))  # the embed reports what was actually simulated
+        try:
+            specs = scenario_sweep_specs([level], battles=battles)
+            status = await ctx.send(f"🧪 Running balance sweep for level {level}... 0%")
+            last_reported = [0]
+
+            def report(done: int, total: int) -> None:
+                percent = done * 100 // total
+                if percent - last_reported[0] >= 25 or done == total:
+                    last_reported[0] = percent
+                    asyncio.get_running_loop().create_task(
+                        status.edit(content=f"🧪 Running balance sweep for level {level}... {percent}%")
+                    )
+
+            self.sweep_job = service.start_sweep(specs, progress=report)
+            results = await self.sweep_job.wait()
+        except asyncio.CancelledError:
+            await ctx.send("🛑 Balance sweep cancelled.")
+            return
+        except Exception as e:
+            await ctx.send(f"❌ Error running balance sweep: {str(e)}")
+            return
+
+        embed = discord.Embed(
+            title=f"📊 Balance Sweep: Level {level}",
+            description=f"{battles:,} simulated battles per mission rank",
+            color=discord.Color.blue()
+        )
+        for label, totals in results.items():
+            embed.add_field(
+                name=label,
+                value=(f"Win rate: **{totals.win_rate:.1%}**\n"
+                       f"Avg rounds: {totals.average_rounds:.1f}\n"
+                       f"Avg damage: {totals.damage_dealt / max(1, totals.battles):.0f}"),
+                inline=True
+            )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="cancel_sweep")
+    @commands.has_permissions(administrator=True)
+    async def cancel_sweep(self, ctx: commands.Context):
+        """Cancel the running balance sweep (admin only)."""
+        if self.sweep_job is None or self.sweep_job.done:
+            await ctx.send("No balance sweep is running.")
+            return
+        self.sweep_job.cancel()
+        await ctx.send("🛑 Cancelling balance sweep...")
+
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(MissionCommands(bot))
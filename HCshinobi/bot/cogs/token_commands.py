@@ -3,6 +3,7 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional
 
+from ...core.cooldowns import DAILY, CooldownScope, CooldownStore, format_remaining
 from ...utils.embeds import create_error_embed
 
 
@@ -11,6 +12,12 @@ class TokenCommands(commands.Cog):
     
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        self._local_cooldowns = CooldownStore()
+
+    def _earn_cooldowns(self) -> CooldownScope:
+        """``/earn_tokens`` claims in the shared (persisted) store, or a cog-local one without services."""
+        store = getattr(getattr(self.bot, "services", None), "cooldowns", None)
+        return (store if isinstance(store, CooldownStore) else self._local_cooldowns).scope("tokens")
 
     @app_commands.command(name="tokens", description="Check your current token balance")
     async def tokens(self, interaction: discord.Interaction, user: Optional[discord.User] = None) -> None:
@@ -62,10 +69,19 @@ class TokenCommands(commands.Cog):
                 )
                 return
             
-            # Simple daily token reward (could be enhanced with cooldown tracking)
+            # Simple daily token reward, once per 24 hours
+            cooldowns = self._earn_cooldowns()
+            remaining = cooldowns.remaining(interaction.user.id)
+            if remaining:
+                await interaction.response.send_message(
+                    embed=create_error_embed(f"You already earned your tokens today. Come back in {format_remaining(remaining)}."),
+                    ephemeral=True
+                )
+                return
             daily_tokens = 5
             token_system = self.bot.services.token_system
             token_system.add_tokens(interaction.user.id, daily_tokens)
+            cooldowns.start(interaction.user.id, DAILY)
             
             new_balance = token_system.get_player_tokens(interaction.user.id)
             
@@ -8,18 +8,60 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+from dataclasses import dataclass
 import random
 import os
 
-def roll_d20(modifier=0):
-    roll = random.randint(1, 20)
-    total = roll + modifier
-    crit = None
-    if roll == 20:
-        crit = 'success'
-    elif roll == 1:
-        crit = 'failure'
-    return {'roll': roll, 'modifier': modifier, 'total': total, 'crit': crit}
+from ...core.battle.engine import Attack, D20Damage, Hit, TurnEngine, TurnState, roll_d20
+from ...core.battle.registry import registry_for
+from ...core.cooldowns import cooldowns_for, format_remaining
+from ...core.npc_registry import npc_registry_for
+from ...core.stats import effective_stats
+from ...utils.message_updates import publish_frame
+
+
+@dataclass
+class SavingThrowDamage(D20Damage):
+    """Solomon's jutsu: a d20 to hit, then the player's saving throw when the jutsu allows one."""
+    icon: str = "🔥"
+    miss_text: str = "Misses!"
+    label: str = "Solomon"
+
+    def roll(self, rng, attacker, target, attack):
+        result = roll_d20(attack.modifier, rng)
+        if result['crit'] == 'failure' or result['total'] < attack.armor_class:
+            return Hit(missed=True, crit=result['crit'], roll=result)
+        hit = Hit(crit=result['crit'], roll=result)
+        jutsu_info = attack.payload or {}
+        save_dc = jutsu_info.get("save_dc")
+        save_type = jutsu_info.get("save_type")
+        if save_dc and save_type:
+            # Prompt player for saving throw (auto-roll for now)
+            player_mod = target.stat(save_type.lower(), 0) // 2 - 5
+            save_result = roll_d20(player_mod, rng)
+            save_log = f"🛡️ **Saving Throw:** {save_type.upper()} (Roll: {save_result['roll']} + {save_result['modifier']} = {save_result['total']} vs DC {save_dc})"
+            if save_result['crit'] == 'success':
+                save_log += " — **CRITICAL SUCCESS!**"
+            elif save_result['crit'] == 'failure':
+                save_log += " — **CRITICAL FAILURE!**"
+            if save_result['total'] >= save_dc and save_result['crit'] != 'failure':
+                hit.notes.append(save_log + " — Success!")
+                hit.detail = "saved"
+                return hit
+            hit.notes.append(save_log)
+        hit.damage = self._vary(rng, attack)
+        if result['crit'] == 'success':
+            hit.damage *= 2
+        return hit
+
+    def describe(self, attacker, target, attack, hit):
+        if hit.detail == "saved":
+            return self.headline(attacker, attack, hit) + " — Player saves!"
+        return super().describe(attacker, target, attack, hit)
+
+
+PLAYER_D20_DAMAGE = D20Damage(miss_text="Misses!")
+SOLOMON_D20_DAMAGE = SavingThrowDamage()
 
 # In attack and defense logic, use roll_d20 and display results in embeds/logs.
 # For player saving throws, prompt the player with a Discord button to roll (or auto-roll for them), then show the result.
@@ -245,15 +287,34 @@ class UpdatedBossCommands(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        self.turn_engine = TurnEngine()
         self.boss_data_path = "data/characters/solomon.json"
         self.jutsu_data_path = "data/jutsu/solomon_jutsu.json"
-        self.active_boss_battles: Dict[str, Dict[str, Any]] = {}
-        
+        self.active_boss_battles = registry_for(getattr(bot, "services", None)).user_battles("boss")
+        self.npcs = npc_registry_for(getattr(bot, "services", None))
+        self.boss_cooldowns = cooldowns_for(getattr(bot, "services", None)).scope("boss")
+
+    def solomon_cooldown_embed(self, user_id) -> Optional[discord.Embed]:
+        """Embed telling ``user_id`` how long Solomon is still recovering, or None when they may challenge."""
+        remaining = self.boss_cooldowns.remaining(user_id)
+        if not remaining:
+            return None
+        return discord.Embed(
+            title="⏳ **SOLOMON IS RECOVERING** ⏳",
+            description=f"**Solomon:** *'Return when the flames have settled.'*\n\n"
+                       f"You can challenge Solomon again in **{format_remaining(remaining)}**.",
+            color=0xFF6600
+        )
+
+    def start_solomon_cooldown(self, user_id) -> None:
+        """Start the post-battle cooldown, shared with :class:`BossBattleSystem`."""
+        cooldown_hours = self.load_boss_data().get("boss_requirements", {}).get("cooldown_hours", 168)
+        self.boss_cooldowns.start(user_id, timedelta(hours=cooldown_hours))
+
     def load_boss_data(self) -> Dict[str, Any]:
-        """Load Solomon's updated boss data."""
+        """Load Solomon's updated boss data (cached until the file changes)."""
         try:
-            with open(self.boss_data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.npcs.read(self.boss_data_path)
         except FileNotFoundError:
             return {
                 "id": "solomon",
@@ -273,10 +334,9 @@ class UpdatedBossCommands(commands.Cog):
             }
     
     def load_jutsu_data(self) -> Dict[str, Any]:
-        """Load Solomon's jutsu data."""
+        """Load Solomon's jutsu data (cached until the file changes)."""
         try:
-            with open(self.jutsu_data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.npcs.read(self.jutsu_data_path)
         except FileNotFoundError:
             return {"solomon_jutsu": {}}
     
@@ -426,7 +486,7 @@ class UpdatedBossCommands(commands.Cog):
         
         # Check if already in battle
         user_id = str(interaction.user.id)
-        if user_id in self.active_boss_battles:
+        if self.active_boss_battles.busy(user_id):
             embed = discord.Embed(
                 title="❌ **ALREADY IN BATTLE** ❌",
                 description="You are already in a battle with Solomon!",
@@ -435,6 +495,12 @@ class UpdatedBossCommands(commands.Cog):
             await interaction.followup.send(embed=embed)
             return
         
+        # Cooldown check
+        embed = self.solomon_cooldown_embed(user_id)
+        if embed is not None:
+            await interaction.followup.send(embed=embed)
+            return
+        
         # Initialize battle with updated stats
         boss_stats = {
             "id": boss_data.get("id", "solomon"),
@@ -468,6 +534,12 @@ class UpdatedBossCommands(commands.Cog):
         view = UpdatedSolomonBattleView(self, battle_data)
         
         await interaction.followup.send(embed=embed, view=view)
+        self._broadcast(battle_data, embed)
+    
+    def _broadcast(self, battle_data: Dict[str, Any], embed: discord.Embed, final: bool = False):
+        """Mirror the fight to /spectate watchers; the player's own messages are sent as before."""
+        if "battle_id" in battle_data:
+            publish_frame(getattr(self.bot, "services", None), ("boss", battle_data["battle_id"]), embed, final)
     
     def create_updated_battle_embed(self, battle_data: Dict[str, Any]) -> discord.Embed:
         """Create an updated battle embed."""
@@ -530,34 +602,20 @@ class UpdatedBossCommands(commands.Cog):
             await interaction.followup.send(f"❌ You don't know the jutsu **{jutsu_name}**!", ephemeral=True)
             return
         
-        # Determine attack stat (default DEX, can be customized per jutsu)
-        stat_mod = character.get("dexterity", 0) // 2 - 5  # DEX mod
-        ac = boss.get("ac", 15)
-        attack_result = roll_d20(stat_mod)
-        log = f"⚔️ **{character['name']}** uses **{jutsu_name}**! (Roll: {attack_result['roll']} + {attack_result['modifier']} = {attack_result['total']} vs AC {ac})"
-        
-        # Crit/fail logic
-        if attack_result['crit'] == 'success':
-            log += " — **CRITICAL HIT!**"
-        elif attack_result['crit'] == 'failure':
-            log += " — **CRITICAL FAILURE!**"
-        
-        # Hit/miss logic
-        if attack_result['crit'] == 'failure' or attack_result['total'] < ac:
-            log += " — Misses!"
-            battle_data["battle_log"].append(log)
-        else:
-            # Calculate damage (crit = double damage)
-            base_damage = 20 + (character.get("ninjutsu", 0) // 5)
-            damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-            if attack_result['crit'] == 'success':
-                damage *= 2
-            boss["hp"] = max(0, boss["hp"] - damage)
-            log += f" — **Hits for {damage} damage!**"
-            battle_data["battle_log"].append(log)
+        # Determine attack stat (default DEX, can be customized per jutsu); crit = double damage
+        stats = effective_stats(getattr(self.bot, "services", None), character.get("id"))
+        ninjutsu = stats.ninjutsu if stats is not None else character.get("ninjutsu", 0)
+        attack = Attack(
+            jutsu_name,
+            base=20 + (ninjutsu // 5),
+            modifier=character.get("dexterity", 0) // 2 - 5,  # DEX mod
+            armor_class=boss.get("ac", 15),
+        )
+        state = TurnState.of(character, boss, log=battle_data["battle_log"])
+        self.turn_engine.attack(state, 0, attack, PLAYER_D20_DAMAGE)
         
         # Check if boss is defeated
-        if boss["hp"] <= 0:
+        if state.winner is not None:
             await self.handle_updated_victory(interaction, battle_data)
             return
         
@@ -581,6 +639,7 @@ class UpdatedBossCommands(commands.Cog):
         view = UpdatedSolomonBattleView(self, battle_data)
         
         await interaction.followup.send(embed=embed, view=view)
+        self._broadcast(battle_data, embed)
 
     async def process_updated_boss_turn(self, interaction, battle_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process Solomon's turn with d20 mechanics."""
@@ -598,62 +657,20 @@ class UpdatedBossCommands(commands.Cog):
                 battle_data = self.activate_transformation(battle_data, transform_mode)
         
         # Get boss jutsu based on current phase and transformations
+        state = TurnState.of(character, boss, log=battle_data["battle_log"], active=1)
         jutsu_pool = current_phase.get("jutsu_pool", ["Fire Release: Great Fireball Jutsu"])
-        jutsu_name = random.choice(jutsu_pool)
-        
-        # Boss attack roll (default DEX, can be customized per jutsu)
-        boss_stat_mod = boss.get("dexterity", 0) // 2 - 5
-        player_ac = character.get("ac", 15)
-        attack_result = roll_d20(boss_stat_mod)
-        log = f"🔥 **Solomon** uses **{jutsu_name}**! (Roll: {attack_result['roll']} + {attack_result['modifier']} = {attack_result['total']} vs AC {player_ac})"
-        
-        # Crit/fail logic
-        if attack_result['crit'] == 'success':
-            log += " — **CRITICAL HIT!**"
-        elif attack_result['crit'] == 'failure':
-            log += " — **CRITICAL FAILURE!**"
-        
-        # Hit/miss logic
-        if attack_result['crit'] == 'failure' or attack_result['total'] < player_ac:
-            log += " — Misses!"
-            battle_data["battle_log"].append(log)
-        else:
-            # Check if jutsu requires a saving throw
-            jutsu_data = self.load_jutsu_data().get("solomon_jutsu", {})
-            jutsu_info = jutsu_data.get(jutsu_name.replace(" ", "_"), {})
-            save_dc = jutsu_info.get("save_dc")
-            save_type = jutsu_info.get("save_type")
-            if save_dc and save_type:
-                # Prompt player for saving throw (auto-roll for now)
-                player_mod = character.get(save_type.lower(), 0) // 2 - 5
-                save_result = roll_d20(player_mod)
-                save_log = f"🛡️ **Saving Throw:** {save_type.upper()} (Roll: {save_result['roll']} + {save_result['modifier']} = {save_result['total']} vs DC {save_dc})"
-                if save_result['crit'] == 'success':
-                    save_log += " — **CRITICAL SUCCESS!**"
-                elif save_result['crit'] == 'failure':
-                    save_log += " — **CRITICAL FAILURE!**"
-                if save_result['total'] >= save_dc and save_result['crit'] != 'failure':
-                    save_log += " — Success!"
-                    log += " — Player saves!"
-                else:
-                    # Full damage
-                    base_damage = jutsu_info.get("damage", 50)
-                    damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-                    if attack_result['crit'] == 'success':
-                        damage *= 2
-                    character["hp"] = max(0, character["hp"] - damage)
-                    log += f" — **Hits for {damage} damage!**"
-                battle_data["battle_log"].append(log)
-                battle_data["battle_log"].append(save_log)
-            else:
-                # No save, just damage
-                base_damage = jutsu_info.get("damage", 50)
-                damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-                if attack_result['crit'] == 'success':
-                    damage *= 2
-                character["hp"] = max(0, character["hp"] - damage)
-                log += f" — **Hits for {damage} damage!**"
-                battle_data["battle_log"].append(log)
+        jutsu_name = self.turn_engine.choose_jutsu(state, jutsu_pool)
+        
+        # Boss attack roll (default DEX, can be customized per jutsu), then the player's save if the jutsu has one
+        jutsu_info = self.load_jutsu_data().get("solomon_jutsu", {}).get(jutsu_name.replace(" ", "_"), {})
+        attack = Attack(
+            jutsu_name,
+            base=jutsu_info.get("damage", 50),
+            modifier=boss.get("dexterity", 0) // 2 - 5,
+            armor_class=character.get("ac", 15),
+            payload=jutsu_info,
+        )
+        self.turn_engine.attack(state, 1, attack, SOLOMON_D20_DAMAGE)
         
         # Phase transition check
         new_phase = self.get_updated_phase(boss["hp"] / boss["max_hp"])
@@ -665,14 +682,7 @@ class UpdatedBossCommands(commands.Cog):
     
     def get_updated_phase(self, hp_percentage: float) -> Dict[str, Any]:
         """Get the current battle phase based on HP percentage."""
-        boss_data = self.load_boss_data()
-        phases = boss_data.get("boss_phases", [])
-        
-        for phase in phases:
-            if hp_percentage >= phase.get("hp_threshold", 1.0):
-                return phase
-        
-        return phases[-1] if phases else {}
+        return self.npcs.phases(self.load_boss_data()).at(hp_percentage)
     
     def get_phase_index(self, phase: Dict[str, Any]) -> int:
         """Get the index of a phase."""
@@ -815,6 +825,7 @@ class UpdatedBossCommands(commands.Cog):
         view = UpdatedSolomonBattleView(self, battle_data)
         
         await interaction.followup.send(embed=embed, view=view)
+        self._broadcast(battle_data, embed)
     
     async def handle_updated_victory(self, interaction: discord.Interaction, battle_data: Dict[str, Any]):
         """Handle victory in updated battle."""
@@ -847,6 +858,7 @@ class UpdatedBossCommands(commands.Cog):
         # Remove from active battles
         user_id = str(interaction.user.id)
         self.active_boss_battles.pop(user_id, None)
+        self.start_solomon_cooldown(user_id)
         
         from HCshinobi.core.battle_log_templates import ModernBattleLogger
         
@@ -877,6 +889,7 @@ class UpdatedBossCommands(commands.Cog):
         embed.set_footer(text="You have become a legend!")
         
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
     
     async def handle_updated_defeat(self, interaction: discord.Interaction, battle_data: Dict[str, Any]):
         """Handle defeat in updated battle."""
@@ -885,6 +898,7 @@ class UpdatedBossCommands(commands.Cog):
         # Remove from active battles
         user_id = str(interaction.user.id)
         self.active_boss_battles.pop(user_id, None)
+        self.start_solomon_cooldown(user_id)
         
         # Create defeat embed
         embed = discord.Embed(
@@ -895,9 +909,10 @@ class UpdatedBossCommands(commands.Cog):
             color=0xFF0000
         )
         
-        embed.set_footer(text="You can challenge Solomon again in 7 days.")
+        embed.set_footer(text=f"You can challenge Solomon again in {format_remaining(self.boss_cooldowns.remaining(user_id))}.")
         
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
     
     async def show_updated_battle_status(self, interaction: discord.Interaction, character_data: Dict[str, Any]):
         """Show updated battle status."""
@@ -914,7 +929,7 @@ class UpdatedBossCommands(commands.Cog):
         """Flee from updated battle."""
         user_id = str(interaction.user.id)
         if user_id in self.active_boss_battles:
-            self.active_boss_battles.pop(user_id, None)
+            battle_data = self.active_boss_battles.pop(user_id)
             embed = discord.Embed(
                 title="🏃 **FLED FROM BATTLE** 🏃",
                 description="**You have fled from Solomon's wrath...**\n\n"
@@ -922,6 +937,7 @@ class UpdatedBossCommands(commands.Cog):
                 color=0xFF6600
             )
             await interaction.followup.send(embed=embed)
+            self._broadcast(battle_data, embed, final=True)
         else:
             await interaction.followup.send("❌ You are not in a boss battle!")
     
@@ -938,6 +954,7 @@ class UpdatedBossCommands(commands.Cog):
         )
         
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
 
 async def setup(bot):
     """Setup function for the updated boss commands cog."""
@@ -11,3 +11,4 @@ class BotConfig:
     token: str | None = None
     data_dir: str = "data"
     database_url: str | None = None
+    mission_endpoint: str | None = None  # text-generation endpoint for generated missions
@@ -1,3 +1,4 @@
+import os
 from typing import Optional
 from .config import BotConfig
 from ..core.character_system import CharacterSystem
@@ -7,8 +8,24 @@ from ..core.training_system import TrainingSystem
 from ..core.clan_assignment_engine import ClanAssignmentEngine
 from ..core.progression_engine import ShinobiProgressionEngine
 from ..core.clan_data import ClanData
+from ..core.cooldowns import CooldownStore
+from ..core.battle.analytics import BattleAnalytics
+from ..core.battle.lifecycle import BattleLifecycle
 from ..core.battle.persistence import BattlePersistence
+from ..core.battle.registry import BattleRegistry
+from ..core.battle.replay import ReplayStore
+from ..core.battle.tournament import TournamentEngine
 from ..core.unified_jutsu_system import UnifiedJutsuSystem
+from ..core.events import EventBus
+from ..core.achievements import AchievementEngine
+from ..core.matchmaking import MatchmakingQueue
+from ..core.npc_registry import NpcRegistry
+from ..core.stats import EffectiveStatsService
+from ..core.jutsu_mastery import JutsuMasteryTracker
+from ..core.missions.simulation_pool import SimulationService
+from ..core.scheduler import DeadlineScheduler
+from ..utils.message_updates import MessageUpdateQueue
+from ..utils.outbound import OutboundScheduler
 
 class ServiceContainer:
     def __init__(self, config_or_dir: Optional[BotConfig | str] = None, data_dir: Optional[str] = None):
@@ -19,31 +36,84 @@ class ServiceContainer:
             self.config = None
             self.data_dir = config_or_dir or data_dir or "data"
 
+        self.event_bus = EventBus()
+        self.scheduler = DeadlineScheduler()
+        self.cooldowns = CooldownStore(self.data_dir)
         self.character_system = CharacterSystem()
-        self.currency_system = CurrencySystem()
+        self.currency_system = CurrencySystem(event_bus=self.event_bus)
         self.token_system = TokenSystem()
         self.jutsu_system = UnifiedJutsuSystem()
         self.training_system = TrainingSystem(
             currency_system=self.currency_system,
             character_system=self.character_system,
+            event_bus=self.event_bus,
+            cooldowns=self.cooldowns,
         )
         self.clan_assignment_engine = ClanAssignmentEngine()
         self.progression_engine = ShinobiProgressionEngine(
             character_system=self.character_system,
-            jutsu_system=self.jutsu_system
+            jutsu_system=self.jutsu_system,
+            event_bus=self.event_bus,
         )
+        self.stats_service = EffectiveStatsService(self.data_dir)
+        self.character_system.add_save_listener(self.stats_service.invalidate)
+        self.jutsu_mastery = JutsuMasteryTracker(self.character_system)
+        self.achievement_engine = AchievementEngine(
+            character_system=self.character_system,
+        )
+        self.achievement_engine.attach(self.event_bus)
         self.clan_data = ClanData(self.data_dir)
         self.battle_persistence = BattlePersistence(self.data_dir)
+        self.battle_registry = BattleRegistry()
+        self.npc_registry = NpcRegistry(os.path.join(self.data_dir, "characters"))
+        self.matchmaking = MatchmakingQueue(self.character_system, event_bus=self.event_bus)
+        self.replay_store = ReplayStore(self.data_dir)
+        self.outbound = OutboundScheduler()
+        self.message_updates = MessageUpdateQueue(outbound=self.outbound)
+        # Tournament matches keep their own battle files so restored PvP battles never mix with them.
+        self.tournaments = TournamentEngine(
+            BattleLifecycle(
+                self.character_system,
+                BattlePersistence(os.path.join(self.data_dir, "tournaments")),
+                self.progression_engine,
+                battle_timeout=TournamentEngine.MATCH_WINDOW,
+                scheduler=self.scheduler,
+                outbound=self.outbound,
+            ),
+            replay_store=self.replay_store,
+            data_dir=os.path.join(self.data_dir, "tournaments"),
+        )
+        self.tournaments.attach(self.event_bus)
+        self.battle_analytics = BattleAnalytics(self.data_dir)
+        self.battle_analytics.attach(self.event_bus)
+        self.simulation_service = SimulationService()
         self.jutsu_shop_system = None
         self.equipment_shop_system = None
         self.ollama_client = None
         self._initialized = False
 
     async def initialize(self, bot=None):
+        self.scheduler.start()
+        self.matchmaking.start()
+        if bot is not None:
+            self.outbound.client = bot
+            self.tournaments.lifecycle.bot = bot
         self._initialized = True
 
     async def run_ready_hooks(self):
         pass
 
     async def shutdown(self):
-        pass
+        await self.matchmaking.stop()
+        await self.jutsu_mastery.flush()
+        await self.battle_persistence.save_active_battles()
+        await self.battle_persistence.save_battle_history()
+        self.tournaments.save()
+        await self.tournaments.lifecycle.shutdown()
+        await self.message_updates.flush()
+        await self.outbound.close()
+        await self.simulation_service.shutdown()
+        await self.scheduler.stop()
+        self.cooldowns.compact()
+        await self.event_bus.close()
+        self.battle_analytics.flush()
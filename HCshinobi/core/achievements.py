@@ -0,0 +1,274 @@
+"""
+Achievement Engine for HCShinobi
+Computes achievements from progression and battle events using declarative rules.
+
+Rules are written as short conditions such as ``"wins >= 50"`` or
+``"defeated Solomon"``.  Each rule is indexed by the progress field it reads,
+and each event type only updates a fixed set of fields, so handling an event
+touches just the thresholds that field can cross (a bisect over the sorted
+thresholds) rather than every rule that exists.  Only the thresholds crossed
+between the old and new value are checked, so rules already passed are not
+walked again.
+
+Wins, losses, level and jutsu are seeded from the character.  Training
+sessions and boss defeats are only counted here, so they are saved onto the
+character as they change.  Cached progress is therefore a bounded LRU that
+can always be reseeded after a restart or eviction.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .events import (
+    AchievementUnlockedEvent,
+    BattleEndedEvent,
+    CurrencyChangedEvent,
+    EventBus,
+    GameEvent,
+    JutsuUnlockedEvent,
+    LevelUpEvent,
+    TrainingCompletedEvent,
+    publish_event,
+)
+
+logger = logging.getLogger(__name__)
+
+_THRESHOLD_RE = re.compile(r"^\s*(\w+)\s*>=\s*(\d+)\s*$")
+_DEFEATED_RE = re.compile(r"^\s*defeated\s+(.+?)\s*$", re.IGNORECASE)
+
+# Progress fields each event type can change. Rules are only evaluated for these.
+EVENT_FIELDS: Dict[type, Tuple[str, ...]] = {
+    BattleEndedEvent: ("wins", "losses", "bosses_defeated", "defeated"),
+    LevelUpEvent: ("level",),
+    CurrencyChangedEvent: ("balance",),
+    TrainingCompletedEvent: ("training_sessions",),
+    JutsuUnlockedEvent: ("jutsu_unlocked",),
+}
+
+
+@dataclass
+class AchievementRule:
+    """A single declarative achievement."""
+    name: str
+    condition: str
+    description: str = ""
+    category: str = "General"
+    field: str = ""
+    threshold: int = 0
+    target: str = ""
+
+    def __post_init__(self):
+        match = _THRESHOLD_RE.match(self.condition)
+        if match:
+            self.field, self.threshold = match.group(1), int(match.group(2))
+            return
+        match = _DEFEATED_RE.match(self.condition)
+        if match:
+            self.field, self.target = "defeated", match.group(1).lower()
+            return
+        raise ValueError(f"Unsupported achievement condition: {self.condition!r}")
+
+
+@dataclass
+class PlayerProgress:
+    """Counters the rules are evaluated against."""
+    counters: Dict[str, int] = field(default_factory=dict)
+    defeated: Set[str] = field(default_factory=set)
+    unlocked: Set[str] = field(default_factory=set)
+
+
+DEFAULT_RULES: List[AchievementRule] = [
+    AchievementRule("First Battle", "wins >= 1", "Win your first fight", "Combat"),
+    AchievementRule("Battle Hardened", "wins >= 50", "Win 50 battles", "Combat"),
+    AchievementRule("Boss Slayer", "bosses_defeated >= 1", "Defeat your first boss", "Combat"),
+    AchievementRule("Solomon's Equal", "defeated Solomon", "Defeat Solomon", "Combat"),
+    AchievementRule("Dedicated Student", "training_sessions >= 10", "Complete 10 training sessions", "Training"),
+    AchievementRule("Master Trainer", "training_sessions >= 100", "Complete 100 training sessions", "Training"),
+    AchievementRule("Master of Elements", "jutsu_unlocked >= 15", "Unlock 15 jutsu", "Training"),
+    AchievementRule("Rising Shinobi", "level >= 10", "Reach level 10", "Progression"),
+    AchievementRule("Veteran Shinobi", "level >= 25", "Reach level 25", "Progression"),
+    AchievementRule("Wealthy Ninja", "balance >= 100000", "Accumulate 100,000 ryo", "Economic"),
+]
+
+
+class AchievementEngine:
+    """Evaluates indexed achievement rules as events arrive."""
+
+    # Players whose progress stays cached. Only bounded with a character system to reseed from.
+    PROGRESS_CACHE_SIZE = 1024
+
+    def __init__(self, character_system=None, event_bus: Optional[EventBus] = None,
+                 rules: Optional[List[AchievementRule]] = None):
+        self.character_system = character_system
+        self.event_bus = event_bus
+        self.rules: Dict[str, AchievementRule] = {}
+        # field -> (sorted thresholds, rules in the same order)
+        self._threshold_index: Dict[str, Tuple[List[int], List[AchievementRule]]] = {}
+        # defeated target -> rules
+        self._defeat_index: Dict[str, List[AchievementRule]] = {}
+        self.progress: "OrderedDict[str, PlayerProgress]" = OrderedDict()
+        self._subscription = None
+        for rule in rules if rules is not None else DEFAULT_RULES:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: AchievementRule) -> None:
+        """Register a rule and place it in the field index."""
+        self.rules[rule.name] = rule
+        if rule.field == "defeated":
+            self._defeat_index.setdefault(rule.target, []).append(rule)
+            return
+        thresholds, rules = self._threshold_index.setdefault(rule.field, ([], []))
+        pos = bisect.bisect_right(thresholds, rule.threshold)
+        thresholds.insert(pos, rule.threshold)
+        rules.insert(pos, rule)
+
+    def attach(self, event_bus: EventBus) -> None:
+        """Subscribe to the events that can unlock achievements."""
+        self.event_bus = event_bus
+        self._subscription = event_bus.subscribe(
+            self.handle_event, *EVENT_FIELDS.keys(), name="achievements"
+        )
+
+    async def _get_progress(self, user_id: str) -> PlayerProgress:
+        progress = self.progress.get(user_id)
+        if progress is not None:
+            self.progress.move_to_end(user_id)
+            return progress
+        progress = PlayerProgress()
+        if self.character_system:
+            character = await self.character_system.get_character(user_id)
+            if character:
+                progress.counters["wins"] = character.wins
+                progress.counters["losses"] = character.losses
+                progress.counters["level"] = character.level
+                progress.counters["jutsu_unlocked"] = len(character.jutsu)
+                progress.counters["training_sessions"] = character.training_sessions
+                progress.counters["bosses_defeated"] = character.bosses_defeated
+                progress.defeated.update(character.defeated_bosses)
+                progress.unlocked.update(character.achievements)
+        self.progress[user_id] = progress
+        if self.character_system and len(self.progress) > self.PROGRESS_CACHE_SIZE:
+            self.progress.popitem(last=False)
+        return progress
+
+    async def _load(self, user_id: str) -> Tuple[PlayerProgress, Optional[Dict[str, int]], Set[str]]:
+        """The player's progress, plus the counters and defeats it had before this event.
+
+        A freshly seeded record has no "before" (None), so its first evaluation
+        catches up on every threshold the stored counters already pass.
+        """
+        if user_id in self.progress:
+            progress = await self._get_progress(user_id)
+            return progress, dict(progress.counters), set(progress.defeated)
+        return await self._get_progress(user_id), None, set()
+
+    async def handle_event(self, event: GameEvent) -> List[str]:
+        """Apply an event to the affected players and return newly unlocked achievements."""
+        unlocked: List[str] = []
+        if isinstance(event, BattleEndedEvent):
+            if event.user_id:
+                winner, before, defeated = await self._load(event.user_id)
+                self._increment(winner, "wins")
+                if event.mode == "boss" and event.opponent:
+                    self._increment(winner, "bosses_defeated")
+                    winner.defeated.add(event.opponent.lower())
+                earned = self._evaluate(winner, EVENT_FIELDS[BattleEndedEvent], before, defeated)
+                unlocked += earned
+                await self._record(event.user_id, winner, earned)
+            if event.loser_id and event.mode != "boss":
+                loser, before, _ = await self._load(event.loser_id)
+                self._increment(loser, "losses")
+                earned = self._evaluate(loser, ("losses",), before)
+                unlocked += earned
+                await self._record(event.loser_id, loser, earned)
+            return unlocked
+
+        fields = EVENT_FIELDS.get(type(event))
+        if not fields:
+            return unlocked
+        progress, before, _ = await self._load(event.user_id)
+        if isinstance(event, LevelUpEvent):
+            progress.counters["level"] = event.new_level
+        elif isinstance(event, CurrencyChangedEvent):
+            progress.counters["balance"] = event.balance
+        elif isinstance(event, TrainingCompletedEvent):
+            self._increment(progress, "training_sessions")
+        elif isinstance(event, JutsuUnlockedEvent) and not (before is None and self.character_system):
+            # A freshly seeded record already counts the jutsu that triggered the event.
+            self._increment(progress, "jutsu_unlocked")
+        earned = self._evaluate(progress, fields, before)
+        if earned or isinstance(event, TrainingCompletedEvent):
+            await self._record(event.user_id, progress, earned)
+        return earned
+
+    @staticmethod
+    def _increment(progress: PlayerProgress, name: str) -> None:
+        progress.counters[name] = progress.counters.get(name, 0) + 1
+
+    def _evaluate(self, progress: PlayerProgress, fields, before: Optional[Dict[str, int]],
+                  defeated: Set[str] = frozenset()) -> List[str]:
+        """Rules whose threshold was crossed between ``before`` and now, or every passed one if None."""
+        earned: List[str] = []
+        for name in fields:
+            if name == "defeated":
+                targets = progress.defeated if before is None else progress.defeated - defeated
+                for target in targets:
+                    for rule in self._defeat_index.get(target, ()):
+                        if rule.name not in progress.unlocked:
+                            earned.append(rule.name)
+                continue
+            index = self._threshold_index.get(name)
+            if not index:
+                continue
+            thresholds, rules = index
+            low = 0 if before is None else bisect.bisect_right(thresholds, before.get(name, 0))
+            high = bisect.bisect_right(thresholds, progress.counters.get(name, 0))
+            for rule in rules[low:high]:
+                if rule.name not in progress.unlocked:
+                    earned.append(rule.name)
+        progress.unlocked.update(earned)
+        return earned
+
+    async def _record(self, user_id: str, progress: PlayerProgress, earned: List[str]) -> None:
+        """Save the counters only this engine keeps, plus any unlocks, to the character."""
+        if self.character_system:
+            try:
+                character = await self.character_system.get_character(user_id)
+                if character:
+                    character.wins = progress.counters.get("wins", 0)
+                    character.losses = progress.counters.get("losses", 0)
+                    character.training_sessions = progress.counters.get("training_sessions", 0)
+                    character.bosses_defeated = progress.counters.get("bosses_defeated", 0)
+                    character.defeated_bosses = sorted(progress.defeated)
+                    for achievement in earned:
+                        if achievement not in character.achievements:
+                            character.achievements.append(achievement)
+                    await self.character_system.save_character(character)
+            except Exception as e:
+                logger.warning(f"Could not save achievements for {user_id}: {e}")
+        for achievement in earned:
+            publish_event(self.event_bus, AchievementUnlockedEvent(user_id=user_id, achievement=achievement))
+
+    async def get_player_achievements(self, user_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Return every rule grouped by category with unlocked state and progress."""
+        progress = await self._get_progress(str(user_id))
+        categories: Dict[str, List[Dict[str, Any]]] = {}
+        for rule in self.rules.values():
+            if rule.field == "defeated":
+                current, goal = int(rule.target in progress.defeated), 1
+            else:
+                current, goal = progress.counters.get(rule.field, 0), rule.threshold
+            categories.setdefault(rule.category, []).append({
+                "name": rule.name,
+                "description": rule.description,
+                "unlocked": rule.name in progress.unlocked,
+                "current": min(current, goal),
+                "goal": goal,
+            })
+        return categories
@@ -0,0 +1,360 @@
+"""
+Enemy AI for HCShinobi
+Pluggable move policies for mission enemies and bosses, with a planner held to a per-decision time budget.
+
+A :class:`BattleModel` describes one kind of fight to a planner: who moves,
+which moves they have, and each move's outcomes with their probabilities.
+Those outcomes are a miss, a hit and a crit, using the accuracy and damage
+the game's own formulas give. Models precompute those numbers once, so a
+search step is a few tuple operations. States are plain tuples so results
+can be cached.
+
+:class:`ExpectimaxPolicy` searches the model with iterative deepening. Its
+own moves are maximised, the other side's are minimised, and chance nodes
+average over outcomes. It checks a deadline at every node. When time runs
+out it keeps the deepest search that finished. If not even one ply
+finished, it asks its fallback policy, a one-ply greedy pick by default.
+Evaluated positions go into an LRU cache, so repeated states cost nothing
+on later turns. Every policy records its decision latency. :meth:`EnemyPolicy.metrics`
+reports the latency percentiles and how often the fallback was needed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Outcome = Tuple[float, Hashable]  # (probability, next state)
+
+# ShinobiOSEngine.execute_action: a 5% crit roll, independent of the hit roll, for 1.5x damage
+CRIT_CHANCE = 0.05
+CRIT_MULTIPLIER = 1.5
+
+WIN = 2.0  # terminal scores sit outside the [-1, 1] range of ongoing fights
+
+_model_ids = itertools.count()
+
+
+class BattleModel:
+    """The rules a planner searches. States must be hashable; ``value`` scores one for ``side`` in ``[-WIN, WIN]``."""
+
+    signature: Hashable = None  # identifies the model's fixed data in the planner's cache
+
+    def side_of(self, state: Any) -> int:
+        raise NotImplementedError
+
+    def actions(self, state: Any) -> List[Any]:
+        raise NotImplementedError
+
+    def outcomes(self, state: Any, action: Any) -> List[Outcome]:
+        raise NotImplementedError
+
+    def value(self, state: Any, side: int) -> float:
+        raise NotImplementedError
+
+    def terminal(self, state: Any) -> bool:
+        raise NotImplementedError
+
+
+@dataclass
+class Decision:
+    action: Any
+    value: float = 0.0
+    depth: int = 0         # plies the chosen value looked ahead
+    elapsed: float = 0.0   # seconds spent deciding
+    fallback: bool = False
+
+
+class EnemyPolicy:
+    """Picks a move for the side to move in a model state and records how long it took."""
+
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self, rng: Optional[random.Random] = None, clock: Callable[[], float] = time.perf_counter):
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.decisions = 0
+        self.fallbacks = 0
+        self._latency: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def decide(self, model: BattleModel, state: Any) -> Decision:
+        start = self.clock()
+        decision = self._decide(model, state, start)
+        decision.elapsed = self.clock() - start
+        self.decisions += 1
+        self.fallbacks += decision.fallback
+        self._latency.append(decision.elapsed)
+        return decision
+
+    def _decide(self, model: BattleModel, state: Any, start: float) -> Decision:
+        raise NotImplementedError
+
+    def _pick(self, scored: List[Tuple[float, Any]]) -> Tuple[float, Any]:
+        """The best ``(value, action)``; ties are broken at random so enemies stay varied."""
+        top = max(value for value, _ in scored)
+        return self.rng.choice([item for item in scored if item[0] >= top - 1e-9])
+
+    def metrics(self) -> Dict[str, Any]:
+        """Decision count, fallback count and latency percentiles in milliseconds."""
+        samples = sorted(self._latency)
+
+        def percentile(q: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[max(0, math.ceil(q * len(samples)) - 1)] * 1000
+
+        return {
+            "decisions": self.decisions,
+            "fallbacks": self.fallbacks,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+            "latency_max_ms": samples[-1] * 1000 if samples else 0.0,
+        }
+
+
+class RandomPolicy(EnemyPolicy):
+    """Any legal move, uniformly: the old behaviour."""
+
+    def _decide(self, model, state, start):
+        return Decision(self.rng.choice(model.actions(state)))
+
+
+class GreedyPolicy(EnemyPolicy):
+    """The move with the best expected score one ply ahead; no search, so it never runs over."""
+
+    def _decide(self, model, state, start):
+        side = model.side_of(state)
+        scored = [(sum(p * model.value(nxt, side) for p, nxt in model.outcomes(state, action)), action)
+                  for action in model.actions(state)]
+        value, action = self._pick(scored)
+        return Decision(action, value, depth=1)
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class ExpectimaxPolicy(EnemyPolicy):
+    """Depth-limited expectiminimax with iterative deepening, a strict time budget and a position cache."""
+
+    def __init__(self, budget: float = 0.02, max_depth: int = 6, cache_size: int = 50_000,
+                 fallback: Optional[EnemyPolicy] = None, rng: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        super().__init__(rng, clock)
+        self.budget = budget
+        self.max_depth = max_depth
+        self.cache_size = cache_size
+        self.fallback = fallback or GreedyPolicy(rng=self.rng, clock=clock)
+        self._cache: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._deadline = 0.0
+        self.nodes = 0
+        self.cache_hits = 0
+
+    def _decide(self, model, state, start):
+        actions = model.actions(state)
+        if len(actions) == 1:
+            return Decision(actions[0])
+        self._deadline = start + self.budget
+        side = model.side_of(state)
+        best: Optional[Decision] = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                scored = []
+                for action in actions:
+                    if self.clock() > self._deadline:
+                        raise _OutOfTime()
+                    scored.append((self._chance(model, state, action, depth - 1, side), action))
+                value, action = self._pick(scored)
+                best = Decision(action, value, depth)
+                if abs(value) >= WIN:  # a forced result; looking deeper cannot change the move
+                    break
+        except _OutOfTime:
+            pass
+        if best is None:
+            best = self.fallback.decide(model, state)
+            best.fallback = True
+            logger.debug(f"Enemy AI ran out of its {self.budget * 1000:.0f}ms budget; used {type(self.fallback).__name__}")
+        return best
+
+    def _chance(self, model: BattleModel, state: Any, action: Any, depth: int, side: int) -> float:
+        return sum(p * self._search(model, nxt, depth, side) for p, nxt in model.outcomes(state, action))
+
+    def _search(self, model: BattleModel, state: Any, depth: int, side: int) -> float:
+        if depth == 0 or model.terminal(state):
+            return model.value(state, side)
+        key = (model.signature, state, depth, side)
+        cache = self._cache
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            self.cache_hits += 1
+            return value
+        if self.clock() > self._deadline:
+            raise _OutOfTime()
+        self.nodes += 1
+        values = [self._chance(model, state, action, depth - 1, side) for action in model.actions(state)]
+        value = max(values) if model.side_of(state) == side else min(values)
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+
+def _team_value(hp: Sequence[int], max_hp: Sequence[int], teams: Sequence[int], side: int) -> float:
+    own = opp = 0.0
+    own_n = opp_n = 0
+    own_alive = opp_alive = False
+    for health, maximum, team in zip(hp, max_hp, teams):
+        if team == side:
+            own += health / maximum
+            own_n += 1
+            own_alive = own_alive or health > 0
+        else:
+            opp += health / maximum
+            opp_n += 1
+            opp_alive = opp_alive or health > 0
+    if not opp_alive:
+        return WIN
+    if not own_alive:
+        return -WIN
+    return own / max(own_n, 1) - opp / max(opp_n, 1)
+
+
+class ShinobiOSModel(BattleModel):
+    """A ShinobiOS mission fight. State: ``(health, chakra, mover)``, where fighters act in list order.
+
+    Accuracy and damage come from :meth:`ShinobiOSEngine.calculate_accuracy` and
+    :meth:`~ShinobiOSEngine.calculate_damage`, after the target's defense the way
+    ``take_damage`` applies it. They are computed once per attacker, jutsu and target.
+    """
+
+    def __init__(self, engine: Any, environment: Any, fighters: Sequence[Any], teams: Sequence[int],
+                 jutsu: Sequence[Sequence[Any]]):
+        self.signature = ("shinobios", next(_model_ids))
+        self.fighters = list(fighters)
+        self.teams = tuple(teams)
+        self.jutsu = [list(options) for options in jutsu]
+        self.max_hp = tuple(max(1, f.max_health) for f in fighters)
+        self.max_chakra = tuple(f.max_chakra for f in fighters)
+        self.regen = int(5 * environment.chakra_modifier)
+        # per attacker: [(jutsu index, chakra cost, {target: (hit chance, damage, crit damage)})]
+        self._moves: List[List[Tuple[int, int, Dict[int, Tuple[float, int, int]]]]] = []
+        for a, attacker in enumerate(fighters):
+            moves = []
+            for j, technique in enumerate(self.jutsu[a]):
+                hits = {}
+                for t, target in enumerate(fighters):
+                    if self.teams[t] == self.teams[a]:
+                        continue
+                    accuracy = engine.calculate_accuracy(technique, attacker, target, environment) / 100
+                    damage = engine.calculate_damage(technique, attacker, target, environment)
+                    armor = target.defense // 10
+                    hits[t] = (accuracy, max(1, damage - armor), max(1, int(damage * CRIT_MULTIPLIER) - armor))
+                moves.append((j, technique.chakra_cost, hits))
+            self._moves.append(moves)
+
+    def snapshot(self, mover: int, active: Optional[Sequence[bool]] = None) -> Tuple:
+        """The live fighters' state with ``mover`` to act; inactive fighters count as down."""
+        active = active or [True] * len(self.fighters)
+        hp = tuple(f.health if alive else 0 for f, alive in zip(self.fighters, active))
+        return hp, tuple(f.chakra for f in self.fighters), mover
+
+    def _next(self, hp: Tuple[int, ...], mover: int) -> int:
+        count = len(hp)
+        for step in range(1, count + 1):
+            candidate = (mover + step) % count
+            if hp[candidate] > 0:
+                return candidate
+        return mover
+
+    def side_of(self, state):
+        return self.teams[state[2]]
+
+    def actions(self, state):
+        hp, chakra, mover = state
+        actions = [(j, t) for j, cost, hits in self._moves[mover] if cost <= chakra[mover]
+                   for t in hits if hp[t] > 0]
+        return actions or [None]
+
+    def outcomes(self, state, action):
+        hp, chakra, mover = state
+        spent = list(chakra)
+        if action is None:
+            spent[mover] = min(self.max_chakra[mover], chakra[mover] + self.regen)
+            spent = tuple(spent)
+            return [(1.0, (hp, spent, self._next(hp, mover)))]
+        j, t = action
+        _, cost, hits = self._moves[mover][j]
+        chance, damage, crit = hits[t]
+        spent[mover] = min(self.max_chakra[mover], chakra[mover] - cost + self.regen)
+        spent = tuple(spent)
+        results = [(1.0 - chance, (hp, spent, self._next(hp, mover)))]
+        for p, dealt in ((chance * (1 - CRIT_CHANCE), damage), (chance * CRIT_CHANCE, crit)):
+            after = hp[:t] + (max(0, hp[t] - dealt),) + hp[t + 1:]
+            results.append((p, (after, spent, self._next(after, mover))))
+        return results
+
+    def value(self, state, side):
+        return _team_value(state[0], self.max_hp, self.teams, side)
+
+    def terminal(self, state):
+        return abs(self.value(state, 0)) >= WIN
+
+
+class BossModel(BattleModel):
+    """A solo boss duel. State: ``(player_hp, boss_hp, boss_to_move)``; the boss is side 1.
+
+    The boss's moves are the jutsu pool of its phase at that HP, with damage
+    read from its compiled :class:`~HCshinobi.core.boss_tables.BossTable`. The
+    player's reply is ``strike`` at 80%, 100% or 120%, like ``VarianceDamage``.
+    The boss regenerates ``regen`` of its max HP after each counter, and dodge
+    jutsu deal nothing.
+    """
+
+    DODGES = ("Kamui Phase",)
+
+    def __init__(self, table: Any, boss_max_hp: int, player_max_hp: int, strike: int, regen: float = 0.02,
+                 default_pool: Sequence[str] = ("Basic Attack",)):
+        self.signature = ("boss", id(table), boss_max_hp, player_max_hp, strike, regen, tuple(default_pool))
+        self.table = table
+        self.boss_max_hp = max(1, boss_max_hp)
+        self.player_max_hp = max(1, player_max_hp)
+        self.strikes = tuple(int(strike * factor) for factor in (0.8, 1.0, 1.2))
+        self.regen = int(self.boss_max_hp * regen)
+        self.default_pool = list(default_pool)
+
+    def snapshot(self, player_hp: int, boss_hp: int) -> Tuple[int, int, bool]:
+        return player_hp, boss_hp, True
+
+    def side_of(self, state):
+        return 1 if state[2] else 0
+
+    def actions(self, state):
+        if not state[2]:
+            return [None]
+        phase = self.table.phase(state[1] / self.boss_max_hp)
+        return list(dict.fromkeys(phase.get("jutsu_pool") or self.default_pool))
+
+    def outcomes(self, state, action):
+        player_hp, boss_hp, boss_turn = state
+        if not boss_turn:
+            return [(1 / len(self.strikes), (player_hp, max(0, boss_hp - dealt), True)) for dealt in self.strikes]
+        if any(dodge in action for dodge in self.DODGES):
+            return [(1.0, (player_hp, boss_hp, False))]
+        phase = self.table.phase(boss_hp / self.boss_max_hp)
+        player_hp = max(0, player_hp - self.table.damage(action, phase))
+        return [(1.0, (player_hp, min(self.boss_max_hp, boss_hp + self.regen), False))]
+
+    def value(self, state, side):
+        return _team_value(state[:2], (self.player_max_hp, self.boss_max_hp), (0, 1), side)
+
+    def terminal(self, state):
+        return state[0] <= 0 or state[1] <= 0
@@ -0,0 +1,299 @@
+"""
+Battle Analytics Store for HCShinobi
+Append-only columnar history of finished battles, for balance queries.
+
+Every :class:`BattleEndedEvent` becomes one row of fixed-width ``array``
+columns: battle, mode, end reason, winner, loser, both levels, turns and the
+end time. Strings with few distinct values (modes, reasons, players, jutsu)
+are interned into per-table codes, so those columns are plain numbers.
+Battle ids are unique per battle, so interning them would grow the string
+tables without bound; they go into a :class:`FixedBytes` column instead,
+``BATTLE_ID_WIDTH`` bytes per row (NumPy dtype ``S32``). That is wide enough
+for a 26-character ULID and its mode prefix. Per-jutsu damage goes into a
+second table, with one row per (battle, side, jutsu) pointing back at its
+battle row.
+
+New rows collect in an open segment. The segment is sealed once it holds
+``SEGMENT_ROWS`` battles, or on :meth:`BattleAnalytics.flush` at shutdown.
+Sealing writes ``segment-NNNNNN.col`` under ``<data_dir>/battles/analytics``:
+a JSON header line followed by each column's raw bytes. New strings are
+appended to ``strings.jsonl`` first. Sealed segments are never rewritten.
+Start-up reads them back with ``array.frombytes``, so loading costs one
+read per column per segment and no JSON per battle. A crash loses only the
+battles in the open segment; ``history.jsonl`` still has their logs.
+
+:mod:`.queries` runs vectorised group-bys over these columns.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..events import BattleEndedEvent, EventBus, GameEvent
+
+logger = logging.getLogger(__name__)
+
+# Bytes kept per battle id; longer ids keep their last BATTLE_ID_WIDTH bytes, which hold the ULID.
+BATTLE_ID_WIDTH = 32
+
+# (column, array typecode). String columns hold codes into BattleAnalytics.strings;
+# "S<n>" columns are FixedBytes.
+BATTLE_COLUMNS = (
+    ("battle", f"S{BATTLE_ID_WIDTH}"), ("mode", "h"), ("reason", "h"), ("winner", "i"), ("loser", "i"),
+    ("winner_level", "h"), ("loser_level", "h"), ("turns", "i"), ("ended_at", "d"),
+)
+DAMAGE_COLUMNS = (("row", "i"), ("side", "b"), ("jutsu", "i"), ("damage", "i"))
+
+WINNER, LOSER = 0, 1
+NO_CODE = -1
+
+
+class FixedBytes:
+    """Fixed-width byte strings packed end to end, with the ``array`` methods the store uses.
+
+    ``data`` is the packed buffer, which NumPy reads as dtype ``typecode`` (``S<width>``).
+    """
+
+    def __init__(self, width: int, data: bytes = b""):
+        self.width = self.itemsize = width
+        self.typecode = f"S{width}"
+        self.data = bytearray(data)
+
+    def pack(self, value: Optional[str]) -> bytes:
+        """``value`` as one NUL-padded cell, keeping its last ``width`` bytes."""
+        raw = ("" if value is None else str(value)).encode("ascii", "replace")[-self.width:]
+        return raw.ljust(self.width, b"\0")
+
+    def __len__(self) -> int:
+        return len(self.data) // self.width
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FixedBytes) and (self.width, self.data) == (other.width, other.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("FixedBytes only supports contiguous slices")
+            return FixedBytes(self.width, self.data[start * self.width:stop * self.width])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FixedBytes index out of range")
+        return self.data[index * self.width:(index + 1) * self.width].rstrip(b"\0").decode("ascii")
+
+    def __delitem__(self, index: slice) -> None:
+        start, stop, _ = index.indices(len(self))
+        del self.data[start * self.width:stop * self.width]
+
+    def append(self, value: Optional[str]) -> None:
+        self.data += self.pack(value)
+
+    def extend(self, other: "FixedBytes") -> None:
+        self.data += other.data
+
+    def frombytes(self, data: bytes) -> None:
+        self.data += data
+
+    def tobytes(self) -> bytes:
+        return bytes(self.data)
+
+    def byteswap(self) -> None:
+        pass  # single bytes have no byte order
+
+
+def _column(typecode: str):
+    return FixedBytes(int(typecode[1:])) if typecode.startswith("S") else array(typecode)
+
+
+class BattleAnalytics:
+    """Finished battles as parallel typed columns, sealed to disk in segments."""
+
+    SEGMENT_ROWS = 4096
+    STRINGS_FILE = "strings.jsonl"
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.path = Path(data_dir) / "battles" / "analytics" if data_dir else None
+        self.battles: Dict[str, Any] = {name: _column(code) for name, code in BATTLE_COLUMNS}
+        self.damage: Dict[str, array] = {name: array(code) for name, code in DAMAGE_COLUMNS}
+        self.strings: Dict[str, List[str]] = {"mode": [], "reason": [], "player": [], "jutsu": []}
+        self._codes: Dict[str, Dict[str, int]] = {table: {} for table in self.strings}
+        self._unsaved: List[Tuple[str, str]] = []
+        self._sealed = 0
+        self._sealed_damage = 0
+        self.segments = 0
+        self._subscription = None
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.battles["ended_at"])
+
+    def attach(self, event_bus: EventBus) -> None:
+        """Record every battle that ends from now on."""
+        self._subscription = event_bus.subscribe(self.handle_event, BattleEndedEvent, name="analytics")
+
+    async def handle_event(self, event: GameEvent) -> None:
+        if isinstance(event, BattleEndedEvent):
+            self.record(event)
+
+    # ------------------------------------------------------------------
+    # Strings
+    # ------------------------------------------------------------------
+
+    def code(self, table: str, value: Optional[str]) -> int:
+        """``value``'s code in ``table``, interning it on first sight."""
+        value = "" if value is None else str(value)
+        codes = self._codes[table]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.strings[table])
+            self.strings[table].append(value)
+            self._unsaved.append((table, value))
+        return code
+
+    def code_of(self, table: str, value: Optional[str]) -> int:
+        """``value``'s code in ``table`` without interning it; ``NO_CODE`` if it never appeared."""
+        return self._codes[table].get("" if value is None else str(value), NO_CODE)
+
+    def lookup(self, table: str, code: int) -> str:
+        return self.strings[table][code]
+
+    def battle_id(self, row: int) -> str:
+        """The (possibly shortened, see ``BATTLE_ID_WIDTH``) id of the battle in ``row``."""
+        return self.battles["battle"][row]
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, event: BattleEndedEvent) -> int:
+        """Append one finished battle; returns its row."""
+        row = len(self)
+        values = {
+            "battle": event.battle_id,
+            "mode": self.code("mode", event.mode),
+            "reason": self.code("reason", event.end_reason),
+            "winner": self.code("player", event.user_id),
+            "loser": self.code("player", event.loser_id or event.opponent),
+            "winner_level": event.level,
+            "loser_level": event.loser_level,
+            "turns": event.turns,
+            "ended_at": event.timestamp.timestamp(),
+        }
+        for name, column in self.battles.items():
+            column.append(values[name])
+        damage = self.damage
+        for side, dealt in ((WINNER, event.damage), (LOSER, event.loser_damage)):
+            for jutsu, amount in dealt.items():
+                damage["row"].append(row)
+                damage["side"].append(side)
+                damage["jutsu"].append(self.code("jutsu", jutsu))
+                damage["damage"].append(amount)
+        if len(self) - self._sealed >= self.SEGMENT_ROWS:
+            self.flush()
+        return row
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Seal the open segment to disk (a no-op when it is empty or there is no data_dir)."""
+        if self.path is None or len(self) == self._sealed:
+            return
+        header = {
+            "first": self._sealed,
+            "rows": len(self) - self._sealed,
+            "damage_rows": len(self.damage["row"]) - self._sealed_damage,
+            "byteorder": sys.byteorder,
+            "columns": [[name, column.typecode, column.itemsize]
+                        for table in (self.battles, self.damage) for name, column in table.items()],
+        }
+        target = self.path / f"segment-{self.segments + 1:06d}.col"
+        tmp = target.with_suffix(".tmp")
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if self._unsaved:
+                with open(self.path / self.STRINGS_FILE, "a", encoding="utf-8") as f:
+                    for table, value in self._unsaved:
+                        f.write(json.dumps([table, value], ensure_ascii=False) + "\n")
+                self._unsaved = []
+            with open(tmp, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                for column in self.battles.values():
+                    f.write(column[self._sealed:].tobytes())
+                for column in self.damage.values():
+                    f.write(column[self._sealed_damage:].tobytes())
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.error(f"Failed to seal battle analytics segment {target}: {e}")
+            return
+        self.segments += 1
+        self._sealed, self._sealed_damage = len(self), len(self.damage["row"])
+
+    def _load(self) -> None:
+        try:
+            with open(self.path / self.STRINGS_FILE, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        table, value = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable string in {self.path / self.STRINGS_FILE}")
+                        continue
+                    self.code(table, value)
+        except FileNotFoundError:
+            pass
+        self._unsaved = []
+        for segment in sorted(self.path.glob("segment-*.col")):
+            if not self._read_segment(segment):
+                break  # later segments would point at rows that were not loaded
+            self.segments = int(segment.stem.split("-")[1])
+        self._sealed, self._sealed_damage = len(self), len(self.damage["row"])
+
+    def _read_segment(self, segment: Path) -> bool:
+        battles, damage = len(self), len(self.damage["row"])
+        try:
+            with open(segment, "rb") as f:
+                header = json.loads(f.readline())
+                counts = {"battle": header["rows"], "damage": header["damage_rows"]}
+                if {name for name, _, _ in header["columns"]} != self.battles.keys() | self.damage.keys():
+                    raise ValueError("segment columns do not match this store")
+                for name, typecode, itemsize in header["columns"]:
+                    table = "battle" if name in self.battles else "damage"
+                    column = (self.battles if table == "battle" else self.damage)[name]
+                    if column.typecode != typecode or column.itemsize != itemsize:
+                        raise ValueError(f"column {name} is {typecode}/{itemsize}")
+                    data = f.read(counts[table] * itemsize)
+                    if len(data) != counts[table] * itemsize:
+                        raise ValueError(f"column {name} is truncated")
+                    chunk = _column(typecode)
+                    chunk.frombytes(data)
+                    if header["byteorder"] != sys.byteorder:
+                        chunk.byteswap()
+                    column.extend(chunk)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Stopping at unreadable battle analytics segment {segment}: {e}")
+            for column in self.battles.values():
+                del column[battles:]
+            for column in self.damage.values():
+                del column[damage:]
+            return False
+        if header["first"] != battles:
+            # An earlier segment went missing; re-point this one's damage rows at where its battles landed.
+            shift = battles - header["first"]
+            rows = self.damage["row"]
+            rows[damage:] = array("i", (r + shift for r in rows[damage:]))
+        return True
+
+
+def analytics_for(services: Any) -> Optional[BattleAnalytics]:
+    """The container's shared store, or None for a cog running without services."""
+    store = getattr(services, "battle_analytics", None)
+    return store if isinstance(store, BattleAnalytics) else None
@@ -1,7 +1,108 @@
-from typing import List
-from .state import BattleState
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional
+
 from .types import StatusEffect, BattleLogCallback
 
+if TYPE_CHECKING:
+    from .state import BattleParticipant, BattleState
+
+EffectHandler = Callable[["BattleState", "BattleParticipant", dict, BattleLogCallback], None]
+
+_HANDLERS: Dict[str, EffectHandler] = {}
+_BLOCKERS: Dict[str, str] = {}
+
+
+def register_effect(name: str) -> Callable[[EffectHandler], EffectHandler]:
+    """Register the handler run for ``name`` when its phase is applied."""
+    def decorator(handler: EffectHandler) -> EffectHandler:
+        _HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def register_blocker(name: str, message: str) -> None:
+    """Mark ``name`` as preventing action; ``message`` is formatted with ``{name}``."""
+    _BLOCKERS[name] = message
+
+
+class EffectSet(Sequence):
+    """A participant's effects keyed by name and indexed by phase.
+
+    Entries stay plain dicts (``StatusEffect.to_dict()``) so the set reads and
+    serializes like the list it replaces, but lookups by name, the effects of
+    one phase and the action-blocking check no longer scan every effect.
+    """
+
+    __slots__ = ("_by_name", "_by_phase")
+
+    def __init__(self, effects: Iterable[dict] = ()):
+        self._by_name: Dict[str, dict] = {}
+        self._by_phase: Dict[str, Dict[str, dict]] = {}
+        for eff in effects:
+            self.append(eff)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._by_name.values())
+
+    def __getitem__(self, index):
+        return list(self._by_name.values())[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (EffectSet, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EffectSet({list(self)!r})"
+
+    def get(self, name: str) -> Optional[dict]:
+        return self._by_name.get(name)
+
+    def has(self, name: str) -> bool:
+        eff = self._by_name.get(name)
+        return eff is not None and eff["duration"] > 0
+
+    def phase(self, effect_type: str) -> List[dict]:
+        return list(self._by_phase.get(effect_type, {}).values())
+
+    def append(self, eff: dict) -> None:
+        """Add ``eff``; an effect with the same name is replaced."""
+        self.discard(eff["name"])
+        self._by_name[eff["name"]] = eff
+        self._by_phase.setdefault(eff["effect_type"], {})[eff["name"]] = eff
+
+    def extend(self, effects: Iterable[dict]) -> None:
+        for eff in effects:
+            self.append(eff)
+
+    def discard(self, name: str) -> Optional[dict]:
+        eff = self._by_name.pop(name, None)
+        if eff is not None:
+            bucket = self._by_phase.get(eff["effect_type"])
+            if bucket is not None:
+                bucket.pop(name, None)
+                if not bucket:
+                    del self._by_phase[eff["effect_type"]]
+        return eff
+
+    def remove(self, eff: dict) -> None:
+        if self._by_name.get(eff["name"]) is not eff:
+            raise ValueError(f"{eff['name']} is not in the effect set")
+        self.discard(eff["name"])
+
+    def clear(self) -> None:
+        self._by_name.clear()
+        self._by_phase.clear()
+
+    def blocker(self) -> Optional[str]:
+        """Name of an active effect that prevents acting, if any."""
+        return next((name for name in _BLOCKERS if self.has(name)), None)
+
 
 def _get_participant(battle: BattleState, pid: str):
     if battle.attacker.id == pid:
@@ -9,49 +110,59 @@ def _get_participant(battle: BattleState, pid: str):
     return battle.defender
 
 
+@register_effect("Poison")
+def _poison(battle: BattleState, participant: BattleParticipant, eff: dict, log: BattleLogCallback) -> None:
+    dmg = int(participant.character.max_hp * eff["potency"])
+    participant.current_hp -= dmg
+    log(battle, f"{participant.character.name} took {dmg} poison damage")
+
+
+@register_effect("Regeneration")
+def _regeneration(battle: BattleState, participant: BattleParticipant, eff: dict, log: BattleLogCallback) -> None:
+    heal = int(participant.character.max_hp * eff["potency"])
+    participant.current_hp = min(participant.character.max_hp, participant.current_hp + heal)
+    log(battle, f"{participant.character.name} regenerated {heal} HP")
+
+
+register_blocker("Stun", "{name} is stunned and cannot act")
+
+
 def add_status_effect(battle: BattleState, participant_id: str, effect: StatusEffect, log: BattleLogCallback) -> None:
     participant = _get_participant(battle, participant_id)
-    for existing in participant.effects:
-        if existing["name"] == effect.name:
-            existing["duration"] = max(existing["duration"], effect.duration)
-            existing["potency"] = max(existing["potency"], effect.potency)
-            log(battle, f"{participant.character.name} was refreshed with {effect.name}")
-            return
+    existing = participant.effects.get(effect.name)
+    if existing is not None:
+        existing["duration"] = max(existing["duration"], effect.duration)
+        existing["potency"] = max(existing["potency"], effect.potency)
+        log(battle, f"{participant.character.name} was refreshed with {effect.name}")
+        return
     participant.effects.append(effect.to_dict())
     log(battle, f"{participant.character.name} was affected by {effect.name}")
 
 
 def apply_status_effects(battle: BattleState, effect_type: str, log: BattleLogCallback) -> None:
     for participant in [battle.attacker, battle.defender]:
-        for eff in list(participant.effects):
-            if eff["effect_type"] != effect_type:
-                continue
-            if eff["name"] == "Poison":
-                dmg = int(participant.character.max_hp * eff["potency"])
-                participant.current_hp -= dmg
-                log(battle, f"{participant.character.name} took {dmg} poison damage")
-            if eff["name"] == "Regeneration":
-                heal = int(participant.character.max_hp * eff["potency"])
-                participant.current_hp = min(participant.character.max_hp, participant.current_hp + heal)
-                log(battle, f"{participant.character.name} regenerated {heal} HP")
+        for eff in participant.effects.phase(effect_type):
+            handler = _HANDLERS.get(eff["name"])
+            if handler is not None:
+                handler(battle, participant, eff, log)
 
 
 def tick_status_durations(battle: BattleState, log: BattleLogCallback) -> None:
     for participant in [battle.attacker, battle.defender]:
-        remaining = []
+        expired = []
         for eff in participant.effects:
             eff["duration"] -= 1
             if eff["duration"] <= 0:
-                log(battle, f"{eff['name']} on {participant.character.name} wore off")
-            else:
-                remaining.append(eff)
-        participant.effects = remaining
+                expired.append(eff)
+        for eff in expired:
+            participant.effects.discard(eff["name"])
+            log(battle, f"{eff['name']} on {participant.character.name} wore off")
 
 
 def can_player_act(battle: BattleState, participant_id: str, log: BattleLogCallback) -> bool:
     participant = _get_participant(battle, participant_id)
-    for eff in participant.effects:
-        if eff["name"] == "Stun" and eff["duration"] > 0:
-            log(battle, f"{participant.character.name} is stunned and cannot act")
-            return False
+    blocker = participant.effects.blocker()
+    if blocker is not None:
+        log(battle, _BLOCKERS[blocker].format(name=participant.character.name))
+        return False
     return True
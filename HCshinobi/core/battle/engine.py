@@ -0,0 +1,297 @@
+"""
+Turn Engine for HCShinobi
+One attack, turn and victory core shared by every battle mode.
+
+Each cog keeps its own storage (PvP ``battle_data`` dicts, boss dicts, mission
+participants). For every action it wraps that storage in a :class:`TurnState`
+made of :class:`Fighter` views. A :class:`DamageModel` rolls the hit.
+:class:`TurnEngine` then applies the damage, writes the log line, checks for
+a knockout and advances the turn. Seeded RNG, replays and benchmarks only
+need to hook in here.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from .log import BattleLog, EventFlag, EventKind
+
+logger = logging.getLogger(__name__)
+
+PVP_JUTSU_MULTIPLIERS: Dict[str, float] = {
+    "Rasengan": 1.4,
+    "Chidori": 1.3,
+    "Great Fireball Jutsu": 1.2,
+    "Dragon Flame Jutsu": 1.15,
+    "Shadow Clone Jutsu": 1.1,
+    "Fireball Jutsu": 1.0,
+    "Basic Attack": 0.8,
+    "Punch": 0.7,
+    "Kick": 0.7,
+}
+
+
+def roll_d20(modifier: int = 0, rng=None) -> Dict[str, Any]:
+    """Roll a d20 with modifier and return detailed results.
+
+    Pass a battle's own ``random.Random`` as ``rng`` to keep its rolls reproducible.
+    """
+    roll = (rng or random).randint(1, 20)
+    total = roll + modifier
+    crit = None
+    if roll == 20:
+        crit = 'success'
+    elif roll == 1:
+        crit = 'failure'
+    return {'roll': roll, 'modifier': modifier, 'total': total, 'crit': crit}
+
+
+class Fighter:
+    """A view over one combatant, whether the cog stores it as a dict or a ShinobiOS stats object."""
+
+    __slots__ = ("source", "_record")
+
+    def __init__(self, source: Any):
+        self.source = source
+        self._record = isinstance(source, dict)
+
+    @property
+    def name(self) -> str:
+        return self.source["name"] if self._record else self.source.name
+
+    @property
+    def hp(self) -> int:
+        return self.source["hp"] if self._record else self.source.health
+
+    @hp.setter
+    def hp(self, value: int) -> None:
+        if self._record:
+            self.source["hp"] = value
+        else:
+            self.source.health = value
+
+    @property
+    def max_hp(self) -> int:
+        return self.source.get("max_hp", self.hp) if self._record else self.source.max_health
+
+    @property
+    def level(self) -> int:
+        return self.source.get("level", 1) if self._record else self.source.level
+
+    def stat(self, key: str, default: Any = 0) -> Any:
+        return self.source.get(key, default) if self._record else getattr(self.source, key, default)
+
+    def take(self, damage: int) -> int:
+        """Apply ``damage`` the way this storage does and return what landed."""
+        if self._record:
+            self.hp = max(0, self.hp - damage)
+            return damage
+        return self.source.take_damage(damage)
+
+
+@dataclass
+class Attack:
+    """What the actor chose plus the modifiers the adapter resolved for it."""
+    jutsu: str
+    power: float = 1.0        # multiplicative: mastery, phase or jutsu scaling
+    bonus: int = 0            # flat: gear, stat bonuses
+    base: int = 0             # base damage for variance and d20 models
+    modifier: int = 0         # d20 attack modifier
+    armor_class: int = 10
+    payload: Any = None       # model-specific data, e.g. a ShinobiOS Jutsu
+
+
+@dataclass
+class Hit:
+    damage: int = 0
+    missed: bool = False
+    crit: Optional[str] = None
+    roll: Optional[Dict[str, Any]] = None
+    applied: bool = False     # the model already changed the target's HP
+    detail: Any = None
+    notes: List[str] = field(default_factory=list)  # extra log lines after the attack line
+
+
+class DamageModel:
+    """Rolls one attack; ``text`` formats its log line, ``None`` logs a structured event."""
+
+    icon = "⚔️"
+    text: Optional[str] = None
+
+    def roll(self, rng, attacker: Fighter, target: Fighter, attack: Attack) -> Hit:
+        raise NotImplementedError
+
+    def describe(self, attacker: Fighter, target: Fighter, attack: Attack, hit: Hit) -> Optional[str]:
+        if self.text is None:
+            return None
+        return self.text.format(icon=self.icon, actor=attacker.name, target=target.name,
+                                jutsu=attack.jutsu, damage=hit.damage)
+
+
+@dataclass
+class RangeDamage(DamageModel):
+    """``(randint(low, high) + level * level_factor + bonus) * multiplier * power``."""
+    low: int
+    high: int
+    level_factor: float = 0
+    multipliers: Mapping[str, float] = field(default_factory=dict)
+    text: Optional[str] = None
+
+    def roll(self, rng, attacker, target, attack):
+        base_damage = rng.randint(self.low, self.high)
+        multiplier = self.multipliers.get(attack.jutsu, 1.0) * attack.power
+        return Hit(damage=int((base_damage + attacker.level * self.level_factor + attack.bonus) * multiplier))
+
+
+@dataclass
+class VarianceDamage(DamageModel):
+    """``attack.base * power``, rolled between 80% and 120%."""
+    text: Optional[str] = None
+    low_factor: float = 0.8
+    high_factor: float = 1.2
+
+    def _vary(self, rng, attack: Attack) -> int:
+        base_damage = int(attack.base * attack.power)
+        return rng.randint(int(base_damage * self.low_factor), int(base_damage * self.high_factor))
+
+    def roll(self, rng, attacker, target, attack):
+        return Hit(damage=self._vary(rng, attack))
+
+
+@dataclass
+class TableDamage(DamageModel):
+    """Fixed damage per jutsu scaled by ``power`` (the boss phase multiplier)."""
+    table: Mapping[str, int]
+    default: int = 100
+    text: Optional[str] = None
+
+    def roll(self, rng, attacker, target, attack):
+        return Hit(damage=int(self.table.get(attack.jutsu, self.default) * attack.power))
+
+
+@dataclass
+class D20Damage(VarianceDamage):
+    """d20 + modifier against armor class; a natural 20 doubles the varied damage."""
+    icon: str = "⚔️"
+    miss_text: str = "**Misses!**"
+    label: Optional[str] = None  # name shown in the log instead of the attacker's
+
+    def roll(self, rng, attacker, target, attack):
+        result = roll_d20(attack.modifier, rng)
+        if result['crit'] == 'failure' or result['total'] < attack.armor_class:
+            return Hit(missed=True, crit=result['crit'], roll=result)
+        damage = self._vary(rng, attack)
+        if result['crit'] == 'success':
+            damage *= 2
+        return Hit(damage=damage, crit=result['crit'], roll=result)
+
+    def headline(self, attacker: Fighter, attack: Attack, hit: Hit) -> str:
+        result = hit.roll
+        log = (f"{self.icon} **{self.label or attacker.name}** uses **{attack.jutsu}**! "
+               f"(Roll: {result['roll']} + {result['modifier']} = {result['total']} vs AC {attack.armor_class})")
+        if hit.crit == 'success':
+            log += " — **CRITICAL HIT!**"
+        elif hit.crit == 'failure':
+            log += " — **CRITICAL FAILURE!**"
+        return log
+
+    def describe(self, attacker, target, attack, hit):
+        log = self.headline(attacker, attack, hit)
+        if hit.missed:
+            return log + f" — {self.miss_text}"
+        return log + f" — **Hits for {hit.damage} damage!**"
+
+
+@dataclass
+class ShinobiOSDamage(DamageModel):
+    """Delegates to :meth:`ShinobiOSEngine.execute_action`; ``attack.payload`` is the Jutsu."""
+    engine: Any
+    environment: Any = None
+
+    def roll(self, rng, attacker, target, attack):
+        action = self.engine.execute_action(attacker.source, target.source, attack.payload, self.environment, rng=rng)
+        return Hit(damage=action.damage, missed=not action.success, applied=True, detail=action)
+
+
+@dataclass
+class TurnState:
+    """Fighters, log and turn bookkeeping for one action; ``teams`` defaults to one fighter per side."""
+    fighters: List[Fighter]
+    log: Any
+    rng: Any = random
+    turn: int = 1
+    active: int = 0
+    teams: Optional[List[int]] = None
+    winner: Optional[int] = None
+    end_reason: Optional[str] = None
+
+    @classmethod
+    def of(cls, *sources: Any, log: Any = None, **kwargs) -> "TurnState":
+        return cls(fighters=[Fighter(s) for s in sources], log=log if log is not None else [], **kwargs)
+
+    def team(self, index: int) -> int:
+        return self.teams[index] if self.teams else index
+
+    def team_down(self, team: int) -> bool:
+        return all(f.hp <= 0 for i, f in enumerate(self.fighters) if self.team(i) == team)
+
+    def log_ref(self, index: int):
+        """Log actor reference: the index when the log's actor table lines up, else the name."""
+        actors = getattr(self.log, "actors", None)
+        name = self.fighters[index].name
+        if actors and index < len(actors) and actors[index] == name:
+            return index
+        return name
+
+
+class TurnEngine:
+    """Resolves attacks and turn order over a :class:`TurnState`."""
+
+    def attack(self, state: TurnState, actor: int, attack: Attack, model: DamageModel,
+               target: Optional[int] = None) -> Hit:
+        if target is None:
+            target = next(i for i in range(len(state.fighters)) if state.team(i) != state.team(actor))
+        attacker, defender = state.fighters[actor], state.fighters[target]
+
+        hit = model.roll(state.rng, attacker, defender, attack)
+        if not hit.applied and not hit.missed and hit.damage:
+            hit.damage = defender.take(hit.damage)
+
+        line = model.describe(attacker, defender, attack, hit)
+        if line is not None:
+            for text in [line, *hit.notes]:
+                self.note(state, text)
+        elif isinstance(state.log, BattleLog):
+            flags = (EventFlag.MISS if hit.missed else EventFlag.NONE) | (
+                EventFlag.CRIT if hit.crit == 'success' else EventFlag.NONE)
+            state.log.record(EventKind.ATTACK, actor=state.log_ref(actor), jutsu=attack.jutsu, damage=hit.damage,
+                             flags=flags, target=state.log_ref(target), turn=state.turn)
+
+        if defender.hp <= 0 and state.team_down(state.team(target)):
+            state.winner, state.end_reason = actor, "victory"
+        return hit
+
+    def note(self, state: TurnState, text: str) -> None:
+        if isinstance(state.log, BattleLog):
+            state.log.record(EventKind.NOTE, text=text, turn=state.turn)
+        else:
+            state.log.append(text)
+
+    def advance(self, state: TurnState, announce: bool = False) -> int:
+        """Next turn to the next fighter still standing; ``announce`` logs a TURN event."""
+        count = len(state.fighters)
+        for step in range(1, count + 1):
+            candidate = (state.active + step) % count
+            if state.fighters[candidate].hp > 0:
+                state.active = candidate
+                break
+        state.turn += 1
+        if announce and isinstance(state.log, BattleLog):
+            state.log.record(EventKind.TURN, actor=state.log_ref(state.active), turn=state.turn)
+        return state.active
+
+    def choose_jutsu(self, state: TurnState, options: List[Any]) -> Any:
+        return state.rng.choice(options)
@@ -1,37 +1,114 @@
 import asyncio
 from datetime import datetime, timezone
+from .log import jutsu_damage
 from .state import BattleState
+from ..events import BattleEndedEvent, publish_event
+from ..scheduler import DeadlineScheduler
 
 class BattleLifecycle:
-    def __init__(self, character_system, persistence, progression_engine, battle_timeout: int = 5):
+    def __init__(self, character_system, persistence, progression_engine, battle_timeout: int = 5,
+                 event_bus=None, scheduler: DeadlineScheduler | None = None, outbound=None):
         self.character_system = character_system
         self.persistence = persistence
         self.progression_engine = progression_engine
         self.battle_timeout = battle_timeout
         self.battle_tasks = {}
         self.bot = None
+        self.event_bus = event_bus
+        self.scheduler = scheduler or DeadlineScheduler()
+        self._tracked = set()
+        self.outbound = outbound
+        # Awaited with (battle_state, battle_id) after a battle ends, e.g. to settle a tournament match.
+        self.end_listeners = []
+        # Battles added to or removed from persistence are tracked and untracked directly.
+        add_listener = getattr(persistence, "add_active_listener", None)
+        if callable(add_listener):
+            add_listener(self._on_active_change)
+        self.adopt_active_battles()
+
+    def track_battle(self, battle_id: str, battle_state: BattleState):
+        """Schedule the battle's timeout relative to its last action."""
+        deadline = battle_state.last_action.timestamp() + self.battle_timeout
+        self.scheduler.schedule(("battle", battle_id), deadline, self._on_battle_deadline)
+        self._tracked.add(battle_id)
+
+    def touch_battle(self, battle_id: str, battle_state: BattleState):
+        """Record activity on a battle and push its timeout back."""
+        battle_state.last_action = datetime.now(timezone.utc)
+        self.track_battle(battle_id, battle_state)
+
+    def untrack_battle(self, battle_id: str):
+        self.scheduler.cancel(("battle", battle_id))
+        self._tracked.discard(battle_id)
+
+    def _on_active_change(self, battle_id: str, battle_state):
+        """Persistence listener: a battle was added (with its state) or removed (None)."""
+        if battle_state is None:
+            self.untrack_battle(battle_id)
+        elif battle_id not in self._tracked:
+            self.track_battle(battle_id, battle_state)
+
+    def adopt_active_battles(self):
+        """Schedule battles already active before the listener was registered; run once at startup."""
+        for bid, state in list(getattr(self.persistence, "active_battles", {}).items()):
+            if bid not in self._tracked:
+                self.track_battle(bid, state)
+
+    async def _on_battle_deadline(self, key):
+        _, bid = key
+        self._tracked.discard(bid)
+        state = self.persistence.active_battles.get(bid)
+        if state is None:
+            return
+        # last_action may have been bumped without touch_battle; honour it.
+        if (datetime.now(timezone.utc) - state.last_action).total_seconds() <= self.battle_timeout:
+            self.track_battle(bid, state)
+            return
+        state.is_active = False
+        state.end_reason = "timeout"
+        await self.handle_battle_end(state, bid)
+        await self.notify_players_battle_timeout(state.attacker.id, state.defender.id)
 
     async def handle_battle_end(self, battle_state: BattleState, battle_id: str):
         await self.persistence.add_battle_to_history(battle_id, battle_state)
         await self.persistence.remove_active_battle(battle_id)
+        self.untrack_battle(battle_id)
+        self._publish_battle_end(battle_state, battle_id)
         if battle_state.winner_id:
             exp = self._calculate_exp_gain(battle_state)
             await self.progression_engine.award_battle_experience(battle_state.winner_id, exp)
+        for listener in self.end_listeners:
+            await listener(battle_state, battle_id)
+
+    def _publish_battle_end(self, battle_state: BattleState, battle_id: str):
+        winner_id = battle_state.winner_id or ""
+        winner, loser = battle_state.attacker, battle_state.defender
+        if winner_id and winner.id != winner_id:
+            winner, loser = loser, winner
+        log = battle_state.battle_log
+        publish_event(self.event_bus, BattleEndedEvent(
+            user_id=winner_id,
+            battle_id=battle_id,
+            loser_id=loser.id if winner_id else "",
+            end_reason=battle_state.end_reason,
+            turns=battle_state.turn_number,
+            level=winner.character.level if winner_id else 0,
+            loser_level=loser.character.level if winner_id else 0,
+            damage=jutsu_damage(log, winner.character.name) if winner_id else {},
+            loser_damage=jutsu_damage(log, loser.character.name) if winner_id else {},
+        ))
 
     def _calculate_exp_gain(self, battle_state: BattleState) -> int:
         return 100
 
     async def cleanup_inactive_battles(self):
-        to_remove = []
-        for bid, state in list(self.persistence.active_battles.items()):
-            if (datetime.now(timezone.utc) - state.last_action).total_seconds() > self.battle_timeout:
-                state.is_active = False
-                state.end_reason = "timeout"
-                to_remove.append((bid, state))
-        for bid, state in to_remove:
-            await self.handle_battle_end(state, bid)
+        """End battles whose deadline has passed; only expired deadlines are visited."""
+        await self.scheduler.fire_expired()
 
     async def notify_players_battle_timeout(self, attacker_id: str, defender_id: str):
+        if self.outbound is not None:
+            await self.outbound.send_dms([attacker_id, defender_id], content="Your battle timed out.")
+            return
         if not self.bot:
             return
         for pid in [attacker_id, defender_id]:
@@ -39,12 +116,21 @@ class BattleLifecycle:
             await user.send("Your battle timed out.")
 
     async def _battle_timeout_check(self):
+        self.adopt_active_battles()
         while True:
             await self.cleanup_inactive_battles()
-            await asyncio.sleep(self.battle_timeout)
+            # Sleep until the next deadline, but wake at least once per timeout
+            # period to pick up deadlines scheduled while asleep.
+            delay = self.battle_timeout
+            next_deadline = self.scheduler.next_deadline()
+            if next_deadline is not None:
+                delay = min(delay, max(0.0, next_deadline - self.scheduler.clock()))
+            await asyncio.sleep(delay)
 
     async def shutdown(self):
         for task in self.battle_tasks.values():
             task.cancel()
+        for bid in list(self._tracked):
+            self.untrack_battle(bid)
         await self.persistence.save_active_battles()
         await self.persistence.save_battle_history()
@@ -0,0 +1,509 @@
+"""
+Structured Battle Log for HCShinobi
+Compact battle event records in a bounded ring buffer, rendered to text on demand.
+
+A :class:`BattleLog` stores :class:`BattleEvent` records (turn, actor index,
+interned jutsu id, damage, flags) instead of formatted strings.  Only the
+most recent ``capacity`` events are kept in memory; text is produced through
+:class:`~HCshinobi.core.battle_log_templates.ModernBattleLogger` when an
+embed reads the log.  The log behaves like a read-only sequence of strings,
+so ``log[-3:]`` and ``"\\n".join(log)`` keep working, and ``append`` accepts
+plain strings as free-text notes.
+
+A log attached to a :class:`BattleHistoryStream` writes every event to an
+append-only JSON lines file as it is recorded, in batches, so the full
+history survives even though the in-memory buffer does not.
+:class:`BattleHistory` reads that file back one battle at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from enum import IntEnum, IntFlag
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..battle_log_templates import ModernBattleLogger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 50
+
+
+class EventKind(IntEnum):
+    NOTE = 0
+    ATTACK = 1
+    DEFEAT = 2
+    TURN = 3
+
+
+class EventFlag(IntFlag):
+    NONE = 0
+    MISS = 1
+    CRIT = 2
+    FUMBLE = 4
+
+
+@dataclass(frozen=True, slots=True)
+class BattleEvent:
+    """One compact log record; ``actor``/``target``/``jutsu`` are table indexes (-1 for none)."""
+    turn: int
+    kind: int
+    actor: int = -1
+    jutsu: int = -1
+    damage: int = 0
+    flags: int = 0
+    target: int = -1
+    text: Optional[str] = None
+
+
+_renderer: Optional[ModernBattleLogger] = None
+
+
+def default_renderer() -> ModernBattleLogger:
+    global _renderer
+    if _renderer is None:
+        _renderer = ModernBattleLogger()
+    return _renderer
+
+
+class BattleLog(Sequence):
+    """Ring buffer of :class:`BattleEvent` records that reads as a list of rendered strings."""
+
+    def __init__(self, actors: Iterable[str] = (), capacity: Optional[int] = DEFAULT_CAPACITY,
+                 renderer: Optional[ModernBattleLogger] = None):
+        self.actors: List[str] = list(actors)
+        self.capacity = capacity
+        self.events: deque = deque(maxlen=capacity)
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self.turn = 0
+        # Events ever recorded; ``total - len(self)`` of them have been evicted.
+        self.total = 0
+        # Damage ever dealt per (actor, jutsu id); unlike ``events`` it survives eviction.
+        self.damage: Dict[Tuple[int, int], int] = {}
+        self.renderer = renderer
+        self.history: Optional["BattleHistoryStream"] = None
+        self.battle_id: Optional[str] = None
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[Any], actors: Iterable[str] = (),
+                   capacity: Optional[int] = DEFAULT_CAPACITY) -> "BattleLog":
+        log = cls(actors, capacity)
+        log.extend(lines)
+        return log
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def actor_id(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        try:
+            return self.actors.index(name)
+        except ValueError:
+            self.actors.append(name)
+            return len(self.actors) - 1
+
+    def jutsu_id(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        jid = self._name_ids.get(name)
+        if jid is None:
+            jid = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return jid
+
+    def record(self, kind: int, actor: Union[int, str] = -1, jutsu: Optional[str] = None, damage: int = 0,
+               flags: int = 0, target: Union[int, str] = -1, text: Optional[str] = None,
+               turn: Optional[int] = None) -> BattleEvent:
+        """Append a structured event. ``actor``/``target`` may be indexes or names."""
+        if isinstance(actor, str):
+            actor = self.actor_id(actor)
+        if isinstance(target, str):
+            target = self.actor_id(target)
+        event = BattleEvent(
+            turn=self.turn if turn is None else turn,
+            kind=int(kind),
+            actor=actor,
+            jutsu=self.jutsu_id(jutsu),
+            damage=int(damage),
+            flags=int(flags),
+            target=target,
+            text=text,
+        )
+        self._push(event)
+        return event
+
+    def append(self, entry: Union[str, BattleEvent]) -> None:
+        """Append a prebuilt event, or a string as a free-text note."""
+        if isinstance(entry, BattleEvent):
+            self._push(entry)
+        else:
+            self.record(EventKind.NOTE, text=str(entry))
+
+    def extend(self, entries: Iterable[Union[str, BattleEvent]]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def clear(self) -> None:
+        """Drop the buffered events; ``total`` keeps counting so offsets stay valid."""
+        self.events.clear()
+
+    def _push(self, event: BattleEvent) -> None:
+        self.events.append(event)
+        self.total += 1
+        self._tally(event)
+        if self.history is not None:
+            self.history.write_event(self.battle_id, self, event)
+
+    def _tally(self, event: BattleEvent) -> None:
+        if event.kind == EventKind.ATTACK and event.damage and event.actor >= 0 and event.jutsu >= 0:
+            key = (event.actor, event.jutsu)
+            self.damage[key] = self.damage.get(key, 0) + event.damage
+
+    def damage_by(self, actor: Union[int, str]) -> Dict[str, int]:
+        """Total damage ``actor`` (index or name) has dealt with each jutsu over the whole battle."""
+        if isinstance(actor, str):
+            if actor not in self.actors:
+                return {}
+            actor = self.actors.index(actor)
+        return {self.names[jutsu]: damage for (who, jutsu), damage in self.damage.items() if who == actor}
+
+    def attach_history(self, stream: "BattleHistoryStream", battle_id: str) -> None:
+        """Stream this log to ``stream``, starting with the events already buffered."""
+        if self.history is stream and self.battle_id == battle_id:
+            return
+        self.history, self.battle_id = stream, battle_id
+        stream.write_header(battle_id, self)
+        for event in self.events:
+            stream.write_event(battle_id, self, event)
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _name(self, index: int) -> str:
+        return self.actors[index] if 0 <= index < len(self.actors) else "Unknown"
+
+    def render_event(self, event: BattleEvent) -> str:
+        if event.kind == EventKind.NOTE:
+            return event.text or ""
+        if event.kind == EventKind.DEFEAT:
+            return f"💀 **{self._name(event.actor)}** has been defeated!"
+        if event.kind == EventKind.TURN:
+            return f"🎯 {self._name(event.actor)}'s turn!"
+
+        renderer = self.renderer or default_renderer()
+        actor = self._name(event.actor)
+        jutsu = self.names[event.jutsu] if event.jutsu >= 0 else None
+        if event.flags & EventFlag.MISS:
+            text = renderer.format_action(actor, jutsu or "an attack", 0, success=False)
+        elif jutsu:
+            text = renderer.format_action(actor, jutsu, event.damage)
+        else:
+            text = renderer.format_basic_attack(actor, event.damage)
+        if event.flags & EventFlag.CRIT:
+            text += " — **CRITICAL HIT!**"
+        elif event.flags & EventFlag.FUMBLE:
+            text += " — **CRITICAL FAILURE!**"
+        return text
+
+    def entry(self, index: int) -> Dict[str, Any]:
+        """Decoded fields of one buffered event, with names resolved."""
+        event = self.events[index]
+        return {
+            "turn": event.turn,
+            "kind": EventKind(event.kind).name.lower(),
+            "actor": self._name(event.actor) if event.actor >= 0 else None,
+            "target": self._name(event.target) if event.target >= 0 else None,
+            "jutsu": self.names[event.jutsu] if event.jutsu >= 0 else None,
+            "damage": event.damage,
+            "success": not event.flags & EventFlag.MISS,
+            "text": event.text,
+        }
+
+    def render(self, last: Optional[int] = None) -> List[str]:
+        """Text for the buffered events, or only the ``last`` few."""
+        events = list(self.events)
+        if last is not None:
+            events = events[-last:] if last > 0 else []
+        return [self.render_event(e) for e in events]
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.render_event(e) for e in list(self.events)[index]]
+        return self.render_event(self.events[index])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.render_event(e) for e in list(self.events))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (BattleLog, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BattleLog(events={len(self)}, total={self.total}, capacity={self.capacity})"
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def encode_event(self, event: BattleEvent) -> List[Any]:
+        """``[turn, kind, actor, jutsu name, damage, flags, target, text]`` with trailing defaults dropped."""
+        jutsu = self.names[event.jutsu] if event.jutsu >= 0 else None
+        row = [event.turn, event.kind, event.actor, jutsu, event.damage, event.flags, event.target, event.text]
+        defaults = [None, None, -1, None, 0, 0, -1, None]
+        while len(row) > 2 and row[-1] == defaults[len(row) - 1]:
+            row.pop()
+        return row
+
+    def decode_event(self, row: Union[List[Any], str]) -> BattleEvent:
+        if isinstance(row, str):
+            # Entries exported from a plain string log.
+            return BattleEvent(self.turn, EventKind.NOTE, text=row)
+        row = list(row) + [-1, None, 0, 0, -1, None][len(row) - 2:]
+        turn, kind, actor, jutsu, damage, flags, target, text = row[:8]
+        return BattleEvent(turn, kind, actor, self.jutsu_id(jutsu), damage, flags, target, text)
+
+    def export_since(self, offset: int) -> List[List[Any]]:
+        """Encoded events whose sequence number is at least ``offset`` and still buffered."""
+        skip = max(0, len(self.events) - (self.total - offset))
+        return [self.encode_event(e) for e in list(self.events)[skip:]]
+
+    def replay(self, rows: List[List[Any]], offset: int) -> None:
+        """Append encoded events starting at sequence ``offset``, skipping ones already present."""
+        for row in rows[max(0, self.total - offset):]:
+            event = self.decode_event(row)
+            self.events.append(event)
+            self.total += 1
+            self._tally(event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "a": self.actors,
+            "c": self.capacity,
+            "t": self.total,
+            "n": self.turn,
+            "e": [self.encode_event(e) for e in self.events],
+            "d": [[actor, self.names[jutsu], damage] for (actor, jutsu), damage in self.damage.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BattleLog":
+        log = cls(data.get("a", ()), data.get("c", DEFAULT_CAPACITY))
+        for row in data.get("e", []):
+            log.events.append(log.decode_event(row))
+        log.total = data.get("t", len(log.events))
+        log.turn = data.get("n", 0)
+        if "d" in data:
+            log.damage = {(actor, log.jutsu_id(jutsu)): damage for actor, jutsu, damage in data["d"]}
+        else:
+            # Saved before damage was tallied: the buffered events are the best record left.
+            for event in log.events:
+                log._tally(event)
+        return log
+
+
+def log_total(log: Sequence) -> int:
+    """Entries ever appended to ``log`` (a :class:`BattleLog` or a plain list)."""
+    return log.total if isinstance(log, BattleLog) else len(log)
+
+
+def jutsu_damage(log: Sequence, actor: Union[int, str]) -> Dict[str, int]:
+    """Damage per jutsu dealt by ``actor``; plain string logs carry none."""
+    return log.damage_by(actor) if isinstance(log, BattleLog) else {}
+
+
+def encode_log(log: Sequence) -> Any:
+    return log.to_dict() if isinstance(log, BattleLog) else list(log)
+
+
+def decode_log(data: Any, actors: Iterable[str] = ()) -> BattleLog:
+    if isinstance(data, dict):
+        return BattleLog.from_dict(data)
+    return BattleLog.from_lines(data or [], actors)
+
+
+def export_log_since(log: Sequence, offset: int) -> List[Any]:
+    return log.export_since(offset) if isinstance(log, BattleLog) else list(log[offset:])
+
+
+def replay_log(log: Sequence, entries: List[Any], offset: int) -> None:
+    if isinstance(log, BattleLog):
+        log.replay(entries, offset)
+    else:
+        log.extend(entries[max(0, len(log) - offset):])
+
+
+class BattleHistoryStream:
+    """Append-only JSON lines file that receives every event of attached logs.
+
+    Records are batched in memory and written in one call once ``BATCH_SIZE``
+    are pending, or ``FLUSH_DELAY`` seconds after the first one when an event
+    loop is running, so recording an event never touches the disk itself.
+    Lookups read the file back one battle at a time.
+    """
+
+    BATCH_SIZE = 64
+    FLUSH_DELAY = 1.0
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = None
+        self._pending: List[str] = []
+        self._flush_handle = None
+        # Actors already written per battle, so new ones can be sent along.
+        self._actors_written: Dict[str, int] = {}
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        try:
+            self._pending.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to encode battle history: {e}")
+            return
+        if len(self._pending) >= self.BATCH_SIZE:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._flush_handle = loop.call_later(self.FLUSH_DELAY, self.flush)
+
+    def write_header(self, battle_id: str, log: BattleLog) -> None:
+        self._write({"b": battle_id, "a": log.actors})
+        self._actors_written[battle_id] = len(log.actors)
+
+    def write_event(self, battle_id: str, log: BattleLog, event: BattleEvent) -> None:
+        record = {"b": battle_id, "e": log.encode_event(event)}
+        if len(log.actors) > self._actors_written.get(battle_id, 0):
+            # Actors added after the header travel with the next event.
+            record["a"] = log.actors
+            self._actors_written[battle_id] = len(log.actors)
+        self._write(record)
+
+    def write_log(self, battle_id: str, log: BattleLog) -> None:
+        """Write a log that was never streamed as encoded events, without rendering them."""
+        self.write_header(battle_id, log)
+        for event in log.events:
+            self.write_event(battle_id, log, event)
+        self.finish(battle_id)
+
+    def finish(self, battle_id: str) -> None:
+        self._actors_written.pop(battle_id, None)
+
+    def write_lines(self, battle_id: str, lines: Iterable[str]) -> None:
+        self._write({"b": battle_id, "l": list(lines)})
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(self._pending))
+            self._file.flush()
+        except OSError as e:
+            logger.error(f"Failed to write battle history: {e}")
+        self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _records(self, battle_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Decoded records in file order, only ``battle_id``'s when given."""
+        self.flush()
+        marker = None if battle_id is None else '"b":' + json.dumps(battle_id, ensure_ascii=False)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if marker is not None and marker not in line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if battle_id is None or record.get("b") == battle_id:
+                        yield record
+        except FileNotFoundError:
+            return
+
+    def _render(self, battle_id: Optional[str] = None) -> Dict[str, List[str]]:
+        logs: Dict[str, BattleLog] = {}
+        result: Dict[str, List[str]] = {}
+        for record in self._records(battle_id):
+            key = record.get("b")
+            lines = result.setdefault(key, [])
+            if "l" in record:
+                lines.extend(record["l"])
+                continue
+            log = logs.get(key)
+            if log is None:
+                log = logs[key] = BattleLog(capacity=1)
+            if "a" in record:
+                log.actors = list(record["a"])
+            if "e" in record:
+                lines.append(log.render_event(log.decode_event(record["e"])))
+        return {k: v for k, v in result.items() if v}
+
+    def read_battle(self, battle_id: str) -> List[str]:
+        """Render one battle's history; other battles' records are skipped unparsed."""
+        return self._render(battle_id).get(battle_id, [])
+
+    def battle_ids(self) -> Iterator[str]:
+        """Every battle with history, in the order it first appears."""
+        seen = set()
+        for record in self._records():
+            battle_id = record.get("b")
+            if battle_id not in seen and (record.get("l") or "e" in record):
+                seen.add(battle_id)
+                yield battle_id
+
+    def read(self) -> Dict[str, List[str]]:
+        """Render the whole file back into ``battle_id -> [lines]``; prefer :meth:`read_battle`."""
+        return self._render()
+
+
+class BattleHistory(Mapping):
+    """``battle_id -> [lines]`` over a history stream, read one battle per lookup.
+
+    Nothing is held in memory, so it serves any number of finished battles.
+    """
+
+    def __init__(self, stream: BattleHistoryStream):
+        self.stream = stream
+
+    def __getitem__(self, battle_id: str) -> List[str]:
+        lines = self.stream.read_battle(battle_id)
+        if not lines:
+            raise KeyError(battle_id)
+        return lines
+
+    def __contains__(self, battle_id: object) -> bool:
+        return isinstance(battle_id, str) and any(
+            record.get("l") or "e" in record for record in self.stream._records(battle_id)
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return self.stream.battle_ids()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.stream.battle_ids())
@@ -1,26 +1,465 @@
+"""
+Battle Persistence for HCShinobi
+Snapshots active battles to disk and recovers them after a restart.
+
+Layout under ``<data_dir>/battles/state``:
+
+* ``snapshots/<battle_id>.json`` - one compact snapshot per active battle.
+  Only battles marked dirty since the last checkpoint are rewritten.
+* ``turns.wal`` - append-only JSON lines, one record per turn, written by
+  :meth:`BattlePersistence.record_turn`.  A turn record holds only what the
+  turn changed (HP, turn pointer, the new input and log events).  A
+  checkpoint rewrites the dirty snapshots and truncates the log.
+* ``history.jsonl`` - append-only battle history.  Structured logs of active
+  battles stream into it event by event (see :mod:`.log`); other logs are
+  written when the battle is added to history.  It is read back one battle
+  at a time, so only the last ``HISTORY_CACHE_SIZE`` logs are held in memory.
+
+On load the snapshots are read and the write-ahead log is replayed on top of
+them, so a crash between checkpoints loses at most the turn being written.
+Battles are either :class:`BattleState` objects or the plain ``battle_data``
+dicts used by the PvP cog; both round-trip through the same files.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..character import Character
+from .log import (
+    BattleHistory,
+    BattleHistoryStream,
+    BattleLog,
+    decode_log,
+    encode_log,
+    export_log_since,
+    log_total,
+    replay_log,
+)
+from .state import BattleParticipant, BattleState
+
+logger = logging.getLogger(__name__)
+
+_CHARACTER_DEFAULTS = {f.name: getattr(Character(id="", name=""), f.name) for f in fields(Character)}
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_character(character: Character) -> Dict[str, Any]:
+    """Only the fields that differ from a freshly created character."""
+    encoded = {"id": character.id, "name": character.name}
+    for name, default in _CHARACTER_DEFAULTS.items():
+        value = getattr(character, name)
+        if name not in encoded and value != default:
+            encoded[name] = value
+    return encoded
+
+
+def decode_character(data: Dict[str, Any]) -> Character:
+    known = {k: v for k, v in data.items() if k in _CHARACTER_DEFAULTS}
+    return Character(**known)
+
+
+def encode_participant(participant: BattleParticipant) -> List[Any]:
+    return [participant.id, encode_character(participant.character), participant.current_hp, list(participant.effects)]
+
+
+def decode_participant(data: List[Any]) -> BattleParticipant:
+    pid, character, current_hp, effects = data
+    return BattleParticipant(id=pid, character=decode_character(character), current_hp=current_hp, effects=effects)
+
+
+def encode_battle(battle: Any) -> Dict[str, Any]:
+    """Compact, JSON-safe encoding of a :class:`BattleState` or a PvP ``battle_data`` dict."""
+    if isinstance(battle, dict):
+        data = {k: v for k, v in battle.items() if k != "battle_log"}
+        return {"k": "d", "v": data, "l": encode_log(battle.get("battle_log", []))}
+    return {
+        "k": "s",
+        "i": battle.id,
+        "a": encode_participant(battle.attacker),
+        "d": encode_participant(battle.defender),
+        "c": battle.current_turn_player_id,
+        "n": battle.turn_number,
+        "l": encode_log(battle.battle_log),
+        "t": battle.last_action.isoformat(),
+        "x": battle.is_active,
+        "w": battle.winner_id,
+        "r": battle.end_reason,
+    }
+
+
+def decode_battle(data: Dict[str, Any]) -> Any:
+    if data.get("k") == "d":
+        battle = dict(data["v"])
+        if "l" in data:
+            actors = [battle.get(side, {}).get("name", "") for side in ("challenger", "opponent")]
+            battle["battle_log"] = decode_log(data["l"], actors)
+        return battle
+    attacker, defender = decode_participant(data["a"]), decode_participant(data["d"])
+    return BattleState(
+        attacker=attacker,
+        defender=defender,
+        current_turn_player_id=data["c"],
+        turn_number=data["n"],
+        battle_log=decode_log(data["l"], [attacker.character.name, defender.character.name]),
+        last_action=datetime.fromisoformat(data["t"]),
+        is_active=data["x"],
+        winner_id=data["w"],
+        end_reason=data["r"],
+        id=data["i"],
+    )
+
+
+_MISSING = object()
+
+
+def battle_fields(battle: Dict[str, Any]) -> Dict[str, Any]:
+    """A detached copy of a PvP ``battle_data`` dict without its log, to diff the next turn against."""
+    return copy.deepcopy({k: v for k, v in battle.items() if k != "battle_log"})
+
+
+def diff_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """What changed from ``previous`` to ``current``.
+
+    ``v`` holds replaced values and ``m`` the diffs of nested dicts. ``a`` holds
+    only the new tail of a list that grew, and ``x`` the removed keys. A PvP
+    turn therefore records the fighters' HP, the turn pointer and the new
+    ``[action, actor, jutsu, ...]`` input, not the whole battle.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in current.items():
+        if key == "battle_log":
+            continue
+        old = previous.get(key, _MISSING)
+        if old == value:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            delta.setdefault("m", {})[key] = diff_fields(old, value)
+        elif isinstance(value, list) and isinstance(old, list) and len(old) < len(value) and value[:len(old)] == old:
+            delta.setdefault("a", {})[key] = value[len(old):]
+        else:
+            delta.setdefault("v", {})[key] = value
+    removed = [key for key in previous if key not in current and key != "battle_log"]
+    if removed:
+        delta["x"] = removed
+    return delta
+
+
+def patch_fields(target: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    """Apply a :func:`diff_fields` delta to ``target`` in place."""
+    target.update(delta.get("v", {}))
+    for key, nested in delta.get("m", {}).items():
+        patch_fields(target.setdefault(key, {}), nested)
+    for key, tail in delta.get("a", {}).items():
+        target.setdefault(key, []).extend(tail)
+    for key in delta.get("x", ()):
+        target.pop(key, None)
+
+
+def encode_turn(battle: Any, log_start: int, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Per-turn delta: changed fields plus log entries from ``log_start`` on.
+
+    For a PvP dict, ``previous`` is its :func:`battle_fields` as of the last record.
+    """
+    if isinstance(battle, dict):
+        log = export_log_since(battle.get("battle_log", []), log_start)
+        if previous is None:
+            return {"k": "d", "v": {k: v for k, v in battle.items() if k != "battle_log"}, "l": log, "o": log_start}
+        return {"k": "d", "p": diff_fields(previous, battle), "l": log, "o": log_start}
+    return {
+        "k": "s",
+        "h": [battle.attacker.current_hp, battle.defender.current_hp],
+        "e": [list(battle.attacker.effects), list(battle.defender.effects)],
+        "c": battle.current_turn_player_id,
+        "n": battle.turn_number,
+        "l": export_log_since(battle.battle_log, log_start),
+        "o": log_start,
+        "t": battle.last_action.isoformat(),
+        "x": battle.is_active,
+        "w": battle.winner_id,
+        "r": battle.end_reason,
+    }
+
+
+def apply_turn(battle: Any, record: Dict[str, Any]) -> None:
+    """Replay one :func:`encode_turn` record onto ``battle`` in place."""
+    offset = record.get("o", 0)
+    if isinstance(battle, dict):
+        if "p" in record:
+            patch_fields(battle, record["p"])
+        else:
+            battle.update(record["v"])
+        replay_log(battle.setdefault("battle_log", []), record["l"], offset)
+        return
+    battle.attacker.current_hp, battle.defender.current_hp = record["h"]
+    battle.attacker.effects, battle.defender.effects = record["e"]
+    battle.current_turn_player_id = record["c"]
+    battle.turn_number = record["n"]
+    replay_log(battle.battle_log, record["l"], offset)
+    battle.last_action = datetime.fromisoformat(record["t"])
+    battle.is_active = record["x"]
+    battle.winner_id = record["w"]
+    battle.end_reason = record["r"]
+
+
+def _battle_log(battle: Any):
+    if isinstance(battle, dict):
+        return battle.get("battle_log", [])
+    return battle.battle_log
+
+
 class BattlePersistence:
-    def __init__(self, data_dir: str):
+    # Turns recorded before a checkpoint is taken automatically.
+    CHECKPOINT_INTERVAL = 50
+    # Finished battles whose logs stay in memory; older ones live only on disk.
+    HISTORY_CACHE_SIZE = 100
+
+    def __init__(self, data_dir: str, checkpoint_interval: int = CHECKPOINT_INTERVAL):
         self.data_dir = data_dir
         self.active_battles = {}
-        self.battle_history = {}
+        self.battle_history: "OrderedDict[str, Any]" = OrderedDict()
+        self.checkpoint_interval = checkpoint_interval
+
+        self.state_dir = Path(data_dir) / "battles" / "state"
+        self.snapshot_dir = self.state_dir / "snapshots"
+        self.wal_path = self.state_dir / "turns.wal"
+        self.history_path = self.state_dir / "history.jsonl"
+
+        self._dirty: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._log_lengths: Dict[str, int] = {}
+        # PvP dicts as of their last WAL record, so each turn only writes what changed.
+        self._recorded: Dict[str, Dict[str, Any]] = {}
+        self._wal_records = 0
+        self.history_stream = BattleHistoryStream(self.history_path)
+        # Called with (battle_id, battle) when a battle becomes active and (battle_id, None) when it closes.
+        self._active_listeners: List[Callable[[str, Any], None]] = []
+        self._battles_restored = False
+
+    # ------------------------------------------------------------------
+    # Active battles
+    # ------------------------------------------------------------------
+
+    def add_active_listener(self, listener: Callable[[str, Any], None]) -> None:
+        """Register a callback for battles becoming active or closing, e.g. to schedule their timeouts."""
+        self._active_listeners.append(listener)
+
+    def _notify_active(self, battle_id: str, battle_state) -> None:
+        for listener in self._active_listeners:
+            listener(battle_id, battle_state)
 
     async def add_active_battle(self, battle_id: str, battle_state):
         self.active_battles[battle_id] = battle_state
+        self._removed.discard(battle_id)
+        self._write_wal({"op": "open", "b": battle_id, "s": encode_battle(battle_state)})
+        self._log_lengths[battle_id] = log_total(_battle_log(battle_state))
+        self._remember(battle_id, battle_state)
+        self._dirty.add(battle_id)
+        self._stream_history(battle_id, battle_state)
+        self._notify_active(battle_id, battle_state)
+
+    async def store_active_battle(self, battle_id: str, battle_state):
+        """Register a new battle and snapshot it right away."""
+        await self.add_active_battle(battle_id, battle_state)
+        await self.save_active_battles()
+
+    def mark_dirty(self, battle_id: str) -> None:
+        """Flag a battle for the next checkpoint without writing a turn record."""
+        if battle_id in self.active_battles:
+            self._dirty.add(battle_id)
+
+    async def record_turn(self, battle_id: str, battle_state=None):
+        """Append a write-ahead record for the battle's latest turn."""
+        battle_state = battle_state if battle_state is not None else self.active_battles.get(battle_id)
+        if battle_state is None:
+            return
+        if battle_id not in self.active_battles:
+            await self.add_active_battle(battle_id, battle_state)
+            return
+        self.active_battles[battle_id] = battle_state
+        log = _battle_log(battle_state)
+        log_start = min(self._log_lengths.get(battle_id, 0), log_total(log))
+        record = encode_turn(battle_state, log_start, self._recorded.get(battle_id))
+        self._write_wal({"op": "turn", "b": battle_id, "s": record})
+        self._log_lengths[battle_id] = log_total(log)
+        if "p" in record:
+            patch_fields(self._recorded[battle_id], copy.deepcopy(record["p"]))
+        else:
+            self._remember(battle_id, battle_state)
+        self._dirty.add(battle_id)
+        if self._wal_records >= self.checkpoint_interval:
+            await self.save_active_battles()
+
+    def _remember(self, battle_id: str, battle: Any) -> None:
+        if isinstance(battle, dict):
+            self._recorded[battle_id] = battle_fields(battle)
 
     async def remove_active_battle(self, battle_id: str):
-        self.active_battles.pop(battle_id, None)
+        if self.active_battles.pop(battle_id, None) is None:
+            return
+        self._write_wal({"op": "close", "b": battle_id})
+        self._log_lengths.pop(battle_id, None)
+        self._recorded.pop(battle_id, None)
+        self._dirty.discard(battle_id)
+        self._removed.add(battle_id)
+        self._notify_active(battle_id, None)
 
     async def load_active_battles(self):
+        """Return active battles, restoring snapshots and replaying the WAL on first use."""
+        if not self._battles_restored:
+            self._battles_restored = True
+            for battle_id, battle in self._restore().items():
+                if battle_id not in self.active_battles and battle_id not in self._removed:
+                    self.active_battles[battle_id] = battle
+                    self._log_lengths[battle_id] = log_total(_battle_log(battle))
+                    self._remember(battle_id, battle)
+                    self._stream_history(battle_id, battle, replay=False)
+                    self._notify_active(battle_id, battle)
         return self.active_battles
 
     async def save_active_battles(self):
-        pass
+        """Checkpoint: rewrite dirty snapshots, drop removed ones and truncate the WAL."""
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            for battle_id in list(self._dirty):
+                battle = self.active_battles.get(battle_id)
+                if battle is not None:
+                    self._write_snapshot(battle_id, battle)
+                self._dirty.discard(battle_id)
+            for battle_id in list(self._removed):
+                try:
+                    self._snapshot_path(battle_id).unlink()
+                except FileNotFoundError:
+                    pass
+                self._removed.discard(battle_id)
+            if self.wal_path.exists():
+                self.wal_path.write_text("", encoding="utf-8")
+            self._wal_records = 0
+        except OSError as e:
+            logger.error(f"Failed to checkpoint active battles: {e}")
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
 
     async def add_battle_to_history(self, battle_id: str, battle_state):
-        self.battle_history.setdefault(battle_id, []).extend(battle_state.battle_log)
+        log = _battle_log(battle_state)
+        if isinstance(log, BattleLog) and log.history is self.history_stream and log.battle_id == battle_id:
+            # Every event already streamed to disk while the battle ran.
+            self.history_stream.finish(battle_id)
+        elif isinstance(log, BattleLog):
+            self.history_stream.write_log(battle_id, log)
+        else:
+            self.history_stream.write_lines(battle_id, list(log))
+        self.history_stream.flush()
+
+        # Keep only the most recent battles in memory.  A structured log is kept
+        # as is (bounded by its capacity, rendered when read); text is kept as text.
+        previous = self.battle_history.pop(battle_id, None)
+        if previous is not None:
+            entries = list(previous) + list(log)
+            limit = getattr(log, "capacity", None)
+            log = entries[-limit:] if limit else entries
+        elif not isinstance(log, BattleLog):
+            log = list(log)
+        self.battle_history[battle_id] = log
+        while len(self.battle_history) > self.HISTORY_CACHE_SIZE:
+            self.battle_history.popitem(last=False)
 
-    async def load_battle_history(self):
-        return self.battle_history
+    async def load_battle_history(self) -> BattleHistory:
+        """Every battle's full log as text, read from the history file one battle per lookup."""
+        return BattleHistory(self.history_stream)
 
     async def save_battle_history(self):
-        pass
+        self.history_stream.flush()
+
+    def _stream_history(self, battle_id: str, battle_state, replay: bool = True) -> None:
+        log = _battle_log(battle_state)
+        if not isinstance(log, BattleLog) or log.history is not None:
+            return
+        if replay:
+            log.attach_history(self.history_stream, battle_id)
+        else:
+            # Restored logs were streamed before the restart; only new events follow.
+            log.history, log.battle_id = self.history_stream, battle_id
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _snapshot_path(self, battle_id: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(battle_id))
+        return self.snapshot_dir / f"{safe}.json"
+
+    def _write_snapshot(self, battle_id: str, battle: Any) -> None:
+        path = self._snapshot_path(battle_id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_dumps({"b": battle_id, "s": encode_battle(battle)}))
+        os.replace(tmp, path)
+
+    def _write_wal(self, record: Dict[str, Any]) -> None:
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.wal_path, "a", encoding="utf-8") as f:
+                f.write(_dumps(record) + "\n")
+                f.flush()
+            self._wal_records += 1
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to write battle WAL record: {e}")
+
+    @staticmethod
+    def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
+        records = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A torn final line from a crash mid-write.
+                        logger.warning(f"Skipping unreadable record in {path}")
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _restore(self) -> Dict[str, Any]:
+        battles: Dict[str, Any] = {}
+        if self.snapshot_dir.is_dir():
+            for path in self.snapshot_dir.glob("*.json"):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        record = json.load(f)
+                    battles[record["b"]] = decode_battle(record["s"])
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping unreadable battle snapshot {path}: {e}")
+
+        for record in self._read_jsonl(self.wal_path):
+            battle_id, op = record.get("b"), record.get("op")
+            try:
+                if op == "open":
+                    battles[battle_id] = decode_battle(record["s"])
+                elif op == "turn" and battle_id in battles:
+                    apply_turn(battles[battle_id], record["s"])
+                elif op == "close":
+                    battles.pop(battle_id, None)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping bad WAL record for battle {battle_id}: {e}")
+
+        # Anything replayed from the WAL must reach a snapshot at the next checkpoint.
+        self._dirty.update(battles)
+        return battles
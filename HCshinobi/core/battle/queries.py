@@ -0,0 +1,155 @@
+"""
+Battle Analytics Queries for HCShinobi
+Vectorised group-by aggregations over the columnar battle history.
+
+Each query wraps the :class:`~.analytics.BattleAnalytics` columns as NumPy
+views without copying them (``np.frombuffer``). It masks the rows it needs,
+then groups with ``np.unique(..., return_inverse=True)`` and ``np.bincount``.
+No Python loop runs per battle, so a balance dashboard over a million
+battles needs no rescan of the JSON history. Results are small dataclasses
+of plain numbers. No view outlives the call, so the store can keep
+appending.
+
+NumPy is optional, as it is for the batch simulator. Queries raise
+``RuntimeError`` without it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .analytics import WINNER, BattleAnalytics, FixedBytes
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+@dataclass
+class JutsuStat:
+    name: str
+    battles: int
+    damage: int
+    winning_damage: int  # dealt by the side that went on to win
+
+    @property
+    def contribution(self) -> float:
+        """Share of this jutsu's damage that was dealt on the winning side."""
+        return self.winning_damage / self.damage if self.damage else 0.0
+
+
+@dataclass
+class LengthBucket:
+    low: int
+    high: int
+    battles: int
+    mean_turns: float
+    max_turns: int
+
+
+@dataclass
+class ModeSummary:
+    mode: str
+    battles: int
+    mean_turns: float
+    decided: int
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+
+def _require() -> None:
+    if np is None:
+        raise RuntimeError("Battle analytics queries require numpy (pip install numpy)")
+
+
+def _view(column):
+    buffer = column.data if isinstance(column, FixedBytes) else column
+    return np.frombuffer(buffer, dtype=np.dtype(column.typecode))
+
+
+def group_by(keys, *values) -> Tuple["np.ndarray", "np.ndarray", List["np.ndarray"]]:
+    """Distinct ``keys``, how many rows each has, and the per-key sum of each of ``values``."""
+    groups, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    sums = [np.bincount(inverse, weights=v, minlength=len(groups)) for v in values]
+    return groups, counts, sums
+
+
+def battle_mask(store: BattleAnalytics, mode: Optional[str] = None, since: Optional[float] = None):
+    """Boolean mask over battle rows: ``mode`` only (None for all) that ended at or after ``since``."""
+    _require()
+    keep = np.ones(len(store), dtype=bool)
+    if mode is not None:
+        keep &= _view(store.battles["mode"]) == store.code_of("mode", mode)
+    if since is not None:
+        keep &= _view(store.battles["ended_at"]) >= since
+    return keep
+
+
+def jutsu_contribution(store: BattleAnalytics, mode: Optional[str] = None, since: Optional[float] = None,
+                       min_battles: int = 1) -> List[JutsuStat]:
+    """Per-jutsu damage in decided battles, highest winning-side share first."""
+    keep = battle_mask(store, mode, since) & (_view(store.battles["winner"]) != store.code_of("player", ""))
+    rows = _view(store.damage["row"])
+    selected = keep[rows]
+    if not selected.any():
+        return []
+    rows = rows[selected].astype(np.int64)
+    damage = _view(store.damage["damage"])[selected].astype(np.float64)
+    won = damage * (_view(store.damage["side"])[selected] == WINNER)
+    jutsu, inverse = np.unique(_view(store.damage["jutsu"])[selected], return_inverse=True)
+    total = np.bincount(inverse, weights=damage, minlength=len(jutsu))
+    winning = np.bincount(inverse, weights=won, minlength=len(jutsu))
+    # A jutsu both sides used in one battle still counts that battle once.
+    pairs = np.unique(rows * len(jutsu) + inverse)
+    battles = np.bincount(pairs % len(jutsu), minlength=len(jutsu))
+
+    share = np.divide(winning, total, out=np.zeros_like(total), where=total > 0)
+    order = np.lexsort((-total, -share))
+    return [JutsuStat(store.lookup("jutsu", int(jutsu[i])), int(battles[i]), int(total[i]), int(winning[i]))
+            for i in order if battles[i] >= min_battles]
+
+
+def length_by_level(store: BattleAnalytics, mode: Optional[str] = "pvp", bracket: int = 10,
+                    since: Optional[float] = None) -> List[LengthBucket]:
+    """Battle length grouped into ``bracket``-wide level bands of the two fighters' average level."""
+    keep = battle_mask(store, mode, since)
+    if not keep.any():
+        return []
+    winner = _view(store.battles["winner_level"])[keep].astype(np.int64)
+    loser = _view(store.battles["loser_level"])[keep].astype(np.int64)
+    level = np.where(loser > 0, (winner + loser) // 2, winner)
+    turns = _view(store.battles["turns"])[keep]
+    bands, counts, (total,) = group_by(level // bracket, turns)
+    longest = np.zeros(len(bands), dtype=np.int64)
+    np.maximum.at(longest, np.searchsorted(bands, level // bracket), turns)
+    return [LengthBucket(int(b) * bracket, int(b) * bracket + bracket - 1, int(n), float(t / n), int(m))
+            for b, n, t, m in zip(bands, counts, total, longest)]
+
+
+def mode_summary(store: BattleAnalytics, since: Optional[float] = None) -> List[ModeSummary]:
+    """Battles, average length, decided battles and end reasons for every mode, busiest first."""
+    keep = battle_mask(store, since=since)
+    if not keep.any():
+        return []
+    modes = _view(store.battles["mode"])[keep].astype(np.int64)
+    reasons = _view(store.battles["reason"])[keep].astype(np.int64)
+    decided = (_view(store.battles["winner"])[keep] != store.code_of("player", "")).astype(np.float64)
+    groups, counts, (turns, won) = group_by(modes, _view(store.battles["turns"])[keep], decided)
+    width = len(store.strings["reason"])
+    pairs, pair_counts, _ = group_by(modes * width + reasons)
+    summaries = {int(m): ModeSummary(store.lookup("mode", int(m)), int(n), float(t / n), int(w))
+                 for m, n, t, w in zip(groups, counts, turns, won)}
+    for pair, n in zip(pairs, pair_counts):
+        mode, reason = divmod(int(pair), width)
+        summaries[mode].reasons[store.lookup("reason", reason) or "unknown"] = int(n)
+    return sorted(summaries.values(), key=lambda s: -s.battles)
+
+
+def find_battle(store: BattleAnalytics, battle_id: str) -> Optional[int]:
+    """Row of the most recent battle recorded under ``battle_id``, or None."""
+    _require()
+    column = store.battles["battle"]
+    rows = np.flatnonzero(_view(column) == column.pack(battle_id).rstrip(b"\0"))
+    return int(rows[-1]) if len(rows) else None
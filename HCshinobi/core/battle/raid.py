@@ -0,0 +1,283 @@
+"""
+Raid Engine for HCShinobi
+Guild-wide Solomon raids: one shared boss, buffered actions, batched ticks.
+
+Each guild has at most one :class:`Raid`. Its ``boss`` dict is the only copy
+of the boss's state. Every player who joins adds a shard of the boss's base
+HP to the pool, so a raid of thirty lasts about as long as thirty solo
+fights. ``/raid attack`` does not touch the boss. It only records the
+player's jutsu in ``Raid.pending``; a second action in the same tick
+replaces the first. :meth:`RaidEngine.tick` resolves every pending action
+in one pass. It tallies each player's damage for the reward split, then
+picks a single counter-attack against the player with the most damage
+dealt. Submitting is a dict write and a tick is linear in the actions it
+resolves, so bursts of clicks cost nothing until the next tick.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from ..boss_battle_system import solomon_phase_attack, solomon_strike, solomon_table
+from ..boss_tables import BossTable
+from .engine import TurnEngine, TurnState, VarianceDamage
+from .registry import BattleRegistry, new_battle_id
+
+logger = logging.getLogger(__name__)
+
+RAID_LOG_LINES = 20
+
+# Per-hit log lines would be noise with dozens of raiders; ticks log one summary line.
+RAID_STRIKE = VarianceDamage()
+RAID_COUNTER_TEXT = "🔥 **Solomon** uses **{jutsu}** on **{target}** - **{damage} damage!**"
+
+
+class RaidError(Exception):
+    """A raid action that cannot be taken; the message is shown to the player."""
+
+
+@dataclass
+class Raid:
+    raid_id: str
+    key: Any
+    boss: Dict[str, Any]
+    table: BossTable  # phases and counter damage, also the counter's damage model
+    shard_hp: int
+    channel_id: Optional[int] = None
+    message_id: Optional[int] = None
+    players: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    damage: Dict[str, int] = field(default_factory=dict)
+    pending: Dict[str, str] = field(default_factory=dict)
+    log: Deque[str] = field(default_factory=lambda: deque(maxlen=RAID_LOG_LINES))
+    ticks: int = 0
+    last_action: float = 0.0
+    status: str = "active"  # "victory", "defeat" or "expired" once over
+
+    @property
+    def active(self) -> bool:
+        return self.status == "active"
+
+    @property
+    def phase(self) -> Dict[str, Any]:
+        max_hp = self.boss["max_hp"]
+        return self.table.phase(self.boss["hp"] / max_hp if max_hp else 1.0)
+
+    def standing(self) -> List[str]:
+        return [uid for uid, character in self.players.items() if character["hp"] > 0]
+
+    def top(self, count: int = 5) -> List[tuple]:
+        """``(user_id, damage)`` of the biggest contributors."""
+        return sorted(self.damage.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def split(self, total: int) -> Dict[str, int]:
+        """Share ``total`` by damage dealt; largest remainders get the leftover units."""
+        dealt = {uid: dmg for uid, dmg in self.damage.items() if dmg > 0}
+        pool = sum(dealt.values())
+        if not pool:
+            return {}
+        exact = {uid: total * dmg / pool for uid, dmg in dealt.items()}
+        shares = {uid: int(value) for uid, value in exact.items()}
+        leftover = total - sum(shares.values())
+        for uid in sorted(exact, key=lambda uid: exact[uid] - shares[uid], reverse=True)[:leftover]:
+            shares[uid] += 1
+        return shares
+
+
+@dataclass
+class RaidTick:
+    number: int
+    actions: int
+    damage: int
+    lines: List[str]
+
+
+TickHandler = Callable[[Raid, RaidTick], Awaitable[None]]
+
+
+class RaidEngine:
+    """Owns the open raids and resolves their buffered actions once per tick."""
+
+    TICK_INTERVAL = 2.0
+    REGEN = 0.02           # of max HP per tick in which anyone acted, like the solo fight's 2% per turn
+    IDLE_TIMEOUT = 900.0   # raids nobody has acted in for this long expire
+
+    def __init__(self, registry: Optional[BattleRegistry] = None, on_tick: Optional[TickHandler] = None,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic):
+        self.registry = registry if registry is not None else BattleRegistry()
+        self.on_tick = on_tick
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.turn_engine = TurnEngine()
+        self.raids: Dict[Any, Raid] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def raid(self, key: Any) -> Optional[Raid]:
+        return self.raids.get(key)
+
+    def open(self, key: Any, boss_data: Dict[str, Any], channel_id: Optional[int] = None) -> Raid:
+        """Summon the boss for ``key`` (a guild); its HP grows as players join."""
+        existing = self.raids.get(key)
+        if existing is not None and existing.active:
+            raise RaidError("A raid is already underway here!")
+        shard = int(boss_data.get("max_hp", boss_data.get("hp", 1500)))
+        boss = {"id": boss_data.get("id", "solomon"), "name": boss_data.get("name", "Solomon"),
+                "level": boss_data.get("level", 70), "hp": 0, "max_hp": 0}
+        raid_id = self.registry.register("boss", [], battle_id=new_battle_id("raid"))
+        raid = Raid(raid_id, key, boss, solomon_table(boss_data, text=RAID_COUNTER_TEXT), shard,
+                    channel_id=channel_id, last_action=self.clock())
+        self.registry.get(raid_id).data = raid
+        self.raids[key] = raid
+        return raid
+
+    def join(self, key: Any, user_id: Any, character: Dict[str, Any]) -> Raid:
+        """Add a player and their HP shard; raises :class:`BattleConflictError` if they fight Solomon elsewhere."""
+        raid = self._active(key)
+        user_id = str(user_id)
+        if user_id in raid.players:
+            raise RaidError("You have already joined this raid!")
+        self.registry.join(raid.raid_id, user_id)
+        raid.players[user_id] = {
+            "id": user_id,
+            "name": character.get("name", user_id),
+            "hp": character.get("hp", 100),
+            "max_hp": character.get("max_hp", character.get("hp", 100)),
+            "ninjutsu": character.get("ninjutsu", 0),
+            "jutsu": list(character.get("jutsu") or ["Basic Attack"]),
+        }
+        raid.damage.setdefault(user_id, 0)
+        raid.boss["hp"] += raid.shard_hp
+        raid.boss["max_hp"] += raid.shard_hp
+        raid.log.append(f"🛡️ **{raid.players[user_id]['name']}** joins the raid!")
+        return raid
+
+    def submit(self, key: Any, user_id: Any, jutsu: str) -> None:
+        """Buffer a player's action for the next tick."""
+        raid = self._active(key)
+        player = raid.players.get(str(user_id))
+        if player is None:
+            raise RaidError("You have not joined this raid!")
+        if player["hp"] <= 0:
+            raise RaidError("You have fallen and cannot act until the raid ends.")
+        if jutsu not in player["jutsu"]:
+            raise RaidError(f"You don't know the jutsu **{jutsu}**!")
+        raid.pending[player["id"]] = jutsu
+        raid.last_action = self.clock()
+
+    def tick(self, raid: Raid) -> RaidTick:
+        """Resolve every buffered action, then one boss counter-attack."""
+        actions, raid.pending = raid.pending, {}
+        raid.ticks += 1
+        boss = raid.boss
+        phase = raid.phase
+        lines: List[str] = []
+        acting = [uid for uid in actions if raid.players[uid]["hp"] > 0]
+        dealt = 0
+
+        if acting:
+            dealt_before = sum(raid.damage[uid] for uid in acting)
+            state = TurnState.of(boss, *(raid.players[uid] for uid in acting), log=lines, rng=self.rng,
+                                 turn=raid.ticks, teams=[1] + [0] * len(acting))
+            for index, uid in enumerate(acting, start=1):
+                attack = solomon_strike(raid.players[uid], actions[uid])
+                hit = self.turn_engine.attack(state, index, attack, RAID_STRIKE, target=0)
+                raid.damage[uid] += hit.damage
+                if state.winner is not None:
+                    break
+            dealt = sum(raid.damage[uid] for uid in acting) - dealt_before
+            lines.append(f"⚔️ **{len(acting)}** shinobi strike for **{dealt:,}** damage!")
+
+        if boss["hp"] <= 0:
+            raid.status = "victory"
+            lines.append(f"🏆 **{boss['name']}** has fallen!")
+        elif acting:
+            self._counter_attack(raid, phase, lines)
+            new_phase = raid.phase
+            if new_phase != phase:
+                lines.append(f"🔥 **PHASE TRANSITION:** {new_phase.get('name', 'Unknown')}")
+            if not raid.standing():
+                raid.status = "defeat"
+                lines.append("💀 Every raider has fallen...")
+
+        raid.log.extend(lines)
+        return RaidTick(raid.ticks, len(acting), dealt, lines)
+
+    def _counter_attack(self, raid: Raid, phase: Dict[str, Any], lines: List[str]) -> None:
+        boss = raid.boss
+        jutsu_pool = phase.get("jutsu_pool") or ["Basic Attack"]
+        jutsu = self.rng.choice(jutsu_pool)
+        if "Kamui Phase" in jutsu:
+            lines.append(f"🔥 **Solomon** uses **{jutsu}** - **DODGED!**")
+        else:
+            standing = raid.standing()
+            target_id = max(standing, key=lambda uid: raid.damage[uid])  # ties: earliest to join
+            target = raid.players[target_id]
+            state = TurnState.of(boss, target, log=lines, rng=self.rng, turn=raid.ticks)
+            self.turn_engine.attack(state, 0, solomon_phase_attack(jutsu, phase), raid.table)
+            if target["hp"] <= 0:
+                lines.append(f"💀 **{target['name']}** has fallen!")
+        if 0 < boss["hp"] < boss["max_hp"]:
+            regen = min(boss["max_hp"] - boss["hp"], int(boss["max_hp"] * self.REGEN))
+            boss["hp"] += regen
+            if regen > 0:
+                lines.append(f"🔥 **Solomon** regenerates **{regen:,} HP**")
+
+    def close(self, key: Any) -> Optional[Raid]:
+        """Forget a raid and free its players to fight Solomon again."""
+        raid = self.raids.pop(key, None)
+        if raid is not None:
+            self.registry.release(raid.raid_id)
+        return raid
+
+    def _active(self, key: Any) -> Raid:
+        raid = self.raids.get(key)
+        if raid is None or not raid.active:
+            raise RaidError("There is no active raid here. Use `/raid open` to summon Solomon!")
+        return raid
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    async def run_once(self) -> None:
+        """Tick every raid with buffered actions and close the ones that ended."""
+        now = self.clock()
+        for key, raid in list(self.raids.items()):
+            if raid.pending:
+                result = self.tick(raid)
+            elif now - raid.last_action >= self.IDLE_TIMEOUT:
+                raid.status = "expired"
+                result = RaidTick(raid.ticks, 0, 0, ["⌛ The raid has dispersed."])
+            else:
+                continue
+            if self.on_tick is not None:
+                try:
+                    await self.on_tick(raid, result)
+                except Exception as e:
+                    logger.error(f"Raid {raid.raid_id} tick handler failed: {e}")
+            if not raid.active:
+                self.close(key)
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.TICK_INTERVAL)
+            await self.run_once()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -0,0 +1,219 @@
+"""
+Battle Registry for HCShinobi
+Collision-free battle IDs and an O(1) user-to-battle index across every mode.
+
+IDs are ULIDs: a millisecond timestamp followed by random bits, in Crockford
+base32. Within one millisecond the random part is incremented, so IDs from
+one process are unique and sort in creation order. They never reuse a freed
+object's address or a dict's length.
+
+:class:`BattleRegistry` maps each battle ID to its participants. It also
+keeps a ``user -> {mode: battle_id}`` index, so asking "is this user already
+fighting" is a dict lookup in any mode. Registering a user who already has
+a battle in the same mode raises :class:`BattleConflictError`. Cogs that key
+their battles by user id can use :meth:`BattleRegistry.user_battles`, a dict
+that claims and releases registry entries as battles are added and removed.
+"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import time
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+
+
+class UlidGenerator:
+    """Monotonic ULIDs: later calls always compare greater, even within one millisecond."""
+
+    def __init__(self, clock: Callable[[], float] = time.time, randbits: Callable[[int], int] = secrets.randbits):
+        self.clock = clock
+        self.randbits = randbits
+        self._last_ms = -1
+        self._last_random = 0
+
+    def __call__(self) -> str:
+        ms = int(self.clock() * 1000)
+        if ms <= self._last_ms:
+            ms = self._last_ms
+            random_part = self._last_random + 1
+            if random_part >> _RANDOM_BITS:  # 2**80 IDs in one millisecond: borrow the next one
+                ms, random_part = ms + 1, self.randbits(_RANDOM_BITS)
+        else:
+            random_part = self.randbits(_RANDOM_BITS)
+        self._last_ms, self._last_random = ms, random_part
+        value = (ms << _RANDOM_BITS) | random_part
+        chars = []
+        for _ in range(26):
+            chars.append(_CROCKFORD[value & 31])
+            value >>= 5
+        return "".join(reversed(chars))
+
+
+_ulid = UlidGenerator()
+
+
+def new_battle_id(prefix: str = "") -> str:
+    """A fresh ULID, optionally tagged with the battle mode (``pvp_01J…``)."""
+    return f"{prefix}_{_ulid()}" if prefix else _ulid()
+
+
+class BattleConflictError(Exception):
+    """A participant already has an active battle in this mode."""
+
+    def __init__(self, user_id: str, mode: str, battle_id: str):
+        super().__init__(f"User {user_id} is already in {mode} battle {battle_id}")
+        self.user_id = user_id
+        self.mode = mode
+        self.battle_id = battle_id
+
+
+@dataclass
+class BattleEntry:
+    battle_id: str
+    mode: str
+    participants: Tuple[str, ...]
+    data: Any = None
+
+
+class BattleRegistry:
+    """Active battles by ID, plus a user -> mode -> battle index."""
+
+    def __init__(self, id_factory: Callable[[str], str] = new_battle_id):
+        self._new_id = id_factory
+        self._battles: Dict[str, BattleEntry] = {}
+        self._users: Dict[str, Dict[str, str]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._battles)
+
+    def __contains__(self, battle_id: str) -> bool:
+        return battle_id in self._battles
+
+    def register(self, mode: str, participants: Iterable[Any], data: Any = None,
+                 battle_id: Optional[str] = None) -> str:
+        """Claim ``participants`` for a new battle in ``mode`` and return its ID."""
+        users = tuple(dict.fromkeys(str(p) for p in participants))
+        for user in users:
+            existing = self._users.get(user, {}).get(mode)
+            if existing is not None:
+                raise BattleConflictError(user, mode, existing)
+        battle_id = battle_id or self._new_id(mode)
+        if battle_id in self._battles:
+            raise ValueError(f"Battle {battle_id} is already registered")
+        self._battles[battle_id] = BattleEntry(battle_id, mode, users, data)
+        for user in users:
+            self._users.setdefault(user, {})[mode] = battle_id
+        self._counts[mode] = self._counts.get(mode, 0) + 1
+        return battle_id
+
+    def join(self, battle_id: str, user_id: Any) -> None:
+        """Claim one more participant for a running battle, e.g. a raider arriving mid-fight."""
+        entry = self._battles[battle_id]
+        user = str(user_id)
+        existing = self._users.get(user, {}).get(entry.mode)
+        if existing == battle_id:
+            return
+        if existing is not None:
+            raise BattleConflictError(user, entry.mode, existing)
+        entry.participants += (user,)
+        self._users.setdefault(user, {})[entry.mode] = battle_id
+
+    def release(self, battle_id: str) -> Optional[BattleEntry]:
+        """Forget a finished battle; its participants are free to fight again."""
+        entry = self._battles.pop(battle_id, None)
+        if entry is None:
+            return None
+        for user in entry.participants:
+            modes = self._users.get(user)
+            if modes is not None and modes.get(entry.mode) == battle_id:
+                del modes[entry.mode]
+                if not modes:
+                    del self._users[user]
+        self._counts[entry.mode] -= 1
+        return entry
+
+    def get(self, battle_id: str) -> Optional[BattleEntry]:
+        return self._battles.get(battle_id)
+
+    def battle_for(self, user_id: Any, mode: str) -> Optional[str]:
+        return self._users.get(str(user_id), {}).get(mode)
+
+    def battles_for(self, user_id: Any) -> Dict[str, str]:
+        """Every active battle of ``user_id`` as ``{mode: battle_id}``."""
+        return dict(self._users.get(str(user_id), {}))
+
+    def in_battle(self, user_id: Any, mode: Optional[str] = None) -> bool:
+        modes = self._users.get(str(user_id))
+        if not modes:
+            return False
+        return mode is None or mode in modes
+
+    def count(self, mode: Optional[str] = None) -> int:
+        return len(self._battles) if mode is None else self._counts.get(mode, 0)
+
+    def user_battles(self, mode: str) -> "UserBattles":
+        return UserBattles(self, mode)
+
+
+class UserBattles(MutableMapping):
+    """A cog's ``user_id -> battle data`` dict whose entries are claimed in the registry.
+
+    Adding a user registers a single-player battle in ``mode``. If the user
+    already fights in that mode elsewhere, this raises
+    :class:`BattleConflictError`. Deleting the user releases the battle.
+    Dict battle data gets a ``battle_id`` key when it has none.
+    """
+
+    def __init__(self, registry: BattleRegistry, mode: str):
+        self.registry = registry
+        self.mode = mode
+        self._data: Dict[str, Any] = {}
+        self._ids: Dict[str, str] = {}
+
+    def __getitem__(self, user_id: Any) -> Any:
+        return self._data[str(user_id)]
+
+    def __setitem__(self, user_id: Any, data: Any) -> None:
+        user_id = str(user_id)
+        battle_id = self._ids.get(user_id)
+        if battle_id is None:
+            battle_id = self.registry.register(self.mode, [user_id], data=data)
+            self._ids[user_id] = battle_id
+        else:
+            self.registry.get(battle_id).data = data
+        if isinstance(data, dict):
+            data.setdefault("battle_id", battle_id)
+        self._data[user_id] = data
+
+    def __delitem__(self, user_id: Any) -> None:
+        user_id = str(user_id)
+        del self._data[user_id]
+        self.registry.release(self._ids.pop(user_id))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def battle_id(self, user_id: Any) -> Optional[str]:
+        return self._ids.get(str(user_id))
+
+    def busy(self, user_id: Any) -> bool:
+        """True when the user fights in this mode here or in another cog sharing the registry."""
+        return self.registry.in_battle(user_id, self.mode)
+
+
+def registry_for(services: Any) -> BattleRegistry:
+    """The container's shared registry, or a private one for a cog running without services."""
+    registry = getattr(services, "battle_registry", None)
+    return registry if isinstance(registry, BattleRegistry) else BattleRegistry()
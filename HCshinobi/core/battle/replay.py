@@ -0,0 +1,160 @@
+"""
+Battle Replays for HCShinobi
+Seeded per-battle RNG streams and compact replay files that re-simulate a fight.
+
+Every PvP battle draws its randomness from its own ``random.Random(seed)``.
+The replay file holds only that seed, the fighters' starting sheets and the
+inputs (which jutsu each player picked, plus the gear and mastery modifiers
+that applied at the time).  :func:`simulate` feeds the inputs back through
+the same turn engine the cog uses live, so the replay reproduces every
+roll and every log line exactly.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import secrets
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .engine import PVP_JUTSU_MULTIPLIERS, Attack, Fighter, RangeDamage, TurnEngine, TurnState
+from .log import BattleLog
+
+logger = logging.getLogger(__name__)
+
+REPLAY_VERSION = 1
+
+# Input opcodes: ["a", actor, jutsu, gear_bonus, mastery], ["b"], ["f", actor], ["t", actor]
+ATTACK, BOT_TURN, FORFEIT, TIMEOUT = "a", "b", "f", "t"
+
+FIGHTER_FIELDS = ("id", "name", "hp", "max_hp", "level", "jutsu")
+
+PVP_PLAYER_DAMAGE = RangeDamage(20, 80, level_factor=2, multipliers=PVP_JUTSU_MULTIPLIERS)
+PVP_BOT_DAMAGE = RangeDamage(15, 60, level_factor=1.5, multipliers=PVP_JUTSU_MULTIPLIERS)  # Slightly weaker than player
+
+
+def new_seed() -> int:
+    return secrets.randbits(63)
+
+
+def pvp_attack_damage(rng: random.Random, level: int, jutsu_name: str,
+                      gear_bonus: int = 0, mastery: float = 1.0) -> int:
+    """Damage of a player's PvP attack; consumes exactly one roll from ``rng``."""
+    attack = Attack(jutsu_name, power=mastery, bonus=gear_bonus)
+    return PVP_PLAYER_DAMAGE.roll(rng, Fighter({"level": level}), None, attack).damage
+
+
+def pvp_bot_attack(rng: random.Random, bot: Dict[str, Any]) -> Tuple[str, int]:
+    """The test bot's jutsu choice and damage; consumes two rolls from ``rng``."""
+    jutsu = rng.choice(bot["jutsu"])
+    return jutsu, PVP_BOT_DAMAGE.roll(rng, Fighter(bot), None, Attack(jutsu)).damage
+
+
+@dataclass
+class BattleReplay:
+    """Everything needed to re-run a battle: seed, starting fighters and inputs."""
+    battle_id: str
+    seed: int
+    fighters: List[Dict[str, Any]]
+    inputs: List[List[Any]] = field(default_factory=list)
+    mode: str = "pvp"
+    version: int = REPLAY_VERSION
+
+    @classmethod
+    def from_battle_data(cls, battle_data: Dict[str, Any]) -> "BattleReplay":
+        return cls(
+            battle_id=battle_data["battle_id"],
+            seed=battle_data["seed"],
+            fighters=battle_data["initial_fighters"],
+            inputs=list(battle_data.get("inputs", [])),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"v": self.version, "m": self.mode, "b": self.battle_id, "s": self.seed,
+                "f": self.fighters, "i": self.inputs}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BattleReplay":
+        return cls(battle_id=data["b"], seed=data["s"], fighters=data["f"], inputs=data.get("i", []),
+                   mode=data.get("m", "pvp"), version=data.get("v", REPLAY_VERSION))
+
+
+def starting_fighters(challenger: Dict[str, Any], opponent: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The static part of both fighter sheets, as stored in the replay."""
+    return [{k: fighter.get(k) for k in FIGHTER_FIELDS} for fighter in (challenger, opponent)]
+
+
+@dataclass
+class ReplayOutcome:
+    log: BattleLog
+    hp: List[int]
+    turns: int
+    winner: Optional[int]
+    end_reason: Optional[str]
+    rng: random.Random
+
+
+def simulate(replay: BattleReplay, log_capacity: Optional[int] = None) -> ReplayOutcome:
+    """Re-run ``replay`` with its seed through the same :class:`TurnEngine` the cog uses."""
+    fighters = [dict(f) for f in replay.fighters]
+    log = BattleLog(actors=[f["name"] for f in fighters], capacity=log_capacity)
+    state = TurnState.of(*fighters, log=log, rng=random.Random(replay.seed))
+    engine = TurnEngine()
+
+    for entry in replay.inputs:
+        op = entry[0]
+        if op in (FORFEIT, TIMEOUT):
+            loser = entry[1]
+            state.winner, state.end_reason = 1 - loser, "forfeit" if op == FORFEIT else "timeout"
+            log.append(f"🏃 {fighters[loser]['name']} forfeited!" if op == FORFEIT
+                       else f"⏰ {fighters[loser]['name']} ran out of time!")
+            break
+
+        if op == ATTACK:
+            _, actor, jutsu, gear_bonus, mastery = entry
+            engine.attack(state, actor, Attack(jutsu, power=mastery, bonus=gear_bonus), PVP_PLAYER_DAMAGE)
+        else:
+            actor = state.active = 1
+            engine.attack(state, actor, Attack(engine.choose_jutsu(state, fighters[actor]["jutsu"])), PVP_BOT_DAMAGE)
+        if state.winner is not None:
+            break
+        state.active = actor
+        engine.advance(state, announce=True)
+
+    return ReplayOutcome(log=log, hp=[f["hp"] for f in fighters], turns=state.turn, winner=state.winner,
+                         end_reason=state.end_reason, rng=state.rng)
+
+
+class ReplayStore:
+    """One compact JSON file per finished battle under ``<data_dir>/battles/replays``."""
+
+    def __init__(self, data_dir: str):
+        self.replay_dir = Path(data_dir) / "battles" / "replays"
+
+    def _path(self, battle_id: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(battle_id))
+        return self.replay_dir / f"{safe}.json"
+
+    def save(self, replay: BattleReplay) -> Optional[Path]:
+        path = self._path(replay.battle_id)
+        try:
+            self.replay_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(replay.to_dict(), f, separators=(",", ":"), ensure_ascii=False)
+            return path
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to save replay {replay.battle_id}: {e}")
+            return None
+
+    def load(self, battle_id: str) -> Optional[BattleReplay]:
+        try:
+            with open(self._path(battle_id), "r", encoding="utf-8") as f:
+                return BattleReplay.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load replay {battle_id}: {e}")
+            return None
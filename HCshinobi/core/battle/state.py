@@ -1,15 +1,23 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List
+from typing import Any
 
 from ..character import Character
+from .effects import EffectSet
+from .log import BattleLog
+from .registry import new_battle_id
 
 @dataclass
 class BattleParticipant:
     id: str
     character: Character
     current_hp: int
-    effects: List[dict] = field(default_factory=list)
+    effects: EffectSet = field(default_factory=EffectSet)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "effects" and not isinstance(value, EffectSet):
+            value = EffectSet(value or [])
+        super().__setattr__(name, value)
 
     @classmethod
     def from_character(cls, character: Character) -> "BattleParticipant":
@@ -21,9 +29,16 @@ class BattleState:
     defender: BattleParticipant
     current_turn_player_id: str
     turn_number: int = 1
-    battle_log: List[str] = field(default_factory=list)
+    battle_log: BattleLog = field(default_factory=BattleLog)
     last_action: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     is_active: bool = True
     winner_id: str | None = None
     end_reason: str | None = None
-    id: str = field(default_factory=lambda: str(id(object())))
+    id: str = field(default_factory=lambda: new_battle_id("battle"))
+
+    def __post_init__(self):
+        actors = [self.attacker.character.name, self.defender.character.name]
+        if not isinstance(self.battle_log, BattleLog):
+            self.battle_log = BattleLog.from_lines(self.battle_log or [], actors)
+        elif not self.battle_log.actors:
+            self.battle_log.actors = actors
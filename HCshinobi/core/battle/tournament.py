@@ -0,0 +1,633 @@
+"""
+Tournament Engine for HCShinobi
+Registration, rating seeds, single- and double-elimination brackets, and simulated AFK matches.
+
+A :class:`Bracket` holds every match as one row of parallel ``array('i')``
+columns: the two slots, the winner, and where the winner and loser go next
+(``match * 2 + slot``). A 1,024-player double-elimination bracket is about
+2,000 rows of ints. Reporting a result writes the two players into their
+next slots and returns the matches that just became ready. Byes are seeded
+to the top seeds and resolve as soon as they are reached, so every round
+costs time in proportion to the matches it plays.
+
+:class:`TournamentEngine` seeds entrants by rating in the standard order,
+so seeds 1 and 2 can only meet in the final. It opens every ready match at
+once. Each open match is a :class:`BattleState` tracked by a
+:class:`BattleLifecycle`, so its deadline runs on the shared scheduler.
+Players fight it out as a normal PvP battle, and the ``BattleEndedEvent``
+settles the match. If the lifecycle times a match out first, the engine
+plays it through the PvP turn engine from a fresh seed. It saves a replay,
+so ``/replay`` shows how the match was decided.
+
+Given a ``data_dir``, the engine keeps one JSON file per tournament with its
+metadata, entrants, the bracket's ``a``/``b``/``winner`` columns and the
+battle id of each open match. Changes are written a moment later in one go.
+:meth:`TournamentEngine.restore` reads the files back after a restart and
+reattaches the open matches to the battles the lifecycle's persistence restored.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..character import Character
+from ..events import BattleEndedEvent, EventBus, GameEvent
+from .lifecycle import BattleLifecycle
+from .persistence import decode_character, encode_character
+from .registry import new_battle_id
+from .replay import ATTACK, BattleReplay, ReplayStore, new_seed, simulate
+from .state import BattleParticipant, BattleState
+
+logger = logging.getLogger(__name__)
+
+SINGLE, DOUBLE = "single", "double"
+FORMATS = (SINGLE, DOUBLE)
+
+EMPTY = -1  # slot still waiting for a player
+BYE = -2    # slot that will never get one
+NOWHERE = -1
+
+# Matches are labelled by round: winners' rounds count up from 1, losers' rounds down from -1.
+GRAND_FINAL = 0
+
+# Simulated matches that are still level after this many turns go to the fighter with more HP left.
+MAX_SIMULATED_TURNS = 200
+
+
+class TournamentError(Exception):
+    """A tournament action that cannot be taken; the message is shown to the player."""
+
+
+def seed_order(size: int) -> List[int]:
+    """0-based seeds in bracket position order for a power-of-two ``size`` (1v8, 4v5, 2v7, 3v6...)."""
+    order = [0]
+    while len(order) < size:
+        total = 2 * len(order) - 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+
+class Bracket:
+    """Every match of a single- or double-elimination bracket as parallel int columns."""
+
+    # Columns that results write; the rest of the layout is rebuilt from the size and format.
+    STATE_COLUMNS = ("a", "b", "winner")
+
+    def __init__(self, players: int, fmt: str = SINGLE):
+        if fmt not in FORMATS:
+            raise TournamentError(f"Unknown format {fmt!r}; use one of {', '.join(FORMATS)}.")
+        if players < 2:
+            raise TournamentError("A tournament needs at least two players.")
+        self.fmt = fmt
+        self.players = players
+        self.size = 1 << (players - 1).bit_length()
+        self.a = array("i")
+        self.b = array("i")
+        self.winner = array("i")
+        self.win_to = array("i")
+        self.lose_to = array("i")
+        self.round = array("i")
+        self.champion = EMPTY
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.a)
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def _add(self, round_number: int, count: int) -> int:
+        start = len(self.a)
+        for column in (self.a, self.b, self.winner, self.win_to, self.lose_to):
+            column.extend([EMPTY] * count)
+        self.round.extend([round_number] * count)
+        return start
+
+    def _build(self) -> None:
+        rounds = self.size.bit_length() - 1
+        winners = [self._add(r, self.size >> r) for r in range(1, rounds + 1)]
+        for r in range(rounds - 1):
+            for j in range(self.size >> (r + 1)):
+                self.win_to[winners[r] + j] = (winners[r + 1] + j // 2) * 2 + j % 2
+        order = seed_order(self.size)
+        for j in range(self.size // 2):
+            top, bottom = order[2 * j], order[2 * j + 1]
+            self.a[j] = top if top < self.players else BYE
+            self.b[j] = bottom if bottom < self.players else BYE
+        if self.fmt == SINGLE:
+            return
+
+        # Losers' bracket: odd rounds pair survivors, even rounds bring in the next winners' round's losers.
+        losers: List[int] = []
+        for r in range(1, rounds):
+            losers.append(self._add(-(2 * r - 1), self.size >> (r + 1)))
+            losers.append(self._add(-(2 * r), self.size >> (r + 1)))
+        final = self._add(GRAND_FINAL, 2)  # the second game is only played if the losers' champion wins
+        if not losers:
+            self.win_to[winners[0]] = final * 2
+            self.lose_to[winners[0]] = final * 2 + 1
+            return
+        for j in range(self.size // 2):
+            self.lose_to[winners[0] + j] = (losers[0] + j // 2) * 2 + j % 2
+        for r in range(1, rounds):
+            minor, major = losers[2 * r - 2], losers[2 * r - 1]
+            count = self.size >> (r + 1)
+            for j in range(count):
+                self.win_to[minor + j] = (major + j) * 2
+                # Alternate the drop order so early opponents do not meet again straight away.
+                drop = count - 1 - j if r % 2 else j
+                self.lose_to[winners[r] + j] = (major + drop) * 2 + 1
+                self.win_to[major + j] = ((losers[2 * r] + j // 2) * 2 + j % 2) if r < rounds - 1 else final * 2 + 1
+        self.win_to[winners[-1]] = final * 2
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def ready(self, match: int) -> bool:
+        return self.winner[match] == EMPTY and self.a[match] != EMPTY and self.b[match] != EMPTY
+
+    def players_of(self, match: int) -> Tuple[int, int]:
+        return self.a[match], self.b[match]
+
+    def open_matches(self) -> List[int]:
+        return [m for m in range(len(self.a)) if self.ready(m)]
+
+    def settle_byes(self) -> List[int]:
+        """Resolve every bye that is ready; returns the matches left for players to fight."""
+        playable: List[int] = []
+        for match in self.open_matches():
+            if self.ready(match):
+                playable.extend(self._advance(match))
+        return playable
+
+    def report(self, match: int, winner: int) -> List[int]:
+        """Record ``winner`` (a seed) for ``match``; returns matches that became playable."""
+        if not self.ready(match):
+            raise TournamentError(f"Match {match + 1} is not waiting for a result.")
+        if winner not in (self.a[match], self.b[match]):
+            raise TournamentError(f"Seed {winner + 1} is not in match {match + 1}.")
+        return self._resolve(match, winner)
+
+    def _advance(self, match: int) -> List[int]:
+        """A ready match with a bye resolves on the spot; otherwise it is playable."""
+        a, b = self.a[match], self.b[match]
+        if a != BYE and b != BYE:
+            return [match]
+        return self._resolve(match, b if a == BYE else a)
+
+    def _resolve(self, match: int, winner: int) -> List[int]:
+        loser = self.b[match] if winner == self.a[match] else self.a[match]
+        self.winner[match] = winner
+        if self.round[match] == GRAND_FINAL:
+            return self._resolve_final(match, winner)
+        if self.win_to[match] == NOWHERE:  # single-elimination final
+            self.champion = winner
+            return []
+        playable: List[int] = []
+        # A bye "loses" too, so the losers' bracket keeps its shape and its byes settle the same way.
+        for player, target in ((winner, self.win_to[match]), (loser, self.lose_to[match])):
+            if target == NOWHERE:
+                continue
+            next_match, slot = divmod(target, 2)
+            (self.a if slot == 0 else self.b)[next_match] = player
+            if self.ready(next_match):
+                playable.extend(self._advance(next_match))
+        return playable
+
+    def _resolve_final(self, match: int, winner: int) -> List[int]:
+        if self.round[match - 1] == GRAND_FINAL:  # the reset game
+            self.champion = winner
+            return []
+        reset = match + 1
+        if winner == self.b[match]:
+            # The winners' champion has only lost once: play the reset game.
+            self.a[reset], self.b[reset] = self.a[match], self.b[match]
+            return [reset]
+        self.a[reset] = self.b[reset] = self.winner[reset] = BYE
+        self.champion = winner
+        return []
+
+    @property
+    def finished(self) -> bool:
+        return self.champion != EMPTY
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"players": self.players, "fmt": self.fmt, "champion": self.champion}
+        for name in self.STATE_COLUMNS:
+            data[name] = getattr(self, name).tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Bracket":
+        bracket = cls(data["players"], data.get("fmt", SINGLE))
+        for name in cls.STATE_COLUMNS:
+            column = array("i", data[name])
+            if len(column) != len(bracket):
+                raise ValueError(f"bracket column {name} has {len(column)} rows, expected {len(bracket)}")
+            setattr(bracket, name, column)
+        bracket.champion = data.get("champion", EMPTY)
+        return bracket
+
+    def label(self, match: int) -> str:
+        round_number = self.round[match]
+        if round_number == GRAND_FINAL:
+            return "Grand Final Reset" if self.round[match - 1] == GRAND_FINAL else "Grand Final"
+        last = self.size.bit_length() - 1
+        if round_number == last:
+            return "Final" if self.fmt == SINGLE else "Winners' Final"
+        if round_number > 0:
+            return f"Round {round_number}"
+        if -round_number == 2 * (last - 1):
+            return "Losers' Final"
+        return f"Losers' Round {-round_number}"
+
+
+@dataclass
+class Tournament:
+    tournament_id: str
+    key: Any
+    name: str
+    fmt: str = SINGLE
+    channel_id: Optional[int] = None
+    organizer_id: Optional[str] = None
+    entrants: Dict[str, Character] = field(default_factory=dict)  # registration order
+    players: List[str] = field(default_factory=list)               # seed order once started
+    seeds: Dict[str, int] = field(default_factory=dict)
+    bracket: Optional[Bracket] = None
+    live: Dict[int, BattleState] = field(default_factory=dict)     # open match -> its battle
+    simulated: int = 0
+    status: str = "registration"  # then "running", then "finished"
+
+    @property
+    def champion(self) -> Optional[str]:
+        if self.bracket is None or not self.bracket.finished:
+            return None
+        return self.players[self.bracket.champion]
+
+    def seed_of(self, user_id: Any) -> Optional[int]:
+        return self.seeds.get(str(user_id))
+
+    def match_players(self, match: int) -> Tuple[str, str]:
+        a, b = self.bracket.players_of(match)
+        return self.players[a], self.players[b]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Everything but the open matches' battles, which persist with the lifecycle's battles."""
+        return {
+            "tournament_id": self.tournament_id,
+            "key": self.key,
+            "name": self.name,
+            "fmt": self.fmt,
+            "channel_id": self.channel_id,
+            "organizer_id": self.organizer_id,
+            "entrants": [encode_character(c) for c in self.entrants.values()],
+            "players": self.players,
+            "bracket": self.bracket.to_dict() if self.bracket is not None else None,
+            "live": {str(match): state.id for match, state in self.live.items()},
+            "simulated": self.simulated,
+            "status": self.status,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Tournament":
+        """The tournament without its open matches; :meth:`TournamentEngine.restore` reattaches them."""
+        entrants = [decode_character(c) for c in data.get("entrants", [])]
+        players = list(data.get("players", []))
+        return cls(
+            tournament_id=data["tournament_id"],
+            key=data["key"],
+            name=data["name"],
+            fmt=data.get("fmt", SINGLE),
+            channel_id=data.get("channel_id"),
+            organizer_id=data.get("organizer_id"),
+            entrants={str(c.id): c for c in entrants},
+            players=players,
+            seeds={user_id: seed for seed, user_id in enumerate(players)},
+            bracket=Bracket.from_dict(data["bracket"]) if data.get("bracket") else None,
+            simulated=data.get("simulated", 0),
+            status=data.get("status", "registration"),
+        )
+
+
+MatchHandler = Callable[[Tournament, int, BattleState], Awaitable[None]]
+FinishHandler = Callable[[Tournament], Awaitable[None]]
+
+
+def simulate_match(first: Character, second: Character, seed: int, battle_id: str = "",
+                   max_turns: int = MAX_SIMULATED_TURNS) -> Tuple[int, BattleReplay]:
+    """Play ``first`` vs ``second`` at full HP through the PvP turn engine; returns the winner (0 or 1).
+
+    Both sides pick a random known jutsu each turn. The picks are recorded as
+    replay inputs, so :func:`simulate` reproduces the match roll for roll.
+    """
+    fighters = [{"id": c.id, "name": c.name, "hp": c.max_hp, "max_hp": c.max_hp, "level": c.level,
+                 "jutsu": list(c.jutsu) or ["Basic Attack"]} for c in (first, second)]
+    picker = random.Random(seed ^ 0x5EED)  # separate stream: the picks are inputs, not battle rolls
+    inputs = [[ATTACK, turn % 2, picker.choice(fighters[turn % 2]["jutsu"]), 0, 1.0] for turn in range(max_turns)]
+    replay = BattleReplay(battle_id=battle_id, seed=seed, fighters=fighters, inputs=inputs, mode="tournament")
+    outcome = simulate(replay, log_capacity=0)
+    replay.inputs = inputs[:outcome.turns]
+    if outcome.winner is not None:
+        return outcome.winner, replay
+    return (0 if outcome.hp[0] >= outcome.hp[1] else 1), replay
+
+
+class TournamentEngine:
+    """Runs the tournaments of every guild; open matches live in a :class:`BattleLifecycle`."""
+
+    # Seconds both players get to finish a match before it is simulated.
+    MATCH_WINDOW = 15 * 60
+    MAX_PLAYERS = 1024
+    # Simulated matches between yields to the event loop when a whole round goes AFK at once.
+    SIMULATION_BATCH = 64
+    # Seconds changes wait before they are written, so a burst of results is saved once.
+    SAVE_DELAY = 1.0
+
+    def __init__(self, lifecycle: BattleLifecycle, replay_store: Optional[ReplayStore] = None,
+                 on_match: Optional[MatchHandler] = None, on_finish: Optional[FinishHandler] = None,
+                 seed: Callable[[], int] = new_seed, data_dir: Optional[str] = None):
+        self.lifecycle = lifecycle
+        self.replay_store = replay_store
+        self.on_match = on_match
+        self.on_finish = on_finish
+        self.new_seed = seed
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.tournaments: Dict[Any, Tournament] = {}
+        self._matches: Dict[str, Tuple[Tournament, int]] = {}  # battle id -> open match
+        self._players: Dict[str, str] = {}                     # user id -> battle id of their open match
+        self._dirty: Set[str] = set()                          # tournament ids changed since the last save
+        self._save_handle = None
+        self._restored = False
+        lifecycle.end_listeners.append(self._on_battle_end)
+
+    def tournament(self, key: Any) -> Optional[Tournament]:
+        return self.tournaments.get(key)
+
+    def attach(self, event_bus: EventBus) -> None:
+        """Settle open matches from the PvP battles their players fight."""
+        event_bus.subscribe(self.handle_event, BattleEndedEvent, name="tournaments")
+
+    async def handle_event(self, event: GameEvent) -> None:
+        if isinstance(event, BattleEndedEvent) and event.mode == "pvp" and event.user_id and event.loser_id:
+            await self.record_result(event.user_id, event.loser_id, event.end_reason)
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def create(self, key: Any, name: str, fmt: str = SINGLE, channel_id: Optional[int] = None,
+               organizer_id: Any = None) -> Tournament:
+        existing = self.tournaments.get(key)
+        if existing is not None and existing.status != "finished":
+            raise TournamentError(f"**{existing.name}** is still running here!")
+        if fmt not in FORMATS:
+            raise TournamentError(f"Unknown format {fmt!r}; use one of {', '.join(FORMATS)}.")
+        tournament = Tournament(new_battle_id("tournament"), key, name, fmt, channel_id,
+                                None if organizer_id is None else str(organizer_id))
+        if existing is not None:
+            self._discard(existing)
+        self.tournaments[key] = tournament
+        self._changed(tournament)
+        return tournament
+
+    def register(self, key: Any, character: Character) -> Tournament:
+        tournament = self._in_status(key, "registration")
+        user_id = str(character.id)
+        if user_id in tournament.entrants:
+            raise TournamentError("You are already registered!")
+        if len(tournament.entrants) >= self.MAX_PLAYERS:
+            raise TournamentError(f"**{tournament.name}** is full ({self.MAX_PLAYERS} players).")
+        tournament.entrants[user_id] = character
+        self._changed(tournament)
+        return tournament
+
+    def withdraw(self, key: Any, user_id: Any) -> Tournament:
+        tournament = self._in_status(key, "registration")
+        if tournament.entrants.pop(str(user_id), None) is None:
+            raise TournamentError("You are not registered.")
+        self._changed(tournament)
+        return tournament
+
+    def _in_status(self, key: Any, status: str) -> Tournament:
+        tournament = self.tournaments.get(key)
+        if tournament is None:
+            raise TournamentError("There is no tournament here.")
+        if tournament.status != status:
+            raise TournamentError(f"**{tournament.name}** is not open for that ({tournament.status}).")
+        return tournament
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    async def start(self, key: Any) -> Tournament:
+        """Seed by rating (ties keep registration order), build the bracket and open round one."""
+        tournament = self._in_status(key, "registration")
+        entrants = list(tournament.entrants.values())
+        bracket = Bracket(len(entrants), tournament.fmt)
+        ranked = sorted(range(len(entrants)), key=lambda i: -entrants[i].rating)
+        tournament.players = [str(entrants[i].id) for i in ranked]
+        tournament.seeds = {user_id: seed for seed, user_id in enumerate(tournament.players)}
+        tournament.bracket = bracket
+        tournament.status = "running"
+        await self._open(tournament, bracket.settle_byes())
+        self._changed(tournament)
+        return tournament
+
+    async def record_result(self, winner_id: Any, loser_id: Any, reason: Optional[str] = None) -> bool:
+        """Settle the open match between these two players; False if they are not in one."""
+        battle_id = self._players.get(str(winner_id))
+        if battle_id is None or self._players.get(str(loser_id)) != battle_id:
+            return False
+        tournament, match = self._matches[battle_id]
+        state = tournament.live[match]
+        state.winner_id, state.is_active, state.end_reason = str(winner_id), False, reason or "victory"
+        self.lifecycle.untrack_battle(battle_id)
+        persistence = self.lifecycle.persistence
+        await persistence.add_battle_to_history(battle_id, state)
+        await persistence.remove_active_battle(battle_id)
+        await self._settle(tournament, match, tournament.seed_of(winner_id))
+        return True
+
+    async def simulate_open(self, key: Any) -> int:
+        """Simulate every open match now, for an organiser who will not wait; returns how many."""
+        tournament = self._in_status(key, "running")
+        settled = 0
+        for match, state in list(tournament.live.items()):
+            if tournament.live.get(match) is not state:
+                continue
+            state.is_active, state.end_reason = False, "simulated"
+            await self.lifecycle.handle_battle_end(state, state.id)
+            settled += 1
+            if settled % self.SIMULATION_BATCH == 0:
+                await asyncio.sleep(0)
+        return settled
+
+    async def _on_battle_end(self, state: BattleState, battle_id: str) -> None:
+        """Lifecycle hook: a match nobody finished in time (or skipped by an organiser) is simulated."""
+        found = self._matches.get(battle_id)
+        if found is None or state.winner_id:
+            return
+        tournament, match = found
+        first, second = (tournament.entrants[uid] for uid in tournament.match_players(match))
+        winner, replay = simulate_match(first, second, self.new_seed(), battle_id)
+        if self.replay_store is not None:
+            self.replay_store.save(replay)
+        state.winner_id = str((first, second)[winner].id)
+        tournament.simulated += 1
+        await self._settle(tournament, match, tournament.seed_of(state.winner_id))
+
+    async def _settle(self, tournament: Tournament, match: int, winner: int) -> None:
+        state = tournament.live.pop(match)
+        self._matches.pop(state.id, None)
+        for participant in (state.attacker, state.defender):
+            if self._players.get(participant.id) == state.id:
+                del self._players[participant.id]
+        await self._open(tournament, tournament.bracket.report(match, winner))
+        self._changed(tournament)
+        if tournament.bracket.finished and tournament.status == "running":
+            tournament.status = "finished"
+            if self.on_finish is not None:
+                await self.on_finish(tournament)
+
+    async def _open(self, tournament: Tournament, matches: List[int]) -> None:
+        """Start a tracked battle for each playable match and announce them together."""
+        opened = []
+        for match in matches:
+            first, second = (tournament.entrants[uid] for uid in tournament.match_players(match))
+            state = BattleState(
+                attacker=BattleParticipant.from_character(first),
+                defender=BattleParticipant.from_character(second),
+                current_turn_player_id=str(first.id),
+                id=new_battle_id("match"),
+            )
+            tournament.live[match] = state
+            self._matches[state.id] = (tournament, match)
+            self._players[str(first.id)] = self._players[str(second.id)] = state.id
+            await self.lifecycle.persistence.add_active_battle(state.id, state)
+            self.lifecycle.track_battle(state.id, state)
+            opened.append((match, state))
+        if self.on_match is not None and opened:
+            results = await asyncio.gather(*(self.on_match(tournament, match, state) for match, state in opened),
+                                           return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to announce a match of {tournament.tournament_id}: {result}")
+
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _path(self, tournament_id: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in tournament_id)
+        return self.data_dir / "brackets" / f"{safe}.json"
+
+    def _changed(self, tournament: Tournament) -> None:
+        """Queue ``tournament`` to be written; within a running loop, after ``SAVE_DELAY``."""
+        if self.data_dir is None:
+            return
+        self._dirty.add(tournament.tournament_id)
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._save_handle = loop.call_later(self.SAVE_DELAY, self.save)
+
+    def _discard(self, tournament: Tournament) -> None:
+        self._dirty.discard(tournament.tournament_id)
+        if self.data_dir is not None:
+            try:
+                self._path(tournament.tournament_id).unlink()
+            except FileNotFoundError:
+                pass
+
+    def save(self) -> None:
+        """Write every tournament changed since the last save."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self.data_dir is None or not self._dirty:
+            return
+        by_id = {t.tournament_id: t for t in self.tournaments.values()}
+        for tournament_id in list(self._dirty):
+            tournament = by_id.get(tournament_id)
+            if tournament is None:
+                continue
+            path = self._path(tournament_id)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(tournament.to_dict(), f, separators=(",", ":"), ensure_ascii=False)
+                os.replace(tmp, path)
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Failed to save tournament {tournament_id}: {e}")
+        self._dirty.clear()
+
+    async def restore(self) -> int:
+        """Load saved tournaments and reattach open matches to their restored battles; returns how many loaded.
+
+        A match whose battle did not survive is opened again, and battles no
+        tournament claims are closed.
+        """
+        if self._restored or self.data_dir is None:
+            return 0
+        self._restored = True
+        persistence = self.lifecycle.persistence
+        battles = await persistence.load_active_battles()
+        claimed: Set[str] = set()
+        loaded = 0
+        for path in sorted((self.data_dir / "brackets").glob("*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                tournament = Tournament.from_dict(data)
+            except (OSError, ValueError, KeyError, TypeError, TournamentError) as e:
+                logger.error(f"Failed to restore tournament from {path.name}: {e}")
+                continue
+            current = self.tournaments.get(tournament.key)
+            if current is not None and current.status != "finished":
+                continue
+            self.tournaments[tournament.key] = tournament
+            loaded += 1
+            if tournament.status != "running":
+                continue
+            reopen = []
+            for match, battle_id in data.get("live", {}).items():
+                match = int(match)
+                state = battles.get(battle_id)
+                if not isinstance(state, BattleState) or not tournament.bracket.ready(match):
+                    reopen.append(match)
+                    continue
+                tournament.live[match] = state
+                self._matches[battle_id] = (tournament, match)
+                for participant in (state.attacker, state.defender):
+                    self._players[participant.id] = battle_id
+                self.lifecycle.track_battle(battle_id, state)
+                claimed.add(battle_id)
+            reopen = [m for m in reopen if tournament.bracket.ready(m)]
+            if reopen:
+                await self._open(tournament, reopen)
+                self._changed(tournament)
+        for battle_id in [b for b in battles if b not in claimed and b not in self._matches]:
+            await persistence.remove_active_battle(battle_id)
+        return loaded
+
+
+def tournaments_for(services: Any) -> Optional[TournamentEngine]:
+    """The container's shared engine, or None for a cog running without services."""
+    engine = getattr(services, "tournaments", None)
+    return engine if isinstance(engine, TournamentEngine) else None
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
 from typing import Callable
 
@@ -11,7 +11,7 @@ class StatusEffect:
     potency: float
     effect_type: str
     description: str = ""
-    applied_at: datetime = datetime.now(timezone.utc)
+    applied_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
     def to_dict(self):
         d = asdict(self)
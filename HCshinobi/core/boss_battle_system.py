@@ -11,87 +11,305 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from .battle.ai import BossModel, EnemyPolicy, ExpectimaxPolicy
+from .battle.engine import Attack, TableDamage, TurnEngine, TurnState, VarianceDamage
+from .battle.registry import registry_for
+from .boss_tables import BossTable
+from .cooldowns import cooldowns_for
+from .npc_registry import PhaseTable, npc_registry_for
+
+SOLOMON_JUTSU_DAMAGE: Dict[str, int] = {
+    "Katon: Gōka Messhitsu": 80,
+    "Katon: Gōryūka no Jutsu": 100,
+    "Sharingan Genjutsu": 60,
+    "Adamantine Chakra-Forged Chains": 90,
+    "Amaterasu": 150,
+    "Kamui Phase": 0,  # Dodge
+    "Yōton: Maguma Hōkai": 120,
+    "Yōton: Ryūsei no Jutsu": 140,
+    "Susanoo: Ōkami no Yōsei": 200,
+    "Yōton: Enkō no Ōkami": 180,
+    "Kōkō no Kusari": 160,
+    "Eclipse Fang Severance": 250,
+    "Ōkami no Yōsei Susanoo: Final Incarnation": 300,
+    "Yōton: Enkō no Ōkami: Pack Release": 220,
+    "Summoning: Wolves of Kiba no Tōdai": 280
+}
+
+SOLOMON_PHASE_MULTIPLIERS: Dict[str, float] = {
+    "Phase 1: The Crimson Shadow": 1.0,
+    "Phase 2: The Burning Revenant": 1.3,
+    "Phase 3: The Exiled Flame": 1.6,
+    "Phase 4: The Ultimate Being": 2.0
+}
+
+NPC_MECHANICS: Dict[str, Dict[str, Any]] = {
+    "Victor": {
+        "name": "Lightning Storm",
+        "description": "Victor's speed increases with each turn, and he can chain lightning attacks.",
+        "phases": [
+            {
+                "name": "Phase 1: Thunder Initiation",
+                "hp_threshold": 1.0,
+                "description": "Victor begins with basic lightning techniques",
+                "special_ability": "Speed Boost: +10 speed per turn",
+                "jutsu_pool": ["Raiton: Chidori", "Raiton: Lightning Blade", "Raiton: Thunder Strike"]
+            },
+            {
+                "name": "Phase 2: Lightning Fury", 
+                "hp_threshold": 0.7,
+                "description": "Victor's lightning becomes more intense",
+                "special_ability": "Chain Lightning: Attacks can hit multiple times",
+                "jutsu_pool": ["Raiton: Lightning Storm", "Raiton: Thunder Flash", "Raiton: Lightning Arrow"]
+            },
+            {
+                "name": "Phase 3: Thunder God",
+                "hp_threshold": 0.3,
+                "description": "Victor becomes a lightning storm incarnate",
+                "special_ability": "Lightning Field: All attacks have lightning properties",
+                "jutsu_pool": ["Raiton: Lightning Burst", "Raiton: Thunder Crash", "Raiton: Lightning Surge"]
+            }
+        ]
+    },
+    "Trunka": {
+        "name": "Barrier Mastery",
+        "description": "Trunka creates barriers that must be broken before dealing damage.",
+        "phases": [
+            {
+                "name": "Phase 1: Guardian Shield",
+                "hp_threshold": 1.0,
+                "description": "Trunka creates protective barriers",
+                "special_ability": "Barrier Creation: Must break barrier before damaging HP",
+                "jutsu_pool": ["Protection Barrier Jutsu", "Defensive Shield Jutsu", "Guardian Wall Jutsu"]
+            },
+            {
+                "name": "Phase 2: Fortress Defense",
+                "hp_threshold": 0.7,
+                "description": "Trunka's barriers become stronger and more complex",
+                "special_ability": "Multi-Layer Barriers: Multiple barriers must be broken",
+                "jutsu_pool": ["Protection Dome Jutsu", "Defensive Barrier Jutsu", "Guardian Shield Jutsu"]
+            },
+            {
+                "name": "Phase 3: Absolute Defense",
+                "hp_threshold": 0.3,
+                "description": "Trunka's barriers are nearly impenetrable",
+                "special_ability": "Reflective Barriers: Damages attacker when barrier is hit",
+                "jutsu_pool": ["Protection Wall Jutsu", "Defensive Dome Jutsu", "Guardian Barrier Jutsu"]
+            }
+        ]
+    },
+    "Chen": {
+        "name": "Shadow Tactics",
+        "description": "Chen uses shadow manipulation to control the battlefield and restrict player movement.",
+        "phases": [
+            {
+                "name": "Phase 1: Shadow Analysis",
+                "hp_threshold": 1.0,
+                "description": "Chen studies your movements and creates shadow traps",
+                "special_ability": "Shadow Traps: Random jutsu restrictions each turn",
+                "jutsu_pool": ["Shadow Possession Jutsu", "Shadow Sewing Technique", "Shadow Neck Bind"]
+            },
+            {
+                "name": "Phase 2: Shadow Control",
+                "hp_threshold": 0.7,
+                "description": "Chen takes control of the battlefield with shadow manipulation",
+                "special_ability": "Shadow Restriction: Limits player to 1 jutsu per turn",
+                "jutsu_pool": ["Shadow Imitation Technique", "Shadow Strangle Jutsu", "Shadow Gathering Technique"]
+            },
+            {
+                "name": "Phase 3: Shadow Mastery",
+                "hp_threshold": 0.3,
+                "description": "Chen becomes one with the shadows",
+                "special_ability": "Shadow Possession: Can control player's next action",
+                "jutsu_pool": ["Shadow Clone Technique", "Shadow Binding Technique", "Shadow Manipulation Technique"]
+            }
+        ]
+    },
+    "Cap": {
+        "name": "Byakugan Precision",
+        "description": "Cap's Byakugan allows him to target chakra points and disable jutsu.",
+        "phases": [
+            {
+                "name": "Phase 1: Gentle Fist Analysis",
+                "hp_threshold": 1.0,
+                "description": "Cap analyzes your chakra flow and targets weak points",
+                "special_ability": "Chakra Point Targeting: Can disable jutsu temporarily",
+                "jutsu_pool": ["Gentle Fist: Eight Trigrams Sixty-Four Palms", "Gentle Fist: Eight Trigrams Vacuum Palm"]
+            },
+            {
+                "name": "Phase 2: Byakugan Mastery",
+                "hp_threshold": 0.7,
+                "description": "Cap's Byakugan reveals all weaknesses",
+                "special_ability": "Jutsu Disruption: Can permanently disable jutsu for the battle",
+                "jutsu_pool": ["Gentle Fist: Eight Trigrams One Hundred Twenty-Eight Palms", "Gentle Fist: Eight Trigrams Twin Lion Fists"]
+            },
+            {
+                "name": "Phase 3: Ultimate Defense",
+                "hp_threshold": 0.3,
+                "description": "Cap's defense becomes impenetrable",
+                "special_ability": "Eight Trigrams Palms Revolving Heaven: Blocks all attacks",
+                "jutsu_pool": ["Gentle Fist: Eight Trigrams Palms Revolving Heaven", "Gentle Fist: Eight Trigrams Mountain Crusher"]
+            }
+        ]
+    },
+    "Chris": {
+        "name": "Sealing Mastery",
+        "description": "Chris uses sealing techniques to restrict player abilities and create barriers.",
+        "phases": [
+            {
+                "name": "Phase 1: Sealing Preparation",
+                "hp_threshold": 1.0,
+                "description": "Chris prepares sealing formulas and creates basic barriers",
+                "special_ability": "Seal Placement: Can seal player jutsu temporarily",
+                "jutsu_pool": ["Four Symbols Seal", "Five Elements Seal", "Barrier Method Formation"]
+            },
+            {
+                "name": "Phase 2: Advanced Sealing",
+                "hp_threshold": 0.7,
+                "description": "Chris's sealing techniques become more complex",
+                "special_ability": "Chakra Sealing: Can seal player chakra regeneration",
+                "jutsu_pool": ["Eight Trigrams Seal", "Contract Seal", "Four Violet Flames Formation"]
+            },
+            {
+                "name": "Phase 3: Ultimate Sealing",
+                "hp_threshold": 0.3,
+                "description": "Chris's sealing mastery is complete",
+                "special_ability": "Complete Sealing: Can seal all player abilities temporarily",
+                "jutsu_pool": ["Four Black Fogs Formation", "Four Red Yang Formation", "Four White Yin Formation"]
+            }
+        ]
+    }
+}
+
+NPC_JUTSU_DAMAGE: Dict[str, int] = {
+    # Victor's jutsu
+    "Raiton: Chidori": 60, "Raiton: Lightning Blade": 70, "Raiton: Thunder Strike": 80,
+    "Raiton: Lightning Storm": 90, "Raiton: Thunder Flash": 85, "Raiton: Lightning Arrow": 75,
+    "Raiton: Lightning Burst": 100, "Raiton: Thunder Crash": 95, "Raiton: Lightning Surge": 110,
+
+    # Trunka's jutsu
+    "Protection Barrier Jutsu": 40, "Defensive Shield Jutsu": 45, "Guardian Wall Jutsu": 50,
+    "Protection Dome Jutsu": 55, "Defensive Barrier Jutsu": 60, "Guardian Shield Jutsu": 65,
+    "Protection Wall Jutsu": 70, "Defensive Dome Jutsu": 75, "Guardian Barrier Jutsu": 80,
+
+    # Chen's jutsu
+    "Shadow Possession Jutsu": 50, "Shadow Sewing Technique": 55, "Shadow Neck Bind": 60,
+    "Shadow Imitation Technique": 65, "Shadow Strangle Jutsu": 70, "Shadow Gathering Technique": 75,
+    "Shadow Clone Technique": 80, "Shadow Binding Technique": 85, "Shadow Manipulation Technique": 90,
+
+    # Cap's jutsu
+    "Gentle Fist: Eight Trigrams Sixty-Four Palms": 65, "Gentle Fist: Eight Trigrams Vacuum Palm": 70,
+    "Gentle Fist: Eight Trigrams One Hundred Twenty-Eight Palms": 75, "Gentle Fist: Eight Trigrams Twin Lion Fists": 80,
+    "Gentle Fist: Eight Trigrams Palms Revolving Heaven": 85, "Gentle Fist: Eight Trigrams Mountain Crusher": 90,
+
+    # Chris's jutsu
+    "Four Symbols Seal": 45, "Five Elements Seal": 50, "Barrier Method Formation": 55,
+    "Eight Trigrams Seal": 60, "Contract Seal": 65, "Four Violet Flames Formation": 70,
+    "Four Black Fogs Formation": 75, "Four Red Yang Formation": 80, "Four White Yin Formation": 85
+}
+
+NPC_PHASE_MULTIPLIERS: Dict[str, float] = {
+    "Phase 1": 1.0,
+    "Phase 2": 1.3,
+    "Phase 3": 1.6
+}
+
+# Final NPC damage per (phase prefix, jutsu) and the built-in NPCs' phase tables, compiled at import
+NPC_DAMAGE: Dict[Tuple[str, str], int] = {
+    (prefix, jutsu): int(damage * multiplier)
+    for prefix, multiplier in NPC_PHASE_MULTIPLIERS.items()
+    for jutsu, damage in NPC_JUTSU_DAMAGE.items()
+}
+_NPC_PHASE_TABLES: Dict[int, Tuple[List[Dict[str, Any]], PhaseTable]] = {
+    id(mechanics["phases"]): (mechanics["phases"], PhaseTable(mechanics["phases"]))
+    for mechanics in NPC_MECHANICS.values()
+}
+
+# Damage models shared with the boss cogs
+SOLOMON_STRIKE = VarianceDamage(text="⚔️ **{actor}** uses **{jutsu}** - **{damage} damage!**")
+SOLOMON_PHASE_DAMAGE = TableDamage(SOLOMON_JUTSU_DAMAGE, default=100,
+                                   text="🔥 **Solomon** uses **{jutsu}** - **{damage} damage!**")
+
+
+def solomon_strike(character: Dict[str, Any], jutsu_name: str) -> Attack:
+    """A player's basic attack on Solomon (simplified: 50 + ninjutsu / 10 base)."""
+    return Attack(jutsu_name, base=50 + (character.get("ninjutsu", 0) // 10))
+
+
+def solomon_phase_multiplier(phase: Dict[str, Any]) -> float:
+    """The phase's ``damage_multiplier`` from solomon.json, else the built-in value for its name."""
+    multiplier = phase.get("damage_multiplier")
+    return multiplier if multiplier is not None else SOLOMON_PHASE_MULTIPLIERS.get(phase.get("name", ""), 1.0)
+
+
+def solomon_phase_attack(jutsu_name: str, phase: Dict[str, Any]) -> Attack:
+    return Attack(jutsu_name, power=solomon_phase_multiplier(phase), payload=phase)
+
+
+def solomon_table(boss_data: Dict[str, Any], text: Optional[str] = SOLOMON_PHASE_DAMAGE.text) -> BossTable:
+    """Solomon's phases and counter-attack damage compiled from his definition."""
+    return BossTable(boss_data.get("boss_phases", []), SOLOMON_JUTSU_DAMAGE, default=SOLOMON_PHASE_DAMAGE.default,
+                     multiplier=solomon_phase_multiplier, text=text)
+
+
 class BossBattleSystem:
     """Ultimate boss battle system for legendary encounters."""
     
     def __init__(self, bot):
         self.bot = bot
-        self.active_boss_battles = {}
-        self.boss_cooldowns = {}
+        self.active_boss_battles = registry_for(getattr(bot, "services", None)).user_battles("boss")
+        self.npcs = npc_registry_for(getattr(bot, "services", None))
+        self.boss_cooldowns = cooldowns_for(getattr(bot, "services", None)).scope("boss")
         self.boss_data_path = "data/characters/solomon.json"
         self.boss_data = self.load_boss_data()
+        self.turn_engine = TurnEngine()
+        # Solomon's damage does not depend on what he did before, so two plies see everything
+        self.enemy_policy: EnemyPolicy = ExpectimaxPolicy(max_depth=2)
         
     def load_boss_data(self) -> Dict[str, Any]:
-        """Load boss character data."""
+        """Load boss character data (cached; re-read only when the file changes)."""
         try:
-            with open(self.boss_data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.npcs.read(self.boss_data_path)
         except FileNotFoundError:
             return {}
             
     def load_npc_data(self, npc_name: str) -> Dict[str, Any]:
-        """Load NPC character data."""
-        try:
-            npc_file = f"data/characters/{npc_name}.json"
-            with open(npc_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return None
-        except Exception as e:
-            print(f"Error loading NPC data: {e}")
-            return None
+        """Load NPC character data by file or display name, from the NPC registry."""
+        npc = self.npcs.npc(npc_name)
+        return npc.data if npc is not None else None
             
     def save_boss_data(self):
         """Save boss character data."""
         with open(self.boss_data_path, 'w', encoding='utf-8') as f:
             json.dump(self.boss_data, f, indent=4, ensure_ascii=False)
             
+    def boss_table(self) -> BossTable:
+        """Solomon's compiled phase and damage table; rebuilt only when the boss file changes."""
+        return self.npcs.compiled(self.boss_data, "solomon", solomon_table)
+            
     def get_current_phase(self, boss_hp_percentage: float) -> Dict[str, Any]:
         """Get the current boss phase based on HP percentage."""
-        for phase in self.boss_data.get("boss_phases", []):
-            if boss_hp_percentage >= phase["hp_threshold"]:
-                return phase
-        return self.boss_data.get("boss_phases", [])[-1] if self.boss_data.get("boss_phases") else {}
+        return self.boss_table().phase(boss_hp_percentage)
         
     def calculate_boss_damage(self, jutsu_name: str, phase: Dict[str, Any]) -> int:
         """Calculate boss damage based on jutsu and current phase."""
-        base_damage = {
-            "Katon: Gōka Messhitsu": 80,
-            "Katon: Gōryūka no Jutsu": 100,
-            "Sharingan Genjutsu": 60,
-            "Adamantine Chakra-Forged Chains": 90,
-            "Amaterasu": 150,
-            "Kamui Phase": 0,  # Dodge
-            "Yōton: Maguma Hōkai": 120,
-            "Yōton: Ryūsei no Jutsu": 140,
-            "Susanoo: Ōkami no Yōsei": 200,
-            "Yōton: Enkō no Ōkami": 180,
-            "Kōkō no Kusari": 160,
-            "Eclipse Fang Severance": 250,
-            "Ōkami no Yōsei Susanoo: Final Incarnation": 300,
-            "Yōton: Enkō no Ōkami: Pack Release": 220,
-            "Summoning: Wolves of Kiba no Tōdai": 280
-        }
-        
-        damage = base_damage.get(jutsu_name, 100)
-        
-        # Phase multipliers
-        phase_multipliers = {
-            "Phase 1: The Crimson Shadow": 1.0,
-            "Phase 2: The Burning Revenant": 1.3,
-            "Phase 3: The Exiled Flame": 1.6,
-            "Phase 4: The Ultimate Being": 2.0
-        }
-        
-        multiplier = phase_multipliers.get(phase.get("name", ""), 1.0)
-        return int(damage * multiplier)
+        return self.boss_table().damage(jutsu_name, phase)
         
-    def get_boss_jutsu(self, phase: Dict[str, Any]) -> str:
-        """Get a random jutsu from the current phase's jutsu pool."""
+    def get_boss_jutsu(self, phase: Dict[str, Any], rng: Optional[random.Random] = None) -> str:
+        """Get a random jutsu from the current phase's jutsu pool, drawn from ``rng`` if given."""
         jutsu_pool = phase.get("jutsu_pool", [])
         if not jutsu_pool:
             return "Basic Attack"
-        return random.choice(jutsu_pool)
+        return (rng or random).choice(jutsu_pool)
+
+    def choose_boss_jutsu(self, battle_data: Dict[str, Any], table: BossTable, phase: Dict[str, Any]) -> str:
+        """Solomon's counter, planned by ``enemy_policy`` against the player's expected strikes."""
+        if not phase.get("jutsu_pool"):
+            return "Basic Attack"
+        character, boss = battle_data["character"], battle_data["boss"]
+        model = BossModel(table, boss["max_hp"], character.get("max_hp", character["hp"]),
+                          solomon_strike(character, "").base)
+        return self.enemy_policy.decide(model, model.snapshot(character["hp"], boss["hp"])).action
         
     def check_boss_requirements(self, character_data: Dict[str, Any]) -> Tuple[bool, str]:
         """Check if character meets boss battle requirements."""
@@ -109,25 +327,21 @@ class BossBattleSystem:
             if achievement not in character_achievements:
                 return False, f"You need the '{achievement}' achievement to challenge Solomon."
                 
-        # Cooldown check
+        # Cooldown check (persisted, so it survives restarts)
         user_id = str(character_data.get("id", ""))
-        cooldown_hours = requirements.get("cooldown_hours", 168)
-        last_battle = self.boss_cooldowns.get(user_id)
-        
-        if last_battle:
-            time_since_battle = datetime.now() - last_battle
-            if time_since_battle < timedelta(hours=cooldown_hours):
-                remaining_time = timedelta(hours=cooldown_hours) - time_since_battle
-                return False, f"Solomon is recovering. You can challenge him again in {remaining_time.days}d {remaining_time.seconds//3600}h."
+        remaining_time = self.boss_cooldowns.remaining(user_id)
+        if remaining_time:
+            return False, f"Solomon is recovering. You can challenge him again in {remaining_time.days}d {remaining_time.seconds//3600}h."
                 
         return True, "Requirements met."
         
     async def start_boss_battle(self, interaction: discord.Interaction, character_data: Dict[str, Any]) -> bool:
         """Start a boss battle with Solomon."""
         user_id = str(character_data.get("id", ""))
+        self.boss_data = self.load_boss_data()  # cached; picks up edits to the boss file
         
-        # Check if already in battle
-        if user_id in self.active_boss_battles:
+        # Check if already in battle (in any boss cog)
+        if self.active_boss_battles.busy(user_id):
             await interaction.followup.send("❌ You are already in a battle with Solomon!")
             return False
             
@@ -153,9 +367,20 @@ class BossBattleSystem:
         # Create battle embed
         embed = self.create_battle_embed(battle_data, "battle_start")
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed)
         
         return True
         
+    def _broadcast(self, battle_data: Dict[str, Any], embed: discord.Embed, final: bool = False):
+        """Mirror the fight to /spectate watchers under the same key as the boss cogs."""
+        updates = getattr(getattr(self.bot, "services", None), "message_updates", None)
+        if updates is None or "battle_id" not in battle_data:
+            return
+        key = ("boss", battle_data["battle_id"])
+        updates.publish(key, lambda: {"embed": embed})
+        if final:
+            updates.forget(key)  # spectators still get this last frame
+        
     def create_battle_embed(self, battle_data: Dict[str, Any], embed_type: str) -> discord.Embed:
         """Create battle embed based on type."""
         character = battle_data["character"]
@@ -223,11 +448,11 @@ class BossBattleSystem:
         """Process Solomon's turn in the battle."""
         character = battle_data["character"]
         boss = battle_data["boss"]
-        current_phase = self.get_current_phase(boss["hp"] / boss["max_hp"])
+        table = self.boss_table()
+        current_phase = table.phase(boss["hp"] / boss["max_hp"])
         
         # Get boss jutsu
-        jutsu_name = self.get_boss_jutsu(current_phase)
-        damage = self.calculate_boss_damage(jutsu_name, current_phase)
+        jutsu_name = self.choose_boss_jutsu(battle_data, table, current_phase)
         
         # Special phase abilities
         if "Kamui Phase" in jutsu_name:
@@ -235,11 +460,11 @@ class BossBattleSystem:
             return battle_data
             
         # Apply damage
-        character["hp"] = max(0, character["hp"] - damage)
-        battle_data["battle_log"].append(f"🔥 **Solomon** uses **{jutsu_name}** - **{damage} damage!**")
+        state = TurnState.of(character, boss, log=battle_data["battle_log"], active=1)
+        self.turn_engine.attack(state, 1, solomon_phase_attack(jutsu_name, current_phase), table)
         
         # Phase transition check
-        new_phase = self.get_current_phase(boss["hp"] / boss["max_hp"])
+        new_phase = table.phase(boss["hp"] / boss["max_hp"])
         if new_phase != current_phase:
             battle_data["battle_log"].append(f"🔥 **PHASE TRANSITION:** {new_phase.get('name', 'Unknown')}")
             battle_data["battle_log"].append(f"🔥 **{new_phase.get('description', '')}**")
@@ -271,16 +496,12 @@ class BossBattleSystem:
             await interaction.followup.send(f"❌ You don't know the jutsu **{jutsu_name}**!")
             return False
             
-        # Calculate player damage (simplified)
-        base_damage = 50 + (character.get("ninjutsu", 0) // 10)
-        damage = random.randint(int(base_damage * 0.8), int(base_damage * 1.2))
-        
-        # Apply damage to boss
-        boss["hp"] = max(0, boss["hp"] - damage)
-        battle_data["battle_log"].append(f"⚔️ **{character['name']}** uses **{jutsu_name}** - **{damage} damage!**")
+        # Apply the player's attack to the boss
+        state = TurnState.of(character, boss, log=battle_data["battle_log"])
+        self.turn_engine.attack(state, 0, solomon_strike(character, jutsu_name), SOLOMON_STRIKE)
         
         # Check if boss is defeated
-        if boss["hp"] <= 0:
+        if state.winner is not None:
             await self.end_boss_battle(interaction, battle_data, "victory")
             return True
             
@@ -298,6 +519,7 @@ class BossBattleSystem:
         # Send updated battle embed
         embed = self.create_battle_embed(battle_data, "battle_turn")
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed)
         
         return True
         
@@ -311,7 +533,8 @@ class BossBattleSystem:
         self.active_boss_battles.pop(user_id, None)
         
         # Set cooldown
-        self.boss_cooldowns[user_id] = datetime.now()
+        cooldown_hours = self.boss_data.get("boss_requirements", {}).get("cooldown_hours", 168)
+        self.boss_cooldowns.start(user_id, timedelta(hours=cooldown_hours))
         
         if result == "victory":
             # Grant rewards
@@ -360,6 +583,7 @@ class BossBattleSystem:
             )
             
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed, final=True)
         
     async def save_character_data(self, character_data: Dict[str, Any]):
         """Save updated character data."""
@@ -372,6 +596,9 @@ class BossBattleSystem:
 
     async def start_npc_battle(self, interaction: discord.Interaction, character_data: Dict[str, Any], npc_name: str) -> bool:
         """Start a battle with an NPC boss."""
+        if self.active_boss_battles.busy(interaction.user.id):
+            await interaction.followup.send("❌ You are already in a boss battle!")
+            return False
         npc_data = self.load_npc_data(npc_name)
         if not npc_data:
             await interaction.followup.send(f"❌ NPC {npc_name} not found!")
@@ -409,148 +636,12 @@ class BossBattleSystem:
         # Send battle start embed
         embed = self.create_npc_battle_embed(battle_data, "battle_start")
         await interaction.followup.send(embed=embed)
+        self._broadcast(battle_data, embed)
         return True
         
     def get_npc_mechanics(self, npc_name: str) -> Dict[str, Any]:
         """Get special mechanics for each NPC boss."""
-        mechanics = {
-            "Victor": {
-                "name": "Lightning Storm",
-                "description": "Victor's speed increases with each turn, and he can chain lightning attacks.",
-                "phases": [
-                    {
-                        "name": "Phase 1: Thunder Initiation",
-                        "hp_threshold": 1.0,
-                        "description": "Victor begins with basic lightning techniques",
-                        "special_ability": "Speed Boost: +10 speed per turn",
-                        "jutsu_pool": ["Raiton: Chidori", "Raiton: Lightning Blade", "Raiton: Thunder Strike"]
-                    },
-                    {
-                        "name": "Phase 2: Lightning Fury", 
-                        "hp_threshold": 0.7,
-                        "description": "Victor's lightning becomes more intense",
-                        "special_ability": "Chain Lightning: Attacks can hit multiple times",
-                        "jutsu_pool": ["Raiton: Lightning Storm", "Raiton: Thunder Flash", "Raiton: Lightning Arrow"]
-                    },
-                    {
-                        "name": "Phase 3: Thunder God",
-                        "hp_threshold": 0.3,
-                        "description": "Victor becomes a lightning storm incarnate",
-                        "special_ability": "Lightning Field: All attacks have lightning properties",
-                        "jutsu_pool": ["Raiton: Lightning Burst", "Raiton: Thunder Crash", "Raiton: Lightning Surge"]
-                    }
-                ]
-            },
-            "Trunka": {
-                "name": "Barrier Mastery",
-                "description": "Trunka creates barriers that must be broken before dealing damage.",
-                "phases": [
-                    {
-                        "name": "Phase 1: Guardian Shield",
-                        "hp_threshold": 1.0,
-                        "description": "Trunka creates protective barriers",
-                        "special_ability": "Barrier Creation: Must break barrier before damaging HP",
-                        "jutsu_pool": ["Protection Barrier Jutsu", "Defensive Shield Jutsu", "Guardian Wall Jutsu"]
-                    },
-                    {
-                        "name": "Phase 2: Fortress Defense",
-                        "hp_threshold": 0.7,
-                        "description": "Trunka's barriers become stronger and more complex",
-                        "special_ability": "Multi-Layer Barriers: Multiple barriers must be broken",
-                        "jutsu_pool": ["Protection Dome Jutsu", "Defensive Barrier Jutsu", "Guardian Shield Jutsu"]
-                    },
-                    {
-                        "name": "Phase 3: Absolute Defense",
-                        "hp_threshold": 0.3,
-                        "description": "Trunka's barriers are nearly impenetrable",
-                        "special_ability": "Reflective Barriers: Damages attacker when barrier is hit",
-                        "jutsu_pool": ["Protection Wall Jutsu", "Defensive Dome Jutsu", "Guardian Barrier Jutsu"]
-                    }
-                ]
-            },
-            "Chen": {
-                "name": "Shadow Tactics",
-                "description": "Chen uses shadow manipulation to control the battlefield and restrict player movement.",
-                "phases": [
-                    {
-                        "name": "Phase 1: Shadow Analysis",
-                        "hp_threshold": 1.0,
-                        "description": "Chen studies your movements and creates shadow traps",
-                        "special_ability": "Shadow Traps: Random jutsu restrictions each turn",
-                        "jutsu_pool": ["Shadow Possession Jutsu", "Shadow Sewing Technique", "Shadow Neck Bind"]
-                    },
-                    {
-                        "name": "Phase 2: Shadow Control",
-                        "hp_threshold": 0.7,
-                        "description": "Chen takes control of the battlefield with shadow manipulation",
-                        "special_ability": "Shadow Restriction: Limits player to 1 jutsu per turn",
-                        "jutsu_pool": ["Shadow Imitation Technique", "Shadow Strangle Jutsu", "Shadow Gathering Technique"]
-                    },
-                    {
-                        "name": "Phase 3: Shadow Mastery",
-                        "hp_threshold": 0.3,
-                        "description": "Chen becomes one with the shadows",
-                        "special_ability": "Shadow Possession: Can control player's next action",
-                        "jutsu_pool": ["Shadow Clone Technique", "Shadow Binding Technique", "Shadow Manipulation Technique"]
-                    }
-                ]
-            },
-            "Cap": {
-                "name": "Byakugan Precision",
-                "description": "Cap's Byakugan allows him to target chakra points and disable jutsu.",
-                "phases": [
-                    {
-                        "name": "Phase 1: Gentle Fist Analysis",
-                        "hp_threshold": 1.0,
-                        "description": "Cap analyzes your chakra flow and targets weak points",
-                        "special_ability": "Chakra Point Targeting: Can disable jutsu temporarily",
-                        "jutsu_pool": ["Gentle Fist: Eight Trigrams Sixty-Four Palms", "Gentle Fist: Eight Trigrams Vacuum Palm"]
-                    },
-                    {
-                        "name": "Phase 2: Byakugan Mastery",
-                        "hp_threshold": 0.7,
-                        "description": "Cap's Byakugan reveals all weaknesses",
-                        "special_ability": "Jutsu Disruption: Can permanently disable jutsu for the battle",
-                        "jutsu_pool": ["Gentle Fist: Eight Trigrams One Hundred Twenty-Eight Palms", "Gentle Fist: Eight Trigrams Twin Lion Fists"]
-                    },
-                    {
-                        "name": "Phase 3: Ultimate Defense",
-                        "hp_threshold": 0.3,
-                        "description": "Cap's defense becomes impenetrable",
-                        "special_ability": "Eight Trigrams Palms Revolving Heaven: Blocks all attacks",
-                        "jutsu_pool": ["Gentle Fist: Eight Trigrams Palms Revolving Heaven", "Gentle Fist: Eight Trigrams Mountain Crusher"]
-                    }
-                ]
-            },
-            "Chris": {
-                "name": "Sealing Mastery",
-                "description": "Chris uses sealing techniques to restrict player abilities and create barriers.",
-                "phases": [
-                    {
-                        "name": "Phase 1: Sealing Preparation",
-                        "hp_threshold": 1.0,
-                        "description": "Chris prepares sealing formulas and creates basic barriers",
-                        "special_ability": "Seal Placement: Can seal player jutsu temporarily",
-                        "jutsu_pool": ["Four Symbols Seal", "Five Elements Seal", "Barrier Method Formation"]
-                    },
-                    {
-                        "name": "Phase 2: Advanced Sealing",
-                        "hp_threshold": 0.7,
-                        "description": "Chris's sealing techniques become more complex",
-                        "special_ability": "Chakra Sealing: Can seal player chakra regeneration",
-                        "jutsu_pool": ["Eight Trigrams Seal", "Contract Seal", "Four Violet Flames Formation"]
-                    },
-                    {
-                        "name": "Phase 3: Ultimate Sealing",
-                        "hp_threshold": 0.3,
-                        "description": "Chris's sealing mastery is complete",
-                        "special_ability": "Complete Sealing: Can seal all player abilities temporarily",
-                        "jutsu_pool": ["Four Black Fogs Formation", "Four Red Yang Formation", "Four White Yin Formation"]
-                    }
-                ]
-            }
-        }
-        return mechanics.get(npc_name, {})
+        return NPC_MECHANICS.get(npc_name, {})
 
     async def process_npc_turn(self, battle_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process NPC's turn with special mechanics."""
@@ -583,10 +674,9 @@ class BossBattleSystem:
     def get_npc_current_phase(self, hp_percentage: float, mechanics: Dict[str, Any]) -> Dict[str, Any]:
         """Get current phase for NPC boss."""
         phases = mechanics.get("phases", [])
-        for phase in phases:
-            if hp_percentage >= phase.get("hp_threshold", 0):
-                return phase
-        return phases[-1] if phases else {}
+        cached = _NPC_PHASE_TABLES.get(id(phases))
+        table = cached[1] if cached is not None and cached[0] is phases else PhaseTable(phases)
+        return table.at(hp_percentage)
 
     def apply_npc_mechanics(self, battle_data: Dict[str, Any], phase: Dict[str, Any]) -> Dict[str, Any]:
         """Apply special mechanics based on NPC and phase."""
@@ -628,45 +718,11 @@ class BossBattleSystem:
 
     def calculate_npc_damage(self, jutsu_name: str, phase: Dict[str, Any], boss: Dict[str, Any]) -> int:
         """Calculate NPC damage based on jutsu and phase."""
-        base_damage = {
-            # Victor's jutsu
-            "Raiton: Chidori": 60, "Raiton: Lightning Blade": 70, "Raiton: Thunder Strike": 80,
-            "Raiton: Lightning Storm": 90, "Raiton: Thunder Flash": 85, "Raiton: Lightning Arrow": 75,
-            "Raiton: Lightning Burst": 100, "Raiton: Thunder Crash": 95, "Raiton: Lightning Surge": 110,
-            
-            # Trunka's jutsu
-            "Protection Barrier Jutsu": 40, "Defensive Shield Jutsu": 45, "Guardian Wall Jutsu": 50,
-            "Protection Dome Jutsu": 55, "Defensive Barrier Jutsu": 60, "Guardian Shield Jutsu": 65,
-            "Protection Wall Jutsu": 70, "Defensive Dome Jutsu": 75, "Guardian Barrier Jutsu": 80,
-            
-            # Chen's jutsu
-            "Shadow Possession Jutsu": 50, "Shadow Sewing Technique": 55, "Shadow Neck Bind": 60,
-            "Shadow Imitation Technique": 65, "Shadow Strangle Jutsu": 70, "Shadow Gathering Technique": 75,
-            "Shadow Clone Technique": 80, "Shadow Binding Technique": 85, "Shadow Manipulation Technique": 90,
-            
-            # Cap's jutsu
-            "Gentle Fist: Eight Trigrams Sixty-Four Palms": 65, "Gentle Fist: Eight Trigrams Vacuum Palm": 70,
-            "Gentle Fist: Eight Trigrams One Hundred Twenty-Eight Palms": 75, "Gentle Fist: Eight Trigrams Twin Lion Fists": 80,
-            "Gentle Fist: Eight Trigrams Palms Revolving Heaven": 85, "Gentle Fist: Eight Trigrams Mountain Crusher": 90,
-            
-            # Chris's jutsu
-            "Four Symbols Seal": 45, "Five Elements Seal": 50, "Barrier Method Formation": 55,
-            "Eight Trigrams Seal": 60, "Contract Seal": 65, "Four Violet Flames Formation": 70,
-            "Four Black Fogs Formation": 75, "Four Red Yang Formation": 80, "Four White Yin Formation": 85
-        }
-        
-        damage = base_damage.get(jutsu_name, 60)
-        
-        # Phase multipliers
-        phase_multipliers = {
-            "Phase 1": 1.0,
-            "Phase 2": 1.3,
-            "Phase 3": 1.6
-        }
-        
-        phase_name = phase.get("name", "Phase 1")
-        multiplier = phase_multipliers.get(phase_name.split(":")[0], 1.0)
-        return int(damage * multiplier)
+        prefix = phase.get("name", "Phase 1").split(":")[0]
+        damage = NPC_DAMAGE.get((prefix, jutsu_name))
+        if damage is None:
+            damage = int(NPC_JUTSU_DAMAGE.get(jutsu_name, 60) * NPC_PHASE_MULTIPLIERS.get(prefix, 1.0))
+        return damage
 
     def get_npc_jutsu(self, phase: Dict[str, Any]) -> str:
         """Get a random jutsu from the current phase's jutsu pool."""
@@ -786,7 +842,7 @@ class BossBattleCommands(commands.Cog):
         elif action == "flee":
             user_id = str(interaction.user.id)
             if user_id in self.boss_system.active_boss_battles:
-                self.boss_system.active_boss_battles.pop(user_id, None)
+                battle_data = self.boss_system.active_boss_battles.pop(user_id)
                 embed = discord.Embed(
                     title="🏃 **FLED FROM BATTLE** 🏃",
                     description="**You have fled from Solomon's wrath...**\n\n"
@@ -794,6 +850,7 @@ class BossBattleCommands(commands.Cog):
                     color=0xFF6600
                 )
                 await interaction.followup.send(embed=embed)
+                self.boss_system._broadcast(battle_data, embed, final=True)
             else:
                 await interaction.followup.send("❌ You are not in a boss battle!")
                 
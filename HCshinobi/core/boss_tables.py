@@ -0,0 +1,71 @@
+"""
+Boss Tables for HCShinobi
+Phase, multiplier and damage lookups compiled once per boss definition.
+
+A boss counter-attack needs three things: the active phase for the boss's
+HP, that phase's damage multiplier, and the damage of the chosen jutsu.
+:class:`BossTable` works all three out when it is built. Phases go into a
+:class:`~HCshinobi.core.npc_registry.PhaseTable`. Every phase's multiplier
+is resolved once. Final damage is stored for each ``(phase, jutsu)`` pair
+the boss can use. During a turn the lookups are dict reads, so a counter
+no longer rebuilds dict literals or scans the phase list.
+
+The table is also a :class:`~HCshinobi.core.battle.engine.DamageModel`. It
+reads the phase from ``Attack.payload``, so it can be passed straight to
+:meth:`TurnEngine.attack`.
+"""
+
+from __future__ import annotations
+
+import logging
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from .battle.engine import Attack, DamageModel, Hit
+from .npc_registry import PhaseTable
+
+logger = logging.getLogger(__name__)
+
+Multiplier = Callable[[Dict[str, Any]], float]
+
+
+def _flat(phase: Dict[str, Any]) -> float:
+    return 1.0
+
+
+class BossTable(DamageModel):
+    """A boss definition's phases and per-phase jutsu damage, precomputed."""
+
+    def __init__(self, phases: Iterable[Dict[str, Any]], damage: Mapping[str, int], default: int = 100,
+                 multiplier: Multiplier = _flat, text: Optional[str] = None):
+        self.phases = PhaseTable(phases)
+        self.base: Dict[str, int] = dict(damage)
+        self.default = default
+        self.multiplier = multiplier
+        self.text = text
+        self._powers: Dict[str, float] = {}
+        self._damage: Dict[Tuple[str, str], int] = {}
+        for phase in self.phases.phases:
+            name = phase.get("name", "")
+            if name in self._powers:
+                continue
+            power = self._powers[name] = multiplier(phase)
+            for jutsu in chain(self.base, phase.get("jutsu_pool", ())):
+                self._damage[name, jutsu] = int(self.base.get(jutsu, default) * power)
+
+    def phase(self, hp_ratio: float, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.phases.at(hp_ratio, default)
+
+    def power(self, phase: Dict[str, Any]) -> float:
+        """The damage multiplier of ``phase``; phases outside the definition are resolved on the spot."""
+        power = self._powers.get(phase.get("name", ""))
+        return power if power is not None else self.multiplier(phase)
+
+    def damage(self, jutsu_name: str, phase: Dict[str, Any]) -> int:
+        damage = self._damage.get((phase.get("name", ""), jutsu_name))
+        if damage is None:
+            damage = int(self.base.get(jutsu_name, self.default) * self.power(phase))
+        return damage
+
+    def roll(self, rng, attacker, target, attack: Attack) -> Hit:
+        return Hit(damage=self.damage(attack.jutsu, attack.payload or {}))
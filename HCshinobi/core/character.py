@@ -24,6 +24,8 @@ class Character:
     losses: int = 0
     draws: int = 0
     wins_against_rank: Dict[str, int] = field(default_factory=dict)
+    rating: int = 1200  # PvP Elo, see core.matchmaking
+    rated_games: int = 0  # decisive PvP games behind ``rating``
     
     # Additional fields to match existing character files
     exp: int = 0
@@ -45,5 +47,8 @@ class Character:
     titles: List[str] = field(default_factory=list)
     completed_missions: List[str] = field(default_factory=list)
     jutsu_mastery: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    training_sessions: int = 0
+    bosses_defeated: int = 0
+    defeated_bosses: List[str] = field(default_factory=list)
     last_daily_claim: Optional[str] = None
     active_mission_id: Optional[str] = None
@@ -1,12 +1,14 @@
 import json
 import os
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 from .character import Character
 from .constants import DATA_DIR, CHARACTERS_SUBDIR
 
 class CharacterSystem:
     def __init__(self) -> None:
         self.characters: Dict[str, Character] = {}
+        self._save_listeners: List[Callable[[str], None]] = []
+        self._pre_save_hooks: List[Callable[[Character], None]] = []
         self.characters_dir = os.path.join(DATA_DIR, CHARACTERS_SUBDIR)
         os.makedirs(self.characters_dir, exist_ok=True)
         self._load_existing_characters()
@@ -39,6 +41,8 @@ class CharacterSystem:
 
     def _save_character_to_file(self, character: Character) -> None:
         """Save character data to JSON file."""
+        for hook in self._pre_save_hooks:
+            hook(character)
         try:
             character_file = os.path.join(self.characters_dir, f"{character.id}.json")
             character_data = self._character_to_dict(character)
@@ -46,6 +50,16 @@ class CharacterSystem:
                 json.dump(character_data, f, indent=4, ensure_ascii=False)
         except Exception as e:
             print(f"Error saving character file for {character.id}: {e}")
+        for listener in self._save_listeners:
+            listener(str(character.id))
+
+    def add_pre_save_hook(self, hook: Callable[[Character], None]) -> None:
+        """Register a callback that may update a character right before it is written."""
+        self._pre_save_hooks.append(hook)
+
+    def add_save_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback run with the character id after every save."""
+        self._save_listeners.append(listener)
 
     def _character_to_dict(self, character: Character) -> Dict:
         """Convert Character object to dictionary for JSON serialization."""
@@ -71,6 +85,8 @@ class CharacterSystem:
             "losses": character.losses,
             "draws": character.draws,
             "wins_against_rank": character.wins_against_rank,
+            "rating": character.rating,
+            "rated_games": character.rated_games,
             "exp": character.exp,
             "specialization": character.specialization,
             "willpower": character.willpower,
@@ -90,6 +106,9 @@ class CharacterSystem:
             "titles": character.titles,
             "completed_missions": character.completed_missions,
             "jutsu_mastery": character.jutsu_mastery,
+            "training_sessions": character.training_sessions,
+            "bosses_defeated": character.bosses_defeated,
+            "defeated_bosses": character.defeated_bosses,
             "last_daily_claim": character.last_daily_claim,
             "active_mission_id": character.active_mission_id
         }
@@ -118,6 +137,8 @@ class CharacterSystem:
             losses=data.get("losses", 0),
             draws=data.get("draws", 0),
             wins_against_rank=data.get("wins_against_rank", {}),
+            rating=data.get("rating", 1200),
+            rated_games=data.get("rated_games", 0),
             # Additional fields
             exp=data.get("exp", 0),
             specialization=data.get("specialization"),
@@ -138,6 +159,9 @@ class CharacterSystem:
             titles=data.get("titles", []),
             completed_missions=data.get("completed_missions", []),
             jutsu_mastery=data.get("jutsu_mastery", {}),
+            training_sessions=data.get("training_sessions", 0),
+            bosses_defeated=data.get("bosses_defeated", 0),
+            defeated_bosses=data.get("defeated_bosses", []),
             last_daily_claim=data.get("last_daily_claim"),
             active_mission_id=data.get("active_mission_id")
         )
@@ -0,0 +1,258 @@
+"""
+Cooldown Store for HCShinobi
+Durable per-user cooldowns shared by boss fights, training, daily claims and token earning.
+
+Each cooldown is an expiry time (epoch seconds, UTC) kept under a scope such
+as ``"boss"`` or ``"daily"``. Lookups read a dict, so "how long until I can
+do this again" is O(1). Expired entries are not removed on read. They sit in
+a min-heap ordered by expiry, and :meth:`CooldownStore.purge` pops whatever
+has lapsed. Every write calls it, so the store stays as small as the set of
+live cooldowns without a background task.
+
+With a ``data_dir`` every change is appended to ``cooldowns.jsonl`` as one
+JSON line. On start-up the log is replayed and lapsed entries are dropped,
+so a week-long Solomon cooldown survives restarts. Once the log holds
+``COMPACT_FACTOR`` times more lines than live cooldowns, it is rewritten
+with just the live entries.
+
+:meth:`CooldownStore.scope` returns a dict-like view of one scope. It maps
+user ids to aware UTC expiry datetimes, so code that kept a plain
+``Dict[str, datetime]`` of cooldowns works unchanged.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+import time
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DAILY = timedelta(hours=24)
+
+
+class CooldownStore:
+    """Expiry times by scope and key, with a min-heap for lazy purging and an append-only log."""
+
+    FILENAME = "cooldowns.jsonl"
+    # Rewrite the log (or rebuild the heap) once it outgrows the live entries by this factor.
+    COMPACT_FACTOR = 2
+
+    def __init__(self, data_dir: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.path = Path(data_dir) / self.FILENAME if data_dir else None
+        self._expiry: Dict[str, Dict[str, float]] = {}
+        self._heap: List[Tuple[float, str, str]] = []
+        self._live = 0
+        self._lines = 0
+        self.purged = 0
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        """Entries held, including lapsed ones not purged yet."""
+        return self._live
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def expires_at(self, scope: str, key: Any) -> Optional[float]:
+        """When ``key``'s cooldown ends, or None if it is not on cooldown."""
+        until = self._expiry.get(scope, {}).get(str(key))
+        return until if until is not None and until > self.clock() else None
+
+    def remaining(self, scope: str, key: Any) -> float:
+        """Seconds left on ``key``'s cooldown; 0 when it is free to act."""
+        until = self._expiry.get(scope, {}).get(str(key))
+        return max(0.0, until - self.clock()) if until is not None else 0.0
+
+    def active(self, scope: str) -> Dict[str, float]:
+        """Every live cooldown in ``scope`` as ``{key: expiry}``."""
+        now = self.clock()
+        return {key: until for key, until in self._expiry.get(scope, {}).items() if until > now}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def set(self, scope: str, key: Any, until: float) -> None:
+        """Put ``key`` on cooldown until ``until`` (epoch seconds), replacing any earlier cooldown."""
+        key = str(key)
+        self.purge()
+        self._put(scope, key, until)
+        self._append({"scope": scope, "key": key, "until": until})
+
+    def start(self, scope: str, key: Any, seconds: float) -> float:
+        """Put ``key`` on cooldown for ``seconds`` from now; returns the expiry."""
+        until = self.clock() + seconds
+        self.set(scope, key, until)
+        return until
+
+    def clear(self, scope: str, key: Any) -> bool:
+        """End ``key``'s cooldown early. Returns False if it had none."""
+        key = str(key)
+        if self._drop(scope, key) is None:
+            return False
+        self._append({"scope": scope, "key": key, "until": None})
+        return True
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop every cooldown that has lapsed by ``now``; returns how many went."""
+        now = self.clock() if now is None else now
+        heap = self._heap
+        purged = 0
+        while heap and heap[0][0] <= now:
+            until, scope, key = heapq.heappop(heap)
+            if self._expiry.get(scope, {}).get(key) == until:  # not replaced since it was pushed
+                self._drop(scope, key)
+                purged += 1
+        self.purged += purged
+        return purged
+
+    def _put(self, scope: str, key: str, until: float) -> None:
+        keys = self._expiry.setdefault(scope, {})
+        if key not in keys:
+            self._live += 1
+        keys[key] = until
+        heapq.heappush(self._heap, (until, scope, key))
+        if len(self._heap) > self.COMPACT_FACTOR * self._live + 64:
+            self._heap = [(until, scope, key) for scope, keys in self._expiry.items() for key, until in keys.items()]
+            heapq.heapify(self._heap)
+
+    def _drop(self, scope: str, key: str) -> Optional[float]:
+        keys = self._expiry.get(scope)
+        until = keys.pop(key, None) if keys else None
+        if until is not None:
+            self._live -= 1
+            if not keys:
+                del self._expiry[scope]
+        return until
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        record = json.loads(line)
+                        scope, key, until = record["scope"], record["key"], record["until"]
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Skipping malformed cooldown record in {self.path}")
+                        continue
+                    if until is None:
+                        self._drop(scope, key)
+                    else:
+                        self._put(scope, key, until)
+        except FileNotFoundError:
+            return
+        self.purge()
+        if self._lines > self._live:
+            self.compact()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to record cooldown in {self.path}: {e}")
+            return
+        self._lines += 1
+        if self._lines > self.COMPACT_FACTOR * self._live + 64:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the live cooldowns."""
+        if self.path is None:
+            return
+        self.purge()
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                for scope, keys in self._expiry.items():
+                    for key, until in keys.items():
+                        f.write(json.dumps({"scope": scope, "key": key, "until": until},
+                                           separators=(",", ":"), ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error(f"Failed to compact {self.path}: {e}")
+            return
+        self._lines = self._live
+
+    def scope(self, name: str) -> "CooldownScope":
+        return CooldownScope(self, name)
+
+
+class CooldownScope(MutableMapping):
+    """One scope of a :class:`CooldownStore` as a ``user_id -> expiry datetime`` dict.
+
+    Lapsed cooldowns read as missing. Values are aware UTC datetimes;
+    assigning a datetime (or epoch seconds) starts or replaces a cooldown.
+    """
+
+    def __init__(self, store: CooldownStore, name: str):
+        self.store = store
+        self.name = name
+
+    def __getitem__(self, key: Any) -> datetime:
+        until = self.store.expires_at(self.name, key)
+        if until is None:
+            raise KeyError(key)
+        return datetime.fromtimestamp(until, timezone.utc)
+
+    def __setitem__(self, key: Any, value: Union[datetime, float]) -> None:
+        until = value.timestamp() if isinstance(value, datetime) else float(value)
+        self.store.set(self.name, key, until)
+
+    def __delitem__(self, key: Any) -> None:
+        if self.store.expires_at(self.name, key) is None or not self.store.clear(self.name, key):
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.active(self.name))
+
+    def __len__(self) -> int:
+        return len(self.store.active(self.name))
+
+    def __contains__(self, key: Any) -> bool:
+        return self.store.expires_at(self.name, key) is not None
+
+    def start(self, key: Any, duration: timedelta) -> datetime:
+        """Put ``key`` on cooldown for ``duration``; returns when it ends."""
+        return datetime.fromtimestamp(self.store.start(self.name, key, duration.total_seconds()), timezone.utc)
+
+    def remaining(self, key: Any) -> timedelta:
+        """Time left on ``key``'s cooldown; zero when it is free to act."""
+        return timedelta(seconds=self.store.remaining(self.name, key))
+
+
+def format_remaining(remaining: timedelta) -> str:
+    """``"2d 5h"``, ``"3h 12m"`` or ``"45m"``, rounded up to the minute."""
+    minutes = max(1, -int(-remaining.total_seconds() // 60))
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+def cooldowns_for(services: Any) -> CooldownStore:
+    """The container's shared store, or a private in-memory one for a cog running without services."""
+    store = getattr(services, "cooldowns", None)
+    return store if isinstance(store, CooldownStore) else CooldownStore()
@@ -1,14 +1,27 @@
+from typing import Optional
+
+from .events import CurrencyChangedEvent, EventBus, publish_event
+
+
 class CurrencySystem:
-    def __init__(self) -> None:
+    def __init__(self, event_bus: Optional[EventBus] = None) -> None:
         self.balances = {}
+        self.event_bus = event_bus
 
     async def get_player_balance(self, user_id: int) -> int:
         return self.balances.get(str(user_id), 0)
 
     async def add_balance(self, user_id: int, amount: int) -> None:
         self.balances[str(user_id)] = self.balances.get(str(user_id), 0) + amount
+        self._publish_change(user_id, amount)
 
     def add_balance_and_save(self, user_id: int, amount: int) -> int:
         """Add balance and return the new balance. This is a sync method for compatibility."""
         self.balances[str(user_id)] = self.balances.get(str(user_id), 0) + amount
+        self._publish_change(user_id, amount)
         return self.balances[str(user_id)]
+
+    def _publish_change(self, user_id: int, amount: int) -> None:
+        publish_event(self.event_bus, CurrencyChangedEvent(
+            user_id=str(user_id), delta=amount, balance=self.balances[str(user_id)]
+        ))
@@ -0,0 +1,254 @@
+"""
+In-process event bus for HCShinobi.
+
+Core systems publish typed events (level-ups, rank changes, currency
+movements, finished training and battles) and cogs subscribe to the ones
+they care about.  Publishing never blocks: every subscriber owns a bounded
+queue drained by its own task, and events that do not fit are dropped and
+counted so slow consumers show up in the metrics instead of stalling a
+battle turn.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, ClassVar, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GameEvent:
+    """Base class for every event published on the bus."""
+    event_type: ClassVar[str] = "event"
+
+    user_id: str
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass
+class LevelUpEvent(GameEvent):
+    event_type: ClassVar[str] = "level_up"
+
+    old_level: int = 1
+    new_level: int = 1
+
+
+@dataclass
+class RankChangedEvent(GameEvent):
+    event_type: ClassVar[str] = "rank_changed"
+
+    old_rank: str = ""
+    new_rank: str = ""
+
+
+@dataclass
+class JutsuUnlockedEvent(GameEvent):
+    event_type: ClassVar[str] = "jutsu_unlocked"
+
+    jutsu_name: str = ""
+
+
+@dataclass
+class AchievementUnlockedEvent(GameEvent):
+    event_type: ClassVar[str] = "achievement_unlocked"
+
+    achievement: str = ""
+
+
+@dataclass
+class ExperienceGainedEvent(GameEvent):
+    event_type: ClassVar[str] = "experience_gained"
+
+    amount: int = 0
+    total_exp: int = 0
+
+
+@dataclass
+class CurrencyChangedEvent(GameEvent):
+    event_type: ClassVar[str] = "currency_changed"
+
+    delta: int = 0
+    balance: int = 0
+
+
+@dataclass
+class TrainingCompletedEvent(GameEvent):
+    event_type: ClassVar[str] = "training_completed"
+
+    attribute: str = ""
+    gain: float = 0.0
+    intensity: str = ""
+
+
+@dataclass
+class BattleEndedEvent(GameEvent):
+    """Published once per finished battle; ``user_id`` is the winner (or ``""``)."""
+    event_type: ClassVar[str] = "battle_ended"
+
+    battle_id: str = ""
+    loser_id: str = ""
+    mode: str = "pvp"
+    opponent: str = ""
+    end_reason: Optional[str] = None
+    turns: int = 0
+    level: int = 0
+    loser_level: int = 0
+    # Damage each side dealt per jutsu over the whole battle, for the analytics store.
+    damage: Dict[str, int] = field(default_factory=dict)
+    loser_damage: Dict[str, int] = field(default_factory=dict)
+
+
+EventHandler = Callable[[GameEvent], Awaitable[None]]
+
+
+@dataclass
+class SubscriptionMetrics:
+    """Backpressure counters for a single subscriber."""
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    high_water: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "high_water": self.high_water,
+        }
+
+
+class Subscription:
+    """A subscriber's bounded queue and the task that drains it."""
+
+    def __init__(self, name: str, handler: EventHandler,
+                 event_types: Tuple[Type[GameEvent], ...], maxsize: int):
+        self.name = name
+        self.handler = handler
+        self.event_types = event_types
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.metrics = SubscriptionMetrics()
+        self._task: Optional[asyncio.Task] = None
+
+    def wants(self, event: GameEvent) -> bool:
+        return not self.event_types or isinstance(event, self.event_types)
+
+    def offer(self, event: GameEvent) -> bool:
+        """Queue ``event`` without waiting; count it as dropped when full."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.metrics.dropped += 1
+            return False
+        depth = self.queue.qsize()
+        if depth > self.metrics.high_water:
+            self.metrics.high_water = depth
+        return True
+
+    def ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.handler(event)
+                self.metrics.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics.errors += 1
+                logger.warning(f"Event subscriber '{self.name}' failed on {event.event_type}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class EventBus:
+    """Fan-out of :class:`GameEvent` objects to non-blocking subscribers."""
+
+    DEFAULT_QUEUE_SIZE = 256
+
+    def __init__(self, default_queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.default_queue_size = default_queue_size
+        self._subscriptions: List[Subscription] = []
+        self.published: Dict[str, int] = {}
+
+    def subscribe(self, handler: EventHandler, *event_types: Type[GameEvent],
+                  maxsize: Optional[int] = None, name: Optional[str] = None) -> Subscription:
+        """Register ``handler`` for ``event_types`` (all events when empty)."""
+        sub = Subscription(
+            name or getattr(handler, "__qualname__", repr(handler)),
+            handler,
+            tuple(event_types),
+            maxsize or self.default_queue_size,
+        )
+        self._subscriptions.append(sub)
+        sub.ensure_running()
+        return sub
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        await subscription.stop()
+
+    def publish(self, event: GameEvent) -> int:
+        """Hand ``event`` to every interested subscriber and return how many accepted it.
+
+        Safe to call from synchronous code; delivery happens on the running
+        event loop the next time it gets control.
+        """
+        self.published[event.event_type] = self.published.get(event.event_type, 0) + 1
+        accepted = 0
+        for sub in list(self._subscriptions):
+            if not sub.wants(event):
+                continue
+            sub.ensure_running()
+            if sub.offer(event):
+                accepted += 1
+        return accepted
+
+    async def drain(self) -> None:
+        """Wait until every subscriber has handled everything queued so far."""
+        for sub in list(self._subscriptions):
+            sub.ensure_running()
+            await sub.queue.join()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "published": dict(self.published),
+            "subscribers": {
+                sub.name: {**sub.metrics.to_dict(), "queued": sub.queue.qsize()}
+                for sub in self._subscriptions
+            },
+        }
+
+    async def close(self) -> None:
+        for sub in list(self._subscriptions):
+            await sub.stop()
+        self._subscriptions.clear()
+
+
+def publish_event(event_bus: Optional[EventBus], event: GameEvent) -> None:
+    """Publish ``event`` if a bus is wired in; systems built without one stay silent."""
+    if event_bus is not None:
+        event_bus.publish(event)
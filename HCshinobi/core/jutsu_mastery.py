@@ -0,0 +1,102 @@
+"""
+Jutsu Mastery Tracker for HCShinobi
+Counts jutsu usage in memory and folds it into ``Character.jutsu_mastery`` on save.
+
+Recording a use is a dictionary increment; nothing touches disk until the
+character is saved for another reason (the pending counts ride along through
+a CharacterSystem pre-save hook) or :meth:`JutsuMasteryTracker.flush` writes
+every dirty character in one batch.
+
+Mastery raises damage everywhere a player's jutsu is used and lowers its
+chakra cost where one is charged (ShinobiOS mission actions).
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+from .character import Character
+
+# Uses required to reach each mastery level (index == level).
+MASTERY_THRESHOLDS: Tuple[int, ...] = (0, 10, 25, 50, 100, 200)
+MASTERY_TITLES: Tuple[str, ...] = ("Novice", "Apprentice", "Adept", "Expert", "Master", "Grandmaster")
+
+# Precomputed (damage multiplier, chakra cost multiplier) per mastery level.
+MASTERY_MODIFIERS: Tuple[Tuple[float, float], ...] = tuple(
+    (round(1.0 + 0.05 * level, 2), round(1.0 - 0.04 * level, 2))
+    for level in range(len(MASTERY_THRESHOLDS))
+)
+
+
+def mastery_level(uses: int) -> int:
+    """Mastery level for a total number of uses."""
+    return bisect.bisect_right(MASTERY_THRESHOLDS, uses) - 1
+
+
+class JutsuMasteryTracker:
+    """Per-character in-memory jutsu use counters with batched persistence."""
+
+    def __init__(self, character_system=None):
+        self.character_system = character_system
+        # user_id -> jutsu name -> uses not yet written to the character
+        self._pending: Dict[str, Dict[str, int]] = {}
+        if character_system is not None and hasattr(character_system, "add_pre_save_hook"):
+            character_system.add_pre_save_hook(self.apply_pending)
+
+    def record_use(self, user_id, jutsu_name: str, count: int = 1) -> None:
+        """Count ``count`` uses of ``jutsu_name``; never writes to disk."""
+        counters = self._pending.setdefault(str(user_id), {})
+        counters[jutsu_name] = counters.get(jutsu_name, 0) + count
+
+    def pending_uses(self, user_id, jutsu_name: str) -> int:
+        return self._pending.get(str(user_id), {}).get(jutsu_name, 0)
+
+    def get_uses(self, user_id, jutsu_name: str, character: Optional[Character] = None) -> int:
+        """Persisted plus pending uses of a jutsu."""
+        if character is None and self.character_system is not None:
+            character = self.character_system.characters.get(str(user_id))
+        persisted = 0
+        if character is not None:
+            persisted = character.jutsu_mastery.get(jutsu_name, {}).get("uses", 0)
+        return persisted + self.pending_uses(user_id, jutsu_name)
+
+    def get_level(self, user_id, jutsu_name: str, character: Optional[Character] = None) -> int:
+        return mastery_level(self.get_uses(user_id, jutsu_name, character))
+
+    def get_modifiers(self, user_id, jutsu_name: str,
+                      character: Optional[Character] = None) -> Tuple[float, float]:
+        """``(damage_multiplier, cost_multiplier)`` for the user's current mastery."""
+        return MASTERY_MODIFIERS[self.get_level(user_id, jutsu_name, character)]
+
+    def get_damage_multiplier(self, user_id, jutsu_name: str, character: Optional[Character] = None) -> float:
+        """Damage multiplier for the user's current mastery of a jutsu."""
+        return self.get_modifiers(user_id, jutsu_name, character)[0]
+
+    def apply_pending(self, character: Character) -> bool:
+        """Fold pending counts into ``character.jutsu_mastery``. Returns True if anything changed."""
+        counters = self._pending.pop(str(character.id), None)
+        if not counters:
+            return False
+        for jutsu_name, count in counters.items():
+            entry = character.jutsu_mastery.setdefault(jutsu_name, {})
+            entry["uses"] = entry.get("uses", 0) + count
+            level = mastery_level(entry["uses"])
+            entry["level"] = level
+            entry["title"] = MASTERY_TITLES[level]
+        return True
+
+    async def flush(self) -> List[str]:
+        """Persist every character with pending counts; returns the flushed ids."""
+        if self.character_system is None:
+            return []
+        flushed = []
+        for user_id in list(self._pending):
+            character = await self.character_system.get_character(user_id)
+            if character is None:
+                self._pending.pop(user_id, None)
+                continue
+            self.apply_pending(character)
+            await self.character_system.save_character(character)
+            flushed.append(user_id)
+        return flushed
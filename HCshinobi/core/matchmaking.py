@@ -0,0 +1,253 @@
+"""
+Matchmaking for HCShinobi
+Elo ratings and a rating-bucketed PvP queue paired on a tick.
+
+Each character has an Elo rating (``Character.rating``). It is updated from
+every finished PvP battle's winner and loser, with a larger K-factor while a
+character has few rated games. Queued players sit in fixed-width rating
+buckets. Enqueueing is a dict insert plus a bisect into the sorted list of
+non-empty bucket keys, so it costs O(log n). Each tick walks the queue
+oldest first. It pairs every player with the closest-rated opponent inside
+a window that widens the longer the player has waited. Waits of matched
+players feed the p50/p90/p99 in :meth:`MatchmakingQueue.metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .events import BattleEndedEvent, EventBus, GameEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATING = 1200
+PROVISIONAL_GAMES = 30
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / 400))
+
+
+def k_factor(games: int) -> int:
+    return 40 if games < PROVISIONAL_GAMES else 20
+
+
+def elo_update(winner: float, loser: float, winner_games: int = PROVISIONAL_GAMES,
+               loser_games: int = PROVISIONAL_GAMES) -> Tuple[int, int]:
+    """New ``(winner, loser)`` ratings after one decisive game."""
+    expected = expected_score(winner, loser)
+    return (round(winner + k_factor(winner_games) * (1 - expected)),
+            round(loser - k_factor(loser_games) * (1 - expected)))
+
+
+@dataclass
+class Ticket:
+    user_id: str
+    rating: int
+    queued_at: float
+    channel_id: Optional[int] = None
+
+    @property
+    def bucket(self) -> int:
+        return self.rating // MatchmakingQueue.BUCKET_WIDTH
+
+
+MatchHandler = Callable[[Ticket, Ticket], Awaitable[None]]
+
+
+class MatchmakingQueue:
+    """Rating-bucketed queue of PvP players; :meth:`tick` pairs them."""
+
+    BUCKET_WIDTH = 50
+    BASE_WINDOW = 100     # rating difference accepted immediately
+    WINDOW_GROWTH = 10    # extra rating points per second waited
+    MAX_WINDOW = 1000
+    TICK_INTERVAL = 2.0
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, character_system=None, event_bus: Optional[EventBus] = None,
+                 on_match: Optional[MatchHandler] = None, clock: Callable[[], float] = time.monotonic):
+        self.character_system = character_system
+        self.on_match = on_match
+        self.clock = clock
+        self._tickets: Dict[str, Ticket] = {}          # insertion order is queue order
+        self._buckets: Dict[int, Dict[str, Ticket]] = {}
+        self._bucket_keys: List[int] = []
+        self._waits: Deque[float] = deque(maxlen=self.WAIT_SAMPLES)
+        self._task: Optional[asyncio.Task] = None
+        self._subscription = None
+        self.matched = 0
+        if event_bus is not None:
+            self.attach(event_bus)
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, user_id: Any) -> bool:
+        return str(user_id) in self._tickets
+
+    # ------------------------------------------------------------------
+    # Ratings
+    # ------------------------------------------------------------------
+
+    def attach(self, event_bus: EventBus) -> None:
+        """Re-rate both players whenever a PvP battle ends."""
+        self._subscription = event_bus.subscribe(self.handle_event, BattleEndedEvent, name="matchmaking")
+
+    async def handle_event(self, event: GameEvent) -> None:
+        if not isinstance(event, BattleEndedEvent) or event.mode != "pvp":
+            return
+        if event.user_id and event.loser_id:
+            await self.record_result(event.user_id, event.loser_id)
+
+    async def rating(self, user_id: Any) -> int:
+        character = await self._character(user_id)
+        return getattr(character, "rating", DEFAULT_RATING) if character else DEFAULT_RATING
+
+    async def record_result(self, winner_id: Any, loser_id: Any) -> Optional[Tuple[int, int]]:
+        """Apply one win and loss to both characters' ratings; returns the new ratings."""
+        winner, loser = await self._character(winner_id), await self._character(loser_id)
+        if winner is None or loser is None:
+            return None  # bot opponents and deleted characters are unrated
+        winner.rating, loser.rating = elo_update(
+            winner.rating, loser.rating, winner.rated_games, loser.rated_games,
+        )
+        winner.rated_games += 1
+        loser.rated_games += 1
+        for character in (winner, loser):
+            try:
+                await self.character_system.save_character(character)
+            except Exception as e:
+                logger.warning(f"Could not save rating for {character.id}: {e}")
+        return winner.rating, loser.rating
+
+    async def _character(self, user_id: Any):
+        if self.character_system is None:
+            return None
+        try:
+            return await self.character_system.get_character(str(user_id))
+        except Exception as e:
+            logger.warning(f"Could not load character {user_id} for matchmaking: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+
+    def enqueue(self, user_id: Any, rating: int, channel_id: Optional[int] = None) -> Ticket:
+        """Queue ``user_id`` (re-queueing keeps the original wait time)."""
+        user_id = str(user_id)
+        existing = self._tickets.get(user_id)
+        if existing is not None:
+            return existing
+        ticket = Ticket(user_id, int(rating), self.clock(), channel_id)
+        self._tickets[user_id] = ticket
+        bucket = self._buckets.get(ticket.bucket)
+        if bucket is None:
+            bucket = self._buckets[ticket.bucket] = {}
+            bisect.insort(self._bucket_keys, ticket.bucket)
+        bucket[user_id] = ticket
+        return ticket
+
+    def dequeue(self, user_id: Any) -> Optional[Ticket]:
+        ticket = self._tickets.pop(str(user_id), None)
+        if ticket is None:
+            return None
+        bucket = self._buckets[ticket.bucket]
+        del bucket[ticket.user_id]
+        if not bucket:
+            del self._buckets[ticket.bucket]
+            del self._bucket_keys[bisect.bisect_left(self._bucket_keys, ticket.bucket)]
+        return ticket
+
+    def window(self, ticket: Ticket, now: float) -> float:
+        return min(self.MAX_WINDOW, self.BASE_WINDOW + self.WINDOW_GROWTH * (now - ticket.queued_at))
+
+    def _closest(self, ticket: Ticket, window: float) -> Optional[Ticket]:
+        """Closest-rated other ticket within ``window``; ties go to whoever waited longest."""
+        low = bisect.bisect_left(self._bucket_keys, math.floor((ticket.rating - window) / self.BUCKET_WIDTH))
+        high = bisect.bisect_right(self._bucket_keys, math.floor((ticket.rating + window) / self.BUCKET_WIDTH))
+        best, best_key = None, None
+        for key in self._bucket_keys[low:high]:
+            for other in self._buckets[key].values():
+                if other is ticket:
+                    continue
+                gap = abs(other.rating - ticket.rating)
+                if gap <= window and (best_key is None or (gap, other.queued_at) < best_key):
+                    best, best_key = other, (gap, other.queued_at)
+        return best
+
+    def pair(self, now: Optional[float] = None) -> List[Tuple[Ticket, Ticket]]:
+        """Match as many queued players as the current windows allow."""
+        now = self.clock() if now is None else now
+        pairs = []
+        for ticket in list(self._tickets.values()):
+            if ticket.user_id not in self._tickets:
+                continue  # already matched this tick
+            partner = self._closest(ticket, self.window(ticket, now))
+            if partner is None:
+                continue
+            for matched in (self.dequeue(ticket.user_id), self.dequeue(partner.user_id)):
+                self._waits.append(now - matched.queued_at)
+            pairs.append((ticket, partner))
+        self.matched += len(pairs)
+        return pairs
+
+    async def tick(self) -> List[Tuple[Ticket, Ticket]]:
+        pairs = self.pair()
+        for first, second in pairs:
+            if self.on_match is None:
+                continue
+            try:
+                await self.on_match(first, second)
+            except Exception as e:
+                logger.error(f"Failed to start matched battle {first.user_id} vs {second.user_id}: {e}")
+        return pairs
+
+    def metrics(self) -> Dict[str, Any]:
+        now = self.clock()
+        waits = sorted(self._waits)
+
+        def percentile(q: float) -> float:  # nearest rank
+            return waits[max(0, math.ceil(q * len(waits)) - 1)] if waits else 0.0
+
+        return {
+            "queued": len(self._tickets),
+            "buckets": len(self._bucket_keys),
+            "matched": self.matched,
+            "oldest_wait": max((now - t.queued_at for t in self._tickets.values()), default=0.0),
+            "wait_p50": percentile(0.50),
+            "wait_p90": percentile(0.90),
+            "wait_p99": percentile(0.99),
+        }
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.TICK_INTERVAL)
+            if self._tickets:
+                await self.tick()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -1,5 +1,6 @@
 from .mission import Mission, MissionStatus, MissionDifficulty
 from .discord_interface import MissionInterface
-from .generator import MissionGenerator
+from .generator import MissionGenerationError, MissionGenerator
 
-__all__ = ["Mission", "MissionStatus", "MissionDifficulty", "MissionInterface", "MissionGenerator"]
+__all__ = ["Mission", "MissionStatus", "MissionDifficulty", "MissionInterface", "MissionGenerator",
+           "MissionGenerationError"]
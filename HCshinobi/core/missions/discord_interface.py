@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
 from . import Mission, MissionDifficulty, MissionStatus
-from .generator import MissionGenerator
+from .generator import MissionGenerationError, MissionGenerator
 
 class MissionInterface(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
@@ -15,11 +15,24 @@ class MissionInterface(commands.Cog):
         self.active_missions: Dict[str, List[Mission]] = {}
         self.player_missions: Dict[int, Mission] = {}
         self._village_cooldowns: Dict[str, datetime] = {}
+        self._generator: Optional[MissionGenerator] = None
+
+    async def cog_unload(self) -> None:
+        if self._generator is not None:
+            await self._generator.close()
+            self._generator = None
+
+    def _mission_generator(self) -> MissionGenerator:
+        """One pooled generator for the cog's lifetime, so every mission reuses warm connections."""
+        if self._generator is None:
+            config = getattr(getattr(self.bot, "services", None), "config", None)
+            endpoint = getattr(config, "mission_endpoint", None)
+            self._generator = MissionGenerator(endpoint if isinstance(endpoint, str) else None).open()
+        return self._generator
 
     async def _generate_mission(self, village: str, difficulty: str) -> Mission:
-        async with MissionGenerator() as gen:
-            missions = await gen.generate_mission_batch(village, [MissionDifficulty(difficulty)], 1)
-            return missions[0]
+        missions = await self._mission_generator().generate_mission_batch(village, [MissionDifficulty(difficulty)], 1)
+        return missions[0]
 
     @app_commands.command(name="mission")
     async def mission_command(self, interaction: discord.Interaction, difficulty: str, village: str) -> None:
@@ -29,10 +42,20 @@ class MissionInterface(commands.Cog):
         if last and (now - last).total_seconds() < 2:
             await interaction.followup.send("Please wait before requesting another mission.", ephemeral=True)
             return
-        mission = await self._generate_mission(village, difficulty)
+        # Claim the cooldown before awaiting the endpoint so concurrent requests see it.
+        self._village_cooldowns[village] = now
+        try:
+            mission = await self._generate_mission(village, difficulty)
+        except MissionGenerationError:
+            if last is None:
+                self._village_cooldowns.pop(village, None)
+            else:
+                self._village_cooldowns[village] = last
+            await interaction.followup.send("The mission board is unavailable right now. Try again soon.",
+                                            ephemeral=True)
+            return
         self.active_missions.setdefault(village, []).append(mission)
         self.player_missions[interaction.user.id] = mission
-        self._village_cooldowns[village] = now
         await interaction.followup.send(f"Mission '{mission.title}' created", ephemeral=True)
 
     @app_commands.command(name="missions")
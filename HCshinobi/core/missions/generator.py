@@ -1,31 +1,112 @@
+"""
+Mission Generator for HCShinobi
+Missions written by a text-generation endpoint, fetched concurrently over one pooled session.
+
+Each mission is one POST of ``{"village", "difficulty"}`` to ``endpoint``,
+a mission service that answers ``{"response": "<mission JSON>"}``. The
+payload is not an Ollama prompt, so the endpoint is that service, not a raw
+Ollama ``/api/generate``.
+:meth:`MissionGenerator.generate_mission_batch` sends the whole batch at
+once. A semaphore keeps at most ``concurrency`` requests in flight, and the
+connector pool is the same size with keep-alive on. A batch therefore
+reuses a handful of warm connections instead of opening one per mission
+or queueing behind a single request.
+
+A reply that is not a JSON object, or whose ``response`` does not decode
+to one, raises :class:`MissionGenerationError` and is not retried.
+
+Every request has its own timeout. Connection errors, timeouts and
+429/5xx replies are retried with exponential backoff and full jitter, so
+a batch that hits a busy endpoint does not retry in lockstep. Other HTTP
+errors fail at once. A mission that still fails raises
+:class:`MissionGenerationError`, and the rest of its batch is cancelled.
+"""
+
 from __future__ import annotations
 
-import aiohttp
+import asyncio
 import json
+import logging
+import math
+import random
+import time
 import uuid
-from typing import List
+from collections import deque
 from datetime import timedelta
+from typing import Any, Deque, Dict, List, Optional
+
+import aiohttp
 
 from . import Mission, MissionDifficulty
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT = "http://localhost"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class MissionGenerationError(RuntimeError):
+    """The endpoint could not produce a mission, even after retrying."""
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
 class MissionGenerator:
-    def __init__(self) -> None:
+    """Turns endpoint replies into :class:`Mission` objects, many requests at a time."""
+
+    # Requests in flight at once; the connection pool is sized to match.
+    CONCURRENCY = 8
+    # Seconds per request, connecting included.
+    TIMEOUT = 30.0
+    # Extra attempts after the first, and the base backoff that doubles with each one.
+    RETRIES = 3
+    BACKOFF = 0.25
+    KEEPALIVE = 30.0
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self, endpoint: Optional[str] = None, concurrency: int = CONCURRENCY, timeout: float = TIMEOUT,
+                 retries: int = RETRIES, backoff: float = BACKOFF, rng: Optional[random.Random] = None) -> None:
+        self.endpoint = endpoint or DEFAULT_ENDPOINT
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.rng = rng or random.Random()
         self.session: aiohttp.ClientSession | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._latency: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
-        return self
+        return self.open()
 
     async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def open(self) -> "MissionGenerator":
+        """Start the pooled session (idempotent); ``async with`` calls this for you."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=self.KEEPALIVE,
+                                             ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def close(self) -> None:
         if self.session:
             await self.session.close()
+            self.session = None
 
     async def generate_mission(self, village: str, difficulty: MissionDifficulty) -> Mission:
         payload = {"village": village, "difficulty": difficulty.value}
         assert self.session is not None
-        async with self.session.post("http://localhost", json=payload) as resp:
-            data = await resp.json()
-        details = json.loads(data.get("response", "{}"))
+        details = self._details(await self._post(payload))
         return Mission(
             id=str(uuid.uuid4()),
             title=details.get("title", "Mission"),
@@ -37,11 +118,75 @@ class MissionGenerator:
             requirements=details.get("requirements", {}),
         )
 
+    def _details(self, data: Any) -> Dict[str, Any]:
+        """The mission object inside a reply; anything else is a :class:`MissionGenerationError`."""
+        try:
+            details = json.loads(data.get("response", "{}"))
+        except (AttributeError, TypeError, ValueError) as e:
+            details, reason = None, f"an unreadable reply ({type(e).__name__}: {e})"
+        else:
+            reason = f"a JSON {type(details).__name__} instead of a mission object"
+        if not isinstance(details, dict):
+            self.failures += 1
+            raise MissionGenerationError(f"{self.endpoint} sent {reason}")
+        return details
+
     async def generate_mission_batch(
         self, village: str, difficulties: List[MissionDifficulty], count: int
     ) -> List[Mission]:
-        missions: List[Mission] = []
-        for diff in difficulties:
-            for _ in range(count):
-                missions.append(await self.generate_mission(village, diff))
-        return missions
+        """``count`` missions per difficulty, in that order, generated concurrently."""
+        tasks = [asyncio.ensure_future(self.generate_mission(village, diff))
+                 for diff in difficulties for _ in range(count)]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    self.requests += 1
+                    async with self.session.post(self.endpoint, json=payload) as resp:
+                        if resp.status in RETRY_STATUSES:
+                            raise _RetryableStatus(resp.status)
+                        if resp.status >= 400:
+                            self.failures += 1
+                            raise MissionGenerationError(f"{self.endpoint} answered HTTP {resp.status}")
+                        data = await resp.json()
+                    self._latency.append(time.perf_counter() - started)
+                return data
+            except (aiohttp.ClientError, asyncio.TimeoutError, _RetryableStatus) as e:
+                reason = str(e) or type(e).__name__
+                if attempt == self.retries:
+                    self.failures += 1
+                    raise MissionGenerationError(
+                        f"{self.endpoint} failed after {attempt + 1} attempts: {reason}"
+                    ) from e
+                logger.debug(f"Retrying mission request to {self.endpoint}: {reason}")
+            self.retried += 1
+            # Full jitter, outside the semaphore so a backing-off request does not hold a slot.
+            await asyncio.sleep(self.rng.uniform(0, self.backoff * 2 ** attempt))
+            attempt += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Request, retry and failure counts and latency percentiles of successful requests in milliseconds."""
+        samples = sorted(self._latency)
+
+        def percentile(q: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[max(0, math.ceil(q * len(samples)) - 1)] * 1000
+
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failures": self.failures,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+            "latency_max_ms": samples[-1] * 1000 if samples else 0.0,
+        }
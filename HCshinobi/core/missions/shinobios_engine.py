@@ -12,6 +12,8 @@ import json
 import uuid
 from datetime import datetime, timedelta
 
+from ..stats import stat_bonus
+
 class BattlePhase(Enum):
     PREPARATION = "preparation"
     ENGAGEMENT = "engagement"
@@ -52,6 +54,8 @@ class ShinobiStats:
     elemental_affinity: str = "none"
     kekkei_genkai: Optional[str] = None
     special_abilities: List[str] = field(default_factory=list)
+    # Set for players, so modifiers from the cached stat block apply to their rolls.
+    character_id: Optional[str] = None
     
     def regenerate_chakra(self, amount: int) -> None:
         """Regenerate chakra over time"""
@@ -115,7 +119,8 @@ class EnvironmentEffect:
 class ShinobiOSEngine:
     """Core ShinobiOS battle simulation engine"""
     
-    def __init__(self):
+    def __init__(self, services: Any = None):
+        self.services = services
         self.environments = self._load_environments()
         self.jutsu_database = self._load_jutsu_database()
         self.narration_templates = self._load_narration_templates()
@@ -344,17 +349,24 @@ class ShinobiOSEngine:
         
         return base_stats
     
+    def effective_stat(self, shinobi: ShinobiStats, stat: str) -> int:
+        """``stat`` plus a player's equipment, buff and condition bonus from the cached stat block."""
+        value = getattr(shinobi, stat)
+        if shinobi.character_id is not None:
+            value += stat_bonus(self.services, shinobi.character_id, stat)
+        return value
+    
     def calculate_damage(self, jutsu: Jutsu, attacker: ShinobiStats, 
                         target: ShinobiStats, environment: EnvironmentEffect) -> int:
         """Calculate damage with all modifiers"""
         base_damage = jutsu.damage
         
         # Attacker modifiers
-        ninjutsu_bonus = attacker.ninjutsu / 100
-        chakra_control_bonus = attacker.chakra_control / 100
+        ninjutsu_bonus = self.effective_stat(attacker, "ninjutsu") / 100
+        chakra_control_bonus = self.effective_stat(attacker, "chakra_control") / 100
         
         # Target modifiers
-        defense_reduction = target.defense / 200
+        defense_reduction = self.effective_stat(target, "defense") / 200
         
         # Environment modifiers
         env_damage_mod = environment.damage_modifier
@@ -376,11 +388,11 @@ class ShinobiOSEngine:
         base_accuracy = jutsu.accuracy
         
         # Attacker modifiers
-        intelligence_bonus = attacker.intelligence / 100
-        chakra_control_bonus = attacker.chakra_control / 100
+        intelligence_bonus = self.effective_stat(attacker, "intelligence") / 100
+        chakra_control_bonus = self.effective_stat(attacker, "chakra_control") / 100
         
         # Target modifiers
-        speed_penalty = target.speed / 200
+        speed_penalty = self.effective_stat(target, "speed") / 200
         
         # Environment modifiers
         env_accuracy_mod = environment.accuracy_modifier
@@ -392,10 +404,21 @@ class ShinobiOSEngine:
         return int(accuracy)
     
     def execute_action(self, actor: ShinobiStats, target: ShinobiStats, 
-                      jutsu: Jutsu, environment: EnvironmentEffect) -> BattleAction:
-        """Execute a battle action with full simulation"""
+                      jutsu: Jutsu, environment: EnvironmentEffect,
+                      rng: Optional[random.Random] = None) -> BattleAction:
+        """Execute a battle action with full simulation.
+
+        Rolls come from ``rng`` when given so a seeded battle replays exactly.
+        """
+        rng = rng or random
+        # Players' mastery scales damage and discounts the chakra cost
+        mastery = getattr(self.services, "jutsu_mastery", None) if actor.character_id is not None else None
+        damage_multiplier, cost_multiplier = (
+            mastery.get_modifiers(actor.character_id, jutsu.name) if mastery is not None else (1.0, 1.0)
+        )
+        chakra_cost = int(jutsu.chakra_cost * cost_multiplier)
         # Check chakra cost
-        if not actor.use_chakra(jutsu.chakra_cost):
+        if not actor.use_chakra(chakra_cost):
             return BattleAction(
                 actor=actor.name,
                 target=target.name,
@@ -408,16 +431,19 @@ class ShinobiOSEngine:
                 timestamp=datetime.now()
             )
         
+        if mastery is not None:
+            mastery.record_use(actor.character_id, jutsu.name)
+        
         # Calculate accuracy and damage
         accuracy = self.calculate_accuracy(jutsu, actor, target, environment)
-        damage = self.calculate_damage(jutsu, actor, target, environment)
+        damage = int(self.calculate_damage(jutsu, actor, target, environment) * damage_multiplier)
         
         # Determine hit/miss
-        hit_roll = random.randint(1, 100)
+        hit_roll = rng.randint(1, 100)
         success = hit_roll <= accuracy
         
         # Critical hit chance (5% base)
-        critical = random.randint(1, 100) <= 5
+        critical = rng.randint(1, 100) <= 5
         if critical and success:
             damage = int(damage * 1.5)
         
@@ -432,7 +458,7 @@ class ShinobiOSEngine:
                 effects.append("critical_hit")
         
         # Generate narration
-        narration = self._generate_narration(actor, target, jutsu, success, critical, environment)
+        narration = self._generate_narration(actor, target, jutsu, success, critical, environment, rng)
         
         return BattleAction(
             actor=actor.name,
@@ -440,7 +466,7 @@ class ShinobiOSEngine:
             jutsu=jutsu,
             success=success,
             damage=actual_damage,
-            chakra_used=jutsu.chakra_cost,
+            chakra_used=chakra_cost,
             effects=effects,
             narration=narration,
             timestamp=datetime.now()
@@ -448,16 +474,16 @@ class ShinobiOSEngine:
     
     def _generate_narration(self, actor: ShinobiStats, target: ShinobiStats, 
                            jutsu: Jutsu, success: bool, critical: bool, 
-                           environment: EnvironmentEffect) -> str:
+                           environment: EnvironmentEffect, rng=random) -> str:
         """Generate dynamic battle narration"""
         templates = self.narration_templates
         
         if critical and success:
-            template = random.choice(templates["critical_hit"])
+            template = rng.choice(templates["critical_hit"])
         elif success:
-            template = random.choice(templates["successful_hit"])
+            template = rng.choice(templates["successful_hit"])
         else:
-            template = random.choice(templates["miss"])
+            template = rng.choice(templates["miss"])
         
         # Replace placeholders
         narration = template.format(
@@ -469,7 +495,7 @@ class ShinobiOSEngine:
         
         # Add environmental effects
         if environment.special_effects and success:
-            env_effect = random.choice(environment.special_effects)
+            env_effect = rng.choice(environment.special_effects)
             if env_effect in ["fire_release_boost", "water_release_boost", "earth_release_boost"]:
                 narration += f" The {environment.name} amplifies the jutsu's power!"
         
@@ -10,12 +10,15 @@ import json
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 from enum import Enum
 import random
 
 from .mission import Mission, MissionStatus, MissionDifficulty
-from .shinobios_engine import ShinobiOSEngine, ShinobiStats, BattleAction, EnvironmentEffect
+from .shinobios_engine import ShinobiOSEngine, ShinobiStats, BattleAction, EnvironmentEffect, Jutsu
+from ..battle.ai import EnemyPolicy, ExpectimaxPolicy, ShinobiOSModel
+from ..battle.engine import Attack, ShinobiOSDamage, TurnEngine, TurnState
+from ..battle.log import BattleLog, EventFlag, EventKind
 
 class BattleMissionType(Enum):
     ELIMINATION = "elimination"
@@ -63,7 +66,8 @@ class BattleParticipant:
             stamina=stats_data.get("stamina", 100),
             max_stamina=stats_data.get("max_stamina", 100),
             level=stats_data.get("level", 1),
-            experience=stats_data.get("experience", 0)
+            experience=stats_data.get("experience", 0),
+            character_id=data["user_id"] if data.get("is_player", True) else None
         )
         return cls(
             user_id=data["user_id"],
@@ -78,7 +82,7 @@ class BattleState:
     """Current state of a battle mission"""
     participants: List[BattleParticipant] = field(default_factory=list)
     current_turn: int = 0
-    battle_log: List[Dict[str, Any]] = field(default_factory=list)
+    battle_log: BattleLog = field(default_factory=BattleLog)
     environment: Optional[EnvironmentEffect] = None
     objectives: List[str] = field(default_factory=list)
     completed_objectives: List[str] = field(default_factory=list)
@@ -95,28 +99,51 @@ class BattleState:
     def get_enemies(self) -> List[BattleParticipant]:
         return [p for p in self.participants if not p.is_player and p.status == "active"]
     
-    def add_battle_log(self, action: BattleAction) -> None:
-        self.battle_log.append({
-            "turn": self.current_turn,
-            "actor": action.actor,
-            "target": action.target,
-            "jutsu": action.jutsu.name,
-            "success": action.success,
-            "damage": action.damage,
-            "narration": action.narration,
-            "timestamp": action.timestamp.isoformat()
-        })
+    def add_battle_log(self, action: Union[BattleAction, str]) -> None:
+        if isinstance(action, str):
+            self.battle_log.record(EventKind.NOTE, text=action, turn=self.current_turn)
+            return
+        self.battle_log.record(
+            EventKind.ATTACK,
+            actor=action.actor,
+            jutsu=action.jutsu.name,
+            damage=action.damage,
+            flags=EventFlag.NONE if action.success else EventFlag.MISS,
+            target=action.target,
+            turn=self.current_turn,
+        )
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "participants": [p.to_dict() for p in self.participants],
             "current_turn": self.current_turn,
-            "battle_log": self.battle_log,
+            "battle_log": self.battle_log.to_dict(),
             "environment": self.environment.name if self.environment else None,
             "objectives": self.objectives,
             "completed_objectives": self.completed_objectives
         }
     
+    @staticmethod
+    def _load_battle_log(data: Any) -> BattleLog:
+        if isinstance(data, dict):
+            return BattleLog.from_dict(data)
+        # Older saves stored a list of action dicts.
+        log = BattleLog()
+        for entry in data or []:
+            if isinstance(entry, dict):
+                log.record(
+                    EventKind.ATTACK,
+                    actor=entry.get("actor", "Unknown"),
+                    jutsu=entry.get("jutsu"),
+                    damage=entry.get("damage", 0),
+                    flags=EventFlag.NONE if entry.get("success", True) else EventFlag.MISS,
+                    target=entry.get("target", -1),
+                    turn=entry.get("turn", 0),
+                )
+            else:
+                log.append(str(entry))
+        return log
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any], engine: ShinobiOSEngine) -> "BattleState":
         participants = [BattleParticipant.from_dict(p, engine) for p in data.get("participants", [])]
@@ -127,7 +154,7 @@ class BattleState:
         return cls(
             participants=participants,
             current_turn=data.get("current_turn", 0),
-            battle_log=data.get("battle_log", []),
+            battle_log=cls._load_battle_log(data.get("battle_log")),
             environment=environment,
             objectives=data.get("objectives", []),
             completed_objectives=data.get("completed_objectives", [])
@@ -142,6 +169,9 @@ class ShinobiOSMission(Mission):
         self.battle_state: Optional[BattleState] = None
         self.mission_type: BattleMissionType = BattleMissionType.ELIMINATION
         self.battle_id: str = str(uuid.uuid4())
+        self.turn_engine = TurnEngine()
+        self.enemy_policy: EnemyPolicy = ExpectimaxPolicy()
+        self._ai_model: Optional[ShinobiOSModel] = None
         
     def initialize_battle(self, players: List[Dict[str, Any]], 
                          environment: str = "forest") -> None:
@@ -153,7 +183,8 @@ class ShinobiOSMission(Mission):
             player_stats = self.engine.create_shinobi(
                 name=player_data["name"],
                 level=player_data.get("level", 1),
-                **player_data.get("stats", {})
+                **player_data.get("stats", {}),
+                character_id=str(player_data["user_id"])
             )
             participant = BattleParticipant(
                 user_id=player_data["user_id"],
@@ -207,16 +238,8 @@ class ShinobiOSMission(Mission):
             return {"success": False, "error": "Jutsu not available"}
         
         # Execute action
-        action = self.engine.execute_action(
-            player.stats, 
-            target.stats, 
-            jutsu, 
-            self.battle_state.environment
-        )
-        
-        # Update battle state
         self.battle_state.current_turn += 1
-        self.battle_state.add_battle_log(action)
+        action = self._strike(player.stats, target.stats, jutsu)
         
         # Check if target is defeated
         if target.stats.health <= 0:
@@ -250,39 +273,27 @@ class ShinobiOSMission(Mission):
         
         actions = []
         enemies = self.battle_state.get_enemies()
-        players = self.battle_state.get_players()
         
         for enemy in enemies:
             if enemy.stats.health <= 0:
                 continue
             
-            # Simple AI: attack random player
-            if players:
-                target = random.choice(players)
-                available_jutsu = self.engine.get_available_jutsu(enemy.stats)
+            choice = self.choose_enemy_action(enemy)
+            if choice is not None:
+                jutsu, target = choice
+                action = self._strike(enemy.stats, target.stats, jutsu)
+                actions.append({
+                    "actor": action.actor,
+                    "target": action.target,
+                    "jutsu": action.jutsu.name,
+                    "success": action.success,
+                    "damage": action.damage,
+                    "narration": action.narration
+                })
                 
-                if available_jutsu:
-                    jutsu = random.choice(available_jutsu)
-                    action = self.engine.execute_action(
-                        enemy.stats,
-                        target.stats,
-                        jutsu,
-                        self.battle_state.environment
-                    )
-                    
-                    self.battle_state.add_battle_log(action)
-                    actions.append({
-                        "actor": action.actor,
-                        "target": action.target,
-                        "jutsu": action.jutsu.name,
-                        "success": action.success,
-                        "damage": action.damage,
-                        "narration": action.narration
-                    })
-                    
-                    # Check if target is defeated
-                    if target.stats.health <= 0:
-                        target.status = "defeated"
+                # Check if target is defeated
+                if target.stats.health <= 0:
+                    target.status = "defeated"
         
         # Regenerate stats
         for participant in self.battle_state.get_active_participants():
@@ -290,6 +301,44 @@ class ShinobiOSMission(Mission):
         
         return actions
     
+    def choose_enemy_action(self, enemy: BattleParticipant) -> Optional[Tuple[Jutsu, BattleParticipant]]:
+        """The enemy's jutsu and target, planned by ``enemy_policy`` within its time budget."""
+        players = self.battle_state.get_players()
+        if not players:
+            return None
+        participants = self.battle_state.participants
+        model = self._enemy_ai_model()
+        index = participants.index(enemy)
+        if not model.jutsu[index]:
+            return None
+        state = model.snapshot(index, [p.status == "active" for p in participants])
+        decision = self.enemy_policy.decide(model, state)
+        if decision.action is None:
+            # Nothing affordable: the attempt still costs the turn, as before
+            return random.choice(model.jutsu[index]), random.choice(players)
+        jutsu_index, target = decision.action
+        return model.jutsu[index][jutsu_index], participants[target]
+    
+    def _enemy_ai_model(self) -> ShinobiOSModel:
+        """The planner's view of this battle; rebuilt only if the participants change."""
+        participants = self.battle_state.participants
+        model = self._ai_model
+        if model is None or len(model.fighters) != len(participants) or any(
+                f is not p.stats for f, p in zip(model.fighters, participants)):
+            model = self._ai_model = ShinobiOSModel(
+                self.engine, self.battle_state.environment or self.engine.environments["forest"],
+                [p.stats for p in participants],
+                [0 if p.is_player else 1 for p in participants],
+                [self.engine.get_available_jutsu(p.stats) for p in participants],
+            )
+        return model
+    
+    def _strike(self, actor: ShinobiStats, target: ShinobiStats, jutsu) -> BattleAction:
+        """Run one ShinobiOS action through the shared turn engine and log it."""
+        state = TurnState.of(actor, target, log=self.battle_state.battle_log, turn=self.battle_state.current_turn)
+        model = ShinobiOSDamage(self.engine, self.battle_state.environment)
+        return self.turn_engine.attack(state, 0, Attack(jutsu.name, payload=jutsu), model).detail
+    
     def _check_mission_completion(self) -> Dict[str, Any]:
         """Check if mission objectives are completed"""
         if not self.battle_state:
@@ -329,7 +378,7 @@ class ShinobiOSMission(Mission):
             "objectives": self.battle_state.objectives,
             "completed_objectives": self.battle_state.completed_objectives,
             "environment": self.battle_state.environment.name if self.battle_state.environment else None,
-            "recent_actions": self.battle_state.battle_log[-5:] if self.battle_state.battle_log else []
+            "recent_actions": self.battle_state.battle_log.render(last=5)
         }
     
     def to_dict(self) -> Dict[str, Any]:
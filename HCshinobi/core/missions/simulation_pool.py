@@ -0,0 +1,242 @@
+"""
+ShinobiOS Simulation Worker Pool
+Runs large balance sweeps in worker processes without blocking the bot's event loop.
+
+Sweeps are described by small picklable :class:`BattleSpec` objects.  Each
+spec is split into chunks of at most ``chunk_size`` battles, the chunks are
+executed by :func:`run_battle_spec` in a ``ProcessPoolExecutor`` and only
+compact per-chunk totals travel back to the parent, where they are merged per
+spec label.  A sweep is started with :meth:`SimulationService.start_sweep`,
+which returns a :class:`SweepJob` that reports progress and can be cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import simulator
+from .shinobios_engine import ShinobiOSEngine
+from .simulator import BatchSimulator, simulate_battle
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass(frozen=True)
+class BattleSpec:
+    """Picklable description of a batch of battles."""
+    label: str
+    player_level: int
+    difficulty: str = "D"
+    environment: str = "forest"
+    battles: int = 1000
+    seed: Optional[int] = None
+    player_stats: Tuple[Tuple[str, int], ...] = ()
+
+
+@dataclass
+class SweepTotals:
+    """Merged results for one spec label."""
+    battles: int = 0
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    rounds: int = 0
+    damage_dealt: int = 0
+    damage_taken: int = 0
+
+    def add(self, chunk: Dict[str, int]) -> None:
+        for name in ("battles", "wins", "losses", "draws", "rounds", "damage_dealt", "damage_taken"):
+            setattr(self, name, getattr(self, name) + chunk[name])
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.battles if self.battles else 0.0
+
+    @property
+    def average_rounds(self) -> float:
+        return self.rounds / self.battles if self.battles else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "battles": self.battles,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "win_rate": self.win_rate,
+            "average_rounds": self.average_rounds,
+            "average_damage_dealt": self.damage_dealt / self.battles if self.battles else 0.0,
+            "average_damage_taken": self.damage_taken / self.battles if self.battles else 0.0,
+        }
+
+
+def run_battle_spec(spec: BattleSpec) -> Dict[str, int]:
+    """Worker entry point: simulate ``spec`` and return compact totals."""
+    engine = ShinobiOSEngine()
+    if simulator.np is not None:
+        player = engine.create_shinobi("Player", spec.player_level, **dict(spec.player_stats))
+        result = BatchSimulator(engine, seed=spec.seed).run_scenario(
+            player, spec.difficulty, spec.environment, battles=spec.battles
+        )
+        return {
+            "label": spec.label,
+            "battles": result.battles,
+            "wins": result.wins,
+            "losses": result.losses,
+            "draws": result.draws,
+            "rounds": int(result.rounds.sum()),
+            "damage_dealt": int(result.damage_dealt.sum()),
+            "damage_taken": int(result.damage_taken.sum()),
+        }
+
+    # numpy missing: fall back to the scalar engine.
+    rng = random.Random(spec.seed)
+    totals = {"label": spec.label, "battles": spec.battles, "wins": 0, "losses": 0, "draws": 0,
+              "rounds": 0, "damage_dealt": 0, "damage_taken": 0}
+    for _ in range(spec.battles):
+        fighter = engine.create_shinobi("Player", spec.player_level, **dict(spec.player_stats))
+        scenario = engine.create_mission_scenario(spec.difficulty, spec.environment)
+        outcome = simulate_battle(engine, fighter, scenario["enemies"], scenario["environment"], rng=rng)
+        key = {"player": "wins", "enemies": "losses"}.get(outcome.winner, "draws")
+        totals[key] += 1
+        totals["rounds"] += outcome.rounds
+        totals["damage_dealt"] += outcome.damage_dealt
+        totals["damage_taken"] += outcome.damage_taken
+    return totals
+
+
+def chunk_specs(specs: Iterable[BattleSpec], chunk_size: int) -> List[BattleSpec]:
+    """Split specs so no chunk runs more than ``chunk_size`` battles.
+
+    Chunks of a seeded spec get derived seeds so the sweep stays reproducible.
+    """
+    chunks = []
+    for spec in specs:
+        remaining, index = spec.battles, 0
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            seed = None if spec.seed is None else spec.seed * 1_000_003 + index
+            chunks.append(replace(spec, battles=size, seed=seed))
+            remaining -= size
+            index += 1
+    return chunks
+
+
+def scenario_sweep_specs(levels: Iterable[int], difficulties: Iterable[str] = ("D", "C", "B", "A", "S"),
+                         environments: Iterable[str] = ("forest",), battles: int = 10_000,
+                         seed: Optional[int] = None) -> List[BattleSpec]:
+    """Every level against every scenario difficulty and environment."""
+    specs = []
+    for level in levels:
+        for difficulty in difficulties:
+            for environment in environments:
+                specs.append(BattleSpec(
+                    label=f"L{level} vs {difficulty} ({environment})",
+                    player_level=level,
+                    difficulty=difficulty,
+                    environment=environment,
+                    battles=battles,
+                    seed=None if seed is None else seed + len(specs),
+                ))
+    return specs
+
+
+@dataclass
+class SweepJob:
+    """Handle for a running sweep."""
+    total_chunks: int
+    completed_chunks: int = 0
+    results: Dict[str, SweepTotals] = field(default_factory=dict)
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def progress(self) -> float:
+        return self.completed_chunks / self.total_chunks if self.total_chunks else 1.0
+
+    @property
+    def done(self) -> bool:
+        return self.task is not None and self.task.done()
+
+    def cancel(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+    async def wait(self) -> Dict[str, SweepTotals]:
+        """Wait for the sweep; raises ``asyncio.CancelledError`` if it was cancelled."""
+        if self.task is not None:
+            await self.task
+        return self.results
+
+
+class SimulationService:
+    """Ships battle specs to a process pool and merges the results asynchronously."""
+
+    DEFAULT_CHUNK_SIZE = 5_000
+
+    def __init__(self, max_workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._executor = executor
+        self._owns_executor = executor is None
+        self.jobs: List[SweepJob] = []
+
+    @property
+    def executor(self) -> Executor:
+        # The pool is created on first use so importing the service never forks.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def start_sweep(self, specs: Iterable[BattleSpec], progress: Optional[ProgressCallback] = None,
+                    chunk_size: Optional[int] = None, max_in_flight: Optional[int] = None) -> SweepJob:
+        """Start a sweep in the background and return its :class:`SweepJob`."""
+        chunks = chunk_specs(specs, chunk_size or self.chunk_size)
+        job = SweepJob(total_chunks=len(chunks))
+        limit = max_in_flight or max(2, 2 * (self.max_workers or 4))
+        job.task = asyncio.get_running_loop().create_task(self._run(job, chunks, progress, limit))
+        self.jobs.append(job)
+        return job
+
+    async def run_sweep(self, specs: Iterable[BattleSpec], progress: Optional[ProgressCallback] = None,
+                        chunk_size: Optional[int] = None) -> Dict[str, SweepTotals]:
+        """Run a sweep to completion and return merged totals per spec label."""
+        return await self.start_sweep(specs, progress, chunk_size).wait()
+
+    async def _run(self, job: SweepJob, chunks: List[BattleSpec],
+                   progress: Optional[ProgressCallback], limit: int) -> None:
+        loop = asyncio.get_running_loop()
+        pending = set()
+        queue = list(reversed(chunks))
+        try:
+            while queue or pending:
+                # Keep a bounded number of chunks in flight so cancellation is prompt.
+                while queue and len(pending) < limit:
+                    pending.add(loop.run_in_executor(self.executor, run_battle_spec, queue.pop()))
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    chunk = future.result()
+                    job.results.setdefault(chunk["label"], SweepTotals()).add(chunk)
+                    job.completed_chunks += 1
+                    if progress is not None:
+                        try:
+                            progress(job.completed_chunks, job.total_chunks)
+                        except Exception as e:
+                            logger.warning(f"Sweep progress callback failed: {e}")
+        except asyncio.CancelledError:
+            for future in pending:
+                future.cancel()
+            raise
+
+    async def shutdown(self) -> None:
+        for job in self.jobs:
+            job.cancel()
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,242 @@
+"""
+ShinobiOS Batch Battle Simulator
+Runs many independent ShinobiOS fights in lockstep for balance testing.
+
+The rules mirror a mission battle driven by :class:`ShinobiOSEngine`: every
+round the player uses a random available jutsu on the first enemy still
+standing, then each surviving enemy uses a random jutsu on the player, then
+everyone regenerates.  :func:`simulate_battle` plays one fight through the
+real engine; :class:`BatchSimulator` plays N fights at once with NumPy arrays
+for HP and chakra and vectorized hit, crit and damage rolls.  Both use the
+same formulas, so their statistics agree (see ``tests/missions``).
+
+NumPy is only needed for :class:`BatchSimulator`.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from .shinobios_engine import EnvironmentEffect, ShinobiOSEngine, ShinobiStats
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+DEFAULT_MAX_ROUNDS = 200
+CRIT_CHANCE = 5
+CRIT_MULTIPLIER = 1.5
+
+
+@dataclass
+class DuelOutcome:
+    """Result of one scalar battle."""
+    winner: str  # "player", "enemies" or "draw"
+    rounds: int
+    damage_dealt: int
+    damage_taken: int
+
+
+@dataclass
+class SimulationResult:
+    """Aggregated statistics for a batch of battles."""
+    battles: int
+    wins: int
+    losses: int
+    draws: int
+    rounds: Any = field(repr=False)
+    damage_dealt: Any = field(repr=False)
+    damage_taken: Any = field(repr=False)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.battles if self.battles else 0.0
+
+    @property
+    def average_rounds(self) -> float:
+        return float(np.mean(self.rounds)) if self.battles else 0.0
+
+    def damage_distribution(self, which: str = "dealt") -> Dict[str, float]:
+        values = self.damage_dealt if which == "dealt" else self.damage_taken
+        if not self.battles:
+            return {"mean": 0.0, "std": 0.0, "p5": 0.0, "p50": 0.0, "p95": 0.0}
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        return {
+            "mean": float(np.mean(values)),
+            "std": float(np.std(values)),
+            "p5": float(p5),
+            "p50": float(p50),
+            "p95": float(p95),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "battles": self.battles,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "win_rate": self.win_rate,
+            "average_rounds": self.average_rounds,
+            "damage_dealt": self.damage_distribution("dealt"),
+            "damage_taken": self.damage_distribution("taken"),
+        }
+
+    @classmethod
+    def merge(cls, results: Sequence["SimulationResult"]) -> "SimulationResult":
+        """Combine results from several batches into one."""
+        return cls(
+            battles=sum(r.battles for r in results),
+            wins=sum(r.wins for r in results),
+            losses=sum(r.losses for r in results),
+            draws=sum(r.draws for r in results),
+            rounds=np.concatenate([r.rounds for r in results]) if results else np.zeros(0),
+            damage_dealt=np.concatenate([r.damage_dealt for r in results]) if results else np.zeros(0),
+            damage_taken=np.concatenate([r.damage_taken for r in results]) if results else np.zeros(0),
+        )
+
+
+def simulate_battle(engine: ShinobiOSEngine, player: ShinobiStats, enemies: List[ShinobiStats],
+                    environment: EnvironmentEffect, max_rounds: int = DEFAULT_MAX_ROUNDS,
+                    rng: Optional[random.Random] = None) -> DuelOutcome:
+    """Play one battle through the scalar engine. Fighters are modified in place."""
+    rng = rng or random
+    player_jutsu = engine.get_available_jutsu(player)
+    enemy_jutsu = [engine.get_available_jutsu(e) for e in enemies]
+    dealt = taken = 0
+
+    for round_no in range(1, max_rounds + 1):
+        target = next(e for e in enemies if e.health > 0)
+        before = target.health
+        engine.execute_action(player, target, rng.choice(player_jutsu), environment, rng)
+        dealt += before - target.health
+        for enemy, pool in zip(enemies, enemy_jutsu):
+            if enemy.health <= 0 or player.health <= 0:
+                continue
+            before = player.health
+            engine.execute_action(enemy, player, rng.choice(pool), environment, rng)
+            taken += before - player.health
+        for fighter in [player, *enemies]:
+            if fighter.health > 0:
+                engine.regenerate_stats(fighter, environment)
+
+        if player.health <= 0:
+            return DuelOutcome("enemies", round_no, dealt, taken)
+        if all(e.health <= 0 for e in enemies):
+            return DuelOutcome("player", round_no, dealt, taken)
+    return DuelOutcome("draw", max_rounds, dealt, taken)
+
+
+class BatchSimulator:
+    """Vectorized ShinobiOS battles: N independent fights advanced in lockstep."""
+
+    def __init__(self, engine: Optional[ShinobiOSEngine] = None, seed: Optional[int] = None):
+        if np is None:
+            raise RuntimeError("BatchSimulator requires numpy (pip install numpy)")
+        self.engine = engine or ShinobiOSEngine()
+        self.rng = np.random.default_rng(seed)
+
+    def _attack_tables(self, attacker: ShinobiStats, target: ShinobiStats,
+                       environment: EnvironmentEffect):
+        """Per-jutsu (cost, accuracy, damage) arrays for one attacker/target pair."""
+        jutsu = self.engine.get_available_jutsu(attacker)
+        cost = np.array([j.chakra_cost for j in jutsu], dtype=np.int64)
+        accuracy = np.array(
+            [self.engine.calculate_accuracy(j, attacker, target, environment) for j in jutsu], dtype=np.int64
+        )
+        damage = np.array(
+            [self.engine.calculate_damage(j, attacker, target, environment) for j in jutsu], dtype=np.int64
+        )
+        return cost, accuracy, damage
+
+    def run(self, player: ShinobiStats, enemies: List[ShinobiStats], environment: EnvironmentEffect,
+            battles: int, max_rounds: int = DEFAULT_MAX_ROUNDS) -> SimulationResult:
+        """Simulate ``battles`` fights of ``player`` against ``enemies``."""
+        n = battles
+
+        # Player tables are [enemy, jutsu]; enemy tables are [jutsu] against the player.
+        player_tables = [self._attack_tables(player, e, environment) for e in enemies]
+        p_cost = player_tables[0][0]
+        p_acc = np.stack([t[1] for t in player_tables])
+        p_dmg = np.stack([t[2] for t in player_tables])
+        enemy_tables = [self._attack_tables(e, player, environment) for e in enemies]
+        enemy_defense = np.array([e.defense for e in enemies], dtype=np.int64)
+
+        p_hp = np.full(n, player.health, dtype=np.int64)
+        p_chakra = np.full(n, player.chakra, dtype=np.int64)
+        e_hp = np.tile(np.array([e.health for e in enemies], dtype=np.int64), (n, 1))
+        e_chakra = np.tile(np.array([e.chakra for e in enemies], dtype=np.int64), (n, 1))
+        p_regen = int(5 * environment.chakra_modifier)
+
+        active = np.ones(n, dtype=bool)
+        rounds = np.full(n, max_rounds, dtype=np.int64)
+        outcome = np.zeros(n, dtype=np.int8)  # 1 win, -1 loss, 0 draw
+        dealt = np.zeros(n, dtype=np.int64)
+        taken = np.zeros(n, dtype=np.int64)
+        rows = np.arange(n)
+
+        for round_no in range(1, max_rounds + 1):
+            if not active.any():
+                break
+            # Player strikes the first enemy still standing.
+            target = np.argmax(e_hp > 0, axis=1)
+            choice = self.rng.integers(0, p_cost.shape[0], size=n)
+            cost = p_cost[choice]
+            afford = active & (p_chakra >= cost)
+            p_chakra -= np.where(afford, cost, 0)
+            hit = afford & (self.rng.integers(1, 101, size=n) <= p_acc[target, choice])
+            crit = self.rng.integers(1, 101, size=n) <= CRIT_CHANCE
+            raw = p_dmg[target, choice]
+            raw = np.where(crit, (raw * CRIT_MULTIPLIER).astype(np.int64), raw)
+            current = e_hp[rows, target]
+            applied = np.where(hit, np.minimum(current, np.maximum(1, raw - enemy_defense[target] // 10)), 0)
+            e_hp[rows, target] = current - applied
+            dealt += applied
+
+            # Each surviving enemy strikes the player in order.
+            for idx, (cost_t, acc_t, dmg_t) in enumerate(enemy_tables):
+                can_act = active & (e_hp[:, idx] > 0) & (p_hp > 0)
+                choice = self.rng.integers(0, cost_t.shape[0], size=n)
+                cost = cost_t[choice]
+                afford = can_act & (e_chakra[:, idx] >= cost)
+                e_chakra[:, idx] -= np.where(afford, cost, 0)
+                hit = afford & (self.rng.integers(1, 101, size=n) <= acc_t[choice])
+                crit = self.rng.integers(1, 101, size=n) <= CRIT_CHANCE
+                raw = np.where(crit, (dmg_t[choice] * CRIT_MULTIPLIER).astype(np.int64), dmg_t[choice])
+                applied = np.where(hit, np.minimum(p_hp, np.maximum(1, raw - player.defense // 10)), 0)
+                p_hp -= applied
+                taken += applied
+
+            # Regeneration for everyone still standing in a running battle.
+            p_chakra = np.where(active & (p_hp > 0), np.minimum(player.max_chakra, p_chakra + p_regen), p_chakra)
+            for idx, enemy in enumerate(enemies):
+                regen = int(5 * environment.chakra_modifier)
+                alive = active & (e_hp[:, idx] > 0)
+                e_chakra[:, idx] = np.where(alive, np.minimum(enemy.max_chakra, e_chakra[:, idx] + regen),
+                                            e_chakra[:, idx])
+
+            lost = active & (p_hp <= 0)
+            won = active & ~lost & (e_hp <= 0).all(axis=1)
+            finished = lost | won
+            outcome[lost] = -1
+            outcome[won] = 1
+            rounds[finished] = round_no
+            active &= ~finished
+
+        return SimulationResult(
+            battles=n,
+            wins=int((outcome == 1).sum()),
+            losses=int((outcome == -1).sum()),
+            draws=int((outcome == 0).sum()),
+            rounds=rounds,
+            damage_dealt=dealt,
+            damage_taken=taken,
+        )
+
+    def run_scenario(self, player: ShinobiStats, difficulty: str, environment: str = "forest",
+                     battles: int = 10_000, max_rounds: int = DEFAULT_MAX_ROUNDS) -> SimulationResult:
+        """Simulate ``player`` against a :meth:`ShinobiOSEngine.create_mission_scenario` scenario."""
+        scenario = self.engine.create_mission_scenario(difficulty, environment)
+        return self.run(player, scenario["enemies"], scenario["environment"], battles, max_rounds)
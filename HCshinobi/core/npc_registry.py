@@ -0,0 +1,227 @@
+"""
+NPC Registry for HCShinobi
+Boss and NPC definitions loaded once, indexed, and reloaded when their files change.
+
+Boss cogs used to ``json.load`` ``data/characters/solomon.json`` (and the
+jutsu file, and each NPC's file) inside every command handler.
+:class:`NpcRegistry` keeps each parsed file in memory. It checks the file's
+mtime and size at most once per ``CHECK_INTERVAL``, so an edited definition
+is picked up without a restart. Callers share the returned dicts and must
+treat them as read-only.
+
+Files in the characters directory whose names are not Discord user ids are
+NPCs. They are indexed by file name and by display name (case-insensitive),
+and by level for range queries. Phase lists become :class:`PhaseTable`
+objects sorted by ``hp_threshold``, so finding the active phase is a
+bisection rather than a scan. :meth:`NpcRegistry.compiled` memoizes any
+other table built from a definition, such as a boss's damage table, until
+the definition's file changes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_Stamp = Tuple[int, int]  # (mtime_ns, size)
+T = TypeVar("T")
+
+
+class PhaseTable:
+    """Phases ordered by ``hp_threshold``; the active phase is the highest threshold at or below the HP ratio."""
+
+    __slots__ = ("phases", "_thresholds")
+
+    def __init__(self, phases: Iterable[Dict[str, Any]]):
+        # Among equal thresholds the phase listed first wins, as the linear scans did.
+        indexed = sorted(enumerate(phases), key=lambda item: (item[1].get("hp_threshold", 0), -item[0]))
+        self.phases: List[Dict[str, Any]] = [phase for _, phase in indexed]
+        self._thresholds = [phase.get("hp_threshold", 0) for phase in self.phases]
+
+    def __len__(self) -> int:
+        return len(self.phases)
+
+    def at(self, hp_ratio: float, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The phase for ``hp_ratio``; below every threshold the lowest phase stays active."""
+        if not self.phases:
+            return default if default is not None else {}
+        index = bisect.bisect_right(self._thresholds, hp_ratio) - 1
+        return self.phases[max(index, 0)]
+
+
+@dataclass
+class NpcDefinition:
+    key: str  # file name without ``.json``
+    path: str
+    data: Dict[str, Any]
+
+    @property
+    def name(self) -> str:
+        return self.data.get("name", self.key)
+
+    @property
+    def level(self) -> int:
+        return self.data.get("level", 1)
+
+
+@dataclass
+class _Entry:
+    stamp: _Stamp
+    data: Any
+    checked: float
+
+
+class NpcRegistry:
+    """Cached, hot-reloading boss and NPC definitions."""
+
+    CHECK_INTERVAL = 5.0
+    IGNORED = frozenset({"template"})
+
+    def __init__(self, characters_dir: str = "data/characters", clock: Callable[[], float] = time.monotonic):
+        self.characters_dir = characters_dir
+        self.clock = clock
+        self._files: Dict[str, _Entry] = {}
+        self._tables: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+        self._npcs: Dict[str, NpcDefinition] = {}
+        self._names: Dict[str, str] = {}
+        self._levels: List[int] = []
+        self._by_level: List[str] = []
+        self._scanned = float("-inf")
+        self._listing: Dict[str, _Stamp] = {}
+        self.loads = 0
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def read(self, path: str) -> Any:
+        """Parsed contents of ``path``, re-read only when the file changed.
+
+        Raises ``FileNotFoundError`` like ``open`` when the file is missing.
+        """
+        now = self.clock()
+        entry = self._files.get(path)
+        if entry is not None and now - entry.checked < self.CHECK_INTERVAL:
+            return entry.data
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._forget(path)
+            raise
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if entry is None or entry.stamp != stamp:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._forget(path)
+            entry = self._files[path] = _Entry(stamp, data, now)
+            self.loads += 1
+        entry.checked = now
+        return entry.data
+
+    def _forget(self, path: str) -> None:
+        entry = self._files.pop(path, None)
+        if entry is not None:
+            for key in [key for key in self._tables if key[0] == id(entry.data)]:
+                del self._tables[key]
+
+    def compiled(self, data: Dict[str, Any], kind: str, build: Callable[[Dict[str, Any]], T]) -> T:
+        """``build(data)``, memoized per ``kind`` for each loaded version of a cached file.
+
+        Definitions that did not come from :meth:`read` are built on every call.
+        """
+        key = (id(data), kind)
+        cached = self._tables.get(key)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        table = build(data)
+        if any(entry.data is data for entry in self._files.values()):
+            self._tables[key] = (data, table)
+        return table
+
+    def phases(self, data: Dict[str, Any], field: str = "boss_phases") -> PhaseTable:
+        """The phase table of a definition; built once per loaded version of a cached file."""
+        return self.compiled(data, field, lambda data: PhaseTable(data.get(field, [])))
+
+    # ------------------------------------------------------------------
+    # NPC index
+    # ------------------------------------------------------------------
+
+    def _is_npc_file(self, filename: str) -> bool:
+        stem, ext = os.path.splitext(filename)
+        return ext == ".json" and not stem.isdigit() and stem not in self.IGNORED
+
+    def refresh(self, force: bool = False) -> None:
+        """Rescan the characters directory (at most once per interval) and rebuild the indexes if anything changed."""
+        now = self.clock()
+        if not force and now - self._scanned < self.CHECK_INTERVAL:
+            return
+        self._scanned = now
+        listing: Dict[str, _Stamp] = {}
+        try:
+            with os.scandir(self.characters_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and self._is_npc_file(entry.name):
+                        stat = entry.stat()
+                        listing[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        if listing == self._listing:
+            return
+        self._listing = listing
+
+        npcs: Dict[str, NpcDefinition] = {}
+        for path, stamp in listing.items():
+            entry = self._files.get(path)
+            if entry is not None and entry.stamp != stamp:
+                entry.checked = float("-inf")  # the scan saw a change: skip read()'s throttle
+            try:
+                data = self.read(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping NPC definition {path}: {e}")
+                continue
+            if isinstance(data, dict):
+                key = os.path.splitext(os.path.basename(path))[0]
+                npcs[key.lower()] = NpcDefinition(key, path, data)
+        for path in set(self._files) - set(listing):
+            if os.path.dirname(path) == self.characters_dir:
+                self._forget(path)
+
+        self._npcs = npcs
+        self._names = {}
+        for lookup, definition in npcs.items():
+            self._names.setdefault(definition.name.lower(), lookup)
+        for lookup in npcs:
+            self._names[lookup] = lookup  # file names win over display names
+        ordered = sorted((definition.level, lookup) for lookup, definition in npcs.items())
+        self._levels = [level for level, _ in ordered]
+        self._by_level = [lookup for _, lookup in ordered]
+
+    def npc(self, name: str) -> Optional[NpcDefinition]:
+        """Look an NPC up by file name or display name, ignoring case."""
+        self.refresh()
+        lookup = self._names.get(name.lower())
+        return self._npcs.get(lookup) if lookup is not None else None
+
+    def npcs(self) -> List[NpcDefinition]:
+        """Every NPC, lowest level first."""
+        return self.by_level()
+
+    def by_level(self, low: int = 0, high: Optional[int] = None) -> List[NpcDefinition]:
+        """NPCs whose level is within ``low..high`` inclusive, lowest level first."""
+        self.refresh()
+        start = bisect.bisect_left(self._levels, low)
+        end = len(self._levels) if high is None else bisect.bisect_right(self._levels, high)
+        return [self._npcs[lookup] for lookup in self._by_level[start:end]]
+
+
+def npc_registry_for(services: Any) -> NpcRegistry:
+    """The container's shared registry, or a private one for a cog running without services."""
+    registry = getattr(services, "npc_registry", None)
+    return registry if isinstance(registry, NpcRegistry) else NpcRegistry()
@@ -10,13 +10,23 @@ from datetime import datetime
 
 from .character_system import CharacterSystem
 from .jutsu_system import JutsuSystem
+from .events import (
+    EventBus,
+    ExperienceGainedEvent,
+    JutsuUnlockedEvent,
+    LevelUpEvent,
+    RankChangedEvent,
+    publish_event,
+)
 
 class ShinobiProgressionEngine:
     """Enhanced progression engine with level-up and jutsu unlocking."""
     
-    def __init__(self, character_system: Optional[CharacterSystem] = None, jutsu_system: Optional[JutsuSystem] = None):
+    def __init__(self, character_system: Optional[CharacterSystem] = None, jutsu_system: Optional[JutsuSystem] = None,
+                 event_bus: Optional[EventBus] = None):
         self.character_system = character_system or CharacterSystem()
         self.jutsu_system = jutsu_system or JutsuSystem()
+        self.event_bus = event_bus
     
     def calculate_exp_for_level(self, level: int) -> int:
         """Calculate experience required for a specific level."""
@@ -113,6 +123,8 @@ class ShinobiProgressionEngine:
                 return {"success": False, "error": "Character not found"}
             
             character_data = self.character_system._character_to_dict(character)
+            old_level = character_data.get("level", 1)
+            old_rank = character_data.get("rank", "Academy Student")
             
             # Add experience
             character_data["exp"] = character_data.get("exp", 0) + exp
@@ -135,6 +147,10 @@ class ShinobiProgressionEngine:
             # Save character
             self.character_system._save_character_to_file(character)
             
+            self._publish_progression_events(
+                str(player_id), exp, character_data, old_level, old_rank, unlocked_jutsu
+            )
+            
             return {
                 "success": True,
                 "exp_gained": exp,
@@ -147,6 +163,25 @@ class ShinobiProgressionEngine:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def _publish_progression_events(self, player_id: str, exp: int, character_data: Dict[str, Any],
+                                    old_level: int, old_rank: str, unlocked_jutsu: List[str]) -> None:
+        """Publish the events produced by a single experience award."""
+        if self.event_bus is None:
+            return
+        publish_event(self.event_bus, ExperienceGainedEvent(
+            user_id=player_id, amount=exp, total_exp=character_data["exp"]
+        ))
+        if character_data["level"] > old_level:
+            publish_event(self.event_bus, LevelUpEvent(
+                user_id=player_id, old_level=old_level, new_level=character_data["level"]
+            ))
+        if character_data["rank"] != old_rank:
+            publish_event(self.event_bus, RankChangedEvent(
+                user_id=player_id, old_rank=old_rank, new_rank=character_data["rank"]
+            ))
+        for jutsu_name in unlocked_jutsu:
+            publish_event(self.event_bus, JutsuUnlockedEvent(user_id=player_id, jutsu_name=jutsu_name))
+    
     async def award_mission_experience(self, player_id: str, exp: int) -> Dict[str, Any]:
         """Award experience from mission completion."""
         return await self.award_battle_experience(int(player_id), exp)
@@ -0,0 +1,159 @@
+"""
+Deadline Scheduler for HCShinobi
+Keyed one-shot deadlines for battle timeouts, mission expiry, training completion and cooldowns.
+
+Deadlines live in a min-heap with lazy invalidation: rescheduling a key pushes
+a new heap entry in O(log n) and leaves the old one to be discarded when it
+reaches the top.  :meth:`DeadlineScheduler.pop_expired` removes a key from the
+schedule before returning it, so each deadline fires exactly once no matter
+how many times it was touched.  Callers either drive it with
+:meth:`DeadlineScheduler.fire_expired` or call :meth:`DeadlineScheduler.start`
+so a background task sleeps until the earliest deadline and fires it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+ExpiryCallback = Callable[[Hashable], Union[None, Awaitable[None]]]
+
+
+class DeadlineScheduler:
+    """Min-heap of keyed deadlines; each key has at most one live deadline."""
+
+    # Rebuild the heap once stale entries outnumber live ones by this factor.
+    COMPACT_FACTOR = 2
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._callbacks: Dict[Hashable, Optional[ExpiryCallback]] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def schedule(self, key: Hashable, deadline: float, callback: Optional[ExpiryCallback] = None) -> None:
+        """Set ``key`` to expire at ``deadline`` (clock seconds), replacing any earlier deadline."""
+        seq = next(self._seq)
+        self._entries[key] = (deadline, seq)
+        if callback is not None or key not in self._callbacks:
+            self._callbacks[key] = callback
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if len(self._heap) > self.COMPACT_FACTOR * len(self._entries) + 64:
+            self._compact()
+        self._notify()
+
+    def schedule_in(self, key: Hashable, delay: float, callback: Optional[ExpiryCallback] = None) -> None:
+        self.schedule(key, self.clock() + delay, callback)
+
+    def touch(self, key: Hashable, delay: float) -> None:
+        """Push ``key``'s deadline to ``delay`` seconds from now, keeping its callback."""
+        self.schedule_in(key, delay)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop ``key``'s deadline. Returns False if it was not scheduled."""
+        self._callbacks.pop(key, None)
+        return self._entries.pop(key, None) is not None
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest live deadline, discarding stale heap entries on the way."""
+        heap = self._heap
+        while heap:
+            deadline, seq, key = heap[0]
+            if self._entries.get(key) == (deadline, seq):
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def pop_expired(self, now: Optional[float] = None) -> List[Tuple[Hashable, Optional[ExpiryCallback]]]:
+        """Unschedule and return every ``(key, callback)`` whose deadline is at or before ``now``."""
+        now = self.clock() if now is None else now
+        expired = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            expired.append((key, self._callbacks.pop(key, None)))
+        return expired
+
+    async def fire_expired(self, now: Optional[float] = None) -> List[Hashable]:
+        """Run callbacks for expired keys; returns the keys that fired."""
+        fired = []
+        for key, callback in self.pop_expired(now):
+            fired.append(key)
+            self.fired += 1
+            if callback is None:
+                continue
+            try:
+                result = callback(key)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Deadline callback for {key!r} failed: {e}")
+        return fired
+
+    def _compact(self) -> None:
+        self._heap = [(deadline, seq, key) for key, (deadline, seq) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Fire deadlines from a background task on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            await self.fire_expired()
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - self.clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._wakeup = None
@@ -0,0 +1,240 @@
+"""
+Effective Stats Service for HCShinobi
+Combines base stats, equipment, buffs, debuffs and status conditions into one cached stat block.
+
+Results are memoized per character and only rebuilt after the character's
+version is bumped, which happens whenever the character is saved or one of
+the modifier helpers below changes equipment, buffs, debuffs or conditions.
+:meth:`EffectiveStatsService.invalidate_all` bumps a generation that is part
+of every version.
+
+Damage code reads stats through :func:`effective_stats`, or through
+:func:`stat_bonus` when its own stats are on another scale (ShinobiOS).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .character import Character
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS: Tuple[str, ...] = (
+    "max_hp", "max_chakra", "max_stamina",
+    "strength", "defense", "speed",
+    "ninjutsu", "genjutsu", "taijutsu",
+    "willpower", "chakra_control", "intelligence", "perception",
+)
+
+# Multipliers applied by named status conditions that carry no explicit stats.
+STATUS_CONDITION_MODIFIERS: Dict[str, Dict[str, float]] = {
+    "Blinded": {"perception": 0.5, "speed": 0.9},
+    "Exhausted": {"speed": 0.8, "taijutsu": 0.8, "strength": 0.8},
+    "Chakra Depleted": {"ninjutsu": 0.7, "chakra_control": 0.7},
+    "Injured": {"defense": 0.8, "speed": 0.9},
+    "Focused": {"chakra_control": 1.2, "perception": 1.1},
+    "Smoke Screen": {"speed": 1.1},
+}
+
+
+@dataclass(frozen=True)
+class EffectiveStats:
+    """Immutable stat block after every modifier has been applied."""
+    max_hp: int
+    max_chakra: int
+    max_stamina: int
+    strength: int
+    defense: int
+    speed: int
+    ninjutsu: int
+    genjutsu: int
+    taijutsu: int
+    willpower: int
+    chakra_control: int
+    intelligence: int
+    perception: int
+
+    def to_dict(self) -> Dict[str, int]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+class EffectiveStatsService:
+    """Computes and memoizes effective stats per character version."""
+
+    def __init__(self, data_dir: str = "data", equipment_catalog: Optional[Dict[str, Any]] = None):
+        self.data_dir = Path(data_dir)
+        self._catalog = equipment_catalog
+        self._versions: Dict[str, int] = {}
+        # Bumped by invalidate_all; part of every character's version.
+        self._generation = 0
+        self._cache: Dict[str, Tuple[Tuple[int, int], EffectiveStats]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def equipment_catalog(self) -> Dict[str, Any]:
+        if self._catalog is None:
+            self._catalog = {}
+            for name in ("equipment_shop.json", "general_items.json"):
+                path = self.data_dir / "shops" / name
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        self._catalog.update(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Equipment catalog {path} not loaded: {e}")
+        return self._catalog
+
+    # ------------------------------------------------------------------
+    # Cache management
+    # ------------------------------------------------------------------
+
+    def invalidate(self, character_id) -> None:
+        """Bump a character's version so the next lookup recomputes."""
+        key = str(character_id)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def invalidate_all(self) -> None:
+        """Bump every character's version at once, e.g. after the equipment catalog changes."""
+        self._generation += 1
+        self._cache.clear()
+
+    def version(self, character_id) -> Tuple[int, int]:
+        """The version a cached stat block must carry to still be current."""
+        return self._generation, self._versions.get(str(character_id), 0)
+
+    def get(self, character: Character) -> EffectiveStats:
+        """Return the effective stats for ``character``, computing them at most once per version."""
+        key = str(character.id)
+        version = self.version(key)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        stats = self.compute(character)
+        self._cache[key] = (version, stats)
+        return stats
+
+    def get_bonus(self, character: Character, stat: str) -> int:
+        """Difference between the effective and base value of ``stat``."""
+        return getattr(self.get(character), stat) - getattr(character, stat, 0)
+
+    # ------------------------------------------------------------------
+    # Computation
+    # ------------------------------------------------------------------
+
+    def compute(self, character: Character) -> EffectiveStats:
+        flat: Dict[str, float] = {name: float(getattr(character, name, 0) or 0) for name in STAT_FIELDS}
+        mult: Dict[str, float] = {name: 1.0 for name in STAT_FIELDS}
+
+        for item in (character.equipment or {}).values():
+            self._apply_modifier(self._resolve_item(item), flat, mult, sign=1)
+        for buff in (character.buffs or {}).values():
+            self._apply_modifier(buff, flat, mult, sign=1)
+        for debuff in (character.debuffs or {}).values():
+            self._apply_modifier(debuff, flat, mult, sign=-1)
+        for name, condition in (character.status_conditions or {}).items():
+            if isinstance(condition, dict) and ("stats" in condition or "multipliers" in condition):
+                self._apply_modifier(condition, flat, mult, sign=1)
+            else:
+                for stat, factor in STATUS_CONDITION_MODIFIERS.get(name, {}).items():
+                    mult[stat] *= factor
+
+        return EffectiveStats(**{
+            name: max(0, int(round(flat[name] * mult[name]))) for name in STAT_FIELDS
+        })
+
+    def _resolve_item(self, item: Any) -> Dict[str, Any]:
+        if isinstance(item, dict):
+            return item
+        if isinstance(item, str):
+            return self.equipment_catalog.get(item, {})
+        return {}
+
+    @staticmethod
+    def _apply_modifier(modifier: Any, flat: Dict[str, float], mult: Dict[str, float], sign: int) -> None:
+        """Apply ``{"stats": {...}, "multipliers": {...}}`` or a bare ``{stat: value}`` mapping."""
+        if not isinstance(modifier, dict):
+            return
+        stats = modifier.get("stats")
+        if stats is None and "multipliers" not in modifier:
+            stats = modifier
+        for stat, value in (stats or {}).items():
+            if stat in flat and isinstance(value, (int, float)):
+                flat[stat] += -abs(value) if sign < 0 else value
+        for stat, factor in (modifier.get("multipliers") or {}).items():
+            if stat in mult and isinstance(factor, (int, float)):
+                mult[stat] *= factor
+
+    # ------------------------------------------------------------------
+    # Modifier helpers (mutate and invalidate in one step)
+    # ------------------------------------------------------------------
+
+    def equip(self, character: Character, slot: str, item: Any) -> None:
+        character.equipment[slot] = item
+        self.invalidate(character.id)
+
+    def unequip(self, character: Character, slot: str) -> Any:
+        item = character.equipment.pop(slot, None)
+        self.invalidate(character.id)
+        return item
+
+    def apply_buff(self, character: Character, name: str, modifier: Dict[str, Any]) -> None:
+        character.buffs[name] = modifier
+        self.invalidate(character.id)
+
+    def remove_buff(self, character: Character, name: str) -> None:
+        character.buffs.pop(name, None)
+        self.invalidate(character.id)
+
+    def apply_debuff(self, character: Character, name: str, modifier: Dict[str, Any]) -> None:
+        character.debuffs[name] = modifier
+        self.invalidate(character.id)
+
+    def remove_debuff(self, character: Character, name: str) -> None:
+        character.debuffs.pop(name, None)
+        self.invalidate(character.id)
+
+    def set_status_condition(self, character: Character, name: str, value: Any = True) -> None:
+        character.status_conditions[name] = value
+        self.invalidate(character.id)
+
+    def clear_status_condition(self, character: Character, name: str) -> None:
+        character.status_conditions.pop(name, None)
+        self.invalidate(character.id)
+
+
+def stats_for(services: Any) -> Optional[EffectiveStatsService]:
+    """The container's shared service, or None for a cog running without services."""
+    service = getattr(services, "stats_service", None)
+    return service if isinstance(service, EffectiveStatsService) else None
+
+
+def _loaded_character(services: Any, character_id) -> Optional[Character]:
+    character_system = getattr(services, "character_system", None)
+    if character_system is None or character_id is None:
+        return None
+    return character_system.characters.get(str(character_id))
+
+
+def effective_stats(services: Any, character_id) -> Optional[EffectiveStats]:
+    """The cached stat block of a loaded character; None without services or that character."""
+    service = stats_for(services)
+    character = _loaded_character(services, character_id)
+    if service is None or character is None:
+        return None
+    return service.get(character)
+
+
+def stat_bonus(services: Any, character_id, stat: str) -> int:
+    """How far ``stat`` is raised or lowered by modifiers, for combat stats on a different scale."""
+    service = stats_for(services)
+    character = _loaded_character(services, character_id)
+    if service is None or character is None:
+        return 0
+    return service.get_bonus(character, stat)
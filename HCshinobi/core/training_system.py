@@ -9,6 +9,8 @@ from typing import Dict, Tuple, Optional
 
 from .currency_system import CurrencySystem
 from .character_system import CharacterSystem
+from .cooldowns import CooldownStore
+from .events import EventBus, TrainingCompletedEvent, publish_event
 
 
 class TrainingIntensity:
@@ -42,13 +44,17 @@ class TrainingSystem:
         data_dir: str = "data",
         currency_system: Optional[CurrencySystem] = None,
         character_system: Optional[CharacterSystem] = None,
+        event_bus: Optional[EventBus] = None,
+        cooldowns: Optional[CooldownStore] = None,
     ) -> None:
         self.data_dir = Path(data_dir) / "training"
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.active_sessions: Dict[str, TrainingSession] = {}
-        self.cooldowns: Dict[str, datetime] = {}
+        # user_id -> cooldown expiry; durable when the store is the container's
+        self.cooldowns = (cooldowns if cooldowns is not None else CooldownStore()).scope("training")
         self.currency_system = currency_system
         self.character_system = character_system
+        self.event_bus = event_bus
 
     def _get_training_cost(self, attribute: str) -> int:
         return 10
@@ -130,6 +136,9 @@ class TrainingSystem:
                 setattr(char, session.attribute, current + gain)
                 await self.character_system.save_character(char)
         self.cooldowns[uid] = datetime.now(timezone.utc) + timedelta(hours=self.COOLDOWN_HOURS)
+        publish_event(self.event_bus, TrainingCompletedEvent(
+            user_id=uid, attribute=session.attribute, gain=gain, intensity=session.intensity
+        ))
         return True, f"Training completed! Points Gained: **{gain:.2f}**", gain
 
 
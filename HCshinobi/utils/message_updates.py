@@ -0,0 +1,364 @@
+"""
+Message Updates for HCShinobi
+Edit-in-place battle messages behind a per-channel coalescing queue.
+
+Each battle owns one Discord message, tracked here by a key such as the
+battle id. A turn does not post a new embed and view. It calls
+:meth:`MessageUpdateQueue.submit` with a render callable. The queue holds at
+most one pending render per key and drains each channel no faster than
+``min_interval``, so a burst of state changes becomes a single edit that
+shows the latest state. When an :class:`~HCshinobi.utils.outbound.OutboundScheduler`
+is given, edits and sends go through it at interactive priority.
+
+Spectators :meth:`~MessageUpdateQueue.watch` a battle key from their own
+channel or thread. Each submit renders once, and every spectator message is
+edited from that same payload (minus the participants' buttons), so a crowd
+adds Discord calls but no render work. A spectator is dropped when its
+message or channel disappears, when its lease runs out, or when the battle
+is forgotten.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import discord
+
+from .outbound import Priority
+
+logger = logging.getLogger(__name__)
+
+Render = Callable[[], Dict[str, Any]]
+Send = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class _Pending:
+    render: Render
+    send: Optional[Send]
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    spectator: Optional[Tuple[Hashable, Any]] = None  # (battle key, channel id)
+
+
+@dataclass
+class _Spectator:
+    send: Send
+    expires_at: float
+
+
+class _SharedRender:
+    """Calls a battle's render once; the participant and every spectator reuse the payload."""
+
+    __slots__ = ("render", "queue", "payload")
+
+    def __init__(self, render: Render, queue: "MessageUpdateQueue"):
+        self.render = render
+        self.queue = queue
+        self.payload: Optional[Dict[str, Any]] = None
+
+    def __call__(self) -> Dict[str, Any]:
+        if self.payload is None:
+            self.payload = self.render()
+            self.queue.renders += 1
+        return self.payload
+
+    def for_spectators(self) -> Dict[str, Any]:
+        payload = dict(self())
+        if "view" in payload:
+            payload["view"] = None  # spectators cannot act; clears buttons on edit, omitted on send
+        return payload
+
+
+class MessageUpdateQueue:
+    """One message per battle key; edits are coalesced and rate limited per channel."""
+
+    # Discord allows roughly five message edits per five seconds in a channel.
+    MIN_INTERVAL = 1.0
+    # Spectators re-run /spectate to keep watching past this many seconds.
+    SPECTATE_TTL = 30 * 60
+    MAX_SPECTATORS = 50
+
+    def __init__(self, min_interval: float = MIN_INTERVAL, clock: Callable[[], float] = time.monotonic,
+                 outbound: Any = None):
+        self.min_interval = min_interval
+        self.outbound = outbound
+        self._clock = clock
+        self._messages: Dict[Hashable, Any] = {}
+        self._pending: Dict[Any, Dict[Hashable, _Pending]] = {}
+        self._workers: Dict[Any, asyncio.Task] = {}
+        self._last_edit: Dict[Any, float] = {}
+        self._spectators: Dict[Hashable, Dict[Any, _Spectator]] = {}
+        self._frames: Dict[Hashable, _SharedRender] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.edits = 0
+        self.sends = 0
+        self.renders = 0
+        self.fanned_out = 0
+        self.spectators_dropped = 0
+
+    def track(self, key: Hashable, message: Any) -> None:
+        """Adopt ``message`` (a Message or PartialMessage) as the handle for ``key``."""
+        if message is not None:
+            self._messages[key] = message
+
+    def message(self, key: Hashable) -> Optional[Any]:
+        return self._messages.get(key)
+
+    def forget(self, key: Hashable) -> None:
+        """Drop the handle and any queued render; resolves waiters with the last message.
+
+        Spectators stop watching, but renders already queued for them (usually
+        the final result) are still delivered.
+        """
+        message = self._messages.pop(key, None)
+        for pending in self._pending.values():
+            entry = pending.pop(key, None)
+            if entry is not None:
+                self._resolve(entry, message)
+        self._frames.pop(key, None)
+        for channel_id in list(self._spectators.get(key, ())):
+            self._drop_spectator(key, channel_id)
+
+    def submit(self, key: Hashable, channel_id: Any, render: Render, send: Optional[Send] = None) -> asyncio.Future:
+        """Queue ``render`` for ``key``; a render already waiting for the same key is replaced.
+
+        ``send`` posts a fresh message when the key has no handle yet (or it was deleted).
+        The returned future resolves to the message once the latest render is on screen.
+        """
+        self.submitted += 1
+        shared = self._frame(key, render)
+        waiter = self._enqueue(key, channel_id, shared, send)
+        self._fan_out(key, shared)
+        return waiter
+
+    def publish(self, key: Hashable, render: Render) -> int:
+        """Show ``render`` to ``key``'s spectators only; for battles whose own message is sent elsewhere.
+
+        Returns how many spectators it went to.
+        """
+        return self._fan_out(key, self._frame(key, render))
+
+    # ------------------------------------------------------------------
+    # Spectators
+    # ------------------------------------------------------------------
+
+    def watch(self, key: Hashable, channel_id: Any, send: Send, ttl: Optional[float] = None) -> bool:
+        """Mirror ``key``'s battle message into ``channel_id`` (a channel or thread) for ``ttl`` seconds.
+
+        Watching again renews the lease. If the battle already has spectators,
+        its latest frame is posted straight away. Returns False when the battle already has
+        ``MAX_SPECTATORS`` other spectators.
+        """
+        spectators = self._live_spectators(key)
+        if channel_id not in spectators and len(spectators) >= self.MAX_SPECTATORS:
+            return False
+        ttl = self.SPECTATE_TTL if ttl is None else ttl
+        spectators[channel_id] = _Spectator(send, self._clock() + ttl)
+        self._spectators[key] = spectators
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._enqueue(("spectate", key, channel_id), channel_id, frame.for_spectators, send, (key, channel_id))
+        return True
+
+    def unwatch(self, key: Hashable, channel_id: Any) -> bool:
+        """Stop mirroring ``key`` into ``channel_id``; False if it was not watching."""
+        if channel_id not in self._spectators.get(key, ()):
+            return False
+        self._drop_spectator(key, channel_id)
+        return True
+
+    def spectators(self, key: Hashable) -> List[Any]:
+        """Channel ids currently watching ``key``."""
+        return list(self._live_spectators(key))
+
+    def spectator_stats(self) -> Dict[str, int]:
+        return {
+            "battles": len(self._spectators),
+            "spectators": sum(len(s) for s in self._spectators.values()),
+            "renders": self.renders,
+            "fanned_out": self.fanned_out,
+            "dropped": self.spectators_dropped,
+        }
+
+    def _frame(self, key: Hashable, render: Render) -> _SharedRender:
+        """Wrap ``render`` so it runs once; while ``key`` has spectators, keep it for the next one to see first."""
+        shared = _SharedRender(render, self)
+        if key in self._spectators:
+            self._frames[key] = shared
+        return shared
+
+    def _fan_out(self, key: Hashable, shared: _SharedRender) -> int:
+        spectators = self._live_spectators(key)
+        if not spectators:
+            return 0
+        for channel_id, spectator in spectators.items():
+            self._enqueue(("spectate", key, channel_id), channel_id, shared.for_spectators, spectator.send,
+                          (key, channel_id))
+        self.fanned_out += len(spectators)
+        return len(spectators)
+
+    def _live_spectators(self, key: Hashable) -> Dict[Any, _Spectator]:
+        """``key``'s spectators, after dropping any whose lease has run out."""
+        spectators = self._spectators.get(key)
+        if not spectators:
+            return {}
+        now = self._clock()
+        for channel_id in [c for c, s in spectators.items() if s.expires_at <= now]:
+            self._drop_spectator(key, channel_id)
+        return self._spectators.get(key, {})
+
+    def _drop_spectator(self, key: Hashable, channel_id: Any) -> None:
+        spectators = self._spectators.get(key)
+        if spectators is None or spectators.pop(channel_id, None) is None:
+            return
+        self.spectators_dropped += 1
+        if not spectators:
+            del self._spectators[key]
+            self._frames.pop(key, None)
+        if not self._pending.get(channel_id, {}).get(("spectate", key, channel_id)):
+            self._messages.pop(("spectate", key, channel_id), None)
+
+    def _enqueue(self, key: Hashable, channel_id: Any, render: Render, send: Optional[Send],
+                 spectator: Optional[Tuple[Hashable, Any]] = None) -> asyncio.Future:
+        waiter = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(channel_id, {})
+        entry = pending.get(key)
+        if entry is not None:
+            self.coalesced += 1
+            entry.render = render
+            entry.send = send or entry.send
+        else:
+            entry = pending[key] = _Pending(render, send, spectator=spectator)
+        entry.waiters.append(waiter)
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.create_task(self._drain(channel_id))
+        return waiter
+
+    async def flush(self) -> None:
+        while self._workers:
+            await asyncio.gather(*list(self._workers.values()), return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in list(self._workers.values()):
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        for pending in self._pending.values():
+            for entry in pending.values():
+                self._resolve(entry, None)
+        self._pending.clear()
+        self._spectators.clear()
+        self._frames.clear()
+        self._last_edit.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "coalesced": self.coalesced, "edits": self.edits, "sends": self.sends}
+
+    async def _drain(self, channel_id: Any) -> None:
+        try:
+            while self._pending.get(channel_id):
+                wait = self._last_edit.get(channel_id, float("-inf")) + self.min_interval - self._clock()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue  # renders that arrived while waiting are already merged
+                pending = self._pending[channel_id]
+                key = next(iter(pending))
+                entry = pending.pop(key)
+                if not pending:
+                    del self._pending[channel_id]
+                self._last_edit[channel_id] = self._clock()
+                self._resolve(entry, await self._deliver(key, channel_id, entry))
+                watching = entry.spectator is None or entry.spectator[1] in self._spectators.get(entry.spectator[0], ())
+                if not watching:
+                    self._messages.pop(key, None)  # stopped watching while this render was queued
+        finally:
+            self._workers.pop(channel_id, None)
+            if not self._pending.get(channel_id):
+                self._pending.pop(channel_id, None)
+            self._release_pacing(channel_id)
+
+    def _release_pacing(self, channel_id: Any) -> None:
+        """Forget an idle channel's last edit time once ``min_interval`` has passed since it."""
+        if channel_id in self._workers:
+            return  # a new worker paces the channel and releases it when it exits
+        last = self._last_edit.get(channel_id)
+        if last is None:
+            return
+        wait = last + self.min_interval - self._clock()
+        if wait > 0:
+            asyncio.get_running_loop().call_later(wait, self._release_pacing, channel_id)
+        else:
+            del self._last_edit[channel_id]
+
+    async def _call(self, channel_id: Any, call: Callable[[], Awaitable[Any]]) -> Any:
+        if self.outbound is None:
+            return await call()
+        return await self.outbound.submit(("channel", channel_id), call, Priority.INTERACTIVE)
+
+    async def _deliver(self, key: Hashable, channel_id: Any, entry: _Pending) -> Optional[Any]:
+        try:
+            payload = entry.render()
+        except Exception as e:
+            logger.error(f"Failed to render battle message {key}: {e}")
+            return self._messages.get(key)
+        message = self._messages.get(key)
+        try:
+            if message is not None:
+                try:
+                    edited = await self._call(channel_id, lambda: message.edit(**payload))
+                    self.edits += 1
+                    if edited is not None:
+                        self._messages[key] = message = edited
+                    return message
+                except discord.NotFound:
+                    self._messages.pop(key, None)
+                    if entry.spectator is not None:  # the spectator deleted it: stop watching
+                        self._drop_spectator(*entry.spectator)
+                        return None
+            if entry.send is None:
+                return None
+            # ``view=None`` clears components on edit, but send() only accepts a real view
+            fields = {k: v for k, v in payload.items() if v is not None}
+            message = await self._call(channel_id, lambda: entry.send(**fields))
+            self.sends += 1
+            self.track(key, message)
+            return message
+        except discord.HTTPException as e:
+            if entry.spectator is not None and isinstance(e, (discord.Forbidden, discord.NotFound)):
+                self._drop_spectator(*entry.spectator)  # channel or thread gone, or no longer allowed
+                return None
+            logger.warning(f"Failed to update battle message {key}: {e}")
+            return self._messages.get(key)
+
+    @staticmethod
+    def _resolve(entry: _Pending, message: Any) -> None:
+        for waiter in entry.waiters:
+            if not waiter.done():
+                waiter.set_result(message)
+
+
+def partial_message(client: Any, channel_id: Any, message_id: Any) -> Optional[Any]:
+    """A bot-token handle for a stored message id.
+
+    Interaction followups are webhook messages that can only be edited for 15
+    minutes, so cogs re-track the channel's partial message once they know its id.
+    """
+    channel = client.get_channel(channel_id) if channel_id and message_id else None
+    if channel is None or not hasattr(channel, "get_partial_message"):
+        return None
+    return channel.get_partial_message(message_id)
+
+
+def publish_frame(services: Any, key: Hashable, embed: "discord.Embed", final: bool = False) -> None:
+    """Mirror one battle embed to ``key``'s /spectate watchers; ``final`` then forgets the battle."""
+    updates = getattr(services, "message_updates", None)
+    if updates is None:
+        return
+    updates.publish(key, lambda: {"embed": embed})
+    if final:
+        updates.forget(key)  # spectators still get this last frame
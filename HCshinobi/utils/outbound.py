@@ -0,0 +1,341 @@
+"""
+Outbound Scheduler for HCShinobi
+Paced, prioritised Discord API calls shared by every cog.
+
+Each call names a route, such as a channel, a DM recipient or a user lookup.
+Each route has its own token bucket, and a global bucket caps the bot as a
+whole. Pending calls wait in one heap per route. The worker always starts
+the highest-priority call whose route has a token, so a battle turn
+overtakes a clan alert already queued in another channel, and a busy route
+never blocks the others. DM fan-out fetches users through a small LRU cache
+and sends with bounded concurrency. :meth:`OutboundScheduler.metrics` reports
+queue depth and wait times for each priority.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+Call = Callable[[], Awaitable[Any]]
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # battle turns and button responses
+    NORMAL = 1
+    BULK = 2         # announcements and DM fan-out
+
+
+class TokenBucket:
+    """``capacity`` requests at once, refilled at ``rate`` per second."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, now: float) -> float:
+        """Seconds until a token is available (0 when one is available now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class PriorityMetrics:
+    """Throughput and queueing delay for one priority."""
+    sent: int = 0
+    failed: int = 0
+    waited: float = 0.0
+    max_wait: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        started = self.sent + self.failed
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "avg_wait": self.waited / started if started else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+@dataclass
+class _Job:
+    call: Call
+    priority: Priority
+    future: asyncio.Future
+    queued_at: float
+
+
+class OutboundScheduler:
+    """Token-bucket pacing per route and overall, highest priority first."""
+
+    # Discord's documented limits: 50 requests/s per bot and about 5 per 5s per channel.
+    GLOBAL_RATE = 50.0
+    ROUTE_RATE = 1.0
+    ROUTE_BURST = 5
+    USER_CACHE_SIZE = 1024
+    # Route buckets kept before idle, refilled ones are swept; a full bucket is the same as a new one.
+    BUCKET_SWEEP = 256
+
+    def __init__(self, client: Any = None, *, global_rate: float = GLOBAL_RATE, route_rate: float = ROUTE_RATE,
+                 route_burst: int = ROUTE_BURST, max_concurrency: int = 8, dm_concurrency: int = 4,
+                 user_cache_size: int = USER_CACHE_SIZE, clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.dm_concurrency = dm_concurrency
+        self.user_cache_size = user_cache_size
+        self.clock = clock
+        self._global = TokenBucket(global_rate, global_rate, clock())
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._sweep_at = self.BUCKET_SWEEP
+        self._routes: Dict[Hashable, List[Tuple[int, int, _Job]]] = {}
+        self._ready: List[Tuple[int, int, Hashable]] = []
+        self._parked: List[Tuple[float, int, Hashable]] = []
+        self._parked_routes: set = set()
+        self._seq = itertools.count()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._running: set = set()
+        self._users: "OrderedDict[int, Any]" = OrderedDict()
+        self._user_fetches: Dict[int, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.depth = 0
+        self.high_water = 0
+        self.user_cache_hits = 0
+        self.user_cache_misses = 0
+        self.stats: Dict[Priority, PriorityMetrics] = {p: PriorityMetrics() for p in Priority}
+
+    # ------------------------------------------------------------------
+    # Submitting calls
+    # ------------------------------------------------------------------
+
+    def submit(self, route: Hashable, call: Call, priority: Priority = Priority.NORMAL) -> asyncio.Future:
+        """Queue ``call`` on ``route``; the future carries its result or exception."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        seq = next(self._seq)
+        heap = self._routes.setdefault(route, [])
+        was_head = heap[0][:2] if heap else None
+        heapq.heappush(heap, (priority, seq, _Job(call, priority, future, self.clock())))
+        if route not in self._parked_routes and (was_head is None or (priority, seq) < was_head):
+            heapq.heappush(self._ready, (priority, seq, route))
+        self.depth += 1
+        self.high_water = max(self.high_water, self.depth)
+        self._wakeup.set()
+        return future
+
+    async def send(self, destination: Any, priority: Priority = Priority.NORMAL, **kwargs) -> Any:
+        """``destination.send(**kwargs)`` paced on the destination's route."""
+        return await self.submit(self.route_for(destination), lambda: destination.send(**kwargs), priority)
+
+    @staticmethod
+    def route_for(destination: Any) -> Hashable:
+        if isinstance(destination, (discord.User, discord.Member)):
+            return ("dm", destination.id)
+        if isinstance(destination, commands.Context):
+            destination = destination.channel
+        return ("channel", getattr(destination, "id", id(destination)))
+
+    async def fetch_user(self, user_id: Any) -> Any:
+        """Cached ``client.fetch_user``; concurrent lookups of one id share a request."""
+        user_id = int(user_id) if str(user_id).isdigit() else user_id
+        user = self._users.get(user_id)
+        if user is not None:
+            self._users.move_to_end(user_id)
+            self.user_cache_hits += 1
+            return user
+        get_user = getattr(self.client, "get_user", None)
+        user = get_user(user_id) if callable(get_user) and isinstance(user_id, int) else None
+        if user is None:
+            pending = self._user_fetches.get(user_id)
+            if pending is None:
+                self.user_cache_misses += 1
+                pending = self.submit(("user", user_id), lambda: self.client.fetch_user(user_id))
+                self._user_fetches[user_id] = pending
+                pending.add_done_callback(lambda _: self._user_fetches.pop(user_id, None))
+            user = await pending
+        self._users[user_id] = user
+        if len(self._users) > self.user_cache_size:
+            self._users.popitem(last=False)
+        return user
+
+    async def send_dms(self, user_ids: Iterable[Any], priority: Priority = Priority.BULK,
+                       **kwargs) -> Dict[Any, bool]:
+        """DM every user, at most ``dm_concurrency`` in flight; returns who was reached."""
+        gate = asyncio.Semaphore(self.dm_concurrency)
+
+        async def deliver(user_id: Any) -> bool:
+            async with gate:
+                try:
+                    user = await self.fetch_user(user_id)
+                    await self.submit(("dm", getattr(user, "id", user_id)), lambda: user.send(**kwargs), priority)
+                    return True
+                except discord.HTTPException as e:
+                    logger.warning(f"Failed to DM user {user_id}: {e}")
+                    return False
+
+        user_ids = list(dict.fromkeys(user_ids))
+        results = await asyncio.gather(*(deliver(uid) for uid in user_ids))
+        return dict(zip(user_ids, results))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "high_water": self.high_water,
+            "in_flight": len(self._running),
+            "routes": len(self._routes),
+            "buckets": len(self._buckets),
+            "user_cache": {"size": len(self._users), "hits": self.user_cache_hits,
+                           "misses": self.user_cache_misses},
+            "priorities": {p.name.lower(): m.to_dict() for p, m in self.stats.items()},
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _bucket(self, route: Hashable, now: float) -> TokenBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            if len(self._buckets) >= self._sweep_at:
+                self._sweep_buckets(now)
+            bucket = self._buckets[route] = TokenBucket(self.route_rate, self.route_burst, now)
+        return bucket
+
+    def _sweep_buckets(self, now: float) -> None:
+        """Drop the buckets of idle routes that have refilled completely."""
+        for route, bucket in list(self._buckets.items()):
+            if route in self._routes or route in self._parked_routes:
+                continue
+            if bucket.wait(now) == 0 and bucket.tokens >= bucket.capacity:
+                del self._buckets[route]
+        # Sweep again only once the live buckets have doubled, so the cost stays amortised.
+        self._sweep_at = max(self.BUCKET_SWEEP, 2 * len(self._buckets))
+
+    def _unpark(self, now: float) -> Optional[float]:
+        """Return routes whose bucket refilled to the ready heap; gives the next refill time."""
+        while self._parked and self._parked[0][0] <= now:
+            _, _, route = heapq.heappop(self._parked)
+            self._parked_routes.discard(route)
+            heap = self._routes.get(route)
+            if heap:
+                priority, seq, _ = heap[0]
+                heapq.heappush(self._ready, (priority, seq, route))
+        return self._parked[0][0] if self._parked else None
+
+    def _next_job(self, now: float) -> Tuple[Optional[_Job], Optional[float]]:
+        """Pop the best startable job, or return how long to sleep."""
+        next_refill = self._unpark(now)
+        while self._ready:
+            priority, seq, route = self._ready[0]
+            heap = self._routes.get(route)
+            if not heap or heap[0][:2] != (priority, seq):
+                heapq.heappop(self._ready)  # superseded by a higher-priority head
+                continue
+            global_wait = self._global.wait(now)
+            if global_wait > 0:
+                return None, global_wait
+            bucket = self._bucket(route, now)
+            route_wait = bucket.wait(now)
+            heapq.heappop(self._ready)
+            if route_wait > 0:
+                heapq.heappush(self._parked, (now + route_wait, next(self._seq), route))
+                self._parked_routes.add(route)
+                next_refill = self._parked[0][0]
+                continue
+            self._global.take(now)
+            bucket.take(now)
+            _, _, job = heapq.heappop(heap)
+            if heap:
+                heapq.heappush(self._ready, (*heap[0][:2], route))
+            else:
+                del self._routes[route]
+            return job, None
+        return None, None if next_refill is None else max(0.0, next_refill - now)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = self.clock()
+            job, delay = self._next_job(now)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.depth -= 1
+            if job.future.done():  # the caller gave up waiting
+                continue
+            stats = self.stats[job.priority]
+            waited = now - job.queued_at
+            stats.waited += waited
+            stats.max_wait = max(stats.max_wait, waited)
+            await self._slots.acquire()
+            task = asyncio.get_running_loop().create_task(self._execute(job, stats))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job: _Job, stats: PriorityMetrics) -> None:
+        try:
+            result = await job.call()
+        except Exception as e:
+            stats.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            stats.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        """Stop the worker; calls still queued fail with ``CancelledError``."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        for heap in self._routes.values():
+            for _, _, job in heap:
+                job.future.cancel()
+        self._routes.clear()
+        self._ready.clear()
+        self._parked.clear()
+        self._parked_routes.clear()
+        self.depth = 0
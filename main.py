@@ -149,6 +149,7 @@ def require_env() -> BotConfig:
         battle_channel_id=int(battle_channel_id),
         online_channel_id=int(online_channel_id),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
+        mission_endpoint=os.getenv("MISSION_ENDPOINT"),
     )
 
 async def load_cog_safely(bot: "HCBot", cog_path: str, cog_type: str) -> bool:
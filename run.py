@@ -131,6 +131,7 @@ def require_env() -> BotConfig:
         battle_channel_id=int(os.getenv("DISCORD_BATTLE_CHANNEL_ID")),
         online_channel_id=int(os.getenv("DISCORD_ONLINE_CHANNEL_ID")),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
+        mission_endpoint=os.getenv("MISSION_ENDPOINT"),
     )
 
 
@@ -46,6 +46,9 @@ setup(
             "flake8>=4.0.0",
             "mypy>=0.910",
         ],
+        "sim": [
+            "numpy>=1.21",
+        ],
     },
     entry_points={
         "console_scripts": [
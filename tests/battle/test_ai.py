@@ -0,0 +1,71 @@
+"""
+Tests for the enemy AI policies and their time budget.
+"""
+import random
+import time
+
+from HCshinobi.core.battle.ai import BossModel, ExpectimaxPolicy, GreedyPolicy, RandomPolicy, ShinobiOSModel
+from HCshinobi.core.boss_battle_system import solomon_table
+from HCshinobi.core.missions.shinobios_engine import Jutsu, ShinobiOSEngine
+
+
+def jutsu(name, damage, cost=10, accuracy=90):
+    return Jutsu(name, cost, damage, accuracy, "short", "none", name)
+
+
+def duel(enemy_jutsu, players=1, player_hp=100):
+    engine = ShinobiOSEngine()
+    env = engine.environments["forest"]
+    enemy = engine.create_shinobi("Enemy", level=10)
+    fighters = [enemy] + [engine.create_shinobi(f"Player {i}", level=10) for i in range(players)]
+    for player in fighters[1:]:
+        player.health = player_hp
+    options = [enemy_jutsu] + [[jutsu("Punch", 5, cost=0)]] * players
+    return ShinobiOSModel(engine, env, fighters, [1] + [0] * players, options)
+
+
+def test_planner_prefers_the_stronger_and_affordable_jutsu():
+    model = duel([jutsu("Flick", 1), jutsu("Rasengan", 40), jutsu("Too Costly", 500, cost=10_000)])
+    policy = ExpectimaxPolicy(budget=0.05, max_depth=3, rng=random.Random(1))
+    decision = policy.decide(model, model.snapshot(0))
+    assert model.jutsu[0][decision.action[0]].name == "Rasengan"
+    assert decision.depth >= 1 and not decision.fallback
+
+
+
+def test_budget_is_strict_and_falls_back_to_the_heuristic():
+    ticks = iter(range(1000))
+    clock = lambda: next(ticks) * 0.01  # every call costs 10ms
+    policy = ExpectimaxPolicy(budget=0.005, clock=clock, rng=random.Random(2))
+    model = duel([jutsu("Flick", 1), jutsu("Rasengan", 40)])
+    decision = policy.decide(model, model.snapshot(0))
+    assert decision.fallback and policy.fallbacks == 1
+    assert model.jutsu[0][decision.action[0]].name == "Rasengan"  # greedy still picks sensibly
+
+    real = ExpectimaxPolicy(budget=0.01, max_depth=50)
+    model = duel([jutsu(f"Jutsu {i}", 10 + i) for i in range(8)], players=3, player_hp=10_000)
+    start = time.perf_counter()
+    real.decide(model, model.snapshot(0))
+    assert time.perf_counter() - start < 0.01 + 0.01  # one node of slack past the deadline
+    assert real.metrics()["decisions"] == 1 and real.metrics()["latency_p99_ms"] > 0
+
+
+def test_repeated_states_come_from_the_cache():
+    model = duel([jutsu("Flick", 1), jutsu("Rasengan", 40)])
+    policy = ExpectimaxPolicy(budget=1.0, max_depth=4)
+    policy.decide(model, model.snapshot(0))
+    nodes = policy.nodes
+    policy.decide(model, model.snapshot(0))
+    assert policy.nodes == nodes and policy.cache_hits > 0
+
+
+def test_boss_model_counters_with_damage_and_other_policies_plug_in():
+    table = solomon_table({"boss_phases": [
+        {"name": "Phase 1: The Crimson Shadow", "hp_threshold": 0.0,
+         "jutsu_pool": ["Kamui Phase", "Sharingan Genjutsu", "Amaterasu"]},
+    ]})
+    model = BossModel(table, boss_max_hp=1500, player_max_hp=500, strike=60)
+    state = model.snapshot(player_hp=500, boss_hp=1500)
+    assert ExpectimaxPolicy(max_depth=2).decide(model, state).action == "Amaterasu"
+    assert GreedyPolicy().decide(model, state).action == "Amaterasu"
+    assert RandomPolicy(rng=random.Random(0)).decide(model, state).action in model.actions(state)
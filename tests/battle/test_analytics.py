@@ -0,0 +1,126 @@
+"""
+Tests for the columnar battle analytics store and its queries.
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from HCshinobi.core.battle.analytics import BattleAnalytics
+from HCshinobi.core.events import BattleEndedEvent, EventBus
+
+np = pytest.importorskip("numpy")
+from HCshinobi.core.battle import queries  # noqa: E402
+
+
+def ended(battle_id, winner="1", loser="2", mode="pvp", reason="victory", turns=10, levels=(10, 10),
+          damage=None, loser_damage=None, when=None):
+    event = BattleEndedEvent(user_id=winner, battle_id=battle_id, loser_id=loser, mode=mode, end_reason=reason,
+                             turns=turns, level=levels[0], loser_level=levels[1],
+                             damage=damage or {}, loser_damage=loser_damage or {})
+    if when is not None:
+        event.timestamp = when
+    return event
+
+
+def test_segments_survive_a_restart(tmp_path):
+    store = BattleAnalytics(str(tmp_path))
+    store.SEGMENT_ROWS = 3
+    for i in range(7):
+        store.record(ended(f"pvp_{i}", damage={"Rasengan": 10 * i}, loser_damage={"Chidori": i}))
+    assert store.segments == 2  # the seventh battle is still in the open segment
+    store.flush()
+    store.flush()  # nothing new to seal
+    assert store.segments == 3
+
+    reopened = BattleAnalytics(str(tmp_path))
+    assert len(reopened) == 7 and reopened.segments == 3
+    for table in ("battles", "damage"):
+        for name, column in getattr(store, table).items():
+            assert getattr(reopened, table)[name] == column, name
+    assert reopened.strings == store.strings
+    assert reopened.record(ended("pvp_7")) == 7 and reopened.code_of("player", "1") == store.code_of("player", "1")
+    assert reopened.battle_id(2) == "pvp_2"
+
+    # A torn segment is dropped whole instead of leaving the columns misaligned.
+    last = tmp_path / "battles" / "analytics" / "segment-000003.col"
+    last.write_bytes(last.read_bytes()[:-4])
+    assert len(BattleAnalytics(str(tmp_path))) == 6
+
+
+@pytest.mark.asyncio
+async def test_queries_group_the_recorded_battles():
+    bus = EventBus()
+    store = BattleAnalytics()
+    store.attach(bus)
+    now = datetime.now(timezone.utc)
+    for event in [
+        ended("a", damage={"Rasengan": 90, "Punch": 10}, loser_damage={"Chidori": 60}, turns=6, levels=(12, 18)),
+        ended("b", winner="2", loser="1", damage={"Chidori": 100}, loser_damage={"Rasengan": 30}, turns=8,
+              levels=(14, 16)),
+        ended("c", damage={"Rasengan": 50}, loser_damage={"Rasengan": 50, "Chidori": 20}, turns=20,
+              levels=(31, 29)),
+        ended("d", winner="", loser="", reason="timeout", damage={"Punch": 999}, turns=30, levels=(0, 0)),
+        ended("e", winner="7", loser="", mode="boss", turns=4, levels=(60, 70), damage={"Amaterasu": 500}),
+        ended("old", damage={"Punch": 5000}, when=now - timedelta(days=30)),
+    ]:
+        bus.publish(event)
+    await bus.drain()
+    assert len(store) == 6
+
+    week = time.time() - 7 * 86400
+    ranked = queries.jutsu_contribution(store, "pvp", since=week)
+    stats = {s.name: s for s in ranked}
+    assert [s.name for s in ranked] == ["Punch", "Rasengan", "Chidori"]
+    assert (stats["Rasengan"].battles, stats["Rasengan"].damage, stats["Rasengan"].winning_damage) == (3, 220, 140)
+    assert stats["Chidori"].contribution == pytest.approx(100 / 180)
+    assert stats["Punch"].damage == 10  # the undecided timeout and the month-old battle are left out
+    assert queries.jutsu_contribution(store, "raid") == []
+
+    buckets = queries.length_by_level(store, "pvp", bracket=10, since=week)
+    assert [(b.low, b.battles, b.mean_turns, b.max_turns) for b in buckets] == [(0, 1, 30.0, 30), (10, 2, 7.0, 8),
+                                                                               (30, 1, 20.0, 20)]
+
+    summary = {m.mode: m for m in queries.mode_summary(store)}
+    assert summary["pvp"].battles == 5 and summary["pvp"].decided == 4
+    assert summary["pvp"].reasons == {"victory": 4, "timeout": 1}
+    assert summary["boss"].mean_turns == 4.0
+    assert queries.find_battle(store, "c") == 2 and queries.find_battle(store, "z") is None
+    await bus.close()
+
+
+def test_dashboard_queries_scale_to_a_season_of_battles():
+    rng = random.Random(5)
+    store = BattleAnalytics()
+    jutsu = [f"Jutsu {i}" for i in range(40)]
+    for i in range(50_000):
+        store.record(ended(
+            f"pvp_{i}", winner=str(rng.randrange(500)), loser=str(rng.randrange(500)), turns=rng.randint(2, 40),
+            levels=(rng.randint(1, 99), rng.randint(1, 99)),
+            damage={j: rng.randint(1, 80) for j in rng.sample(jutsu, 3)},
+            loser_damage={j: rng.randint(1, 80) for j in rng.sample(jutsu, 2)},
+        ))
+    start = time.perf_counter()
+    stats = queries.jutsu_contribution(store)
+    buckets = queries.length_by_level(store)
+    queries.mode_summary(store)
+    elapsed = time.perf_counter() - start
+    assert len(stats) == 40 and sum(b.battles for b in buckets) == 50_000
+    assert sum(s.damage for s in stats) == sum(store.damage["damage"])
+    assert sum(len(table) for table in store.strings.values()) <= 600  # no per-battle strings
+    assert queries.find_battle(store, "pvp_49999") == 49_999
+    assert elapsed < 1.0, f"dashboard over 50k battles took {elapsed:.3f}s"
+    store.record(ended("after"))  # no NumPy view is left holding the columns
+
+
+def test_battle_ids_are_fixed_width_cells():
+    store = BattleAnalytics()
+    ulid = "01JA2B3C4D5E6F7G8H9JKMNPQR"
+    store.record(ended(f"pvp_{ulid}"))
+    store.record(ended(f"tournament_{ulid}"))  # longer than the cell: keeps the ULID end
+    store.record(ended(None))
+    column = store.battles["battle"]
+    assert len(column.tobytes()) == 3 * column.itemsize and column.typecode == "S32"
+    assert [store.battle_id(row) for row in range(3)] == [f"pvp_{ulid}", f"ament_{ulid}", ""]
+    assert queries.find_battle(store, f"tournament_{ulid}") == 1
@@ -5,11 +5,13 @@ import pytest
 from datetime import datetime, timezone
 from HCshinobi.core.battle.types import StatusEffect, BattleLogCallback
 from HCshinobi.core.battle.effects import (
+    EffectSet,
     add_status_effect,
     apply_status_effects,
     tick_status_durations,
-    can_player_act
+    can_player_act,
 )
+from HCshinobi.core.battle import effects
 from HCshinobi.core.battle.state import BattleState, BattleParticipant
 from HCshinobi.core.character import Character
 
@@ -264,4 +266,77 @@ def test_can_player_act_not_stunned(battle_state, battle_log_callback):
     battle_state.attacker.effects = []
     battle_state.battle_log.clear()
     assert can_player_act(battle_state, battle_state.attacker.id, battle_log_callback)
-    assert len(battle_state.battle_log) == 0 # No log message expected 
\ No newline at end of file
+    assert len(battle_state.battle_log) == 0 # No log message expected 
+
+
+def test_applied_at_is_per_instance():
+    """Each StatusEffect gets its own application time."""
+    first = StatusEffect(name="Poison", duration=1, potency=0.1, effect_type="start_turn")
+    second = StatusEffect(name="Poison", duration=1, potency=0.1, effect_type="start_turn")
+    assert first.applied_at is not second.applied_at
+    assert first.applied_at <= second.applied_at
+
+
+def test_effects_are_indexed_by_phase(battle_state, battle_log_callback, monkeypatch):
+    """Only the handlers for the applied phase run, and assigning a list re-indexes."""
+    calls = []
+
+    def _burn(battle, participant, eff, log):
+        calls.append((participant.id, eff["effect_type"]))
+
+    monkeypatch.setitem(effects._HANDLERS, "Chakra Burn", _burn)
+
+    battle_state.attacker.effects = [
+        StatusEffect(name="Chakra Burn", duration=2, potency=0.1, effect_type="end_turn").to_dict(),
+        StatusEffect(name="Poison", duration=2, potency=0.1, effect_type="start_turn").to_dict(),
+    ]
+    assert isinstance(battle_state.attacker.effects, EffectSet)
+
+    apply_status_effects(battle_state, "start_turn", battle_log_callback)
+    assert calls == []
+    apply_status_effects(battle_state, "end_turn", battle_log_callback)
+    assert calls == [(battle_state.attacker.id, "end_turn")]
+    assert [e["name"] for e in battle_state.attacker.effects.phase("start_turn")] == ["Poison"]
+
+
+def test_many_concurrent_effects_only_visit_their_phase(battle_state, battle_log_callback, monkeypatch):
+    """With 24 effects per participant a phase runs only its own handlers and stun checks do not scan."""
+    calls = []
+
+    def _count(battle, participant, eff, log):
+        calls.append(eff["name"])
+
+    names = [f"Aura {i}" for i in range(22)] + ["Regeneration"]
+    for name in names:
+        monkeypatch.setitem(effects._HANDLERS, name, _count)
+    for participant in (battle_state.attacker, battle_state.defender):
+        for i in range(22):
+            participant.effects.append(
+                StatusEffect(name=f"Aura {i}", duration=10_000, potency=0.0, effect_type=f"phase_{i % 4}").to_dict()
+            )
+        participant.effects.append(
+            StatusEffect(name="Regeneration", duration=10_000, potency=0.0, effect_type="start_turn").to_dict()
+        )
+    battle_state.attacker.effects.append(
+        StatusEffect(name="Stun", duration=10_000, potency=1.0, effect_type="action_check").to_dict()
+    )
+    assert len(battle_state.attacker.effects) == 24
+
+    scans = []
+    iterate = EffectSet.__iter__
+    monkeypatch.setattr(EffectSet, "__iter__", lambda self: scans.append(1) or iterate(self))
+
+    turns = 200
+    for _ in range(turns):
+        apply_status_effects(battle_state, "start_turn", battle_log_callback)
+        can_player_act(battle_state, battle_state.defender.id, battle_log_callback)
+    assert calls == ["Regeneration"] * (2 * turns)
+    assert scans == []
+
+    calls.clear()
+    apply_status_effects(battle_state, "phase_1", battle_log_callback)
+    assert len(calls) == 2 * 6  # Aura 1, 5, 9, 13, 17 and 21 on each side
+
+    tick_status_durations(battle_state, battle_log_callback)
+    assert battle_state.attacker.effects.get("Aura 0")["duration"] == 10_000 - 1
+    assert not can_player_act(battle_state, battle_state.attacker.id, battle_log_callback)
@@ -0,0 +1,127 @@
+"""
+Tests for the shared turn engine and its damage models.
+"""
+import random
+import time
+
+from HCshinobi.bot.cogs.updated_boss_commands import SOLOMON_D20_DAMAGE
+from HCshinobi.core.battle.engine import (
+    Attack,
+    D20Damage,
+    RangeDamage,
+    ShinobiOSDamage,
+    TurnEngine,
+    TurnState,
+    VarianceDamage,
+)
+from HCshinobi.core.battle.log import BattleLog
+from HCshinobi.core.battle.replay import PVP_PLAYER_DAMAGE
+from HCshinobi.core.boss_battle_system import SOLOMON_PHASE_DAMAGE, SOLOMON_STRIKE, solomon_phase_attack
+from HCshinobi.core.missions.shinobios_engine import ShinobiOSEngine
+
+
+class ScriptedRng:
+    """Returns queued rolls in order (clamped to the requested range)."""
+
+    def __init__(self, *rolls):
+        self.rolls = list(rolls)
+
+    def randint(self, low, high):
+        return max(low, min(high, self.rolls.pop(0)))
+
+    def choice(self, options):
+        return options[0]
+
+
+def _duel(**kwargs):
+    player = {"name": "Naruto", "hp": 100, "max_hp": 100, "level": 5}
+    boss = {"name": "Solomon", "hp": 60, "max_hp": 500, "level": 50}
+    return TurnState.of(player, boss, **kwargs)
+
+
+def test_d20_crit_doubles_and_logs_roll():
+    state = _duel(rng=ScriptedRng(20, 24))
+    attack = Attack("Fireball Jutsu", base=20, modifier=2, armor_class=15)
+    hit = TurnEngine().attack(state, 0, attack, D20Damage())
+
+    assert hit.damage == 48
+    assert state.fighters[1].hp == 12
+    assert state.log == [
+        "⚔️ **Naruto** uses **Fireball Jutsu**! (Roll: 20 + 2 = 22 vs AC 15) — **CRITICAL HIT!** — **Hits for 48 damage!**"
+    ]
+
+
+def test_saving_throw_adds_note_and_blocks_damage():
+    state = _duel(rng=ScriptedRng(15, 18))
+    state.fighters[0].source["wis"] = 14
+    attack = Attack("Amaterasu", base=80, modifier=3, armor_class=15, payload={"save_dc": 12, "save_type": "WIS"})
+    TurnEngine().attack(state, 1, attack, SOLOMON_D20_DAMAGE)
+
+    assert state.fighters[0].hp == 100
+    assert state.log[0].endswith("— Player saves!")
+    assert state.log[1] == "🛡️ **Saving Throw:** WIS (Roll: 18 + 2 = 20 vs DC 12) — Success!"
+
+
+def test_knockout_sets_winner_and_teams_keep_battle_going():
+    engine = TurnEngine()
+    state = _duel(rng=ScriptedRng(100))
+    engine.attack(state, 0, Attack("Punch"), RangeDamage(100, 100))
+    assert (state.winner, state.end_reason) == (0, "victory")
+
+    player = {"name": "Player", "hp": 50}
+    enemies = [{"name": "Enemy 1", "hp": 5}, {"name": "Enemy 2", "hp": 5}]
+    state = TurnState.of(player, *enemies, teams=[0, 1, 1], rng=ScriptedRng(10))
+    engine.attack(state, 0, Attack("Kick"), RangeDamage(10, 10), target=1)
+    assert state.winner is None
+    assert engine.advance(state) == 2  # the knocked-out enemy is skipped
+    assert state.turn == 2
+
+
+def test_structured_log_for_pvp_and_shinobios():
+    log = BattleLog(actors=["Naruto", "Solomon"])
+    state = _duel(log=log, rng=random.Random(3))
+    state.fighters[1].hp = 500
+    engine = TurnEngine()
+    engine.attack(state, 0, Attack("Rasengan"), PVP_PLAYER_DAMAGE)
+    engine.advance(state, announce=True)
+    assert log[0].startswith("**Naruto** uses **Rasengan** for ")
+    assert log[1] == "🎯 Solomon's turn!"
+
+    shinobi = ShinobiOSEngine()
+    attacker, target = shinobi.create_shinobi("A", level=5), shinobi.create_shinobi("B", level=5)
+    jutsu = shinobi.get_available_jutsu(attacker)[0]
+    state = TurnState.of(attacker, target, log=BattleLog(), rng=random.Random(1))
+    hit = engine.attack(state, 0, Attack(jutsu.name, payload=jutsu), ShinobiOSDamage(shinobi, shinobi.environments["forest"]))
+    assert target.health == target.max_health - hit.damage  # applied once, by the ShinobiOS engine
+    assert len(state.log) == 1
+
+
+def test_benchmark_every_battle_mode():
+    """One loop covers PvP, boss phase, Solomon strike, d20 and ShinobiOS attacks."""
+    shinobi = ShinobiOSEngine()
+    jutsu = shinobi.get_available_jutsu(shinobi.create_shinobi("A", level=10))[0]
+    modes = {
+        "pvp": (PVP_PLAYER_DAMAGE, Attack("Chidori", power=1.1, bonus=3)),
+        "boss_phase": (SOLOMON_PHASE_DAMAGE, solomon_phase_attack("Amaterasu", {"name": "Phase 2: The Burning Revenant"})),
+        "solomon_strike": (SOLOMON_STRIKE, Attack("Punch", base=55)),
+        "d20": (D20Damage(), Attack("Kick", base=25, modifier=3, armor_class=12)),
+        "variance": (VarianceDamage(text="{actor} hits {target}"), Attack("Kick", base=30)),
+        "shinobios": (ShinobiOSDamage(shinobi, shinobi.environments["forest"]), Attack(jutsu.name, payload=jutsu)),
+    }
+    engine = TurnEngine()
+    rng = random.Random(7)
+    rounds = 500
+    for name, (model, attack) in modes.items():
+        if name == "shinobios":
+            make = lambda: (shinobi.create_shinobi("A", level=10), shinobi.create_shinobi("B", level=10))
+        else:
+            make = lambda: ({"name": "A", "hp": 10**9, "level": 10}, {"name": "B", "hp": 10**9, "level": 10})
+        fighters = make()
+        state = TurnState.of(*fighters, log=BattleLog(actors=["A", "B"], capacity=50), rng=rng)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            engine.attack(state, state.active, attack, model)
+            engine.advance(state)
+        elapsed = time.perf_counter() - start
+        assert state.turn == rounds + 1
+        print(f"{name}: {elapsed / rounds * 1e6:.1f}us per attack")  # reported, not asserted
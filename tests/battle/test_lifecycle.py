@@ -153,6 +153,7 @@ async def test_cleanup_inactive_battles(lifecycle, battle_state):
     battle_id = "test_battle"
     battle_state.last_action = datetime.now(timezone.utc) - timedelta(seconds=10)
     lifecycle.persistence.active_battles = {battle_id: battle_state}
+    lifecycle.adopt_active_battles()
     
     await lifecycle.cleanup_inactive_battles()
     
@@ -217,4 +218,75 @@ async def test_shutdown(lifecycle):
     # Verify tasks were cancelled and state was saved
     mock_task.cancel.assert_called_once()
     lifecycle.persistence.save_active_battles.assert_called_once()
-    lifecycle.persistence.save_battle_history.assert_called_once() 
\ No newline at end of file
+    lifecycle.persistence.save_battle_history.assert_called_once() 
+
+@pytest.mark.asyncio
+async def test_touched_battle_is_rescheduled(lifecycle, battle_state):
+    """Touching a battle pushes its deadline back; expiry ends it exactly once."""
+    battle_id = "test_battle"
+    battle_state.last_action = datetime.now(timezone.utc) - timedelta(seconds=10)
+    lifecycle.persistence.active_battles = {battle_id: battle_state}
+    lifecycle.track_battle(battle_id, battle_state)
+    lifecycle.touch_battle(battle_id, battle_state)
+
+    await lifecycle.cleanup_inactive_battles()
+    assert battle_state.is_active
+    lifecycle.persistence.add_battle_to_history.assert_not_called()
+
+    # Let the battle go idle again, then reach its deadline twice.
+    battle_state.last_action = datetime.now(timezone.utc) - timedelta(seconds=10)
+    deadline = lifecycle.scheduler.deadline(("battle", battle_id))
+    await lifecycle.scheduler.fire_expired(now=deadline)
+    await lifecycle.scheduler.fire_expired(now=deadline + 60)
+    assert battle_state.end_reason == "timeout"
+    lifecycle.persistence.add_battle_to_history.assert_called_once_with(battle_id, battle_state)
+
+@pytest.mark.asyncio
+async def test_notify_players_battle_timeout_uses_outbound(lifecycle):
+    """Timeout DMs go through the outbound scheduler when one is wired in."""
+    lifecycle.outbound = Mock()
+    lifecycle.outbound.send_dms = AsyncMock(return_value={"attacker_id": True, "defender_id": True})
+
+    await lifecycle.notify_players_battle_timeout("attacker_id", "defender_id")
+
+    lifecycle.outbound.send_dms.assert_awaited_once_with(["attacker_id", "defender_id"], content="Your battle timed out.")
+
+
+@pytest.mark.asyncio
+async def test_timed_out_battle_notifies_both_players(lifecycle, battle_state):
+    lifecycle.outbound = Mock()
+    lifecycle.outbound.send_dms = AsyncMock(return_value={})
+    battle_state.last_action = datetime.now(timezone.utc) - timedelta(seconds=10)
+    lifecycle.persistence.active_battles = {"idle": battle_state}
+    lifecycle.adopt_active_battles()
+
+    await lifecycle.cleanup_inactive_battles()
+
+    lifecycle.outbound.send_dms.assert_awaited_once_with(
+        [battle_state.attacker.id, battle_state.defender.id], content="Your battle timed out."
+    )
+
+
+@pytest.mark.asyncio
+async def test_battles_active_at_startup_are_adopted_once(mock_character_system, mock_persistence,
+                                                          mock_progression_engine, battle_state):
+    """Battles already in persistence get deadlines when the lifecycle starts, not on every wake."""
+    mock_persistence.active_battles = {"old": battle_state}
+    lifecycle = BattleLifecycle(mock_character_system, mock_persistence, mock_progression_engine, battle_timeout=5)
+    assert ("battle", "old") in lifecycle.scheduler
+
+    mock_persistence.active_battles = {"old": battle_state, "sneaked_in": battle_state}
+    await lifecycle.cleanup_inactive_battles()
+    assert ("battle", "sneaked_in") not in lifecycle.scheduler
+
+
+@pytest.mark.asyncio
+async def test_persistence_adds_and_removals_are_tracked_directly(tmp_path, mock_character_system,
+                                                                  mock_progression_engine, battle_state):
+    persistence = BattlePersistence(str(tmp_path))
+    lifecycle = BattleLifecycle(mock_character_system, persistence, mock_progression_engine, battle_timeout=5)
+
+    await persistence.add_active_battle(battle_state.id, battle_state)
+    assert ("battle", battle_state.id) in lifecycle.scheduler
+    await persistence.remove_active_battle(battle_state.id)
+    assert ("battle", battle_state.id) not in lifecycle.scheduler
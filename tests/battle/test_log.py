@@ -0,0 +1,116 @@
+"""
+Tests for the structured battle log.
+"""
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from HCshinobi.core.battle.log import BattleHistoryStream, BattleLog, EventFlag, EventKind
+from HCshinobi.core.battle.persistence import BattlePersistence
+
+
+def test_ring_buffer_keeps_recent_events_and_renders_lazily():
+    log = BattleLog(actors=["Naruto", "Sasuke"], capacity=3)
+    log.append("Battle start")
+    log.record(EventKind.ATTACK, actor=0, jutsu="Rasengan", damage=40, target=1, turn=1)
+    log.record(EventKind.ATTACK, actor=1, jutsu="Chidori", flags=EventFlag.MISS, turn=1)
+    log.record(EventKind.TURN, actor=0, turn=2)
+
+    assert len(log) == 3
+    assert log.total == 4
+    assert log[0] == "**Naruto** uses **Rasengan** for **40** damage!"
+    assert log[-2:] == ["**Sasuke** attempts **Chidori** but misses!", "🎯 Naruto's turn!"]
+    assert log.names == ["Rasengan", "Chidori"]
+
+
+def test_encoding_round_trip_and_replay():
+    log = BattleLog(actors=["A", "B"])
+    log.append("start")
+    log.record(EventKind.ATTACK, actor=0, jutsu="Punch", damage=5, flags=EventFlag.CRIT)
+
+    restored = BattleLog.from_dict(log.to_dict())
+    assert restored == log
+    assert restored.total == 2
+
+    offset = log.total
+    log.record(EventKind.DEFEAT, actor=1)
+    rows = log.export_since(offset)
+    restored.replay(rows, offset)
+    restored.replay(rows, offset)  # already applied, skipped
+    assert list(restored) == list(log)
+    assert restored[-1] == "💀 **B** has been defeated!"
+
+
+def test_damage_totals_outlive_the_ring_buffer():
+    log = BattleLog(actors=["Naruto", "Sasuke"], capacity=2)
+    for _ in range(5):
+        log.record(EventKind.ATTACK, actor=0, jutsu="Rasengan", damage=40, target=1)
+        log.record(EventKind.ATTACK, actor=1, jutsu="Chidori", damage=35, target=0)
+    log.record(EventKind.ATTACK, actor=1, jutsu="Chidori", flags=EventFlag.MISS)
+    assert log.damage_by("Naruto") == {"Rasengan": 200} and log.damage_by(1) == {"Chidori": 175}
+
+    restored = BattleLog.from_dict(log.to_dict())
+    offset = log.total
+    log.record(EventKind.ATTACK, actor=0, jutsu="Shadow Clone", damage=10, target=1)
+    restored.replay(log.export_since(offset), offset)
+    assert restored.damage_by("Naruto") == {"Rasengan": 200, "Shadow Clone": 10}
+    assert restored.damage_by("Kakashi") == {}
+
+
+@pytest.mark.asyncio
+async def test_history_streams_every_event_while_memory_is_bounded():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        persistence = BattlePersistence(temp_dir)
+        log = BattleLog(actors=["A", "B"], capacity=5)
+        battle = {"battle_id": "b1", "battle_log": log, "challenger": {"name": "A"}, "opponent": {"name": "B"}}
+        await persistence.add_active_battle("b1", battle)
+        for turn in range(20):
+            log.record(EventKind.ATTACK, actor=turn % 2, jutsu="Kick", damage=turn, turn=turn)
+        await persistence.add_battle_to_history("b1", battle)
+        await persistence.remove_active_battle("b1")
+
+        assert len(persistence.battle_history["b1"]) == 5
+
+        history = await BattlePersistence(temp_dir).load_battle_history()
+        assert len(history["b1"]) == 20
+        assert history["b1"][0] == "**A** uses **Kick** for **0** damage!"
+        assert history["b1"][-1] == "**B** uses **Kick** for **19** damage!"
+
+
+def test_history_stream_sends_late_actors():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stream = BattleHistoryStream(Path(temp_dir) / "history.jsonl")
+        log = BattleLog(actors=["Player"])
+        log.attach_history(stream, "m1")
+        log.record(EventKind.ATTACK, actor="Bandit", jutsu="Slash", damage=7, target="Player")
+        stream.close()
+
+        assert stream.read() == {"m1": ["**Bandit** uses **Slash** for **7** damage!"]}
+
+
+@pytest.mark.asyncio
+async def test_history_writes_are_batched_and_read_back_per_battle():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        persistence = BattlePersistence(temp_dir)
+        persistence.HISTORY_CACHE_SIZE = 2
+        stream = persistence.history_stream
+        log = BattleLog(actors=["A", "B"])
+        log.attach_history(stream, "live")
+        log.record(EventKind.ATTACK, actor=0, jutsu="Kick", damage=3, target=1)
+        assert not stream.path.exists()  # buffered until the batch fills or the battle ends
+
+        for i in range(5):
+            done = BattleLog(actors=[f"P{i}"])
+            done.record(EventKind.ATTACK, actor=0, jutsu="Punch", damage=i)
+            await persistence.add_battle_to_history(f"b{i}", {"battle_log": done})
+        assert list(persistence.battle_history) == ["b3", "b4"]
+        assert isinstance(persistence.battle_history["b4"], BattleLog)  # kept unrendered
+
+        history = await persistence.load_battle_history()
+        assert history["b1"] == ["**P1** uses **Punch** for **1** damage!"]
+        assert "live" in history and "missing" not in history
+        assert list(history) == ["live", "b0", "b1", "b2", "b3", "b4"]
+        with pytest.raises(KeyError):
+            history["missing"]
+        stream.close()
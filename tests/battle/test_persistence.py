@@ -196,4 +196,105 @@ async def test_persistence_data_consistency(persistence, battle_state):
     assert loaded_battle.attacker.current_hp == 75
     assert loaded_battle.defender.current_hp == 60
     assert len(loaded_battle.battle_log) == 1
-    assert "Test log entry" in loaded_battle.battle_log
\ No newline at end of file
+    assert "Test log entry" in loaded_battle.battle_log
+
+@pytest.mark.asyncio
+async def test_restore_replays_turns_after_crash(temp_data_dir, battle_state):
+    """Turns recorded after the last checkpoint are recovered from the WAL."""
+    persistence = BattlePersistence(temp_data_dir)
+    await persistence.store_active_battle(battle_state.id, battle_state)
+
+    battle_state.turn_number = 2
+    battle_state.defender.current_hp = 70
+    battle_state.battle_log.append("Test Character used Punch for 30 damage!")
+    await persistence.record_turn(battle_state.id, battle_state)
+
+    # A new instance simulates a restart without a final save.
+    restored = await BattlePersistence(temp_data_dir).load_active_battles()
+    loaded = restored[battle_state.id]
+    assert isinstance(loaded, BattleState)
+    assert loaded.turn_number == 2
+    assert loaded.defender.current_hp == 70
+    assert loaded.defender.character.name == "Opponent"
+    assert loaded.battle_log == battle_state.battle_log
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_only_rewrites_dirty_battles(persistence, battle_state, attacker, defender):
+    """Snapshots of untouched battles are left alone at a checkpoint."""
+    other = BattleState(attacker=attacker, defender=defender, current_turn_player_id=defender.id, id="other")
+    await persistence.add_active_battle(battle_state.id, battle_state)
+    await persistence.add_active_battle(other.id, other)
+    await persistence.save_active_battles()
+    untouched = persistence._snapshot_path(other.id).stat().st_mtime_ns
+    os.utime(persistence._snapshot_path(other.id), ns=(0, 0))
+
+    battle_state.turn_number = 3
+    await persistence.record_turn(battle_state.id, battle_state)
+    await persistence.save_active_battles()
+
+    assert untouched != 0
+    assert persistence._snapshot_path(other.id).stat().st_mtime_ns == 0
+    assert persistence.wal_path.read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_pvp_battle_data_round_trip(temp_data_dir):
+    """Plain PvP battle dicts are persisted and closed battles stay closed."""
+    persistence = BattlePersistence(temp_data_dir)
+    battle_data = {
+        "battle_id": "pvp_1_2_0",
+        "challenger_id": 1,
+        "opponent_id": 2,
+        "current_turn_user_id": 1,
+        "turn": 1,
+        "challenger": {"id": "1", "name": "A", "hp": 100, "max_hp": 100},
+        "opponent": {"id": "2", "name": "B", "hp": 100, "max_hp": 100},
+        "battle_log": ["start"],
+        "message_id": 1234,
+    }
+    finished = dict(battle_data, battle_id="pvp_3_4_0")
+    await persistence.record_turn(battle_data["battle_id"], battle_data)
+    await persistence.record_turn(finished["battle_id"], finished)
+
+    battle_data["opponent"]["hp"] = 40
+    battle_data["turn"] = 2
+    battle_data["battle_log"].append("hit")
+    await persistence.record_turn(battle_data["battle_id"], battle_data)
+    await persistence.remove_active_battle(finished["battle_id"])
+
+    restored = await BattlePersistence(temp_data_dir).load_active_battles()
+    assert list(restored) == ["pvp_1_2_0"]
+    assert restored["pvp_1_2_0"] == battle_data
+
+
+@pytest.mark.asyncio
+async def test_pvp_turn_records_only_the_delta(temp_data_dir):
+    """A PvP turn writes the changed HP, turn pointer and new input, not the whole battle."""
+    persistence = BattlePersistence(temp_data_dir)
+    battle_data = {
+        "battle_id": "pvp_1_2_0",
+        "current_turn_user_id": 1,
+        "challenger": {"id": "1", "name": "A", "hp": 100, "max_hp": 100, "jutsu": ["Punch"] * 20},
+        "opponent": {"id": "2", "name": "B", "hp": 100, "max_hp": 100, "jutsu": ["Kick"] * 20},
+        "inputs": [],
+        "battle_log": [],
+    }
+    await persistence.record_turn(battle_data["battle_id"], battle_data)
+
+    battle_data["opponent"]["hp"] = 70
+    battle_data["current_turn_user_id"] = 2
+    battle_data["inputs"].append(["attack", 0, "Punch", 0, 1.0])
+    await persistence.record_turn(battle_data["battle_id"], battle_data)
+    battle_data["challenger"]["hp"] = 90
+    battle_data["inputs"].append(["attack", 1, "Kick", 0, 1.0])
+    await persistence.record_turn(battle_data["battle_id"], battle_data)
+
+    turns = [r["s"] for r in persistence._read_jsonl(persistence.wal_path) if r["op"] == "turn"]
+    assert turns[0]["p"] == {"m": {"opponent": {"v": {"hp": 70}}}, "v": {"current_turn_user_id": 2},
+                             "a": {"inputs": [["attack", 0, "Punch", 0, 1.0]]}}
+    assert turns[1]["p"] == {"m": {"challenger": {"v": {"hp": 90}}}, "a": {"inputs": [["attack", 1, "Kick", 0, 1.0]]}}
+
+    restored = await BattlePersistence(temp_data_dir).load_active_battles()
+    assert restored["pvp_1_2_0"] == battle_data
+
@@ -0,0 +1,104 @@
+"""
+Tests for guild-wide raids with batched ticks.
+"""
+import random
+
+import pytest
+
+from HCshinobi.core.battle.raid import RaidEngine, RaidError
+from HCshinobi.core.battle.registry import BattleConflictError, BattleRegistry
+
+BOSS = {
+    "id": "solomon",
+    "name": "Solomon",
+    "max_hp": 200,
+    "boss_phases": [
+        {"name": "Phase 1: The Crimson Shadow", "hp_threshold": 0.5, "jutsu_pool": ["Sharingan Genjutsu"]},
+        {"name": "Phase 2: The Burning Revenant", "hp_threshold": 0.0, "jutsu_pool": ["Amaterasu"]},
+    ],
+}
+
+
+def raider(name, hp=1000, ninjutsu=100):
+    return {"name": name, "hp": hp, "max_hp": hp, "ninjutsu": ninjutsu, "jutsu": ["Rasengan"]}
+
+
+def test_tick_resolves_buffered_actions_with_one_counter_attack():
+    engine = RaidEngine(rng=random.Random(7))
+    raid = engine.open("guild", BOSS)
+    for user in range(50):
+        engine.join("guild", user, raider(f"Ninja {user}"))
+    assert raid.boss["hp"] == raid.boss["max_hp"] == 50 * 200
+
+    for user in range(50):
+        engine.submit("guild", user, "Rasengan")
+    engine.submit("guild", 0, "Rasengan")  # a second click in the same tick replaces the first
+    with pytest.raises(RaidError):
+        engine.submit("guild", 0, "Chidori")
+    with pytest.raises(RaidError):
+        engine.submit("guild", "stranger", "Rasengan")
+
+    tick = engine.tick(raid)
+    assert tick.actions == 50 and not raid.pending
+    assert sum(raid.damage.values()) == tick.damage
+    assert all(48 <= dealt <= 72 for dealt in raid.damage.values())  # 60 base, 80%-120% variance
+    counters = [line for line in tick.lines if "Solomon** uses" in line]
+    assert len(counters) == 1
+    # the counter-attack lands on whoever has dealt the most damage
+    top_id = max(raid.damage, key=raid.damage.get)
+    assert raid.players[top_id]["name"] in counters[0]
+    assert raid.players[top_id]["hp"] == 1000 - 60
+    assert engine.tick(raid).actions == 0
+
+
+def test_victory_splits_rewards_by_damage_and_frees_players():
+    registry = BattleRegistry()
+    engine = RaidEngine(registry, rng=random.Random(1))
+    solo = registry.user_battles("boss")
+    solo["3"] = {"turn": 1}
+
+    raid = engine.open("guild", BOSS)
+    engine.join("guild", 1, raider("Naruto", ninjutsu=3000))
+    engine.join("guild", 2, raider("Sasuke"))
+    with pytest.raises(BattleConflictError):
+        engine.join("guild", 3, raider("Sakura"))  # already fighting Solomon alone
+    assert registry.in_battle(1, "boss")
+
+    while raid.active:
+        engine.submit("guild", 1, "Rasengan")
+        engine.submit("guild", 2, "Rasengan")
+        engine.tick(raid)
+    assert raid.status == "victory" and raid.boss["hp"] == 0
+
+    exp = raid.split(10000)
+    assert sum(exp.values()) == 10000
+    assert exp["1"] > exp["2"] > 0
+    assert sum(raid.split(3).values()) == 3
+
+    engine.close("guild")
+    assert not registry.in_battle(1) and engine.raid("guild") is None
+    assert registry.in_battle(3, "boss")
+
+
+@pytest.mark.asyncio
+async def test_run_once_ticks_busy_raids_and_closes_finished_ones():
+    clock = [0.0]
+    seen = []
+
+    async def on_tick(raid, tick):
+        seen.append((raid.key, tick.actions, raid.status))
+
+    engine = RaidEngine(on_tick=on_tick, rng=random.Random(3), clock=lambda: clock[0])
+    engine.open("busy", BOSS)
+    engine.open("idle", BOSS)
+    engine.join("busy", 1, raider("Naruto"))
+    engine.submit("busy", 1, "Rasengan")
+
+    await engine.run_once()
+    assert seen == [("busy", 1, "active")]
+
+    clock[0] = RaidEngine.IDLE_TIMEOUT
+    await engine.run_once()
+    assert ("idle", 0, "expired") in seen
+    assert engine.raid("idle") is None and engine.raid("busy") is None
+    assert len(engine.registry) == 0
@@ -0,0 +1,81 @@
+"""
+Tests for battle IDs and the user-to-battle registry.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from HCshinobi.core.boss_battle_system import BossBattleSystem
+from HCshinobi.core.battle.registry import (
+    BattleConflictError,
+    BattleRegistry,
+    UlidGenerator,
+    new_battle_id,
+)
+
+
+def test_ulids_are_unique_and_sorted_within_one_millisecond():
+    ulid = UlidGenerator(clock=lambda: 1_700_000_000.0, randbits=lambda bits: 5)
+    ids = [ulid() for _ in range(1000)]
+    assert len(set(ids)) == 1000
+    assert ids == sorted(ids)
+    assert all(len(i) == 26 for i in ids)
+
+    assert new_battle_id("pvp").startswith("pvp_")
+    assert new_battle_id() != new_battle_id()
+
+
+def test_one_active_battle_per_user_per_mode():
+    registry = BattleRegistry()
+    pvp = registry.register("pvp", [1, 2])
+    boss = registry.register("boss", ["1"])  # other modes are independent
+
+    with pytest.raises(BattleConflictError) as exc:
+        registry.register("pvp", [3, 2])
+    assert exc.value.battle_id == pvp and exc.value.user_id == "2"
+    assert not registry.in_battle(3)  # a failed claim leaves nothing behind
+
+    assert registry.battle_for(2, "pvp") == pvp
+    assert registry.battles_for(1) == {"pvp": pvp, "boss": boss}
+    assert registry.count("pvp") == 1 and len(registry) == 2
+
+    registry.release(pvp)
+    assert not registry.in_battle(2)
+    assert registry.in_battle(1) and not registry.in_battle(1, "pvp")
+    assert registry.register("pvp", [2, 3]) != pvp
+
+
+def test_user_battles_claim_and_release_shared_mode():
+    registry = BattleRegistry()
+    solomon = registry.user_battles("boss")
+    npc = registry.user_battles("boss")
+
+    battle = {"turn": 1}
+    solomon["42"] = battle
+    solomon[42] = battle  # updating the same user's battle keeps its ID
+    assert battle["battle_id"] == solomon.battle_id(42)
+    assert registry.battle_for("42", "boss") == battle["battle_id"]
+
+    assert npc.busy(42) and 42 not in npc
+    with pytest.raises(BattleConflictError):
+        npc[42] = {"turn": 1}
+
+    del solomon[42]
+    assert not registry.in_battle(42)
+    npc[42] = {"turn": 1}
+    assert len(npc) == 1 and len(solomon) == 0
+
+
+@pytest.mark.asyncio
+async def test_npc_battle_refuses_players_fighting_in_another_cog():
+    registry = BattleRegistry()
+    registry.user_battles("boss")["42"] = {"turn": 1}  # e.g. a Solomon fight in BossCommands
+    system = BossBattleSystem(SimpleNamespace(services=SimpleNamespace(battle_registry=registry)))
+    interaction = MagicMock()
+    interaction.user.id = 42
+    interaction.followup.send = AsyncMock()
+
+    assert await system.start_npc_battle(interaction, {"level": 99}, "Itachi") is False
+    assert "already in a boss battle" in interaction.followup.send.call_args.args[0]
+    assert len(system.active_boss_battles) == 0
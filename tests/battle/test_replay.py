@@ -0,0 +1,68 @@
+"""
+Tests for seeded battles and replay files.
+"""
+import random
+import tempfile
+
+from HCshinobi.core.battle.replay import (
+    ATTACK,
+    BOT_TURN,
+    FORFEIT,
+    BattleReplay,
+    ReplayStore,
+    pvp_attack_damage,
+    pvp_bot_attack,
+    simulate,
+    starting_fighters,
+)
+
+
+def _fighters():
+    challenger = {"id": "1", "name": "Naruto", "hp": 120, "max_hp": 120, "level": 5,
+                  "jutsu": ["Rasengan", "Punch"], "chakra": 100}
+    opponent = {"id": "2", "name": "Bot", "hp": 100, "max_hp": 100, "level": 4,
+                "jutsu": ["Fireball Jutsu", "Kick"], "chakra": 100}
+    return starting_fighters(challenger, opponent)
+
+
+def test_replay_reproduces_live_battle():
+    fighters = _fighters()
+    seed = 1234
+    rng = random.Random(seed)
+    hp = [f["hp"] for f in fighters]
+    inputs = []
+    while True:
+        damage = pvp_attack_damage(rng, fighters[0]["level"], "Rasengan", 3, 1.1)
+        inputs.append([ATTACK, 0, "Rasengan", 3, 1.1])
+        hp[1] = max(0, hp[1] - damage)
+        if hp[1] <= 0:
+            break
+        _, damage = pvp_bot_attack(rng, fighters[1])
+        inputs.append([BOT_TURN])
+        hp[0] = max(0, hp[0] - damage)
+        if hp[0] <= 0:
+            break
+
+    outcome = simulate(BattleReplay("b1", seed, fighters, inputs))
+    assert outcome.hp == hp
+    assert outcome.winner == (0 if hp[1] == 0 else 1)
+    assert outcome.end_reason == "victory"
+    assert outcome.rng.getstate() == rng.getstate()
+    assert simulate(BattleReplay("b1", seed, fighters, inputs)).log == outcome.log
+
+
+def test_forfeit_ends_replay():
+    replay = BattleReplay("b2", 7, _fighters(), [[ATTACK, 0, "Punch", 0, 1.0], [FORFEIT, 1], [BOT_TURN]])
+    outcome = simulate(replay)
+    assert outcome.winner == 0
+    assert outcome.end_reason == "forfeit"
+    assert outcome.log[-1] == "🏃 Bot forfeited!"
+
+
+def test_store_round_trip():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = ReplayStore(temp_dir)
+        replay = BattleReplay("pvp/1:2", 99, _fighters(), [[ATTACK, 0, "Rasengan", 0, 1.0]])
+        assert store.save(replay) is not None
+        assert store.load("pvp/1:2") == replay
+        assert store.load("missing") is None
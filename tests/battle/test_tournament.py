@@ -0,0 +1,176 @@
+"""
+Tests for the tournament bracket engine.
+"""
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from HCshinobi.core.battle.lifecycle import BattleLifecycle
+from HCshinobi.core.battle.persistence import BattlePersistence
+from HCshinobi.core.battle.replay import ReplayStore, simulate
+from HCshinobi.core.battle.tournament import (
+    BYE, DOUBLE, SINGLE, Bracket, TournamentEngine, TournamentError, seed_order,
+)
+from HCshinobi.core.character import Character
+from HCshinobi.core.events import BattleEndedEvent, EventBus
+
+
+def fighter(i, rating=1200):
+    return Character(id=str(i), name=f"Ninja {i}", rating=rating, jutsu=["Basic Attack"])
+
+
+def in_memory_persistence():
+    persistence = Mock(spec=BattlePersistence)
+    persistence.active_battles = {}
+    persistence.add_active_battle = AsyncMock()
+    persistence.add_battle_to_history = AsyncMock()
+    persistence.remove_active_battle = AsyncMock()
+    return persistence
+
+
+def engine_with(persistence, **kwargs):
+    progression = Mock()
+    progression.award_battle_experience = AsyncMock()
+    lifecycle = BattleLifecycle(Mock(), persistence, progression, battle_timeout=TournamentEngine.MATCH_WINDOW)
+    return TournamentEngine(lifecycle, **kwargs)
+
+
+def test_top_seeds_sit_on_opposite_halves_and_take_the_byes():
+    assert seed_order(8) == [0, 7, 3, 4, 1, 6, 2, 5]
+    bracket = Bracket(6, SINGLE)
+    assert [bracket.players_of(m) for m in range(4)] == [(0, BYE), (3, 4), (1, BYE), (2, 5)]
+    assert sorted(bracket.settle_byes()) == [1, 3]
+    assert bracket.players_of(4) == (0, -1) and bracket.players_of(5) == (1, -1)
+
+    with pytest.raises(TournamentError):
+        Bracket(1)
+    with pytest.raises(TournamentError):
+        bracket.report(0, 0)  # already settled by the bye
+
+
+def test_losers_champion_forces_the_grand_final_reset():
+    bracket = Bracket(4, DOUBLE)
+    assert bracket.settle_byes() == [0, 1]
+    bracket.report(0, 0)
+    bracket.report(1, 1)
+    assert bracket.open_matches() == [2, 3]  # winners' final and the first losers' round
+    assert bracket.label(2) == "Winners' Final" and bracket.label(3) == "Losers' Round 1"
+    bracket.report(2, 0)
+    bracket.report(3, 3)
+    assert bracket.label(4) == "Losers' Final" and bracket.report(4, 3) == [5]
+    assert bracket.label(5) == "Grand Final"
+    assert bracket.report(5, 3) == [6] and not bracket.finished  # seed 1 has only lost once
+    assert bracket.label(6) == "Grand Final Reset"
+    bracket.report(6, 0)
+    assert bracket.champion == 0 and bracket.open_matches() == []
+
+
+@pytest.mark.asyncio
+async def test_pvp_results_and_timeouts_both_settle_matches(tmp_path):
+    persistence = BattlePersistence(str(tmp_path / "tournaments"))
+    store = ReplayStore(str(tmp_path))
+    bus = EventBus()
+    engine = engine_with(persistence, replay_store=store, seed=lambda: 1234)
+    engine.attach(bus)
+    opened, finished = [], []
+
+    async def on_match(tournament, match, state):
+        opened.append(match)
+
+    async def on_finish(tournament):
+        finished.append(tournament.champion)
+
+    engine.on_match, engine.on_finish = on_match, on_finish
+    engine.create("guild", "Chunin Exams", SINGLE, channel_id=1, organizer_id=9)
+    for i, rating in enumerate([1000, 1500, 1300, 1100]):
+        engine.register("guild", fighter(i, rating))
+    with pytest.raises(TournamentError):
+        engine.register("guild", fighter(0))
+    tournament = await engine.start("guild")
+    assert tournament.players == ["1", "2", "3", "0"] and sorted(opened) == [0, 1]
+
+    # Seeds 1 and 4 play it out; the event bus reports the result.
+    bus.publish(BattleEndedEvent(user_id="0", loser_id="1", mode="pvp", end_reason="victory"))
+    await bus.drain()
+    assert 0 not in tournament.live and tournament.bracket.winner[0] == 3
+
+    # Seeds 2 and 3 never show up, so the lifecycle deadline simulates their match.
+    state = tournament.live[1]
+    state.last_action = datetime.now(timezone.utc) - timedelta(seconds=TournamentEngine.MATCH_WINDOW + 1)
+    await engine.lifecycle._on_battle_deadline(("battle", state.id))
+    assert tournament.simulated == 1 and state.winner_id in ("2", "3") and state.id not in persistence.active_battles
+    replay = store.load(state.id)
+    assert replay is not None and simulate(replay).winner == ["2", "3"].index(state.winner_id)
+
+    assert opened[-1] == 2 and tournament.bracket.label(2) == "Final"
+    await engine.simulate_open("guild")
+    assert tournament.status == "finished" and finished == [tournament.champion]
+    assert not engine._players
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_a_thousand_player_double_elimination_simulates_quickly():
+    engine = engine_with(in_memory_persistence(), seed=iter(range(10_000)).__next__)
+    engine.create("big", "Kage Summit", DOUBLE)
+    for i in range(1024):
+        engine.register("big", fighter(i, rating=1000 + i % 400))
+    start = time.perf_counter()
+    tournament = await engine.start("big")
+    rounds = 0
+    while tournament.status == "running":
+        assert await engine.simulate_open("big") > 0
+        rounds += 1
+    elapsed = time.perf_counter() - start
+    assert tournament.simulated in (2046, 2047) and rounds <= 2 * 10 + 2
+    assert len(tournament.bracket) == 2047 and tournament.champion is not None
+    assert elapsed < 20, f"{tournament.simulated} simulated matches took {elapsed:.1f}s"
+
+
+@pytest.mark.asyncio
+async def test_running_tournament_survives_a_restart(tmp_path):
+    data_dir = str(tmp_path / "tournaments")
+    persistence = BattlePersistence(data_dir)
+    engine = engine_with(persistence, data_dir=data_dir)
+    engine.create("guild", "Chunin Exams", DOUBLE, channel_id=1, organizer_id=9)
+    for i, rating in enumerate([1000, 1500, 1300, 1100]):
+        engine.register("guild", fighter(i, rating))
+    tournament = await engine.start("guild")
+    assert await engine.record_result("0", "1")
+    match, state = next(iter(tournament.live.items()))
+    engine.save()
+    await persistence.save_active_battles()
+
+    restarted = BattlePersistence(data_dir)
+    again = engine_with(restarted, data_dir=data_dir)
+    assert await again.restore() == 1
+    restored = again.tournament("guild")
+    assert (restored.status, restored.players, restored.fmt) == ("running", ["1", "2", "3", "0"], DOUBLE)
+    assert restored.bracket.winner.tolist() == tournament.bracket.winner.tolist()
+    assert list(restored.live) == [match] and restored.live[match].id == state.id
+    assert state.id in again.lifecycle._tracked
+
+    assert await again.record_result("2", "3")
+    assert sorted(restored.live) == [2, 3]  # winners' final and the first losers' round
+    assert restored.entrants["2"].rating == 1300
+
+
+@pytest.mark.asyncio
+async def test_a_match_whose_battle_was_lost_is_opened_again(tmp_path):
+    data_dir = str(tmp_path / "tournaments")
+    engine = engine_with(BattlePersistence(data_dir), data_dir=data_dir)
+    engine.create("guild", "Chunin Exams")
+    for i in range(2):
+        engine.register("guild", fighter(i))
+    tournament = await engine.start("guild")
+    lost = tournament.live[0].id
+    engine.save()
+    shutil.rmtree(tmp_path / "tournaments" / "battles")  # the battle did not survive
+
+    again = engine_with(BattlePersistence(data_dir), data_dir=data_dir)
+    await again.restore()
+    reopened = again.tournament("guild").live[0]
+    assert reopened.id != lost and again._players == {"0": reopened.id, "1": reopened.id}
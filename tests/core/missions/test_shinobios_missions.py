@@ -385,8 +385,9 @@ class TestBattleState:
         self.battle_state.add_battle_log(action)
         
         assert len(self.battle_state.battle_log) == 1
-        assert self.battle_state.battle_log[0]["actor"] == "Test Actor"
-        assert self.battle_state.battle_log[0]["jutsu"] == "Fireball Jutsu"
+        assert self.battle_state.battle_log.entry(0)["actor"] == "Test Actor"
+        assert self.battle_state.battle_log.entry(0)["jutsu"] == "Fireball Jutsu"
+        assert self.battle_state.battle_log[0] == "**Test Actor** uses **Fireball Jutsu** for **30** damage!"
     
     def test_battle_state_serialization(self):
         """Test battle state serialization"""
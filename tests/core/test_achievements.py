@@ -0,0 +1,121 @@
+"""
+Tests for the event-driven achievement engine.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from HCshinobi.core.achievements import AchievementEngine, AchievementRule
+from HCshinobi.core.character import Character
+from HCshinobi.core.character_system import CharacterSystem
+from HCshinobi.core.events import (
+    AchievementUnlockedEvent,
+    BattleEndedEvent,
+    EventBus,
+    LevelUpEvent,
+    TrainingCompletedEvent,
+)
+
+
+def test_rule_parsing():
+    rule = AchievementRule("Veteran", "wins >= 50")
+    assert (rule.field, rule.threshold) == ("wins", 50)
+
+    rule = AchievementRule("Slayer", "defeated Solomon")
+    assert (rule.field, rule.target) == ("defeated", "solomon")
+
+    with pytest.raises(ValueError):
+        AchievementRule("Broken", "wins ~ 3")
+
+
+@pytest.mark.asyncio
+async def test_threshold_rules_unlock_in_order():
+    engine = AchievementEngine(rules=[
+        AchievementRule("One", "wins >= 1"),
+        AchievementRule("Three", "wins >= 3"),
+        AchievementRule("Trainee", "training_sessions >= 1"),
+    ])
+
+    assert await engine.handle_event(BattleEndedEvent(user_id="u1", loser_id="u2")) == ["One"]
+    assert await engine.handle_event(BattleEndedEvent(user_id="u1", loser_id="u2")) == []
+    assert await engine.handle_event(BattleEndedEvent(user_id="u1", loser_id="u2")) == ["Three"]
+    assert engine.progress["u2"].counters["losses"] == 3
+    # Level events only look at level rules.
+    assert await engine.handle_event(LevelUpEvent(user_id="u1", new_level=99)) == []
+
+
+@pytest.mark.asyncio
+async def test_defeated_rule_and_progress_view():
+    engine = AchievementEngine()
+    earned = await engine.handle_event(
+        BattleEndedEvent(user_id="u1", mode="boss", opponent="Solomon")
+    )
+    assert set(earned) == {"First Battle", "Boss Slayer", "Solomon's Equal"}
+
+    categories = await engine.get_player_achievements("u1")
+    combat = {entry["name"]: entry for entry in categories["Combat"]}
+    assert combat["Solomon's Equal"]["unlocked"]
+    assert not combat["Battle Hardened"]["unlocked"]
+    assert combat["Battle Hardened"]["current"] == 1
+
+
+@pytest.mark.asyncio
+async def test_engine_publishes_unlocks_on_bus():
+    bus = EventBus()
+    engine = AchievementEngine(rules=[AchievementRule("Trainee", "training_sessions >= 1")])
+    engine.attach(bus)
+    unlocked = []
+
+    async def listener(event):
+        unlocked.append(event.achievement)
+
+    bus.subscribe(listener, AchievementUnlockedEvent)
+    bus.publish(TrainingCompletedEvent(user_id="u1", attribute="speed"))
+    await bus.drain()
+    await bus.drain()
+
+    assert unlocked == ["Trainee"]
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_only_counters_survive_restart_and_eviction(tmp_path):
+    rules = [
+        AchievementRule("Trainee", "training_sessions >= 2"),
+        AchievementRule("Student", "training_sessions >= 3"),
+        AchievementRule("Slayer", "defeated Solomon"),
+    ]
+    with patch("HCshinobi.core.character_system.DATA_DIR", str(tmp_path)):
+        characters = CharacterSystem()
+        await characters.save_character(Character(id="1", name="Rock Lee"))
+        engine = AchievementEngine(characters, rules=rules)
+        engine.PROGRESS_CACHE_SIZE = 1
+        assert await engine.handle_event(TrainingCompletedEvent(user_id="1")) == []
+        assert await engine.handle_event(BattleEndedEvent(user_id="1", mode="boss", opponent="Solomon")) == ["Slayer"]
+        await engine.handle_event(LevelUpEvent(user_id="2", new_level=3))
+        assert list(engine.progress) == ["2"]  # "1" was evicted
+
+        restarted = AchievementEngine(CharacterSystem(), rules=rules)
+    assert await restarted.handle_event(TrainingCompletedEvent(user_id="1")) == ["Trainee"]
+    progress = restarted.progress["1"]
+    assert progress.counters["bosses_defeated"] == 1 and progress.defeated == {"solomon"}
+
+    # Passed thresholds are not walked again: an unlock dropped from the cache is not re-earned.
+    progress.unlocked.discard("Trainee")
+    assert await restarted.handle_event(TrainingCompletedEvent(user_id="1")) == ["Student"]
+
+
+@pytest.mark.asyncio
+async def test_battle_counts_survive_restart(tmp_path):
+    rules = [AchievementRule("Veteran", "wins >= 2"), AchievementRule("Humbled", "losses >= 2")]
+    with patch("HCshinobi.core.character_system.DATA_DIR", str(tmp_path)):
+        characters = CharacterSystem()
+        for user_id in ("1", "2"):
+            await characters.save_character(Character(id=user_id, name=f"Ninja {user_id}"))
+        engine = AchievementEngine(characters, rules=rules)
+        assert await engine.handle_event(BattleEndedEvent(user_id="1", loser_id="2", mode="pvp")) == []
+
+        restarted = AchievementEngine(CharacterSystem(), rules=rules)
+        earned = await restarted.handle_event(BattleEndedEvent(user_id="1", loser_id="2", mode="pvp"))
+        assert earned == ["Veteran", "Humbled"]
+        assert (await CharacterSystem().get_character("1")).wins == 2
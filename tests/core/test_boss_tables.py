@@ -0,0 +1,81 @@
+"""
+Tests for precompiled boss phase and damage tables.
+"""
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from HCshinobi.core.boss_battle_system import (
+    NPC_JUTSU_DAMAGE, NPC_MECHANICS, NPC_PHASE_MULTIPLIERS, SOLOMON_JUTSU_DAMAGE, SOLOMON_PHASE_MULTIPLIERS,
+    BossBattleSystem, solomon_table,
+)
+
+PHASES = [
+    {"name": name, "hp_threshold": threshold, "jutsu_pool": ["Amaterasu", "Kōkō no Kusari", "Unlisted Jutsu"]}
+    for name, threshold in zip(SOLOMON_PHASE_MULTIPLIERS, [1.0, 0.7, 0.4, 0.1])
+]
+
+
+def boss_system(tmp_path, phases=PHASES):
+    path = tmp_path / "solomon.json"
+    path.write_text(json.dumps({"name": "Solomon", "boss_phases": phases}), encoding="utf-8")
+    system = BossBattleSystem(MagicMock())
+    system.boss_data_path = str(path)
+    system.boss_data = system.load_boss_data()
+    return system
+
+
+def test_solomon_table_matches_the_per_call_formula():
+    table = solomon_table({"boss_phases": PHASES})
+    for phase in PHASES + [{"name": "Not A Phase"}]:
+        for jutsu in list(SOLOMON_JUTSU_DAMAGE) + ["Unlisted Jutsu"]:
+            expected = int(SOLOMON_JUTSU_DAMAGE.get(jutsu, 100) * SOLOMON_PHASE_MULTIPLIERS.get(phase["name"], 1.0))
+            assert table.damage(jutsu, phase) == expected
+    assert table.phase(0.5) is PHASES[2]
+
+    # solomon.json's own multipliers win over the built-in ones
+    tuned = solomon_table({"boss_phases": [dict(PHASES[0], damage_multiplier=3.0)]})
+    assert tuned.damage("Amaterasu", PHASES[0]) == 450
+
+
+def test_compiled_table_is_reused_until_the_boss_file_changes(tmp_path):
+    system = boss_system(tmp_path)
+    table = system.boss_table()
+    assert system.boss_table() is table
+    assert system.calculate_boss_damage("Amaterasu", system.get_current_phase(0.05)) == 300
+
+    system.boss_data = {"boss_phases": PHASES[:1]}  # not from the registry: compiled on demand
+    assert system.boss_table() is not table
+    assert system.get_current_phase(0.05)["name"] == PHASES[0]["name"]
+
+
+def test_npc_tables_match_the_per_call_formula():
+    system = BossBattleSystem(MagicMock())
+    for npc, mechanics in NPC_MECHANICS.items():
+        assert system.get_npc_mechanics(npc) is mechanics
+        for ratio in [1.0, 0.7, 0.5, 0.3, 0.0]:
+            phase = system.get_npc_current_phase(ratio, mechanics)
+            assert phase is next((p for p in mechanics["phases"] if ratio >= p["hp_threshold"]), mechanics["phases"][-1])
+            for jutsu in phase["jutsu_pool"] + ["Basic Attack"]:
+                multiplier = NPC_PHASE_MULTIPLIERS.get(phase["name"].split(":")[0], 1.0)
+                assert system.calculate_npc_damage(jutsu, phase, {}) == int(NPC_JUTSU_DAMAGE.get(jutsu, 60) * multiplier)
+    assert system.get_npc_mechanics("Nobody") == {}
+
+
+@pytest.mark.asyncio
+async def test_benchmark_boss_turns_per_second(tmp_path):
+    system = boss_system(tmp_path)
+    character = {"name": "Naruto", "hp": 10**9, "max_hp": 10**9}
+    boss = {"name": "Solomon", "hp": 10**6, "max_hp": 10**6}
+    battle = {"character": character, "boss": boss, "battle_log": [], "turn": 1}
+    turns = 2000
+    start = time.perf_counter()
+    for _ in range(turns):
+        boss["hp"] = boss["max_hp"] // 2  # stay in one phase; regen would otherwise heal to full
+        battle["battle_log"].clear()
+        await system.process_boss_turn(battle)
+    elapsed = time.perf_counter() - start
+    assert battle["turn"] == turns + 1
+    print(f"{turns / elapsed:,.0f} boss turns per second")  # reported, not asserted
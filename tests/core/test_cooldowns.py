@@ -0,0 +1,106 @@
+"""
+Tests for the durable cooldown store.
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from HCshinobi.core.boss_battle_system import BossBattleSystem
+from HCshinobi.core.cooldowns import CooldownStore, format_remaining
+from HCshinobi.core.training_system import TrainingSystem
+
+
+def test_remaining_is_a_lookup_and_expired_entries_are_purged_lazily():
+    clock = [1000.0]
+    store = CooldownStore(clock=lambda: clock[0])
+    store.start("boss", 1, 100)
+    store.start("daily", 1, 10)
+    store.start("daily", 2, 50)
+    assert store.remaining("boss", "1") == 100 and store.remaining("daily", 3) == 0
+
+    clock[0] += 20
+    assert store.remaining("daily", 1) == 0 and store.expires_at("daily", 1) is None
+    assert len(store) == 3  # lapsed but not purged until the next write
+    store.start("daily", 3, 10)
+    assert len(store) == 3 and store.purged == 1
+
+    store.start("daily", 2, 500)  # replacing a cooldown leaves a stale heap entry behind
+    clock[0] += 100
+    assert store.purge() == 2  # boss/1 and daily/3; daily/2 was extended
+    assert store.active("daily") == {"2": 1520.0}
+
+
+def test_cooldowns_survive_a_restart_and_the_log_is_compacted(tmp_path):
+    clock = [1000.0]
+    store = CooldownStore(str(tmp_path), clock=lambda: clock[0])
+    store.start("boss", "solomon-slayer", 168 * 3600)
+    store.start("daily", "early-bird", 60)
+    store.clear("boss", "nobody")
+    for _ in range(200):
+        store.start("tokens", "spammer", 3600)
+    log = tmp_path / CooldownStore.FILENAME
+    assert len(log.read_text().splitlines()) < 200  # rewritten once it outgrew the live set
+
+    clock[0] += 120
+    reopened = CooldownStore(str(tmp_path), clock=lambda: clock[0])
+    assert reopened.remaining("boss", "solomon-slayer") == 168 * 3600 - 120
+    assert reopened.remaining("tokens", "spammer") == 3600 - 120
+    assert reopened.expires_at("daily", "early-bird") is None and len(reopened) == 2
+    assert len(log.read_text().splitlines()) == 2
+
+    reopened.clear("boss", "solomon-slayer")
+    assert CooldownStore(str(tmp_path), clock=lambda: clock[0]).remaining("boss", "solomon-slayer") == 0
+
+
+def test_scope_reads_like_a_dict_of_expiry_datetimes():
+    clock = [1_700_000_000.0]
+    training = CooldownStore(clock=lambda: clock[0]).scope("training")
+    training[42] = datetime.fromtimestamp(clock[0] + 3600, timezone.utc)
+    assert 42 in training and "42" in training and list(training) == ["42"]
+    assert training.get(42) == datetime.fromtimestamp(clock[0] + 3600, timezone.utc)
+    assert training.remaining(42) == timedelta(hours=1)
+    assert format_remaining(training.remaining(42)) == "1h 0m"
+
+    clock[0] += 3600
+    assert 42 not in training and training.get(42) is None and len(training) == 0
+    with pytest.raises(KeyError):
+        del training[42]
+    assert format_remaining(timedelta(days=2, hours=5, seconds=1)) == "2d 5h"
+
+
+def test_systems_share_the_store(tmp_path):
+    store = CooldownStore(str(tmp_path))
+    services = MagicMock(cooldowns=store)
+    boss = BossBattleSystem(MagicMock(services=services))
+    boss.boss_data = {}  # default requirements: level 50, no achievements
+    boss.boss_cooldowns.start("7", timedelta(hours=168))
+    ok, message = boss.check_boss_requirements({"id": 7, "level": 99})
+    assert not ok and "6d 23h" in message
+
+    training = TrainingSystem(data_dir=str(tmp_path), cooldowns=store)
+    training.cooldowns["7"] = datetime.now(timezone.utc) + timedelta(hours=1)
+    assert CooldownStore(str(tmp_path)).active("training").keys() == {"7"}
+
+
+@pytest.mark.asyncio
+async def test_boss_cogs_share_the_solomon_cooldown(tmp_path):
+    from HCshinobi.bot.cogs.boss_commands import BossCommands
+    from HCshinobi.bot.cogs.updated_boss_commands import UpdatedBossCommands
+
+    store = CooldownStore(str(tmp_path))
+    bot = MagicMock(services=MagicMock(cooldowns=store))
+    system, cog, updated = BossBattleSystem(bot), BossCommands(bot), UpdatedBossCommands(bot)
+    system.boss_data = {}
+
+    cog.start_solomon_cooldown(7)
+    assert not system.check_boss_requirements({"id": 7, "level": 99})[0]
+
+    interaction = MagicMock()
+    interaction.user.id = 7
+    interaction.followup.send = AsyncMock()
+    achievements = updated.load_boss_data().get("boss_requirements", {}).get("required_achievements", [])
+    await updated.start_updated_solomon_battle(interaction, {"id": 7, "level": 99, "achievements": achievements})
+    embed = interaction.followup.send.await_args.kwargs["embed"]
+    assert "RECOVERING" in embed.title and "7" not in updated.active_boss_battles
+    assert cog.solomon_cooldown_embed(8) is None
@@ -0,0 +1,102 @@
+"""
+Tests for the in-process event bus.
+"""
+import asyncio
+
+import pytest
+
+from HCshinobi.core.events import (
+    BattleEndedEvent,
+    CurrencyChangedEvent,
+    EventBus,
+    LevelUpEvent,
+    TrainingCompletedEvent,
+)
+from HCshinobi.core.currency_system import CurrencySystem
+from HCshinobi.core.training_system import TrainingSystem
+
+
+@pytest.mark.asyncio
+async def test_subscriber_receives_only_requested_types():
+    bus = EventBus()
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    bus.subscribe(handler, LevelUpEvent)
+    bus.publish(LevelUpEvent(user_id="1", old_level=1, new_level=2))
+    bus.publish(CurrencyChangedEvent(user_id="1", delta=10, balance=10))
+    await bus.drain()
+
+    assert [type(e) for e in received] == [LevelUpEvent]
+    assert bus.metrics()["published"] == {"level_up": 1, "currency_changed": 1}
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_block_on_slow_subscriber():
+    bus = EventBus()
+    release = asyncio.Event()
+
+    async def slow(event):
+        await release.wait()
+
+    sub = bus.subscribe(slow, maxsize=2, name="slow")
+    for i in range(10):
+        bus.publish(LevelUpEvent(user_id=str(i)))
+
+    # First event is being handled, two more are queued, the rest are dropped.
+    metrics = bus.metrics()["subscribers"]["slow"]
+    assert metrics["dropped"] >= 7
+    assert metrics["high_water"] == 2
+
+    release.set()
+    await bus.drain()
+    assert sub.metrics.delivered + sub.metrics.dropped == 10
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_subscriber_is_isolated():
+    bus = EventBus()
+    good = []
+
+    async def bad(event):
+        raise RuntimeError("boom")
+
+    async def ok(event):
+        good.append(event)
+
+    bad_sub = bus.subscribe(bad)
+    bus.subscribe(ok)
+    bus.publish(BattleEndedEvent(user_id="1", battle_id="b1"))
+    await bus.drain()
+
+    assert bad_sub.metrics.errors == 1
+    assert len(good) == 1
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_currency_and_training_publish_events(tmp_path):
+    bus = EventBus()
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    bus.subscribe(handler)
+    currency = CurrencySystem(event_bus=bus)
+    training = TrainingSystem(data_dir=str(tmp_path), currency_system=currency, event_bus=bus)
+
+    currency.add_balance_and_save("42", 500)
+    await training.start_training("42", "strength", 1, "Light")
+    await training.complete_training("42", force_complete=True)
+    await bus.drain()
+
+    types = [type(e) for e in received]
+    assert types == [CurrencyChangedEvent, CurrencyChangedEvent, TrainingCompletedEvent]
+    assert received[1].delta == -10
+    assert received[2].attribute == "strength"
+    await bus.close()
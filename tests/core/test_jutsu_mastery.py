@@ -0,0 +1,105 @@
+"""
+Tests for jutsu mastery tracking.
+"""
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from HCshinobi.core.character import Character
+from HCshinobi.core.character_system import CharacterSystem
+from HCshinobi.core.jutsu_mastery import (
+    MASTERY_MODIFIERS,
+    JutsuMasteryTracker,
+    mastery_level,
+)
+from HCshinobi.core.missions.shinobios_engine import ShinobiOSEngine
+
+
+@pytest.fixture
+def character_system(tmp_path):
+    with patch("HCshinobi.core.character_system.DATA_DIR", str(tmp_path)):
+        yield CharacterSystem()
+
+
+def test_mastery_level_table():
+    assert mastery_level(0) == 0
+    assert mastery_level(9) == 0
+    assert mastery_level(10) == 1
+    assert mastery_level(10_000) == len(MASTERY_MODIFIERS) - 1
+    damage, cost = MASTERY_MODIFIERS[-1]
+    assert damage > 1.0 > cost
+
+
+@pytest.mark.asyncio
+async def test_uses_are_counted_in_memory_without_saving(character_system):
+    character = Character(id="7", name="Kakashi")
+    await character_system.save_character(character)
+    tracker = JutsuMasteryTracker(character_system)
+
+    with patch.object(character_system, "_save_character_to_file") as save:
+        for _ in range(30):
+            tracker.record_use("7", "Chidori")
+        save.assert_not_called()
+
+    assert tracker.get_uses("7", "Chidori") == 30
+    assert tracker.get_level("7", "Chidori") == 2
+    assert character.jutsu_mastery == {}
+
+
+@pytest.mark.asyncio
+async def test_pending_counts_ride_along_with_character_save(character_system):
+    character = Character(id="8", name="Guy")
+    tracker = JutsuMasteryTracker(character_system)
+    tracker.record_use("8", "Leaf Hurricane", count=12)
+
+    await character_system.save_character(character)
+
+    assert character.jutsu_mastery["Leaf Hurricane"]["uses"] == 12
+    assert character.jutsu_mastery["Leaf Hurricane"]["level"] == 1
+    assert tracker.pending_uses("8", "Leaf Hurricane") == 0
+    reloaded = await character_system._load_character("8")
+    assert reloaded.jutsu_mastery["Leaf Hurricane"]["uses"] == 12
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_each_dirty_character_once(character_system):
+    for cid in ("1", "2"):
+        await character_system.save_character(Character(id=cid, name=f"Ninja {cid}"))
+    tracker = JutsuMasteryTracker(character_system)
+    for _ in range(5):
+        tracker.record_use("1", "Rasengan")
+        tracker.record_use("2", "Fireball Jutsu")
+
+    with patch.object(character_system, "_save_character_to_file",
+                      wraps=character_system._save_character_to_file) as save:
+        flushed = await tracker.flush()
+
+    assert sorted(flushed) == ["1", "2"]
+    assert save.call_count == 2
+    assert character_system.characters["1"].jutsu_mastery["Rasengan"]["uses"] == 5
+
+
+def test_mission_actions_spend_discounted_chakra_and_gain_mastery():
+    tracker = JutsuMasteryTracker()
+    engine = ShinobiOSEngine(SimpleNamespace(jutsu_mastery=tracker))
+    rasengan = engine.jutsu_database["rasengan"]
+    environment = engine.environments["forest"]
+    player = engine.create_shinobi("Naruto", level=20, character_id="9")
+    enemy = engine.create_shinobi("Enemy", level=20)
+
+    novice = engine.execute_action(player, enemy, rasengan, environment, rng=random.Random(1))
+    assert novice.chakra_used == rasengan.chakra_cost
+    assert tracker.pending_uses("9", rasengan.name) == 1
+
+    tracker.record_use("9", rasengan.name, count=199)
+    player.chakra = player.max_chakra
+    master = engine.execute_action(player, enemy, rasengan, environment, rng=random.Random(1))
+    assert master.chakra_used == int(rasengan.chakra_cost * MASTERY_MODIFIERS[-1][1])
+    assert player.chakra == player.max_chakra - master.chakra_used
+    assert tracker.pending_uses("9", rasengan.name) == 201
+
+    # enemies have no character and neither pay less nor gain mastery
+    reply = engine.execute_action(enemy, player, rasengan, environment, rng=random.Random(1))
+    assert reply.chakra_used == rasengan.chakra_cost
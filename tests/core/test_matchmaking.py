@@ -0,0 +1,109 @@
+"""
+Tests for Elo ratings and the rating-bucketed matchmaking queue.
+"""
+import pytest
+
+from HCshinobi.core.character import Character
+from HCshinobi.core.events import BattleEndedEvent
+from HCshinobi.core.matchmaking import MatchmakingQueue, elo_update
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCharacters:
+    def __init__(self, *characters):
+        self.characters = {c.id: c for c in characters}
+        self.saved = []
+
+    async def get_character(self, user_id):
+        return self.characters.get(user_id)
+
+    async def save_character(self, character):
+        self.saved.append(character.id)
+
+
+def test_elo_update_moves_provisional_players_further():
+    assert elo_update(1200, 1200) == (1210, 1190)
+    assert elo_update(1200, 1200, winner_games=0, loser_games=0) == (1220, 1180)
+    # beating a much weaker player barely moves either rating
+    winner, loser = elo_update(1600, 1200)
+    assert 1600 < winner <= 1602 and 1198 <= loser < 1200
+
+
+@pytest.mark.asyncio
+async def test_pvp_results_update_both_ratings():
+    veteran = Character(id="1", name="Kakashi", rated_games=50)
+    rookie = Character(id="2", name="Naruto")
+    queue = MatchmakingQueue(FakeCharacters(veteran, rookie))
+
+    await queue.handle_event(BattleEndedEvent(user_id="2", loser_id="1", mode="pvp"))
+    assert (rookie.rating, veteran.rating) == (1220, 1190)
+
+    await queue.handle_event(BattleEndedEvent(user_id="1", loser_id="2", mode="boss"))
+    await queue.handle_event(BattleEndedEvent(user_id="1", loser_id="test_bot", mode="pvp"))
+    assert (rookie.rating, veteran.rating) == (1220, 1190)
+    assert queue.character_system.saved == ["2", "1"]
+    assert (rookie.rated_games, veteran.rated_games) == (1, 51)
+
+
+@pytest.mark.asyncio
+async def test_players_leave_provisional_k_after_enough_games():
+    first, second = Character(id="1", name="Naruto"), Character(id="2", name="Sasuke")
+    queue = MatchmakingQueue(FakeCharacters(first, second))
+    for game in range(30):
+        winner, loser = ("1", "2") if game % 2 == 0 else ("2", "1")
+        await queue.record_result(winner, loser)
+    assert first.rated_games == second.rated_games == 30
+
+    before = first.rating, second.rating
+    await queue.record_result("1", "2")
+    # both are past PROVISIONAL_GAMES, so K is 20 rather than 40
+    assert first.rating - before[0] <= 11 and before[1] - second.rating <= 11
+
+
+def test_pairs_closest_rating_and_widens_window_with_wait():
+    clock = Clock()
+    queue = MatchmakingQueue(clock=clock)
+    queue.enqueue(1, 1500, channel_id=9)
+    queue.enqueue(2, 1000)
+    queue.enqueue(3, 1040)
+    queue.enqueue(4, 1090)
+    queue.enqueue(1, 900)  # already queued: keeps its first ticket
+
+    pairs = queue.pair()
+    assert [(a.user_id, b.user_id) for a, b in pairs] == [("2", "3")]
+    assert len(queue) == 2 and 4 in queue and 2 not in queue
+
+    clock.now = 20  # window is now 100 + 10 * 20 = 300: still short of 410
+    assert queue.pair() == []
+    clock.now = 32
+    (first, second), = queue.pair()
+    assert (first.user_id, first.channel_id, second.user_id) == ("1", 9, "4")
+    assert len(queue) == 0 and queue.metrics()["buckets"] == 0
+
+
+def test_wait_percentiles_and_dequeue():
+    clock = Clock()
+    queue = MatchmakingQueue(clock=clock)
+    for user in range(100):
+        clock.now = user
+        queue.enqueue(user, 1200)
+    queue.enqueue("leaver", 1200)
+    assert queue.dequeue("leaver").user_id == "leaver"
+    assert queue.dequeue("leaver") is None
+
+    clock.now = 100
+    assert queue.metrics()["oldest_wait"] == 100
+    assert len(queue.pair()) == 50
+
+    metrics = queue.metrics()
+    assert metrics["queued"] == 0 and metrics["matched"] == 50
+    assert metrics["wait_p50"] == 50
+    assert metrics["wait_p90"] == 90
+    assert metrics["wait_p99"] == 99
@@ -0,0 +1,79 @@
+"""
+Tests for cached boss/NPC definitions and phase tables.
+"""
+import json
+import os
+
+from HCshinobi.core.npc_registry import NpcRegistry, PhaseTable
+
+PHASES = [
+    {"name": "Phase 1", "hp_threshold": 1.0},
+    {"name": "Phase 2", "hp_threshold": 0.7},
+    {"name": "Phase 3", "hp_threshold": 0.4},
+    {"name": "Phase 4", "hp_threshold": 0.1},
+]
+
+
+def linear_phase(phases, ratio):
+    for phase in phases:
+        if ratio >= phase["hp_threshold"]:
+            return phase
+    return phases[-1]
+
+
+def write(path, data, mtime=None):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_phase_table_matches_linear_scan():
+    table = PhaseTable(reversed(PHASES))  # input order does not matter
+    for ratio in [1.0, 0.99, 0.7, 0.69, 0.4, 0.25, 0.1, 0.05, 0.0]:
+        assert table.at(ratio) is linear_phase(PHASES, ratio)
+    assert PhaseTable([]).at(0.5, default={"name": "Unknown Phase"}) == {"name": "Unknown Phase"}
+
+
+def test_definitions_are_cached_and_reloaded_when_the_file_changes(tmp_path):
+    clock = [0.0]
+    registry = NpcRegistry(str(tmp_path), clock=lambda: clock[0])
+    boss = tmp_path / "solomon.json"
+    write(boss, {"name": "Solomon", "boss_phases": PHASES}, mtime=1_000_000_000)
+
+    first = registry.read(str(boss))
+    assert registry.read(str(boss)) is first
+    assert registry.phases(first) is registry.phases(first)
+    assert registry.phases(first).at(0.5)["name"] == "Phase 3"
+
+    write(boss, {"name": "Solomon", "boss_phases": PHASES[:2]}, mtime=2_000_000_000)
+    assert registry.read(str(boss)) is first  # not re-checked within the interval
+    clock[0] = NpcRegistry.CHECK_INTERVAL
+    reloaded = registry.read(str(boss))
+    assert reloaded is not first and registry.loads == 2
+    assert registry.phases(reloaded).at(0.5)["name"] == "Phase 2"
+
+    clock[0] += NpcRegistry.CHECK_INTERVAL
+    assert registry.read(str(boss)) is reloaded  # unchanged file: stat only
+    assert registry.loads == 2
+
+
+def test_npcs_are_indexed_by_name_and_level(tmp_path):
+    clock = [0.0]
+    registry = NpcRegistry(str(tmp_path), clock=lambda: clock[0])
+    write(tmp_path / "victor.json", {"name": "Victor", "level": 60})
+    write(tmp_path / "Cap.json", {"name": "Cap", "level": 45})
+    write(tmp_path / "slickbackwilie.json", {"name": "Slickback Willie", "level": 44})
+    write(tmp_path / "335942294492676097.json", {"name": "A player", "level": 50})
+    write(tmp_path / "template.json", {"name": "template", "level": 1})
+
+    assert registry.npc("Victor").key == "victor"
+    assert registry.npc("slickback willie").name == "Slickback Willie"
+    assert registry.npc("A player") is None
+    assert [npc.name for npc in registry.npcs()] == ["Slickback Willie", "Cap", "Victor"]
+    assert [npc.name for npc in registry.by_level(45, 59)] == ["Cap"]
+
+    write(tmp_path / "Chen.json", {"name": "Chen", "level": 55})
+    assert registry.npc("Chen") is None  # directory rescans are throttled too
+    clock[0] = NpcRegistry.CHECK_INTERVAL
+    assert registry.npc("chen").level == 55
+    assert [npc.name for npc in registry.by_level(45, 59)] == ["Cap", "Chen"]
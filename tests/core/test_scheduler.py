@@ -0,0 +1,70 @@
+"""
+Tests for the deadline scheduler.
+"""
+import asyncio
+
+import pytest
+
+from HCshinobi.core.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_touch_reschedules_and_expiry_fires_once():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock=clock)
+    scheduler.schedule_in("a", 10)
+    scheduler.schedule_in("b", 20)
+
+    # Touching "a" repeatedly leaves stale heap entries behind.
+    for _ in range(5):
+        clock.now += 5
+        scheduler.touch("a", 10)
+
+    clock.now = 1021.0
+    assert [key for key, _ in scheduler.pop_expired()] == ["b"]
+    assert scheduler.pop_expired() == []
+    assert scheduler.next_deadline() == pytest.approx(1035.0)
+
+    clock.now = 1035.0
+    assert [key for key, _ in scheduler.pop_expired()] == ["a"]
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline() is None
+
+
+def test_cancel_and_compaction():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock=clock)
+    for i in range(500):
+        scheduler.schedule_in("hot", i)
+    scheduler.schedule_in("cold", 1)
+    assert len(scheduler._heap) < 200
+
+    assert scheduler.cancel("cold")
+    assert not scheduler.cancel("cold")
+    clock.now += 1000
+    assert [key for key, _ in scheduler.pop_expired()] == ["hot"]
+
+
+@pytest.mark.asyncio
+async def test_callbacks_fire_from_background_loop():
+    scheduler = DeadlineScheduler()
+    fired = []
+
+    async def on_expire(key):
+        fired.append(key)
+
+    scheduler.start()
+    scheduler.schedule_in(("training", "1"), 0.01, on_expire)
+    scheduler.schedule_in(("mission", "2"), 0.02, fired.append)
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+
+    assert fired == [("training", "1"), ("mission", "2")]
+    assert scheduler.fired == 2
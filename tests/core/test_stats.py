@@ -0,0 +1,91 @@
+"""
+Tests for the effective stats service.
+"""
+from types import SimpleNamespace
+
+from HCshinobi.core.character import Character
+from HCshinobi.core.missions.shinobios_engine import ShinobiOSEngine
+from HCshinobi.core.stats import EffectiveStatsService
+
+
+def make_character(**kwargs):
+    return Character(id="1", name="Tester", ninjutsu=20, speed=10, perception=10, **kwargs)
+
+
+def test_equipment_buffs_and_debuffs_are_combined():
+    service = EffectiveStatsService(equipment_catalog={"kunai": {"stats": {"taijutsu": 1}}})
+    character = make_character(
+        equipment={"weapon": "kunai", "armor": {"stats": {"defense": 4}}},
+        buffs={"Focus": {"stats": {"ninjutsu": 5}, "multipliers": {"ninjutsu": 2.0}}},
+        debuffs={"Slow": {"speed": 3}},
+        status_conditions={"Blinded": True},
+    )
+
+    stats = service.get(character)
+
+    assert stats.taijutsu == character.taijutsu + 1
+    assert stats.defense == character.defense + 4
+    assert stats.ninjutsu == 50
+    assert stats.speed == round((10 - 3) * 0.9)
+    assert stats.perception == 5
+    assert service.get_bonus(character, "ninjutsu") == 30
+
+
+def test_results_are_memoized_until_invalidated():
+    service = EffectiveStatsService(equipment_catalog={})
+    character = make_character()
+
+    first = service.get(character)
+    assert service.get(character) is first
+    assert (service.hits, service.misses) == (1, 1)
+
+    # Direct mutation is not seen until the character is invalidated.
+    character.ninjutsu = 99
+    assert service.get(character).ninjutsu == 20
+    service.invalidate(character.id)
+    assert service.get(character).ninjutsu == 99
+
+
+def test_modifier_helpers_invalidate():
+    service = EffectiveStatsService(equipment_catalog={})
+    character = make_character()
+    service.get(character)
+
+    service.apply_buff(character, "Sage Mode", {"strength": 10})
+    assert service.get(character).strength == character.strength + 10
+    service.remove_buff(character, "Sage Mode")
+    assert service.get(character).strength == character.strength
+
+    service.equip(character, "armor", {"stats": {"defense": 2}})
+    assert service.get(character).defense == character.defense + 2
+    service.unequip(character, "armor")
+    assert service.get(character).defense == character.defense
+
+
+def test_invalidate_all_bumps_every_version():
+    service = EffectiveStatsService(equipment_catalog={})
+    character = make_character()
+    first = service.get(character)
+    before = service.version(character.id)
+
+    service.invalidate_all()
+    assert service.version(character.id) > before
+    assert service.get(character) is not first
+
+
+def test_shinobios_damage_reads_the_cached_stat_block():
+    service = EffectiveStatsService(equipment_catalog={})
+    character = make_character()
+    services = SimpleNamespace(stats_service=service, character_system=SimpleNamespace(characters={"1": character}))
+    engine = ShinobiOSEngine(services)
+    jutsu = engine.jutsu_database["fireball"]
+    forest = engine.environments["forest"]
+    player = engine.create_shinobi("Tester", 5, character_id="1")
+    enemy = engine.create_shinobi("Bandit", 5)
+
+    plain = engine.calculate_damage(jutsu, player, enemy, forest)
+    service.apply_buff(character, "Sage Mode", {"ninjutsu": 50})
+    assert engine.effective_stat(player, "ninjutsu") == player.ninjutsu + 50
+    assert engine.calculate_damage(jutsu, player, enemy, forest) > plain
+    # Enemies have no character, so they keep their own stats.
+    assert engine.effective_stat(enemy, "ninjutsu") == enemy.ninjutsu
@@ -0,0 +1,113 @@
+"""
+Tests for concurrent mission generation against a local stub endpoint.
+"""
+import asyncio
+import json
+import random
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import test_utils, web
+
+from HCshinobi.core.missions.generator import MissionGenerationError, MissionGenerator
+from HCshinobi.core.missions.mission import MissionDifficulty
+
+
+class StubEndpoint:
+    """Stands in for the generation endpoint: fixed latency, scripted failures, and a tally of connections."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.fail_first = 0
+        self.fail_status = 503
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.connections = set()
+        self.url = ""
+        self.reply = None  # overrides the mission body when set
+
+    async def handle(self, request):
+        self.requests += 1
+        number = self.requests
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if number <= self.fail_first:
+                return web.Response(status=self.fail_status)
+            body = await request.json()
+            if self.reply is not None:
+                return web.json_response(self.reply)
+            return web.json_response({"response": json.dumps({
+                "title": f"{body['difficulty']}-rank mission {number}",
+                "reward": {"ryo": 100},
+                "duration_hours": 2,
+            })})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest_asyncio.fixture
+async def stub():
+    endpoint = StubEndpoint()
+    app = web.Application()
+    app.router.add_post("/api/generate", endpoint.handle)
+    server = test_utils.TestServer(app)
+    await server.start_server()
+    endpoint.url = str(server.make_url("/api/generate"))
+    yield endpoint
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_is_concurrent_bounded_and_reuses_connections(stub):
+    stub.delay = 0.02
+    difficulties = list(MissionDifficulty)
+    async with MissionGenerator(stub.url, concurrency=10) as generator:
+        start = time.perf_counter()
+        missions = await generator.generate_mission_batch("Leaf", difficulties, 10)
+        elapsed = time.perf_counter() - start
+
+    # Sequential round trips would take 50 x 20ms = 1s; reported, not asserted.
+    print(f"50 missions took {elapsed:.2f}s")
+    assert len(missions) == 50
+    assert [m.difficulty for m in missions] == [d for d in difficulties for _ in range(10)]
+    assert missions[0].title.startswith("D-rank") and missions[0].reward == {"ryo": 100}
+    assert 1 < stub.peak <= 10
+    assert len(stub.connections) <= 10  # keep-alive: 50 requests over at most one connection per slot
+    metrics = generator.metrics()
+    assert metrics["requests"] == 50 and metrics["retried"] == 0
+    assert metrics["latency_p50_ms"] <= metrics["latency_p99_ms"] <= metrics["latency_max_ms"]
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_and_others_are_not(stub):
+    stub.fail_first = 2
+    async with MissionGenerator(stub.url, backoff=0.001, rng=random.Random(3)) as generator:
+        mission = await generator.generate_mission("Sand", MissionDifficulty.C_RANK)
+    assert mission.title == "C-rank mission 3" and generator.metrics()["retried"] == 2
+
+    async with MissionGenerator(stub.url.replace("/api/generate", "/missing"), backoff=0.001) as generator:
+        with pytest.raises(MissionGenerationError, match="404"):
+            await generator.generate_mission_batch("Sand", [MissionDifficulty.C_RANK], 3)
+    assert generator.metrics()["retried"] == 0
+
+    stub.delay = 0.2
+    async with MissionGenerator(stub.url, timeout=0.05, retries=1, backoff=0.001) as generator:
+        with pytest.raises(MissionGenerationError, match="after 2 attempts"):
+            await generator.generate_mission("Mist", MissionDifficulty.S_RANK)
+    assert generator.metrics()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_replies_raise_generation_errors(stub):
+    async with MissionGenerator(stub.url, backoff=0.001) as generator:
+        for reply, reason in [({"response": "not json"}, "unreadable"), ({"response": "[1, 2]"}, "JSON list"),
+                              (["no", "object"], "unreadable")]:
+            stub.reply = reply
+            with pytest.raises(MissionGenerationError, match=reason):
+                await generator.generate_mission("Leaf", MissionDifficulty.D_RANK)
+    assert generator.metrics()["failures"] == 3 and generator.metrics()["retried"] == 0
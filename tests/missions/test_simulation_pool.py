@@ -0,0 +1,58 @@
+"""
+Tests for the simulation worker pool.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from HCshinobi.core.missions.simulation_pool import (
+    BattleSpec,
+    SimulationService,
+    chunk_specs,
+    run_battle_spec,
+    scenario_sweep_specs,
+)
+
+
+def test_chunking_preserves_battle_counts():
+    specs = [BattleSpec("a", 10, battles=12_500, seed=1), BattleSpec("b", 20, battles=100)]
+    chunks = chunk_specs(specs, 5_000)
+
+    assert [c.battles for c in chunks] == [5_000, 5_000, 2_500, 100]
+    assert len({c.seed for c in chunks if c.label == "a"}) == 3
+    assert chunks[-1].seed is None
+
+
+def test_run_battle_spec_returns_compact_totals():
+    totals = run_battle_spec(BattleSpec("L10 vs D", 10, "D", battles=200, seed=3))
+    assert totals["battles"] == 200
+    assert totals["wins"] + totals["losses"] + totals["draws"] == 200
+    assert totals["rounds"] >= 200
+
+
+@pytest.mark.asyncio
+async def test_sweep_merges_chunks_and_reports_progress():
+    service = SimulationService(max_workers=2)
+    specs = scenario_sweep_specs([10], difficulties=("D", "C"), battles=3_000, seed=5)
+    progress = []
+
+    results = await service.run_sweep(specs, progress=lambda done, total: progress.append((done, total)),
+                                      chunk_size=1_000)
+
+    assert set(results) == {"L10 vs D (forest)", "L10 vs C (forest)"}
+    assert all(r.battles == 3_000 for r in results.values())
+    assert progress[-1] == (6, 6)
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_sweep_can_be_cancelled():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = SimulationService(executor=executor)
+        job = service.start_sweep([BattleSpec("big", 10, battles=200_000)], chunk_size=1_000, max_in_flight=1)
+        await asyncio.sleep(0.05)
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job.wait()
+        assert job.completed_chunks < job.total_chunks
@@ -0,0 +1,73 @@
+"""
+Tests for the vectorized ShinobiOS battle simulator.
+"""
+import copy
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from HCshinobi.core.missions.shinobios_engine import ShinobiOSEngine
+from HCshinobi.core.missions.simulator import BatchSimulator, SimulationResult, simulate_battle
+
+
+@pytest.fixture
+def engine():
+    return ShinobiOSEngine()
+
+
+def test_batch_matches_scalar_engine(engine):
+    """Win rate, round count and damage must agree with the scalar engine within sampling error."""
+    scenario = engine.create_mission_scenario("C", "forest")
+    rng = random.Random(1234)
+    scalar = []
+    for _ in range(1500):
+        player = engine.create_shinobi("Player", 12)
+        enemies = [copy.deepcopy(e) for e in scenario["enemies"]]
+        scalar.append(simulate_battle(engine, player, enemies, scenario["environment"], rng=rng))
+
+    result = BatchSimulator(engine, seed=1234).run(
+        engine.create_shinobi("Player", 12), scenario["enemies"], scenario["environment"], 20000
+    )
+
+    scalar_win = sum(o.winner == "player" for o in scalar) / len(scalar)
+    # Standard error of the difference between two binomial proportions.
+    p = result.win_rate
+    se = math.sqrt(p * (1 - p) / len(scalar) + p * (1 - p) / result.battles)
+    assert abs(scalar_win - result.win_rate) < 4 * se
+
+    scalar_rounds = np.array([o.rounds for o in scalar])
+    se_rounds = math.sqrt(scalar_rounds.var() / len(scalar) + result.rounds.var() / result.battles)
+    assert abs(scalar_rounds.mean() - result.average_rounds) < 4 * se_rounds
+
+    scalar_dealt = np.array([o.damage_dealt for o in scalar])
+    se_dealt = math.sqrt(scalar_dealt.var() / len(scalar) + result.damage_dealt.var() / result.battles)
+    assert abs(scalar_dealt.mean() - result.damage_distribution()["mean"]) < 4 * se_dealt
+
+
+def test_batch_result_summary(engine):
+    sim = BatchSimulator(engine, seed=7)
+    result = sim.run_scenario(engine.create_shinobi("Uchiha", 20), "B", battles=2000)
+
+    summary = result.summary()
+    assert summary["battles"] == 2000
+    assert summary["wins"] + summary["losses"] + summary["draws"] == 2000
+    assert 0.0 <= summary["win_rate"] <= 1.0
+    assert summary["average_rounds"] >= 1
+    dist = summary["damage_dealt"]
+    assert dist["p5"] <= dist["p50"] <= dist["p95"]
+
+
+def test_seeded_runs_are_reproducible_and_mergeable(engine):
+    player = engine.create_shinobi("Player", 10)
+    scenario = engine.create_mission_scenario("D", "desert")
+    first = BatchSimulator(engine, seed=99).run(player, scenario["enemies"], scenario["environment"], 500)
+    second = BatchSimulator(engine, seed=99).run(player, scenario["enemies"], scenario["environment"], 500)
+    assert first.wins == second.wins
+    assert np.array_equal(first.rounds, second.rounds)
+
+    merged = SimulationResult.merge([first, second])
+    assert merged.battles == 1000
+    assert merged.wins == first.wins * 2
@@ -0,0 +1,198 @@
+"""
+Tests for the coalescing battle message update queue.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from HCshinobi.core.battle.registry import BattleRegistry
+from HCshinobi.core.boss_battle_system import BossBattleSystem
+from HCshinobi.utils.message_updates import MessageUpdateQueue
+
+
+class FakeMessage:
+    def __init__(self, message_id, deleted=False):
+        self.id = message_id
+        self.deleted = deleted
+        self.edits = []
+
+    async def edit(self, **kwargs):
+        if self.deleted:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+        self.edits.append((time.monotonic(), kwargs))
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, **kwargs):
+        message = FakeMessage(100 + len(self.sent))
+        self.sent.append((message, kwargs))
+        return message
+
+
+@pytest.mark.asyncio
+async def test_burst_collapses_into_one_edit_with_latest_state():
+    queue = MessageUpdateQueue(min_interval=0.05)
+    message = FakeMessage(1)
+    queue.track("b1", message)
+    state = {"turn": 0}
+    render = lambda: {"content": f"turn {state['turn']}"}
+
+    first = queue.submit("b1", 10, render)
+    await first
+    waiters = []
+    for turn in range(1, 6):
+        state["turn"] = turn
+        waiters.append(queue.submit("b1", 10, render))
+    assert await asyncio.gather(*waiters) == [message] * 5
+
+    assert [kwargs["content"] for _, kwargs in message.edits] == ["turn 0", "turn 5"]
+    assert message.edits[1][0] - message.edits[0][0] >= 0.045
+    assert queue.stats() == {"submitted": 6, "coalesced": 4, "edits": 2, "sends": 0}
+
+
+@pytest.mark.asyncio
+async def test_send_without_handle_then_edit_and_resend_when_deleted():
+    queue = MessageUpdateQueue(min_interval=0)
+    channel = FakeChannel()
+
+    sent = await queue.submit("m1", 10, lambda: {"content": "start", "view": None}, channel.send)
+    assert channel.sent[0][1] == {"content": "start"}  # send() never receives view=None
+    assert await queue.submit("m1", 10, lambda: {"content": "next"}, channel.send) is sent
+    assert sent.edits[0][1] == {"content": "next"}
+
+    sent.deleted = True
+    replacement = await queue.submit("m1", 10, lambda: {"content": "again"}, channel.send)
+    assert replacement is not sent and queue.message("m1") is replacement
+    assert (queue.edits, queue.sends) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_channels_drain_independently_and_forget_drops_pending():
+    queue = MessageUpdateQueue(min_interval=0.05)
+    a, b = FakeMessage(1), FakeMessage(2)
+    queue.track("a", a)
+    queue.track("b", b)
+    await asyncio.gather(queue.submit("a", 1, lambda: {"content": "a"}), queue.submit("b", 2, lambda: {"content": "b"}))
+    assert len(a.edits) == len(b.edits) == 1
+    assert abs(a.edits[0][0] - b.edits[0][0]) < 0.04  # no shared rate limit across channels
+
+    pending = queue.submit("a", 1, lambda: {"content": "late"})
+    queue.forget("a")
+    assert await pending is a
+    await queue.flush()
+    assert len(a.edits) == 1 and queue.message("a") is None
+
+
+class GoneChannel:
+    async def send(self, **kwargs):
+        raise discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Missing Access")
+
+
+@pytest.mark.asyncio
+async def test_one_render_fans_out_to_every_spectator():
+    queue = MessageUpdateQueue(min_interval=0)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return {"content": f"turn {len(renders)}", "view": "buttons"}
+
+    player = FakeChannel()
+    spectators = {100 + i: FakeChannel() for i in range(20)}
+    for channel_id, channel in spectators.items():
+        assert queue.watch("b1", channel_id, channel.send)
+    full = MessageUpdateQueue(min_interval=0)
+    full.MAX_SPECTATORS = 1
+    assert full.watch("b1", 1, player.send) and not full.watch("b1", 2, player.send)
+
+    await queue.submit("b1", 10, render, player.send)
+    await queue.flush()
+    assert len(renders) == 1
+    assert player.sent[0][1] == {"content": "turn 1", "view": "buttons"}
+    assert all(channel.sent[0][1] == {"content": "turn 1"} for channel in spectators.values())
+
+    await queue.submit("b1", 10, render, player.send)
+    await queue.flush()
+    assert len(renders) == 2
+    assert all(c.sent[0][0].edits[0][1] == {"content": "turn 2", "view": None} for c in spectators.values())
+
+    late = FakeChannel()
+    queue.watch("b1", 99, late.send)  # sees the latest frame without a new render
+    await queue.flush()
+    assert late.sent[0][1] == {"content": "turn 2"} and len(renders) == 2
+    assert queue.spectator_stats() == {"battles": 1, "spectators": 21, "renders": 2, "fanned_out": 40, "dropped": 0}
+
+
+@pytest.mark.asyncio
+async def test_spectators_who_leave_are_dropped():
+    clock = [0.0]
+    queue = MessageUpdateQueue(min_interval=0, clock=lambda: clock[0])
+    deleter, leaser, stayer = FakeChannel(), FakeChannel(), FakeChannel()
+    queue.watch("b1", 1, deleter.send)
+    queue.watch("b1", 2, GoneChannel().send)
+    queue.watch("b1", 3, leaser.send, ttl=5)
+    queue.watch("b1", 4, stayer.send)
+    await queue.submit("b1", 10, lambda: {"content": "one"})
+    await queue.flush()
+    assert sorted(queue.spectators("b1")) == [1, 3, 4]  # channel 2 refused the send
+
+    deleter.sent[0][0].deleted = True
+    clock[0] = 10  # channel 3's lease ran out
+    await queue.submit("b1", 10, lambda: {"content": "two"})
+    await queue.flush()
+    assert queue.spectators("b1") == [4] and len(leaser.sent[0][0].edits) == 0
+
+    queue.publish("b1", lambda: {"content": "final"})
+    queue.forget("b1")  # the queued final frame still reaches the spectator
+    await queue.flush()
+    assert stayer.sent[0][0].edits[-1][1] == {"content": "final"}
+    assert queue.spectators("b1") == [] and queue.message(("spectate", "b1", 4)) is None
+    assert queue.spectator_stats()["dropped"] == 4
+
+
+@pytest.mark.asyncio
+async def test_idle_channels_and_unwatched_battles_leave_no_state():
+    queue = MessageUpdateQueue(min_interval=0.02)
+    channel = FakeChannel()
+    for battle in range(5):
+        await queue.submit(f"b{battle}", battle, lambda: {"content": "turn"}, channel.send)
+    assert queue._frames == {}  # nobody is watching, so no frame is kept
+
+    queue.watch("b0", 99, FakeChannel().send)
+    await queue.submit("b0", 0, lambda: {"content": "watched"})
+    assert set(queue._frames) == {"b0"}
+    queue.unwatch("b0", 99)
+    assert queue._frames == {}
+
+    await queue.flush()
+    await asyncio.sleep(0.05)
+    assert queue._last_edit == {}
+
+
+@pytest.mark.asyncio
+async def test_boss_battle_system_fights_reach_spectators():
+    """Every cog that claims a boss fight publishes frames, so /spectate never watches a silent battle."""
+    queue = MessageUpdateQueue(min_interval=0)
+    services = SimpleNamespace(battle_registry=BattleRegistry(), message_updates=queue)
+    system = BossBattleSystem(SimpleNamespace(services=services))
+    system.load_npc_data = lambda name: {"name": name, "hp": 100, "max_hp": 100}
+    interaction = MagicMock()
+    interaction.user.id = 42
+    interaction.followup.send = AsyncMock()
+
+    assert await system.start_npc_battle(interaction, {"level": 99}, "Itachi")
+    battle = system.active_boss_battles["42"]
+    watcher = FakeChannel()
+    assert queue.watch(("boss", battle["battle_id"]), 7, watcher.send)
+
+    await system.end_boss_battle(interaction, battle, "defeat")
+    await queue.flush()
+    assert watcher.sent[0][1] == {"embed": interaction.followup.send.call_args.kwargs["embed"]}
+    assert queue.spectators(("boss", battle["battle_id"])) == []  # the final frame ends the watch
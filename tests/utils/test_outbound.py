@@ -0,0 +1,116 @@
+"""
+Tests for the outbound Discord send scheduler.
+"""
+import asyncio
+
+import pytest
+
+from HCshinobi.utils.outbound import OutboundScheduler, Priority
+
+
+class FakeUser:
+    def __init__(self, user_id, tracker):
+        self.id = user_id
+        self.tracker = tracker
+
+    async def send(self, **kwargs):
+        self.tracker["active"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        await asyncio.sleep(0.005)
+        self.tracker["active"] -= 1
+        self.tracker["sent"].append((self.id, kwargs["content"]))
+
+
+class FakeClient:
+    def __init__(self):
+        self.fetches = 0
+        self.tracker = {"active": 0, "peak": 0, "sent": []}
+
+    def get_user(self, user_id):
+        return None
+
+    async def fetch_user(self, user_id):
+        self.fetches += 1
+        return FakeUser(user_id, self.tracker)
+
+
+@pytest.mark.asyncio
+async def test_interactive_overtakes_queued_bulk_on_same_route():
+    outbound = OutboundScheduler(route_rate=1000, route_burst=1)
+    order = []
+
+    async def record(name):
+        order.append(name)
+
+    futures = [
+        outbound.submit(("channel", 1), lambda: record("alert 1"), Priority.BULK),
+        outbound.submit(("channel", 1), lambda: record("alert 2"), Priority.BULK),
+        outbound.submit(("channel", 1), lambda: record("turn"), Priority.INTERACTIVE),
+    ]
+    await asyncio.gather(*futures)
+    await outbound.close()
+
+    assert order == ["turn", "alert 1", "alert 2"]
+    metrics = outbound.metrics()
+    assert metrics["depth"] == 0 and metrics["high_water"] == 3
+    assert metrics["priorities"]["bulk"]["sent"] == 2
+    assert metrics["priorities"]["interactive"]["sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_route_does_not_block_other_routes():
+    outbound = OutboundScheduler(route_rate=20, route_burst=1)
+    order = []
+
+    async def record(name):
+        order.append(name)
+
+    busy = [outbound.submit(("channel", 1), lambda i=i: record(f"busy {i}")) for i in range(2)]
+    other = outbound.submit(("channel", 2), lambda: record("other"), Priority.BULK)
+    await asyncio.gather(*busy, other)
+    await outbound.close()
+
+    # the second call on channel 1 waits ~50ms for a token; channel 2 goes first
+    assert order == ["busy 0", "other", "busy 1"]
+    assert outbound.metrics()["priorities"]["normal"]["max_wait"] >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_dm_fan_out_is_bounded_and_users_are_cached():
+    client = FakeClient()
+    outbound = OutboundScheduler(client, global_rate=1000, route_rate=1000, dm_concurrency=3)
+    user_ids = [str(i) for i in range(1, 11)]
+
+    reached = await outbound.send_dms(user_ids + ["1"], content="Your battle timed out.")
+    await outbound.send_dms(user_ids[:5], content="Again")
+    await outbound.close()
+
+    assert reached == {uid: True for uid in user_ids}
+    assert client.fetches == 10
+    assert client.tracker["peak"] <= 3
+    assert len(client.tracker["sent"]) == 15
+    assert outbound.metrics()["user_cache"] == {"size": 10, "hits": 5, "misses": 10}
+
+
+@pytest.mark.asyncio
+async def test_idle_route_buckets_are_dropped_once_refilled(monkeypatch):
+    monkeypatch.setattr(OutboundScheduler, "BUCKET_SWEEP", 4)
+    now = [0.0]
+    outbound = OutboundScheduler(route_rate=1, route_burst=5, clock=lambda: now[0])
+
+    async def noop():
+        return None
+
+    for channel in range(4):
+        await outbound.submit(("channel", channel), noop)
+    assert outbound.metrics()["buckets"] == 4
+
+    # Channels 0-3 are idle but still refilling, so their pacing state is kept.
+    await outbound.submit(("channel", 4), noop)
+    assert outbound.metrics()["buckets"] == 5
+
+    now[0] = 10.0  # channels 0-4 are full again
+    for channel in range(5, 9):
+        await outbound.submit(("channel", channel), noop)
+    await outbound.close()
+    assert set(outbound._buckets) == {("channel", c) for c in range(5, 9)}